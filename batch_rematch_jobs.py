@@ -12,18 +12,20 @@ import time
 import json
 import sqlite3
 import yaml
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
 from datetime import datetime
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(__file__))
 
 from src.database.operations import DatabaseManager
-from src.rag.vector_manager import ChromaDBManager
-from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+from src.rag.rag_service import RAGServiceClient
 from src.matcher.generic_resume_models import GenericResumeProfile, SkillCategory, WorkExperience
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from src.rag.vector_manager import ChromaDBManager
+
 
 def load_integration_config(config_path: str = "config/integration_config.yaml") -> dict:
     """加载集成配置文件"""
@@ -38,22 +40,38 @@ def load_integration_config(config_path: str = "config/integration_config.yaml")
 class BatchRematcher:
     """批量重新匹配器"""
     
-    def __init__(self, db_path: str = 'data/jobs.db'):
+    def __init__(self, db_path: str = 'data/jobs.db', use_service: bool = False):
         self.db_path = db_path
         self.logger = get_logger(__name__)
         
         # 加载集成配置
         self.integration_config = load_integration_config()
         
-        # 初始化向量管理器
-        self.vector_manager = self._init_vector_manager()
-        
         # 初始化数据库管理器
         self.db_manager = DatabaseManager(db_path)
         
-        # 加载优化配置并初始化匹配器
-        config = self._load_optimized_config()
-        self.matcher = GenericResumeJobMatcher(self.vector_manager, config)
+        # 本地匹配和服务匹配使用同一份匹配器配置（服务端按请求中的配置创建匹配器）
+        self.matcher_config = self._load_optimized_config()
+        
+        # RAG常驻服务可用时通过服务匹配，不在本进程加载向量库和嵌入模型
+        self.service_client = None
+        if use_service:
+            client = RAGServiceClient.from_config(self.integration_config)
+            if client.is_available():
+                self.service_client = client
+                self.logger.info(f"🔌 使用RAG常驻服务: {client.base_url}")
+            else:
+                self.logger.warning("⚠️ RAG常驻服务未运行，改为本地匹配")
+        
+        self.vector_manager = None
+        self.matcher = None
+        if not self.service_client:
+            from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+            
+            # 初始化向量管理器
+            self.vector_manager = self._init_vector_manager()
+            
+            self.matcher = GenericResumeJobMatcher(self.vector_manager, self.matcher_config)
         
         # 统计信息
         self.stats = {
@@ -66,8 +84,15 @@ class BatchRematcher:
             'end_time': None
         }
     
-    def _init_vector_manager(self) -> ChromaDBManager:
-        """初始化向量管理器 - 参考 test_optimized_matching.py"""
+    def _init_vector_manager(self) -> 'ChromaDBManager':
+        """
+        初始化向量管理器 - 参考 test_optimized_matching.py
+        
+        使用 rag_system.vector_db 配置（包括嵌入模型），与RAG常驻服务的协调器一致，
+        只有未配置嵌入模型时才使用默认的多语言模型
+        """
+        from src.rag.vector_manager import ChromaDBManager
+        
         try:
             # 从集成配置中提取向量数据库配置
             rag_config = self.integration_config.get('rag_system', {})
@@ -76,9 +101,10 @@ class BatchRematcher:
             
             # 构建向量管理器配置
             vector_manager_config = {
+                **vector_db_config,
                 'persist_directory': vector_db_config.get('persist_directory', './chroma_db'),
                 'collection_name': vector_db_config.get('collection_name', 'job_positions'),
-                'embeddings': {
+                'embeddings': vector_db_config.get('embeddings') or {
                     'model_name': 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
                     'device': 'cpu',
                     'normalize_embeddings': True
@@ -189,6 +215,26 @@ class BatchRematcher:
             self.logger.error(f"💥 批量重新匹配失败: {str(e)}")
             raise
     
+    async def run_incremental(self) -> Dict[str, Any]:
+        """增量匹配：只对出队表中新完成RAG处理的职位打分，不再扫描全部未匹配职位"""
+        from src.matcher.incremental_matching import IncrementalMatchingWorker, get_profile_id
+        
+        if not self.matcher:
+            raise RuntimeError("增量匹配需要本地匹配器，不支持 --use-service")
+        
+        incremental_config = self.integration_config.get('integration_system', {}).get('incremental_matching', {})
+        worker = IncrementalMatchingWorker(self.matcher, self.db_manager, incremental_config)
+        
+        resume_profile = await self._create_resume_profile()
+        if not worker.is_registered(get_profile_id(resume_profile)):
+            self.logger.info("简历档案首次登记增量匹配，登记前的职位请先运行一次全量重新匹配")
+        worker.register_profile(resume_profile)
+        
+        totals = await worker.run_pending()
+        self.logger.info(f"✅ 增量匹配完成: {totals['jobs']} 个新职位, 新增 {totals['saved']} 条匹配, "
+                         f"事件水位线 #{totals['events_to']}")
+        return totals
+    
     async def _analyze_current_state(self):
         """分析当前匹配状态"""
         try:
@@ -316,6 +362,10 @@ class BatchRematcher:
     
     async def _process_job_batch(self, job_ids: List[str], resume_profile: GenericResumeProfile):
         """处理一批职位"""
+        if not self.service_client:
+            await self._score_job_batch(job_ids, resume_profile)
+            return
+        
         for job_id in job_ids:
             try:
                 self.stats['processed_jobs'] += 1
@@ -324,20 +374,19 @@ class BatchRematcher:
                 filters = {"job_id": job_id}
                 
                 # 执行匹配
-                result = await self.matcher.find_matching_jobs(
-                    resume_profile,
-                    filters=filters,
-                    top_k=1
+                result = await asyncio.to_thread(
+                    self.service_client.match, resume_profile.to_dict(), 1, filters, self.matcher_config
                 )
                 
                 # 保存匹配结果
-                if result.matches:
-                    await self._save_match_result(result.matches[0])
+                if result['matches']:
+                    match = result['matches'][0]
+                    await self._save_match_result(match)
                     self.stats['new_matches'] += 1
-                    self.logger.info(f"✅ 职位 {job_id} 匹配成功，分数: {result.matches[0].overall_score:.3f}")
+                    self.logger.info(f"✅ 职位 {job_id} 匹配成功，分数: {match['overall_score']:.3f}")
                 else:
                     # 记录查询元数据以便调试
-                    metadata = result.query_metadata
+                    metadata = result['query_metadata']
                     self.logger.debug(f"⚠️ 职位 {job_id} 未产生匹配结果")
                     self.logger.debug(f"   搜索结果数: {metadata.get('search_results_count', 0)}")
                     self.logger.debug(f"   候选职位数: {metadata.get('candidate_jobs_count', 0)}")
@@ -351,38 +400,53 @@ class BatchRematcher:
                 import traceback
                 self.logger.debug(f"错误详情: {traceback.format_exc()}")
     
-    async def _save_match_result(self, match_result):
-        """保存匹配结果到数据库"""
+    async def _score_job_batch(self, job_ids: List[str], resume_profile: GenericResumeProfile):
+        """本地匹配：一次检索整批职位并按列打分，只为达到阈值的职位写库（不生成匹配分析）"""
+        self.stats['processed_jobs'] += len(job_ids)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO resume_matches 
-                (job_id, resume_profile_id, match_score, priority_level, 
-                 semantic_score, skill_match_score, experience_match_score, 
-                 location_match_score, salary_match_score, match_details, 
-                 match_reasons, created_at, processed)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), 0)
-            """, (
-                match_result.job_id,
-                'default',
-                match_result.overall_score,
-                match_result.match_level.value if hasattr(match_result.match_level, 'value') else str(match_result.match_level),
-                match_result.dimension_scores.get('semantic_similarity', 0),
-                match_result.dimension_scores.get('skills_match', 0),
-                match_result.dimension_scores.get('experience_match', 0),
-                match_result.dimension_scores.get('industry_match', 0),
-                match_result.dimension_scores.get('salary_match', 0),
-                json.dumps(match_result.dimension_scores),
-                f"批量重新匹配: {match_result.job_title} at {match_result.company}"
-            ))
-            
-            conn.commit()
-            conn.close()
-            
+            batch = await self.matcher.score_jobs_batch(resume_profile, job_ids)
         except Exception as e:
-            self.logger.error(f"保存匹配结果失败: {str(e)}")
+            self.stats['failed_jobs'] += len(job_ids)
+            self.logger.warning(f"❌ 处理职位批次失败: {str(e)}")
+            return
+        
+        if batch.unscored_job_ids:
+            self.stats['failed_jobs'] += len(batch.unscored_job_ids)
+            self.logger.warning(f"❌ {len(batch.unscored_job_ids)} 个职位没有检索到文档或打分失败: "
+                                f"{', '.join(batch.unscored_job_ids)}")
+        
+        for index in range(len(batch)):
+            match = batch.row_dict(index)
+            await self._save_match_result(match)
+            self.stats['new_matches'] += 1
+            self.logger.info(f"✅ 职位 {match['job_id']} 匹配成功，分数: {match['overall_score']:.3f}")
+        
+        below_threshold = len(job_ids) - len(batch) - len(batch.unscored_job_ids)
+        self.logger.debug(f"⚠️ 本批 {below_threshold} 个职位未达到匹配阈值")
+    
+    async def _save_match_result(self, match_result: Dict[str, Any]):
+        """
+        保存匹配结果到数据库（match_result 为 ResumeMatchingResult.to_dict() 中的单条匹配）
+        
+        按 job_id + resume_profile_id 更新已有记录（已投递的跳过），不存在时插入，
+        重复匹配不会产生重复记录，matching_stats 计数保持准确
+        """
+        dimension_scores = match_result['dimension_scores']
+        saved = self.db_manager.save_resume_match({
+            'job_id': match_result['job_id'],
+            'resume_profile_id': 'default',
+            'match_score': match_result['overall_score'],
+            'priority_level': match_result['match_level'],
+            'semantic_score': dimension_scores.get('semantic_similarity', 0),
+            'skill_match_score': dimension_scores.get('skills_match', 0),
+            'experience_match_score': dimension_scores.get('experience_match', 0),
+            'location_match_score': dimension_scores.get('industry_match', 0),
+            'salary_match_score': dimension_scores.get('salary_match', 0),
+            'match_details': json.dumps(dimension_scores),
+            'match_reasons': f"批量重新匹配: {match_result['job_title']} at {match_result['company']}"
+        })
+        if not saved:
+            self.logger.error(f"保存匹配结果失败: {match_result['job_id']}")
     
     def _generate_report(self) -> Dict[str, Any]:
         """生成处理报告"""
@@ -457,14 +521,22 @@ async def main():
     parser.add_argument('--limit', type=int, help='限制处理的职位数量')
     parser.add_argument('--db-path', default='data/jobs.db', help='数据库路径')
     parser.add_argument('--report-file', help='保存报告到文件')
+    parser.add_argument('--use-service', action='store_true',
+                        help='通过RAG常驻服务匹配（先运行 python rag_cli.py serve）。匹配器配置随请求发送，'
+                             '与本地匹配相同；嵌入模型由服务端的 rag_system.vector_db 配置决定')
+    parser.add_argument('--incremental', action='store_true',
+                        help='只匹配出队表中的新职位（需启用 integration_system.incremental_matching）')
     
     args = parser.parse_args()
     
     # 创建重新匹配器
-    rematcher = BatchRematcher(args.db_path)
+    rematcher = BatchRematcher(args.db_path, use_service=args.use_service)
     
     # 运行批量重新匹配
-    report = await rematcher.run_batch_rematch(args.limit)
+    if args.incremental:
+        report = await rematcher.run_incremental()
+    else:
+        report = await rematcher.run_batch_rematch(args.limit)
     
     # 打印报告
     print("\n" + "="*60)
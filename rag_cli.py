@@ -12,26 +12,15 @@ import logging
 import json
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 # 添加项目根目录到Python路径
 sys.path.append(str(Path(__file__).parent))
 
-from src.rag.rag_system_coordinator import RAGSystemCoordinator
-from src.rag.data_pipeline import RAGDataPipeline, create_progress_callback
-from src.rag.resume_optimizer import ResumeOptimizer
-from src.rag.vector_manager import ChromaDBManager
-from src.rag.resume_document_parser import ResumeDocumentParser
-from src.rag.resume_document_processor import ResumeDocumentProcessor
-from src.rag.llm_factory import create_llm
-from src.matcher import (
-    GenericResumeJobMatcher
-)
-from src.matcher.generic_resume_models import (
-    GenericResumeProfile
-)
-from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
-from src.matcher.generic_resume_vectorizer import GenericResumeVectorizer
-from src.analysis_tools.agent import create_analysis_agent
+# RAG组件、LangChain和嵌入模型依赖较重，统一在各子命令内按需导入，
+# 保证 --help、status 等轻量命令的冷启动时间（见 scripts/benchmark_cli_startup.py）
+if TYPE_CHECKING:
+    from src.matcher.generic_resume_models import GenericResumeProfile
 
 def setup_logging(log_level: str = 'INFO', log_file: str = None):
     """设置日志配置"""
@@ -105,7 +94,16 @@ def load_resume(resume_file: str) -> dict:
             import yaml
             return yaml.safe_load(f)
 
-def create_default_zhanbin_profile() -> GenericResumeProfile:
+def get_service_client(args, config: dict):
+    """RAG常驻服务运行时返回其客户端，否则返回None（使用 --no-service 强制本地执行）"""
+    if getattr(args, 'no_service', False):
+        return None
+    
+    from src.rag.rag_service import RAGServiceClient
+    client = RAGServiceClient.from_config(config)
+    return client if client.is_available() else None
+
+def create_default_zhanbin_profile() -> 'GenericResumeProfile':
     """创建默认的占彬简历档案（通用格式）"""
     from src.matcher.generic_resume_models import GenericResumeProfile, SkillCategory, WorkExperience
     
@@ -169,8 +167,10 @@ def create_default_zhanbin_profile() -> GenericResumeProfile:
     
     return profile
 
-def load_resume_profile(resume_data: dict) -> GenericResumeProfile:
+def load_resume_profile(resume_data: dict) -> 'GenericResumeProfile':
     """统一的简历加载函数"""
+    from src.matcher.generic_resume_models import GenericResumeProfile
+    
     try:
         # 直接使用通用格式加载
         if 'skill_categories' in resume_data:
@@ -241,6 +241,8 @@ async def pipeline_command(args):
     print("=" * 40)
     
     try:
+        from src.rag.data_pipeline import RAGDataPipeline, create_progress_callback
+        
         config = load_config(args.config)
         
         # 覆盖命令行参数
@@ -284,15 +286,25 @@ async def status_command(args):
     
     try:
         config = load_config(args.config)
-        coordinator = RAGSystemCoordinator(config)
+        client = get_service_client(args, config)
         
-        if not coordinator.initialize_system():
-            print("❌ 系统初始化失败")
-            return False
-        
-        # 获取系统状态
-        system_status = coordinator.get_system_status()
-        progress = coordinator.get_processing_progress()
+        if client:
+            print("🔌 使用RAG常驻服务")
+            status = client.status()
+            system_status = status['system_status']
+            progress = status['progress']
+        else:
+            from src.rag.rag_system_coordinator import RAGSystemCoordinator
+            
+            coordinator = RAGSystemCoordinator(config)
+            
+            if not coordinator.initialize_system():
+                print("❌ 系统初始化失败")
+                return False
+            
+            # 获取系统状态
+            system_status = coordinator.get_system_status()
+            progress = coordinator.get_processing_progress()
         
         # 显示组件状态
         print("组件状态:")
@@ -320,12 +332,40 @@ async def status_command(args):
         print(f"❌ 状态查询失败: {e}")
         return False
 
+def serve_command(args):
+    """RAG常驻服务命令"""
+    print("🛰️ RAG常驻服务")
+    print("=" * 20)
+    
+    try:
+        from src.rag.rag_service import RAGService
+        
+        config = load_config(args.config)
+        service = RAGService(config, host=args.host, port=args.port)
+        
+        print("⏳ 正在加载RAG系统和嵌入模型...")
+        service.warm_up()
+        print(f"✅ 服务已就绪: http://{service.host}:{service.port}")
+        print("   status / search / match find-jobs 命令将自动通过服务执行，按 Ctrl+C 停止")
+        service.start()
+        return True
+        
+    except KeyboardInterrupt:
+        print("\n👋 服务已停止")
+        return True
+    except Exception as e:
+        print(f"❌ 服务启动失败: {e}")
+        return False
+
 async def optimize_command(args):
     """简历优化命令"""
     print("📝 简历优化")
     print("=" * 20)
     
     try:
+        from src.rag.rag_system_coordinator import RAGSystemCoordinator
+        from src.rag.resume_optimizer import ResumeOptimizer
+        
         # 加载配置和简历
         config = load_config(args.config)
         resume = load_resume(args.resume)
@@ -434,11 +474,7 @@ async def search_command(args):
     
     try:
         config = load_config(args.config)
-        coordinator = RAGSystemCoordinator(config)
-        
-        if not coordinator.initialize_system():
-            print("❌ 系统初始化失败")
-            return False
+        client = get_service_client(args, config)
         
         # 执行搜索
         query = args.query
@@ -447,32 +483,38 @@ async def search_command(args):
         print(f"搜索查询: {query}")
         print(f"返回数量: {k}")
         
-        # 使用向量搜索
-        similar_docs = coordinator.vector_manager.search_similar_jobs(query, k=k)
+        if client:
+            print("🔌 使用RAG常驻服务")
+            results = client.search(query, k=k)
+        else:
+            from src.rag.rag_system_coordinator import RAGSystemCoordinator
+            
+            coordinator = RAGSystemCoordinator(config)
+            
+            if not coordinator.initialize_system():
+                print("❌ 系统初始化失败")
+                return False
+            
+            # 使用向量搜索
+            similar_docs = coordinator.vector_manager.search_similar_jobs(query, k=k)
+            results = [{'content': doc.page_content, 'metadata': doc.metadata} for doc in similar_docs]
         
-        if not similar_docs:
+        if not results:
             print("❌ 没有找到相关职位")
             return False
         
-        print(f"\n📋 搜索结果 ({len(similar_docs)} 个):")
+        print(f"\n📋 搜索结果 ({len(results)} 个):")
         
-        for i, doc in enumerate(similar_docs, 1):
-            metadata = doc.metadata
+        for i, result in enumerate(results, 1):
+            metadata = result['metadata']
             print(f"\n{i}. {metadata.get('job_title', '未知职位')}")
             print(f"   公司: {metadata.get('company', '未知公司')}")
             print(f"   地点: {metadata.get('location', '未知地点')}")
             print(f"   类型: {metadata.get('type', '未知类型')}")
-            print(f"   内容: {doc.page_content[:100]}...")
+            print(f"   内容: {result['content'][:100]}...")
         
         # 保存搜索结果
         if args.output:
-            results = []
-            for doc in similar_docs:
-                results.append({
-                    'content': doc.page_content,
-                    'metadata': doc.metadata
-                })
-            
             with open(args.output, 'w', encoding='utf-8') as f:
                 json.dump(results, f, ensure_ascii=False, indent=2, default=str)
             print(f"\n💾 搜索结果已保存到: {args.output}")
@@ -489,6 +531,8 @@ async def test_command(args):
     print("=" * 30)
     
     try:
+        from src.rag.vector_manager import ChromaDBManager
+        
         config = load_config(args.config)
         vector_config = config.get('rag_system', {}).get('vector_db', {})
         vector_manager = ChromaDBManager(vector_config)
@@ -575,6 +619,8 @@ async def clear_command(args):
     print("=" * 30)
     
     try:
+        from src.rag.vector_manager import ChromaDBManager
+        
         config = load_config(args.config)
         vector_config = config.get('rag_system', {}).get('vector_db', {})
         vector_manager = ChromaDBManager(vector_config)
@@ -629,6 +675,221 @@ async def clear_command(args):
         print(f"❌ 清理失败: {e}")
         return False
 
+async def audit_vectors_command(args):
+    """重复向量审计命令"""
+    print("🔍 重复向量审计")
+    print("=" * 30)
+    
+    try:
+        from src.rag.vector_manager import ChromaDBManager
+        
+        config = load_config(args.config)
+        vector_config = config.get('rag_system', {}).get('vector_db', {})
+        vector_manager = ChromaDBManager(vector_config)
+        
+        report = vector_manager.audit_duplicate_vectors(batch_size=args.batch_size, fix=args.fix)
+        
+        print(f"📊 扫描文档数量: {report['scanned']}")
+        print(f"🆔 旧式随机ID文档: {report['legacy_ids']}")
+        print(f"📑 重复组数量: {len(report['duplicate_groups'])}")
+        print(f"🗂️ 多余向量数量: {len(report['redundant_ids'])}")
+        
+        for group in report['duplicate_groups'][:args.show]:
+            print(f"   - 职位 {group['job_id']} [{group['type']}] 保留 {group['keep']}，"
+                  f"多余 {len(group['redundant'])} 个")
+        
+        if args.fix:
+            print(f"✅ 已删除 {report['deleted']} 个多余向量")
+        elif report['redundant_ids']:
+            print("💡 使用 --fix 删除多余向量")
+        
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"💾 审计报告已保存到: {args.output}")
+        
+        vector_manager.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ 审计失败: {e}")
+        return False
+
+async def gc_vectors_command(args):
+    """向量垃圾回收命令"""
+    print("♻️ 向量垃圾回收")
+    print("=" * 30)
+    
+    try:
+        from src.rag.vector_manager import ChromaDBManager
+        from src.database.operations import DatabaseManager
+        from src.database.vector_gc import VectorGarbageCollector
+        
+        config = load_config(args.config)
+        rag_config = config.get('rag_system', {})
+        gc_config = dict(rag_config.get('vector_gc', {}))
+        if args.batch_size:
+            gc_config['batch_size'] = args.batch_size
+        if args.skip_latency:
+            gc_config['latency_rounds'] = 0
+        
+        db_manager = DatabaseManager(rag_config.get('database', {}).get('path', './data/jobs.db'))
+        vector_manager = ChromaDBManager(rag_config.get('vector_db', {}))
+        collector = VectorGarbageCollector(db_manager, vector_manager, gc_config)
+        
+        report = collector.run(dry_run=args.dry_run, compact=False if args.no_compact else None)
+        
+        print(f"📊 扫描文档数量: {report['scanned']}")
+        print(f"🗑️ 孤儿职位: {report['orphan_jobs']} 个, 孤儿向量: {report['orphan_vectors']} 个")
+        if args.dry_run:
+            print("💡 干运行模式，未删除任何向量")
+        else:
+            print(f"✅ 已删除 {report['deleted_vectors']} 个孤儿向量")
+            if report['compacted_documents'] is not None:
+                print(f"🧱 集合已压实: {report['compacted_documents']} 个文档")
+            print(f"💾 磁盘占用: {report['size_before_bytes'] / 1024 / 1024:.2f} MB -> "
+                  f"{report['size_after_bytes'] / 1024 / 1024:.2f} MB "
+                  f"(回收 {report['reclaimed_bytes'] / 1024 / 1024:.2f} MB)")
+        
+        before, after = report['latency_before'], report['latency_after']
+        if before and after:
+            print(f"⏱️ 查询延迟 p50: {before['p50_ms']:.2f} ms -> {after['p50_ms']:.2f} ms, "
+                  f"平均: {before['avg_ms']:.2f} ms -> {after['avg_ms']:.2f} ms")
+        
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"💾 回收报告已保存到: {args.output}")
+        
+        vector_manager.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ 垃圾回收失败: {e}")
+        return False
+
+async def compact_index_command(args):
+    """紧凑二级索引命令"""
+    print("🗜️ 紧凑二级索引")
+    print("=" * 30)
+    
+    try:
+        from src.rag.vector_manager import ChromaDBManager
+        
+        config = load_config(args.config)
+        vector_config = dict(config.get('rag_system', {}).get('vector_db', {}))
+        compact_config = dict(vector_config.get('compact_index', {}), enabled=True)
+        for key in ('dim', 'dtype', 'method', 'oversample'):
+            if getattr(args, key, None):
+                compact_config[key] = getattr(args, key)
+        vector_config['compact_index'] = compact_config
+        vector_manager = ChromaDBManager(vector_config)
+        
+        if args.action == 'build':
+            meta = vector_manager.build_compact_index(batch_size=args.batch_size)
+            print(f"✅ 索引构建完成: {meta['rows']} 行, {meta['full_dim']} -> {meta['dim']} 维 "
+                  f"({meta['method']}, {meta['dtype']}), 耗时 {meta['build_seconds']} 秒")
+            if meta.get('explained_variance') is not None:
+                print(f"📐 保留方差比例: {meta['explained_variance']:.2%}")
+            report = meta
+        else:
+            with open(args.queries, 'r', encoding='utf-8') as f:
+                queries = [item['query'] for item in json.load(f)['queries']]
+            report = vector_manager.evaluate_compact_index(queries, k=args.k, rounds=args.rounds)
+            print(f"📊 留出查询: {report['queries']} 条, recall@{args.k}: {report[f'recall@{args.k}']:.4f}")
+            print(f"⏱️ 全维度检索: 平均 {report['full']['avg_ms']:.2f} ms, P95 {report['full']['p95_ms']:.2f} ms")
+            print(f"⏱️ 紧凑索引+重打分: 平均 {report['compact']['avg_ms']:.2f} ms, "
+                  f"P95 {report['compact']['p95_ms']:.2f} ms")
+        
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"💾 报告已保存到: {args.output}")
+        
+        vector_manager.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ 紧凑索引操作失败: {e}")
+        return False
+
+async def snapshot_command(args):
+    """向量快照导出/导入命令"""
+    print("📦 向量快照")
+    print("=" * 30)
+    
+    try:
+        from src.rag.vector_manager import ChromaDBManager
+        
+        config = load_config(args.config)
+        vector_manager = ChromaDBManager(config.get('rag_system', {}).get('vector_db', {}))
+        
+        if args.action == 'export':
+            manifest = vector_manager.export_snapshot(args.path[0], since=args.since, chunk_size=args.chunk_size)
+            print(f"✅ 导出完成 ({manifest['mode']}): {manifest['rows']} 个向量, "
+                  f"扫描 {manifest['scanned']} 个, 耗时 {manifest['export_seconds']} 秒")
+            print(f"🕒 快照时间: {manifest['snapshot_time']}（下次增量导出可使用 --since {args.path[0]}）")
+        else:
+            stats = vector_manager.import_snapshot(args.path, batch_size=args.chunk_size)
+            print(f"✅ 导入完成: 写入 {stats['written']} 个, 删除 {stats['deleted']} 个, "
+                  f"耗时 {stats['import_seconds']} 秒{'（空集合批量加载）' if stats['bulk_load'] else ''}")
+        
+        vector_manager.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ 快照操作失败: {e}")
+        return False
+
+async def job_features_command(args):
+    """职位匹配特征命令"""
+    print("🧮 职位匹配特征")
+    print("=" * 30)
+    
+    try:
+        from src.database.operations import DatabaseManager
+        from src.database.job_features import JobFeatureStore
+        
+        config = load_config(args.config)
+        db_path = config.get('rag_system', {}).get('database', {}).get('path', './data/jobs.db')
+        store = JobFeatureStore(DatabaseManager(db_path))
+        
+        written = store.backfill(force=args.force, batch_size=args.batch_size)
+        print(f"✅ 已为 {written} 个职位写入匹配特征")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 职位特征补齐失败: {e}")
+        return False
+
+async def skill_embeddings_command(args):
+    """技能嵌入表命令"""
+    print("🧩 技能嵌入表")
+    print("=" * 30)
+    
+    try:
+        from src.rag.vector_manager import ChromaDBManager
+        from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+        
+        config = load_config(args.config)
+        vector_manager = ChromaDBManager(config.get('rag_system', {}).get('vector_db', {}))
+        if args.path:
+            advanced_config = dict(config.get('resume_matching_advanced') or {})
+            advanced_config['skill_embeddings'] = dict(advanced_config.get('skill_embeddings') or {}, path=args.path)
+            config['resume_matching_advanced'] = advanced_config
+        matcher = GenericResumeJobMatcher(vector_manager, config)
+        
+        meta = matcher.build_skill_embedding_table(batch_size=args.batch_size)
+        print(f"✅ 技能表构建完成: {meta['rows']} 个技能, {meta['dim']} 维, 耗时 {meta['build_seconds']} 秒")
+        print(f"📁 保存位置: {meta['path']}（模型: {meta['model'] or '未知'}）")
+        
+        vector_manager.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ 技能嵌入表构建失败: {e}")
+        return False
+
 async def match_command(args):
     """简历职位匹配命令"""
     print("🎯 简历职位匹配")
@@ -646,12 +907,6 @@ async def match_command(args):
         if resume_config:
             config.update(resume_config)
         
-        # 初始化系统
-        coordinator = RAGSystemCoordinator(config)
-        if not coordinator.initialize_system():
-            print("❌ 系统初始化失败")
-            return False
-        
         # 加载简历 - 统一使用通用格式
         if args.resume:
             resume_data = load_resume(args.resume)
@@ -662,9 +917,27 @@ async def match_command(args):
             resume_profile = create_default_zhanbin_profile()
             print("📝 使用默认简历档案")
         
-        # 使用通用匹配引擎
-        matcher = GenericResumeJobMatcher(coordinator.vector_manager, config.get('resume_matching', {}))
-        print("🔧 使用通用匹配引擎")
+        # RAG常驻服务运行时由服务端完成匹配，跳过本地模型加载
+        client = None
+        # 追踪需要在本地匹配器中记录评分过程，不走常驻服务
+        if args.action == 'find-jobs' and not args.dry_run and not getattr(args, 'trace', None):
+            client = get_service_client(args, config)
+        
+        if client:
+            print("🔌 使用RAG常驻服务")
+        else:
+            from src.rag.rag_system_coordinator import RAGSystemCoordinator
+            from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+            
+            # 初始化系统
+            coordinator = RAGSystemCoordinator(config)
+            if not coordinator.initialize_system():
+                print("❌ 系统初始化失败")
+                return False
+            
+            # 使用通用匹配引擎
+            matcher = GenericResumeJobMatcher(coordinator.vector_manager, config.get('resume_matching', {}))
+            print("🔧 使用通用匹配引擎")
         
         print(f"👤 简历档案: {resume_profile.name}")
         print(f"💼 当前职位: {resume_profile.current_position}")
@@ -685,82 +958,49 @@ async def match_command(args):
             
             if not args.dry_run:
                 # 执行匹配
-                result = await matcher.find_matching_jobs(
-                    resume_profile,
-                    filters=filters,
-                    top_k=args.limit
-                )
+                if client:
+                    output_data = client.match(resume_profile.to_dict(), top_k=args.limit, filters=filters)
+                else:
+                    from src.matcher.match_trace import MatchTrace
+                    
+                    trace = MatchTrace() if args.trace else None
+                    result = await matcher.find_matching_jobs(
+                        resume_profile,
+                        filters=filters,
+                        top_k=args.limit,
+                        trace=trace
+                    )
+                    output_data = result.to_dict()
+                    if trace is not None:
+                        phases = ', '.join(f"{name} {ms:.1f}ms" for name, ms in trace.summary()['phases_ms'].items())
+                        print(f"🔬 评分追踪: {len(trace)} 个候选职位, {phases}")
+                        print(f"💾 追踪已保存到: {trace.dump(args.trace)}")
                 
                 # 显示匹配摘要
-                summary = result.matching_summary
+                summary = output_data['matching_summary']
                 print(f"\n📊 匹配结果摘要:")
-                print(f"   总匹配数: {summary.total_matches}")
-                print(f"   高优先级: {summary.high_priority}")
-                print(f"   中优先级: {summary.medium_priority}")
-                print(f"   低优先级: {summary.low_priority}")
-                print(f"   平均分数: {summary.average_score:.3f}")
-                print(f"   处理时间: {summary.processing_time:.2f}秒")
+                print(f"   总匹配数: {summary['total_matches']}")
+                print(f"   高优先级: {summary['high_priority']}")
+                print(f"   中优先级: {summary['medium_priority']}")
+                print(f"   低优先级: {summary['low_priority']}")
+                print(f"   平均分数: {summary['average_score']:.3f}")
+                print(f"   处理时间: {summary['processing_time']:.2f}秒")
                 
                 # 显示前几个匹配结果
-                print(f"\n🎯 前{min(5, len(result.matches))}个匹配职位:")
-                for i, match in enumerate(result.matches[:5], 1):
-                    print(f"\n{i}. {match.job_title} - {match.company}")
-                    print(f"   综合评分: {match.overall_score:.3f} ({match.match_level.value})")
-                    print(f"   推荐优先级: {match.recommendation_priority.value}")
-                    print(f"   技能匹配: {match.dimension_scores.get('skills_match', 0):.3f}")
-                    print(f"   经验匹配: {match.dimension_scores.get('experience_match', 0):.3f}")
-                    if match.location:
-                        print(f"   地点: {match.location}")
+                matches = output_data['matches']
+                print(f"\n🎯 前{min(5, len(matches))}个匹配职位:")
+                for i, match in enumerate(matches[:5], 1):
+                    print(f"\n{i}. {match['job_title']} - {match['company']}")
+                    print(f"   综合评分: {match['overall_score']:.3f} ({match['match_level']})")
+                    print(f"   推荐优先级: {match['recommendation_priority']}")
+                    print(f"   技能匹配: {match['dimension_scores'].get('skills_match', 0):.3f}")
+                    print(f"   经验匹配: {match['dimension_scores'].get('experience_match', 0):.3f}")
+                    if match['location']:
+                        print(f"   地点: {match['location']}")
                 
                 # 保存结果
                 if args.output:
-                    # 转换为可序列化的格式
-                    output_data = {
-                        'matching_summary': {
-                            'total_matches': summary.total_matches,
-                            'high_priority': summary.high_priority,
-                            'medium_priority': summary.medium_priority,
-                            'low_priority': summary.low_priority,
-                            'average_score': summary.average_score,
-                            'processing_time': summary.processing_time,
-                            'timestamp': summary.timestamp
-                        },
-                        'matches': [
-                            {
-                                'job_id': match.job_id,
-                                'job_title': match.job_title,
-                                'company': match.company,
-                                'location': match.location,
-                                'salary_range': match.salary_range,
-                                'overall_score': match.overall_score,
-                                'dimension_scores': match.dimension_scores,
-                                'match_level': match.match_level.value,
-                                'recommendation_priority': match.recommendation_priority.value,
-                                'match_analysis': {
-                                    'strengths': match.match_analysis.strengths,
-                                    'weaknesses': match.match_analysis.weaknesses,
-                                    'recommendations': match.match_analysis.recommendations,
-                                    'matched_skills': match.match_analysis.matched_skills,
-                                    'missing_skills': match.match_analysis.missing_skills,
-                                    'skill_gap_score': match.match_analysis.skill_gap_score,
-                                    'experience_alignment': match.match_analysis.experience_alignment,
-                                    'industry_fit': match.match_analysis.industry_fit
-                                },
-                                'confidence_level': match.confidence_level,
-                                'timestamp': match.timestamp
-                            }
-                            for match in result.matches
-                        ],
-                        'career_insights': {
-                            'top_matching_positions': result.career_insights.top_matching_positions,
-                            'skill_gap_analysis': result.career_insights.skill_gap_analysis,
-                            'salary_analysis': result.career_insights.salary_analysis,
-                            'market_trends': result.career_insights.market_trends,
-                            'career_recommendations': result.career_insights.career_recommendations
-                        },
-                        'query_metadata': result.query_metadata
-                    }
-                    
+                    output_data.pop('elapsed_ms', None)
                     with open(args.output, 'w', encoding='utf-8') as f:
                         json.dump(output_data, f, ensure_ascii=False, indent=2, default=str)
                     print(f"\n💾 匹配结果已保存到: {args.output}")
@@ -927,6 +1167,13 @@ async def resume_command(args):
     print("=" * 30)
     
     try:
+        from src.rag.rag_system_coordinator import RAGSystemCoordinator
+        from src.rag.resume_document_parser import ResumeDocumentParser
+        from src.rag.resume_document_processor import ResumeDocumentProcessor
+        from src.rag.llm_factory import create_llm
+        from src.matcher.generic_resume_models import GenericResumeProfile
+        from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+        
         config = load_config(args.config)
         
         if args.action == 'process':
@@ -1419,6 +1666,9 @@ async def chat_command(args):
     print("=" * 40)
     
     try:
+        from src.rag.rag_system_coordinator import RAGSystemCoordinator
+        from src.analysis_tools.agent import create_analysis_agent
+        
         # 加载配置
         config = load_config(args.config)
         
@@ -1674,6 +1924,9 @@ def main():
   # 删除特定职位文档
   python rag_cli.py clear --job-id job123
   
+  # 启动RAG常驻服务（运行期间 status/search/match find-jobs 自动走服务）
+  python rag_cli.py serve --port 8765
+  
   # 启动智能分析聊天
   python rag_cli.py chat --show-help --verbose
   
@@ -1688,6 +1941,7 @@ def main():
                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], 
                        help='日志级别')
     parser.add_argument('--log-file', help='日志文件路径')
+    parser.add_argument('--no-service', action='store_true', help='不使用RAG常驻服务，始终在本进程内执行')
     
     # 子命令
     subparsers = parser.add_subparsers(dest='command', help='可用命令')
@@ -1704,6 +1958,11 @@ def main():
     # 状态命令
     status_parser = subparsers.add_parser('status', help='查询系统状态')
     
+    # 常驻服务命令
+    serve_parser = subparsers.add_parser('serve', help='启动RAG常驻服务')
+    serve_parser.add_argument('--host', help='监听地址（默认 127.0.0.1）')
+    serve_parser.add_argument('--port', type=int, help='监听端口（默认 8765）')
+    
     # 简历优化命令
     optimize_parser = subparsers.add_parser('optimize', help='简历优化')
     optimize_parser.add_argument('action', choices=['analyze', 'optimize', 'cover-letter'], help='优化操作')
@@ -1732,6 +1991,54 @@ def main():
     clear_parser.add_argument('--job-id', help='删除特定职位的文档')
     clear_parser.add_argument('--force', '-f', action='store_true', help='强制删除，不询问确认')
     
+    # 重复向量审计命令
+    audit_parser = subparsers.add_parser('audit-vectors', help='审计并清理重复向量')
+    audit_parser.add_argument('--fix', action='store_true', help='删除多余的重复向量（每组保留一条）')
+    audit_parser.add_argument('--batch-size', '-b', type=int, default=500, help='每批读取的文档数')
+    audit_parser.add_argument('--show', type=int, default=10, help='显示的重复组数量')
+    audit_parser.add_argument('--output', '-o', help='审计报告输出路径')
+    
+    # 向量垃圾回收命令
+    gc_parser = subparsers.add_parser('gc-vectors', help='回收已删除职位的向量并压实集合')
+    gc_parser.add_argument('--dry-run', action='store_true', help='只统计孤儿向量，不删除')
+    gc_parser.add_argument('--no-compact', action='store_true', help='删除后不压实集合')
+    gc_parser.add_argument('--batch-size', '-b', type=int, help='每批扫描/删除的文档数')
+    gc_parser.add_argument('--skip-latency', action='store_true', help='跳过回收前后的查询延迟测量')
+    gc_parser.add_argument('--output', '-o', help='回收报告输出路径')
+    
+    # 紧凑二级索引命令
+    compact_parser = subparsers.add_parser('compact-index', help='构建/评估降维紧凑索引')
+    compact_parser.add_argument('action', choices=['build', 'eval'], help='build 构建索引，eval 评估recall@k与延迟')
+    compact_parser.add_argument('--dim', type=int, help='降维后的维度')
+    compact_parser.add_argument('--method', choices=['pca', 'truncate'], help='降维方法')
+    compact_parser.add_argument('--dtype', choices=['float16', 'int8'], help='存储类型')
+    compact_parser.add_argument('--oversample', type=int, help='候选数相对k的倍数')
+    compact_parser.add_argument('--batch-size', '-b', type=int, default=1000, help='构建时每批读取的向量数')
+    compact_parser.add_argument('--queries', default='testdata/hybrid_search_fixture.json', help='评估用的留出查询集')
+    compact_parser.add_argument('--k', type=int, default=10, help='评估的结果数量')
+    compact_parser.add_argument('--rounds', type=int, default=3, help='每条查询的计时轮数')
+    compact_parser.add_argument('--output', '-o', help='报告输出路径')
+    
+    # 向量快照命令
+    snapshot_parser = subparsers.add_parser('snapshot', help='导出/导入向量快照（Parquet）')
+    snapshot_parser.add_argument('action', choices=['export', 'import'], help='export 导出，import 导入')
+    snapshot_parser.add_argument('path', nargs='+',
+                                 help='快照目录（import 时可依次给出全量快照和增量快照）')
+    snapshot_parser.add_argument('--since', help='增量导出起始时间（ISO时间或上一个快照目录）')
+    snapshot_parser.add_argument('--chunk-size', type=int, default=1000, help='每块读取/写入的向量数')
+    
+    # 职位匹配特征命令
+    features_parser = subparsers.add_parser('job-features', help='补齐已处理职位的匹配特征')
+    features_parser.add_argument('action', choices=['backfill'], help='backfill 从结构化数据补齐特征')
+    features_parser.add_argument('--force', action='store_true', help='重新计算已有特征的职位')
+    features_parser.add_argument('--batch-size', '-b', type=int, default=500, help='每批写入的职位数')
+    
+    # 技能嵌入表命令
+    skill_embeddings_parser = subparsers.add_parser('skill-embeddings', help='构建技能匹配用的技能嵌入表')
+    skill_embeddings_parser.add_argument('action', choices=['build'], help='build 向量化规范技能并写入技能表')
+    skill_embeddings_parser.add_argument('--path', help='技能表目录（默认为向量库目录下的 skill_embeddings）')
+    skill_embeddings_parser.add_argument('--batch-size', '-b', type=int, default=256, help='每批向量化的技能数')
+    
     # 简历匹配命令
     match_parser = subparsers.add_parser('match', help='简历职位匹配')
     match_parser.add_argument('action', choices=[
@@ -1746,6 +2053,7 @@ def main():
     match_parser.add_argument('--job-id', help='特定职位ID（用于analyze-fit）')
     match_parser.add_argument('--job-list', help='职位ID列表文件路径（用于batch-analyze）')
     match_parser.add_argument('--dry-run', action='store_true', help='干运行模式（不执行实际匹配）')
+    match_parser.add_argument('--trace', help='find-jobs 追踪输出路径（.json 或 .parquet），记录各候选职位的维度分数和各阶段耗时')
     
     # 简历处理命令
     resume_parser = subparsers.add_parser('resume', help='简历文档处理')
@@ -1800,6 +2108,8 @@ def main():
             success = asyncio.run(pipeline_command(args))
         elif args.command == 'status':
             success = asyncio.run(status_command(args))
+        elif args.command == 'serve':
+            success = serve_command(args)
         elif args.command == 'optimize':
             success = asyncio.run(optimize_command(args))
         elif args.command == 'search':
@@ -1808,6 +2118,18 @@ def main():
             success = asyncio.run(test_command(args))
         elif args.command == 'clear':
             success = asyncio.run(clear_command(args))
+        elif args.command == 'audit-vectors':
+            success = asyncio.run(audit_vectors_command(args))
+        elif args.command == 'gc-vectors':
+            success = asyncio.run(gc_vectors_command(args))
+        elif args.command == 'compact-index':
+            success = asyncio.run(compact_index_command(args))
+        elif args.command == 'snapshot':
+            success = asyncio.run(snapshot_command(args))
+        elif args.command == 'job-features':
+            success = asyncio.run(job_features_command(args))
+        elif args.command == 'skill-embeddings':
+            success = asyncio.run(skill_embeddings_command(args))
         elif args.command == 'match':
             success = asyncio.run(match_command(args))
         elif args.command == 'resume':
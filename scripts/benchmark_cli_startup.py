@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+CLI冷启动导入耗时基准
+
+使用 python -X importtime 运行 rag_cli.py 的子命令，统计模块导入总耗时和最慢的模块，
+并检查轻量命令是否误导入了重量级依赖：
+- --help:  不应导入 LangChain / ChromaDB / 嵌入模型
+- status:  可以导入 LangChain 和 ChromaDB，但不应加载 sentence-transformers / torch
+
+超出预算或出现禁止导入的模块时以非零状态码退出，便于在CI中跟踪冷启动回归。
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+project_root = Path(__file__).parent.parent
+CLI_PATH = project_root / "rag_cli.py"
+
+# 子命令 -> (导入耗时预算ms, 禁止导入的顶层模块)
+STARTUP_BUDGETS = {
+    'help': (400, ['langchain', 'langchain_core', 'chromadb', 'sentence_transformers', 'torch', 'transformers']),
+    'status': (3000, ['sentence_transformers', 'torch', 'transformers']),
+}
+
+COMMAND_ARGS = {
+    'help': ['--help'],
+    'status': ['status'],
+}
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """解析 -X importtime 输出，返回 [{'module', 'self_us', 'cumulative_us', 'depth'}]"""
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': (len(indent) - 1) // 2
+            })
+    return records
+
+
+def measure_command(command: str, config: Optional[str] = None) -> Dict:
+    """运行子命令并统计导入耗时"""
+    args = [sys.executable, '-X', 'importtime', str(CLI_PATH)]
+    if config:
+        args.extend(['--config', config])
+    args.extend(COMMAND_ARGS[command])
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    completed = subprocess.run(args, cwd=str(project_root), capture_output=True, text=True, env=env, timeout=600)
+    records = parse_importtime(completed.stderr)
+
+    total_us = sum(record['cumulative_us'] for record in records if record['depth'] == 0)
+    imported = {record['module'].split('.')[0] for record in records}
+    budget_ms, forbidden = STARTUP_BUDGETS[command]
+
+    return {
+        'command': command,
+        'returncode': completed.returncode,
+        'import_ms': total_us / 1000,
+        'budget_ms': budget_ms,
+        'forbidden_imported': sorted(imported & set(forbidden)),
+        'slowest': sorted(
+            (record for record in records if record['depth'] == 0),
+            key=lambda record: record['cumulative_us'], reverse=True
+        )[:10]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rag_cli.py 冷启动导入耗时基准")
+    parser.add_argument('--commands', nargs='+', default=['help'], choices=sorted(STARTUP_BUDGETS),
+                        help='要测量的子命令')
+    parser.add_argument('--config', help='传给 rag_cli.py 的配置文件')
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='预算放大系数（较慢的机器上使用）')
+    args = parser.parse_args()
+
+    failed = False
+    for command in args.commands:
+        result = measure_command(command, args.config)
+        budget_ms = result['budget_ms'] * args.budget_scale
+        over_budget = result['import_ms'] > budget_ms
+
+        print(f"\n[{command}] 导入耗时 {result['import_ms']:.1f} ms / 预算 {budget_ms:.0f} ms"
+              f"{'  ❌ 超出预算' if over_budget else '  ✅'}")
+        if result['returncode'] != 0:
+            print(f"  命令退出码: {result['returncode']}")
+        if result['forbidden_imported']:
+            print(f"  ❌ 不应导入的模块: {', '.join(result['forbidden_imported'])}")
+
+        print(f"  {'module':<40}{'cumulative_ms':>16}")
+        for record in result['slowest']:
+            print(f"  {record['module']:<40}{record['cumulative_us'] / 1000:>16.1f}")
+
+        failed = failed or over_budget or bool(result['forbidden_imported'])
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+多进程嵌入工作池基准测试
+
+在放大的固定语料（testdata/hybrid_search_fixture.json）上对比单进程嵌入与
+不同工作进程数下的吞吐量，输出相对单进程的加速比和并行效率。
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import List
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.embedding_pool import EmbeddingWorkerPool
+from src.rag.onnx_embeddings import benchmark_throughput
+
+DEFAULT_FIXTURE = project_root / "testdata" / "hybrid_search_fixture.json"
+
+
+def load_texts(path: Path, repeat: int) -> List[str]:
+    """加载基准文本并放大语料"""
+    with open(path, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    return [doc['content'] for doc in fixture['documents']] * repeat
+
+
+def main():
+    import yaml
+    from src.rag.vector_manager import create_worker_embeddings
+
+    parser = argparse.ArgumentParser(description="多进程嵌入工作池吞吐量基准测试")
+    parser.add_argument('--fixture', default=str(DEFAULT_FIXTURE), help='基准语料文件')
+    parser.add_argument('--config', default='config/integration_config.yaml', help='向量库配置文件')
+    parser.add_argument('--repeat', type=int, default=40, help='语料重复次数')
+    parser.add_argument('--workers', default='1,2,4', help='测试的工作进程数（逗号分隔）')
+    parser.add_argument('--threads-per-worker', type=int, default=1, help='每个工作进程的线程数')
+    parser.add_argument('--chunk-size', type=int, default=64, help='分片大小')
+    parser.add_argument('--no-pin', action='store_true', help='不绑定CPU核')
+    parser.add_argument('--rounds', type=int, default=2, help='计时轮数')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        vector_config = yaml.safe_load(f).get('rag_system', {}).get('vector_db', {})
+
+    texts = load_texts(Path(args.fixture), args.repeat)
+    print(f"语料: {len(texts)} 条文本")
+
+    single = create_worker_embeddings(vector_config)
+    baseline = benchmark_throughput(single.embed_documents, texts, rounds=args.rounds)
+    print(f"{'mode':<20}{'texts/s':>11}{'speedup':>10}{'efficiency':>12}")
+    print(f"{'single_process':<20}{baseline['texts_per_second']:>11.1f}{1.0:>9.2f}x{'-':>12}")
+
+    for workers in [int(value) for value in args.workers.split(',') if value.strip()]:
+        pool = EmbeddingWorkerPool(
+            create_worker_embeddings, factory_args=(vector_config,), workers=workers,
+            threads_per_worker=args.threads_per_worker, pin_cores=not args.no_pin,
+            chunk_size=args.chunk_size
+        )
+        try:
+            pool.start()
+            result = benchmark_throughput(pool.embed_documents, texts, rounds=args.rounds)
+        finally:
+            pool.shutdown()
+
+        speedup = result['texts_per_second'] / (baseline['texts_per_second'] or 1)
+        print(f"{f'pool x{workers}':<20}{result['texts_per_second']:>11.1f}{speedup:>9.2f}x"
+              f"{speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
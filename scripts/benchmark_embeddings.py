@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+嵌入后端基准测试
+
+在固定语料（默认 testdata/hybrid_search_fixture.json 的文档和查询）上对比：
+- pytorch:   sentence-transformers 全精度模型（当前默认后端）
+- onnx_fp32: ONNX Runtime FP32 模型
+- onnx_int8: ONNX Runtime 动态INT8量化模型
+输出各后端相对 PyTorch 的余弦漂移（精度一致性）和吞吐量。
+
+ONNX 模型需先通过 python scripts/download_models.py export-onnx <模型> 导出。
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.onnx_embeddings import OnnxEmbeddings, benchmark_throughput, cosine_drift
+
+DEFAULT_FIXTURE = project_root / "testdata" / "hybrid_search_fixture.json"
+
+
+def load_texts(path: Path, repeat: int) -> List[str]:
+    """加载基准文本（文档和查询），按 repeat 放大语料"""
+    with open(path, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    texts = [doc['content'] for doc in fixture['documents']] + [item['query'] for item in fixture['queries']]
+    return texts * repeat
+
+
+def load_pytorch_backend(config_path: str):
+    """按配置加载 PyTorch 嵌入模型"""
+    import yaml
+    from src.rag.vector_manager import ChromaDBManager
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        vector_config = yaml.safe_load(f).get('rag_system', {}).get('vector_db', {})
+
+    embeddings_config = dict(vector_config.get('embeddings', {}), backend='pytorch')
+    manager = ChromaDBManager(dict(vector_config, embeddings=embeddings_config))
+    return manager.embeddings.load()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="嵌入后端精度/吞吐量基准测试")
+    parser.add_argument('--onnx-dir', required=True, help='ONNX导出目录')
+    parser.add_argument('--fixture', default=str(DEFAULT_FIXTURE), help='基准语料文件')
+    parser.add_argument('--config', default='config/integration_config.yaml', help='PyTorch模型配置文件')
+    parser.add_argument('--repeat', type=int, default=8, help='吞吐量测试时语料重复次数')
+    parser.add_argument('--rounds', type=int, default=3, help='吞吐量计时轮数')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX intra-op 线程数（0为自动）')
+    parser.add_argument('--max-drift', type=float, default=0.02, help='允许的最大余弦漂移')
+    args = parser.parse_args()
+
+    parity_texts = load_texts(Path(args.fixture), 1)
+    throughput_texts = load_texts(Path(args.fixture), args.repeat)
+
+    backends = {'pytorch': load_pytorch_backend(args.config)}
+    backends['onnx_fp32'] = OnnxEmbeddings(args.onnx_dir, quantized=False, intra_op_threads=args.threads)
+    int8 = OnnxEmbeddings(args.onnx_dir, quantized=True, intra_op_threads=args.threads)
+    if int8.model_file != backends['onnx_fp32'].model_file:
+        backends['onnx_int8'] = int8
+
+    reference = backends['pytorch'].embed_documents(parity_texts)
+    rows: List[Dict] = []
+    passed = True
+    for name, backend in backends.items():
+        drift = cosine_drift(reference, backend.embed_documents(parity_texts))
+        throughput = benchmark_throughput(backend.embed_documents, throughput_texts, rounds=args.rounds)
+        if drift['max_drift'] > args.max_drift:
+            passed = False
+        rows.append(dict(name=name, **drift, **throughput))
+
+    base = rows[0]['texts_per_second'] or 1
+    print(f"精度语料: {len(parity_texts)} 条, 吞吐量语料: {len(throughput_texts)} 条")
+    print(f"{'backend':<12}{'mean_cos':>10}{'max_drift':>11}{'texts/s':>11}{'speedup':>9}")
+    for row in rows:
+        print(f"{row['name']:<12}{row['mean_cosine']:>10.4f}{row['max_drift']:>11.4f}"
+              f"{row['texts_per_second']:>11.1f}{row['texts_per_second'] / base:>8.2f}x")
+
+    if not passed:
+        print(f"❌ 余弦漂移超过阈值 {args.max_drift}")
+        sys.exit(1)
+    print(f"✅ 余弦漂移均在阈值 {args.max_drift} 以内")
+
+
+if __name__ == "__main__":
+    main()
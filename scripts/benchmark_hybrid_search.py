@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+混合检索基准测试
+
+在固定语料（testdata/hybrid_search_fixture.json）上对比各检索方式的召回率和延迟：
+- legacy:  旧版按空格分词的关键词重叠评分
+- bm25:    BM25词法索引（jieba/二元组分词）
+- vector:  纯向量检索（需 --with-vectors）
+- rrf:     向量 + BM25 倒数排名融合（需 --with-vectors）
+并对比多查询搜索的串行与批量并发实现（需 --with-vectors）。
+"""
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.lexical_index import BM25Index
+
+DEFAULT_FIXTURE = project_root / "testdata" / "hybrid_search_fixture.json"
+
+
+def load_fixture(path: Path) -> Dict:
+    """加载基准语料"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def legacy_keyword_search(documents: List[Dict], query: str, k: int) -> List[str]:
+    """旧版关键词评分：按空格切分后计算词集合重叠比例"""
+    query_words = set(query.lower().split())
+    scored = []
+    for doc in documents:
+        content_words = set(doc['content'].lower().split())
+        score = len(query_words & content_words) / len(query_words) if query_words else 0
+        if score > 0:
+            scored.append((doc['job_id'], score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return _unique_jobs([job_id for job_id, _ in scored], k)
+
+
+def _unique_jobs(job_ids: List[str], k: int) -> List[str]:
+    """按顺序去重并截取前k个职位"""
+    return list(dict.fromkeys(job_ids))[:k]
+
+
+def evaluate(name: str, search: Callable[[str, int], List[str]], queries: List[Dict], k: int) -> Dict:
+    """计算 recall@k 和延迟分位数"""
+    recalls = []
+    latencies = []
+    for item in queries:
+        start = time.perf_counter()
+        job_ids = search(item['query'], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        relevant = set(item['relevant_jobs'])
+        recalls.append(len(relevant & set(job_ids)) / len(relevant))
+
+    latencies.sort()
+    return {
+        'method': name,
+        f'recall@{k}': round(statistics.mean(recalls), 3),
+        'p50_ms': round(latencies[len(latencies) // 2], 3),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3)
+    }
+
+
+def run_vector_benchmarks(fixture: Dict, k: int, config_path: str) -> List[Dict]:
+    """构建临时向量库，对比向量检索、RRF融合和多查询搜索"""
+    import yaml
+    from langchain.schema import Document
+    from src.rag.vector_manager import ChromaDBManager
+    from src.rag.semantic_search import SemanticSearchEngine
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        vector_config = yaml.safe_load(f).get('rag_system', {}).get('vector_db', {})
+
+    temp_dir = tempfile.mkdtemp(prefix="hybrid_bench_")
+    vector_config = dict(vector_config, persist_directory=temp_dir, collection_name='hybrid_benchmark')
+    vector_config['time_aware_search'] = {'enable_time_boost': False}
+
+    try:
+        manager = ChromaDBManager(config=vector_config)
+        docs_by_job: Dict[str, List[Document]] = {}
+        for doc in fixture['documents']:
+            docs_by_job.setdefault(doc['job_id'], []).append(
+                Document(page_content=doc['content'], metadata={'doc_id': doc['doc_id']})
+            )
+        for job_id, docs in docs_by_job.items():
+            manager.add_job_documents(docs, job_id=job_id)
+
+        engine = SemanticSearchEngine(manager, {'fusion_method': 'rrf'})
+
+        def vector_search(query, top_k):
+            results = manager.similarity_search_with_score(query, k=top_k * 2)
+            return _unique_jobs([doc.metadata['job_id'] for doc, _ in results], top_k)
+
+        def rrf_search(query, top_k):
+            results = engine._hybrid_search(query, top_k * 2)
+            return _unique_jobs([doc.metadata['job_id'] for doc, _ in results], top_k)
+
+        def serial_multi_query(query, top_k):
+            job_ids = []
+            for q in [query] + engine._generate_related_queries(query):
+                job_ids.extend(doc.metadata['job_id'] for doc, _ in manager.similarity_search_with_score(q, k=top_k))
+            return _unique_jobs(job_ids, top_k)
+
+        def batched_multi_query(query, top_k):
+            results = engine._multi_query_search(query, top_k)
+            return _unique_jobs([doc.metadata['job_id'] for doc, _ in results], top_k)
+
+        # 多查询场景使用带同义词扩展的查询
+        multi_queries = [dict(item, query=f"Python 开发 经验 {item['query']}") for item in fixture['queries']]
+
+        return [
+            evaluate('vector', vector_search, fixture['queries'], k),
+            evaluate('rrf(vector+bm25)', rrf_search, fixture['queries'], k),
+            evaluate('multi_query_serial', serial_multi_query, multi_queries, k),
+            evaluate('multi_query_batched', batched_multi_query, multi_queries, k),
+        ]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="混合检索召回率/延迟基准测试")
+    parser.add_argument('--fixture', default=str(DEFAULT_FIXTURE), help='基准语料文件')
+    parser.add_argument('--k', type=int, default=3, help='召回评估的top-k')
+    parser.add_argument('--tokenizer', default='auto', choices=['auto', 'jieba', 'bigram'], help='BM25分词器')
+    parser.add_argument('--with-vectors', action='store_true', help='同时测试向量检索（需要加载嵌入模型）')
+    parser.add_argument('--config', default='config/integration_config.yaml', help='向量库配置文件')
+    args = parser.parse_args()
+
+    fixture = load_fixture(Path(args.fixture))
+    documents = fixture['documents']
+
+    index = BM25Index(tokenizer=args.tokenizer)
+    start = time.perf_counter()
+    index.add_documents((doc['doc_id'], doc['content'], doc['job_id']) for doc in documents)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    results = [
+        evaluate('legacy_keyword', lambda q, k: legacy_keyword_search(documents, q, k), fixture['queries'], args.k),
+        evaluate(f'bm25({index.tokenizer})', lambda q, k: [job_id for job_id, _ in index.search_jobs(q, k)],
+                 fixture['queries'], args.k),
+    ]
+
+    if args.with_vectors:
+        results.extend(run_vector_benchmarks(fixture, args.k, args.config))
+
+    print(f"语料: {len(documents)} 个文档, {len(fixture['queries'])} 个查询, BM25建索引 {build_ms:.2f} ms")
+    print(f"{'method':<24}{'recall@' + str(args.k):>12}{'p50_ms':>12}{'p95_ms':>12}")
+    for row in results:
+        print(f"{row['method']:<24}{row[f'recall@{args.k}']:>12}{row['p50_ms']:>12}{row['p95_ms']:>12}")
+
+
+if __name__ == "__main__":
+    main()
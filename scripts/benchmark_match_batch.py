@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+匹配结果内存基准测试
+
+模拟一次批量重匹配为大量职位打分后按阈值过滤，对比两种结果表示的内存占用和耗时：
+- objects:     每个职位一个 JobMatchResult（含维度分数字典、薪资字典和 MatchAnalysis）
+- match_batch: MatchBatch 按列存储分数，只为达到阈值的前k个生成完整结果
+职位ID、标题等字符串在计时前预先生成（两种方式都只引用已有的元数据字符串）。
+"""
+
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.matcher.generic_resume_models import (
+    JobMatchResult, MatchAnalysis,
+    get_match_level_from_score, get_recommendation_priority_from_score
+)
+from src.matcher.match_batch import DIMENSIONS, MatchBatch
+
+
+def generate_rows(count: int, seed: int = 42):
+    """生成职位元数据和维度分数"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        dimension_scores = {name: rng.random() for name in DIMENSIONS}
+        rows.append((f'job_{i}', f'职位{i % 500}', f'公司{i % 2000}', '上海',
+                     {'min': 10000 + i % 20 * 1000, 'max': 30000 + i % 20 * 1000},
+                     sum(dimension_scores.values()) / len(DIMENSIONS), dimension_scores))
+    return rows
+
+
+def build_objects(rows):
+    results = []
+    for job_id, title, company, location, salary_range, score, dimension_scores in rows:
+        results.append(JobMatchResult(
+            job_id=job_id, job_title=title, company=company, location=location,
+            salary_range=dict(salary_range), overall_score=score, dimension_scores=dict(dimension_scores),
+            match_level=get_match_level_from_score(score), match_analysis=MatchAnalysis(),
+            recommendation_priority=get_recommendation_priority_from_score(score)
+        ))
+    return results
+
+
+def build_batch(rows):
+    batch = MatchBatch(len(rows))
+    for job_id, title, company, location, salary_range, score, dimension_scores in rows:
+        batch.append(job_id, title, company, score, dimension_scores, location=location, salary_range=salary_range)
+    return batch
+
+
+def measure(build, rows):
+    """返回 (结果对象, 峰值内存MB, 常驻内存MB, 构建耗时秒)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 1024 / 1024, current / 1024 / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JobMatchResult 对象与 MatchBatch 列存储的内存对比")
+    parser.add_argument('--matches', type=int, default=100000, help='打分的职位数量')
+    parser.add_argument('--threshold', type=float, default=0.6, help='最低匹配阈值')
+    parser.add_argument('--top-k', type=int, default=100, help='最终保留的匹配数')
+    args = parser.parse_args()
+
+    rows = generate_rows(args.matches)
+    print(f"匹配数: {args.matches}, 阈值: {args.threshold}, top_k: {args.top_k}")
+    print(f"{'mode':<14}{'peak_mb':>10}{'held_mb':>10}{'bytes/match':>13}{'build_s':>10}{'select_s':>10}")
+
+    objects, peak, held, build_seconds = measure(build_objects, rows)
+    start = time.perf_counter()
+    selected = sorted((match for match in objects if match.overall_score >= args.threshold),
+                      key=lambda match: match.overall_score, reverse=True)[:args.top_k]
+    select_seconds = time.perf_counter() - start
+    print(f"{'objects':<14}{peak:>10.1f}{held:>10.1f}{held * 1024 * 1024 / args.matches:>13.0f}"
+          f"{build_seconds:>10.3f}{select_seconds:>10.3f}")
+    expected = [(match.job_id, match.overall_score) for match in selected]
+    del objects, selected
+
+    batch, peak, held, build_seconds = measure(build_batch, rows)
+    start = time.perf_counter()
+    top = batch.filter(args.threshold).ranked(args.top_k)
+    selected = top.to_list()
+    select_seconds = time.perf_counter() - start
+    print(f"{'match_batch':<14}{peak:>10.1f}{held:>10.1f}{held * 1024 * 1024 / args.matches:>13.0f}"
+          f"{build_seconds:>10.3f}{select_seconds:>10.3f}")
+
+    assert [(match.job_id, match.overall_score) for match in selected] == expected, "两种方式选出的匹配不一致"
+    print(f"✅ 两种方式选出的前 {len(expected)} 个匹配一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+向量后端对比基准测试
+
+在同一批向量上对比 ChromaDB 与进程内 HNSW 后端（vector_db.backend: hnsw）：
+- 写入吞吐量（批量 upsert）
+- 无过滤 / 按职位集合过滤的 top-k 查询延迟
+- 按职位集合批量读取向量的延迟
+- 相对精确暴力检索的 recall@k
+
+语料为固定语料（testdata/hybrid_search_fixture.json）的真实嵌入，按 --repeat 加微小扰动放大，
+每份副本视为不同职位；两个后端都写入临时目录，不影响现有数据。
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from src.rag.compact_index import exact_distances, recall_at_k
+from src.rag.vector_backends import ChromaBackend, VectorBackend
+
+DEFAULT_FIXTURE = project_root / "testdata" / "hybrid_search_fixture.json"
+
+
+def build_corpus(fixture: Dict, embeddings, repeat: int, noise: float, seed: int = 42):
+    """嵌入固定语料并加扰动放大，返回 (ids, vectors, documents, metadatas)"""
+    documents = fixture['documents']
+    base = np.asarray(embeddings.embed_documents([doc['content'] for doc in documents]), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+
+    ids, vectors, texts, metadatas = [], [], [], []
+    for copy in range(repeat):
+        jitter = base + noise * rng.normal(size=base.shape).astype(np.float32) if copy else base
+        vectors.append(jitter / np.linalg.norm(jitter, axis=1, keepdims=True))
+        for doc in documents:
+            job_id = f"{doc['job_id']}#{copy}"
+            ids.append(f"{job_id}:{doc['doc_id']}")
+            texts.append(doc['content'])
+            metadatas.append({'job_id': job_id, 'doc_id': doc['doc_id']})
+    return ids, np.concatenate(vectors), texts, metadatas
+
+
+def timed(fn: Callable, rounds: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {'avg_ms': sum(samples) / len(samples), 'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)]}
+
+
+def run_backend(backend: VectorBackend, corpus, queries: np.ndarray, args) -> Dict[str, float]:
+    ids, vectors, texts, metadatas = corpus
+    start = time.perf_counter()
+    for offset in range(0, len(ids), args.batch_size):
+        end = offset + args.batch_size
+        backend.upsert(ids[offset:end], vectors[offset:end].tolist(), texts[offset:end], metadatas[offset:end])
+    insert_seconds = time.perf_counter() - start
+
+    job_ids = sorted({metadata['job_id'] for metadata in metadatas})
+    rng = random.Random(7)
+    filter_jobs = rng.sample(job_ids, min(args.filter_jobs, len(job_ids)))
+    bulk_jobs = rng.sample(job_ids, min(args.bulk_jobs, len(job_ids)))
+
+    recalls = []
+    for query in queries:
+        expected = [ids[i] for i in np.argsort(exact_distances(query, vectors))[:args.k]]
+        actual = backend.query([query.tolist()], n_results=args.k, include=[])['ids'][0]
+        recalls.append(recall_at_k(expected, actual))
+
+    query_list = [query.tolist() for query in queries]
+    return {
+        'insert_per_second': len(ids) / insert_seconds,
+        'query': timed(lambda: [backend.query([q], n_results=args.k) for q in query_list], args.rounds),
+        'filtered_query': timed(
+            lambda: [backend.query([q], n_results=args.k, where={'job_id': {'$in': filter_jobs}}) for q in query_list],
+            args.rounds
+        ),
+        'bulk_get': timed(
+            lambda: backend.get(where={'job_id': {'$in': bulk_jobs}}, include=['embeddings', 'metadatas']),
+            args.rounds
+        ),
+        f'recall@{args.k}': sum(recalls) / len(recalls)
+    }
+
+
+def main():
+    import yaml
+    import chromadb
+    from src.rag.hnsw_backend import HnswBackend
+    from src.rag.vector_manager import ChromaDBManager
+
+    parser = argparse.ArgumentParser(description="ChromaDB 与 HNSW 向量后端对比")
+    parser.add_argument('--fixture', default=str(DEFAULT_FIXTURE), help='基准语料文件')
+    parser.add_argument('--config', default='config/integration_config.yaml', help='向量库配置文件')
+    parser.add_argument('--repeat', type=int, default=400, help='语料放大倍数')
+    parser.add_argument('--noise', type=float, default=0.05, help='放大时的扰动幅度')
+    parser.add_argument('--batch-size', type=int, default=500, help='写入批大小')
+    parser.add_argument('--k', type=int, default=10, help='检索结果数量')
+    parser.add_argument('--filter-jobs', type=int, default=20, help='过滤查询的职位集合大小')
+    parser.add_argument('--bulk-jobs', type=int, default=200, help='批量读取的职位集合大小')
+    parser.add_argument('--rounds', type=int, default=5, help='计时轮数')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        vector_config = yaml.safe_load(f).get('rag_system', {}).get('vector_db', {})
+    with open(args.fixture, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+
+    manager = ChromaDBManager(vector_config)
+    corpus = build_corpus(fixture, manager.embeddings, args.repeat, args.noise)
+    queries = np.asarray(manager.embed_queries([item['query'] for item in fixture['queries']]), dtype=np.float32)
+    print(f"语料: {len(corpus[0])} 个向量, 查询: {len(queries)} 条")
+
+    hnsw_config = vector_config.get('hnsw', {})
+    with tempfile.TemporaryDirectory() as workdir:
+        client = chromadb.PersistentClient(path=str(Path(workdir) / 'chroma'))
+        backends = {
+            'chroma': ChromaBackend(client.get_or_create_collection('benchmark', metadata={'hnsw:space': 'l2'})),
+            'hnsw': HnswBackend(
+                str(Path(workdir) / 'hnsw'), name='benchmark',
+                m=hnsw_config.get('m', 16), ef_construction=hnsw_config.get('ef_construction', 200),
+                ef_search=hnsw_config.get('ef_search', 64),
+                brute_force_threshold=hnsw_config.get('brute_force_threshold', 2000)
+            )
+        }
+        results = {name: run_backend(backend, corpus, queries, args) for name, backend in backends.items()}
+        backends['hnsw'].close()
+
+    print(f"{'backend':<10}{'insert/s':>10}{'query avg':>11}{'filtered':>10}{'bulk get':>10}{f'recall@{args.k}':>11}")
+    for name, row in results.items():
+        print(f"{name:<10}{row['insert_per_second']:>10.0f}{row['query']['avg_ms']:>9.1f}ms"
+              f"{row['filtered_query']['avg_ms']:>8.1f}ms{row['bulk_get']['avg_ms']:>8.1f}ms"
+              f"{row[f'recall@{args.k}']:>11.4f}")
+    print("（query/filtered 为全部查询一轮的耗时）")
+
+
+if __name__ == "__main__":
+    main()
@@ -238,6 +238,35 @@ class ModelManager:
             logger.error(f"模型验证失败: {e}")
             return False
     
+    def export_onnx(self, model_ref: str, quantize: bool = True, max_length: int = 512) -> Optional[Path]:
+        """
+        导出ONNX（动态INT8量化）模型，供 embeddings.backend: onnx 使用
+        
+        Args:
+            model_ref: 模型键名或本地模型路径
+            quantize: 是否生成INT8量化模型
+            max_length: 最大序列长度
+            
+        Returns:
+            Optional[Path]: 导出目录
+        """
+        from src.rag.onnx_embeddings import export_onnx_model
+        
+        local_path = self.get_local_model_path(model_ref) or Path(model_ref)
+        if not local_path.exists():
+            logger.error(f"模型不存在: {local_path}，请先下载模型")
+            return None
+        
+        output_dir = self.models_dir / "onnx" / local_path.name
+        logger.info(f"开始导出ONNX模型: {local_path} -> {output_dir}")
+        
+        try:
+            export_onnx_model(str(local_path), str(output_dir), quantize=quantize, max_length=max_length)
+            return output_dir
+        except Exception as e:
+            logger.error(f"ONNX模型导出失败: {e}")
+            return None
+    
     def generate_config_template(self) -> Dict:
         """生成配置文件模板"""
         
@@ -343,6 +372,12 @@ def main():
     verify_parser = subparsers.add_parser('verify', help='验证模型')
     verify_parser.add_argument('model_path', help='模型路径')
     
+    # 导出ONNX模型命令
+    onnx_parser = subparsers.add_parser('export-onnx', help='导出ONNX（INT8量化）模型')
+    onnx_parser.add_argument('model', help='模型键名或本地模型路径')
+    onnx_parser.add_argument('--no-quantize', action='store_true', help='只导出FP32模型')
+    onnx_parser.add_argument('--max-length', type=int, default=512, help='最大序列长度')
+    
     # 生成配置命令
     config_parser = subparsers.add_parser('generate-config', help='生成配置文件')
     config_parser.add_argument('--output', default='config/local_models_config.yaml',
@@ -381,6 +416,15 @@ def main():
             else:
                 print(f"❌ 模型验证失败: {model_path}")
                 
+        elif args.command == 'export-onnx':
+            path = manager.export_onnx(args.model, quantize=not args.no_quantize, max_length=args.max_length)
+            if path:
+                print(f"\n✅ ONNX模型导出完成: {path}")
+                print("   在配置中设置 embeddings.backend: onnx 和 embeddings.onnx.model_dir 启用")
+                print("   使用 python scripts/benchmark_embeddings.py 检查精度和吞吐量")
+            else:
+                print(f"\n❌ ONNX模型导出失败: {args.model}")
+                
         elif args.command == 'generate-config':
             manager.save_config_template(args.output)
             
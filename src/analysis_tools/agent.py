@@ -17,6 +17,7 @@ from langchain.callbacks.base import BaseCallbackHandler
 from .skill_demand_tool import SkillDemandAnalysisTool
 from .salary_analysis_tool import SalaryAnalysisTool
 from .trend_analysis_tool import TrendAnalysisTool
+from ..database.market_snapshots import MarketSnapshotManager
 from ..rag.llm_factory import create_llm
 
 logger = logging.getLogger(__name__)
@@ -124,12 +125,14 @@ class JobMarketAnalysisAgent:
             # 获取数据库管理器和向量管理器
             db_manager = self.coordinator.db_reader
             vector_manager = self.coordinator.vector_manager
+            snapshot_manager = self._initialize_snapshots(db_manager)
             
             # 技能需求分析工具
             if tool_config.get('skill_demand_analysis', {}).get('enabled', True):
                 skill_tool = SkillDemandAnalysisTool(
                     db_manager=db_manager,
-                    vector_manager=vector_manager
+                    vector_manager=vector_manager,
+                    snapshot_manager=snapshot_manager
                 )
                 tools.append(skill_tool)
                 logger.info("技能需求分析工具已加载")
@@ -138,7 +141,8 @@ class JobMarketAnalysisAgent:
             if tool_config.get('salary_analysis', {}).get('enabled', True):
                 salary_tool = SalaryAnalysisTool(
                     db_manager=db_manager,
-                    vector_manager=vector_manager
+                    vector_manager=vector_manager,
+                    snapshot_manager=snapshot_manager
                 )
                 tools.append(salary_tool)
                 logger.info("薪资分析工具已加载")
@@ -147,7 +151,8 @@ class JobMarketAnalysisAgent:
             if tool_config.get('trend_analysis', {}).get('enabled', True):
                 trend_tool = TrendAnalysisTool(
                     db_manager=db_manager,
-                    vector_manager=vector_manager
+                    vector_manager=vector_manager,
+                    snapshot_manager=snapshot_manager
                 )
                 tools.append(trend_tool)
                 logger.info("趋势分析工具已加载")
@@ -159,6 +164,25 @@ class JobMarketAnalysisAgent:
             logger.error(f"工具初始化失败: {e}")
             raise
     
+    def _initialize_snapshots(self, db_manager) -> Optional[MarketSnapshotManager]:
+        """初始化市场统计快照（增量刷新，失败时工具回退到原始查询）"""
+        snapshot_config = self.agent_config.get('snapshots', {})
+        if not snapshot_config.get('enabled', True):
+            return None
+        
+        try:
+            snapshot_manager = MarketSnapshotManager(db_manager, snapshot_config)
+            stats = snapshot_manager.refresh()
+            if snapshot_config.get('auto_refresh', True):
+                snapshot_manager.start_auto_refresh()
+            
+            logger.info(f"市场统计快照已就绪，本次汇总 {stats['processed_jobs']} 条新职位")
+            return snapshot_manager
+            
+        except Exception as e:
+            logger.warning(f"市场统计快照初始化失败，将使用原始查询: {e}")
+            return None
+    
     def _initialize_memory(self):
         """初始化对话记忆"""
         try:
@@ -6,10 +6,12 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel, Field
 from langchain.tools import BaseTool
 
+from ..database.market_snapshots import parse_salary_range
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,20 +21,23 @@ class BaseAnalysisTool(BaseTool, ABC):
     # 使用类变量存储管理器实例
     _db_manager = None
     _vector_manager = None
+    _snapshot_manager = None
     
-    def __init__(self, db_manager, vector_manager=None, **kwargs):
+    def __init__(self, db_manager, vector_manager=None, snapshot_manager=None, **kwargs):
         """
         初始化分析工具
         
         Args:
             db_manager: 数据库管理器实例
             vector_manager: 向量数据库管理器实例（可选）
+            snapshot_manager: 市场统计快照管理器（可选）
             **kwargs: 其他参数
         """
         super().__init__(**kwargs)
         # 使用类变量存储管理器
         BaseAnalysisTool._db_manager = db_manager
         BaseAnalysisTool._vector_manager = vector_manager
+        BaseAnalysisTool._snapshot_manager = snapshot_manager
     
     @property
     def db_manager(self):
@@ -44,6 +49,11 @@ class BaseAnalysisTool(BaseTool, ABC):
         """获取向量数据库管理器"""
         return BaseAnalysisTool._vector_manager
     
+    @property
+    def snapshot_manager(self):
+        """获取市场统计快照管理器"""
+        return BaseAnalysisTool._snapshot_manager
+    
     @property
     def logger(self):
         """获取日志记录器"""
@@ -192,6 +202,61 @@ class BaseAnalysisTool(BaseTool, ABC):
             self.logger.error(f"数据库查询失败: {e}")
             return []
     
+    def _resolve_db_manager(self):
+        """获取底层的DatabaseManager（兼容DatabaseJobReader）"""
+        if hasattr(self.db_manager, 'db_manager'):
+            return self.db_manager.db_manager
+        return self.db_manager
+    
+    def _build_skill_condition(self, skill: str,
+                               job_id_column: str = 'j.job_id') -> Tuple[str, List[Any]]:
+        """
+        构建技能关键词过滤条件
+        
+        优先使用全文索引（job_search_fts MATCH，整个技能名作为一个短语，与 LIKE 子串匹配等价），
+        全文索引不可用或技能名中有少于3个字符的词时回退到 LIKE 扫描。
+        
+        Args:
+            skill: 技能名称
+            job_id_column: 外层查询中的职位ID列
+            
+        Returns:
+            (SQL条件片段, 参数列表)，回退条件中使用 jd 表别名
+        """
+        skill_name = self._standardize_skill_name(skill)
+        db_manager = self._resolve_db_manager()
+        
+        match_query = None
+        if hasattr(db_manager, 'build_fulltext_query'):
+            match_query = db_manager.build_fulltext_query(
+                skill_name, columns=['keyword', 'description', 'requirements'], phrase=True
+            )
+        
+        if match_query and db_manager.ensure_fulltext_index():
+            condition = f"{job_id_column} IN (SELECT job_id FROM job_search_fts WHERE job_search_fts MATCH ?)"
+            return condition, [match_query]
+        
+        skill_pattern = f"%{skill_name}%"
+        condition = "(LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?)"
+        return condition, [skill_pattern, skill_pattern, skill_pattern]
+    
+    def _get_snapshots(self):
+        """
+        获取已刷新的市场统计快照
+        
+        Returns:
+            快照管理器，未配置或刷新失败时返回None（调用方回退到原始查询）
+        """
+        if self.snapshot_manager and self.snapshot_manager.ensure_fresh():
+            return self.snapshot_manager
+        return None
+    
+    def _resolve_snapshot_skill(self, skill: str) -> Optional[str]:
+        """将技能名映射到快照跟踪的技能，未跟踪时返回None"""
+        if not self.snapshot_manager:
+            return None
+        return self.snapshot_manager.resolve_skill(self._standardize_skill_name(skill))
+    
     def _get_job_count(self) -> int:
         """获取总职位数量"""
         try:
@@ -260,60 +325,15 @@ class BaseAnalysisTool(BaseTool, ABC):
         """
         解析薪资范围文本
         
+        与市场统计快照共用同一解析逻辑，保证快照与原始查询结果一致。
+        
         Args:
             salary_text: 薪资文本，如"15-25k"、"20万-30万"等
             
         Returns:
             包含min、max、avg的字典
         """
-        if not salary_text:
-            return {'min': 0, 'max': 0, 'avg': 0}
-        
-        import re
-        
-        # 薪资解析模式
-        patterns = [
-            r'(\d+)-(\d+)k',           # 15-25k
-            r'(\d+)k-(\d+)k',          # 15k-25k  
-            r'(\d+)-(\d+)万',          # 15-25万
-            r'(\d+)万-(\d+)万',        # 15万-25万
-            r'(\d+)-(\d+)',            # 15000-25000
-            r'(\d+)k',                 # 25k (单个值)
-            r'(\d+)万',                # 25万 (单个值)
-        ]
-        
-        salary_lower = salary_text.lower().strip()
-        
-        for pattern in patterns:
-            match = re.search(pattern, salary_lower)
-            if match:
-                if len(match.groups()) == 2:
-                    # 范围值
-                    min_val, max_val = match.groups()
-                    min_val, max_val = int(min_val), int(max_val)
-                    
-                    # 根据模式调整单位
-                    if 'k' in pattern:
-                        min_val *= 1000
-                        max_val *= 1000
-                    elif '万' in pattern:
-                        min_val *= 10000
-                        max_val *= 10000
-                    
-                    avg_val = (min_val + max_val) // 2
-                    return {'min': min_val, 'max': max_val, 'avg': avg_val}
-                else:
-                    # 单个值
-                    val = int(match.groups()[0])
-                    if 'k' in pattern:
-                        val *= 1000
-                    elif '万' in pattern:
-                        val *= 10000
-                    
-                    return {'min': val, 'max': val, 'avg': val}
-        
-        # 如果无法解析，返回0
-        return {'min': 0, 'max': 0, 'avg': 0}
+        return parse_salary_range(salary_text)
     
     def _format_number(self, number: int) -> str:
         """格式化数字显示"""
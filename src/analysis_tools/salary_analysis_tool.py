@@ -9,6 +9,7 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 from .base_tool import BaseAnalysisTool
+from ..database.market_snapshots import resolve_experience_bucket
 
 
 class SalaryAnalysisInput(BaseModel):
@@ -43,16 +44,18 @@ class SalaryAnalysisTool(BaseAnalysisTool):
     """
     args_schema: type = SalaryAnalysisInput
     
-    def __init__(self, db_manager, vector_manager=None, **kwargs):
+    def __init__(self, db_manager, vector_manager=None, snapshot_manager=None, **kwargs):
         """
         初始化薪资分析工具
         
         Args:
             db_manager: 数据库管理器
             vector_manager: 向量数据库管理器
+            snapshot_manager: 市场统计快照管理器
             **kwargs: 其他参数
         """
-        super().__init__(db_manager, vector_manager=vector_manager, **kwargs)
+        super().__init__(db_manager, vector_manager=vector_manager,
+                         snapshot_manager=snapshot_manager, **kwargs)
     
     def _run(self, skill: Optional[str] = None, location: Optional[str] = None,
              experience: Optional[str] = None, position: Optional[str] = None,
@@ -120,9 +123,9 @@ class SalaryAnalysisTool(BaseAnalysisTool):
         else:
             # 使用传统查询条件
             if skill:
-                skill_pattern = f"%{self._standardize_skill_name(skill)}%"
-                conditions.append("(LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?)")
-                params.extend([skill_pattern, skill_pattern, skill_pattern])
+                skill_condition, skill_params = self._build_skill_condition(skill)
+                conditions.append(skill_condition)
+                params.extend(skill_params)
             
             if location:
                 location_pattern = f"%{location}%"
@@ -253,73 +256,77 @@ class SalaryAnalysisTool(BaseAnalysisTool):
         # 1. 获取主要城市列表
         major_cities = ['北京', '上海', '深圳', '杭州', '广州', '成都', '南京', '武汉', '西安', '苏州']
         
-        location_salary_data = []
+        # 2. 优先读取市场统计快照，自定义职位名称等快照无法覆盖的条件回退到逐城市查询
+        location_salary_data = self._get_location_salary_from_snapshot(skill, experience, position)
         
-        for city in major_cities:
-            # 使用向量搜索获取该城市的相关职位
-            job_ids = self._get_relevant_jobs_vector(skill, city, experience, position)
+        if location_salary_data is None:
+            location_salary_data = []
             
-            if job_ids:
-                # 查询该城市的薪资数据
-                placeholders = ','.join('?' * len(job_ids))
-                query = f"""
-                SELECT jd.salary, COUNT(*) as job_count
-                FROM job_details jd
-                JOIN jobs j ON jd.job_id = j.job_id
-                WHERE j.job_id IN ({placeholders})
-                AND jd.salary IS NOT NULL AND jd.salary != ''
-                """
+            for city in major_cities:
+                # 使用向量搜索获取该城市的相关职位
+                job_ids = self._get_relevant_jobs_vector(skill, city, experience, position)
+
+                if job_ids:
+                    # 查询该城市的薪资数据
+                    placeholders = ','.join('?' * len(job_ids))
+                    query = f"""
+                    SELECT jd.salary, COUNT(*) as job_count
+                    FROM job_details jd
+                    JOIN jobs j ON jd.job_id = j.job_id
+                    WHERE j.job_id IN ({placeholders})
+                    AND jd.salary IS NOT NULL AND jd.salary != ''
+                    """
                 
-                city_results = self._execute_query(query, tuple(job_ids))
-            else:
-                # 传统查询方式
-                conditions = [f"LOWER(jd.location) LIKE '%{city.lower()}%'"]
-                params = []
+                    city_results = self._execute_query(query, tuple(job_ids))
+                else:
+                    # 传统查询方式
+                    conditions = [f"LOWER(jd.location) LIKE '%{city.lower()}%'"]
+                    params = []
                 
-                if skill:
-                    skill_pattern = f"%{self._standardize_skill_name(skill)}%"
-                    conditions.append("(LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?)")
-                    params.extend([skill_pattern, skill_pattern, skill_pattern])
+                    if skill:
+                        skill_condition, skill_params = self._build_skill_condition(skill)
+                        conditions.append(skill_condition)
+                        params.extend(skill_params)
                 
-                if experience:
-                    exp_pattern = f"%{experience}%"
-                    conditions.append("LOWER(jd.experience) LIKE ?")
-                    params.append(exp_pattern)
+                    if experience:
+                        exp_pattern = f"%{experience}%"
+                        conditions.append("LOWER(jd.experience) LIKE ?")
+                        params.append(exp_pattern)
                 
-                if position:
-                    pos_pattern = f"%{position}%"
-                    conditions.append("LOWER(j.title) LIKE ?")
-                    params.append(pos_pattern)
+                    if position:
+                        pos_pattern = f"%{position}%"
+                        conditions.append("LOWER(j.title) LIKE ?")
+                        params.append(pos_pattern)
                 
-                where_clause = " AND ".join(conditions)
+                    where_clause = " AND ".join(conditions)
                 
-                query = f"""
-                SELECT jd.salary
-                FROM jobs j
-                JOIN job_details jd ON j.job_id = jd.job_id
-                WHERE {where_clause}
-                AND jd.salary IS NOT NULL AND jd.salary != ''
-                """
+                    query = f"""
+                    SELECT jd.salary
+                    FROM jobs j
+                    JOIN job_details jd ON j.job_id = jd.job_id
+                    WHERE {where_clause}
+                    AND jd.salary IS NOT NULL AND jd.salary != ''
+                    """
                 
-                city_results = self._execute_query(query, tuple(params))
+                    city_results = self._execute_query(query, tuple(params))
             
-            if city_results:
-                # 计算该城市的薪资统计
-                city_salaries = []
-                for result in city_results:
-                    salary_info = self._parse_salary_range(result['salary'])
-                    if salary_info['avg'] > 0:
-                        city_salaries.append(salary_info['avg'])
+                if city_results:
+                    # 计算该城市的薪资统计
+                    city_salaries = []
+                    for result in city_results:
+                        salary_info = self._parse_salary_range(result['salary'])
+                        if salary_info['avg'] > 0:
+                            city_salaries.append(salary_info['avg'])
                 
-                if city_salaries:
-                    avg_salary = sum(city_salaries) // len(city_salaries)
-                    location_salary_data.append({
-                        'city': city,
-                        'average_salary': avg_salary,
-                        'job_count': len(city_salaries),
-                        'min_salary': min(city_salaries),
-                        'max_salary': max(city_salaries)
-                    })
+                    if city_salaries:
+                        avg_salary = sum(city_salaries) // len(city_salaries)
+                        location_salary_data.append({
+                            'city': city,
+                            'average_salary': avg_salary,
+                            'job_count': len(city_salaries),
+                            'min_salary': min(city_salaries),
+                            'max_salary': max(city_salaries)
+                        })
         
         # 按平均薪资排序
         location_salary_data.sort(key=lambda x: x['average_salary'], reverse=True)
@@ -386,6 +393,44 @@ class SalaryAnalysisTool(BaseAnalysisTool):
         
         return result
     
+    def _get_location_salary_from_snapshot(self, skill: Optional[str] = None,
+                                           experience: Optional[str] = None,
+                                           position: Optional[str] = None) -> Optional[list]:
+        """
+        从市场统计快照获取各城市薪资汇总
+
+        Returns:
+            城市薪资数据列表；快照不可用或条件无法由快照回答时返回None
+        """
+        if position:
+            return None
+
+        snapshot_skill = self._resolve_snapshot_skill(skill) if skill else '*'
+        if not snapshot_skill:
+            return None
+
+        experience_bucket = '*'
+        if experience:
+            experience_bucket = resolve_experience_bucket(experience)
+            if not experience_bucket:
+                return None
+
+        snapshots = self._get_snapshots()
+        if not snapshots:
+            return None
+
+        return [
+            {
+                'city': row['city'],
+                'average_salary': row['average_salary'],
+                'job_count': row['salary_count'],
+                'min_salary': row['min_salary'],
+                'max_salary': row['max_salary']
+            }
+            for row in snapshots.get_city_summary(skill=snapshot_skill, experience_bucket=experience_bucket)
+            if row['salary_count'] > 0
+        ]
+
     def _analyze_overall_salary_market(self, location: Optional[str] = None,
                                      include_percentiles: bool = True) -> dict:
         """
@@ -38,16 +38,18 @@ class SkillDemandAnalysisTool(BaseAnalysisTool):
     """
     args_schema: type = SkillDemandInput
     
-    def __init__(self, db_manager, vector_manager=None, **kwargs):
+    def __init__(self, db_manager, vector_manager=None, snapshot_manager=None, **kwargs):
         """
         初始化技能需求分析工具
         
         Args:
             db_manager: 数据库管理器
             vector_manager: 向量数据库管理器
+            snapshot_manager: 市场统计快照管理器
             **kwargs: 其他参数
         """
-        super().__init__(db_manager, vector_manager=vector_manager, **kwargs)
+        super().__init__(db_manager, vector_manager=vector_manager,
+                         snapshot_manager=snapshot_manager, **kwargs)
     
     def _run(self, skill: Optional[str] = None, limit: int = 20, 
              include_trend: bool = False, category: Optional[str] = None) -> str:
@@ -133,17 +135,17 @@ class SkillDemandAnalysisTool(BaseAnalysisTool):
             skill_results = self._execute_query(base_query, tuple(job_ids))
         else:
             # 传统关键词搜索
-            skill_pattern = f"%{normalized_skill}%"
-            base_query = """
+            skill_condition, skill_params = self._build_skill_condition(normalized_skill)
+            base_query = f"""
             SELECT 
                 COUNT(*) as job_count,
                 COUNT(DISTINCT jd.job_id) as unique_jobs,
                 AVG(CASE WHEN jd.salary IS NOT NULL AND jd.salary != '' THEN 1 ELSE 0 END) as salary_info_rate
             FROM job_details jd
             JOIN jobs j ON jd.job_id = j.job_id
-            WHERE LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?
+            WHERE {skill_condition}
             """
-            skill_results = self._execute_query(base_query, (skill_pattern, skill_pattern, skill_pattern))
+            skill_results = self._execute_query(base_query, tuple(skill_params))
         
         if not skill_results or skill_results[0]['job_count'] == 0:
             return {
@@ -246,6 +248,11 @@ class SkillDemandAnalysisTool(BaseAnalysisTool):
             'swift', 'kotlin', 'flutter', 'react native', 'webpack', 'babel'
         ]
         
+        # 优先读取市场统计快照，无需逐个技能发起向量检索
+        snapshot_result = self._analyze_top_skills_from_snapshot(limit)
+        if snapshot_result:
+            return snapshot_result
+        
         if not self.vector_manager:
             return {
                 'title': '热门技能需求排行',
@@ -335,6 +342,62 @@ class SkillDemandAnalysisTool(BaseAnalysisTool):
         
         return result
     
+    def _analyze_top_skills_from_snapshot(self, limit: int = 20) -> Optional[dict]:
+        """
+        基于市场统计快照生成热门技能排行
+        
+        Returns:
+            分析结果字典，快照不可用或为空时返回None
+        """
+        snapshots = self._get_snapshots()
+        if not snapshots:
+            return None
+        
+        top_skills = snapshots.get_top_skills(limit=limit)
+        total_jobs = snapshots.get_total_jobs()
+        if not top_skills or total_jobs == 0:
+            return None
+        
+        skills = []
+        for i, row in enumerate(top_skills):
+            salary_info = {
+                'avg_salary': row['avg_salary'] // 1000,
+                'min_salary': (row['min_salary'] or 0) // 1000,
+                'max_salary': (row['max_salary'] or 0) // 1000
+            }
+            skills.append({
+                'rank': i + 1,
+                'name': row['skill'].title(),
+                'value': self._format_number(row['job_count']),
+                'percentage': self._format_percentage(row['job_count'], total_jobs),
+                'description': f'{row["job_count"]}个职位需要，平均薪资{salary_info["avg_salary"]}k',
+                'job_count': row['job_count'],
+                'keyword_matches': row['job_count'],
+                'vector_matches': 0,
+                'salary_info': salary_info
+            })
+        
+        total_skill_mentions = sum(skill['job_count'] for skill in skills)
+        top_5_share = sum(skill['job_count'] for skill in skills[:5])
+        
+        return {
+            'title': '热门技能需求排行榜（基于市场统计快照）',
+            'summary': f'基于{total_jobs}个职位的技能识别统计，识别出前{len(skills)}个热门技能',
+            'data': skills,
+            'statistics': {
+                'total_jobs_analyzed': total_jobs,
+                'total_skills_found': len(skills),
+                'total_skill_mentions': total_skill_mentions,
+                'top_5_market_share': self._format_percentage(top_5_share, total_skill_mentions),
+                'average_jobs_per_skill': total_skill_mentions // len(skills),
+                'vector_enhanced': False,
+                'analysis_method': 'market_snapshot'
+            },
+            'insights': self._generate_market_insights_vector(skills, total_jobs),
+            'recommendations': self._generate_market_recommendations_vector(skills),
+            'data_source': f'基于市场统计快照中{total_jobs}个职位的技能、薪资汇总'
+        }
+    
     def _get_vector_skill_count(self, skill: str) -> int:
         """使用向量搜索获取技能相关职位数量"""
         if not self.vector_manager:
@@ -536,15 +599,15 @@ class SkillDemandAnalysisTool(BaseAnalysisTool):
                 params = tuple(job_ids_or_skill) + (limit,)
             else:
                 # 使用技能名称查询
-                skill_pattern = f"%{job_ids_or_skill}%"
-                query = """
+                skill_condition, skill_params = self._build_skill_condition(job_ids_or_skill)
+                query = f"""
                 SELECT j.title, j.company, jd.location, jd.salary, jd.experience
                 FROM jobs j
                 JOIN job_details jd ON j.job_id = jd.job_id
-                WHERE LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?
+                WHERE {skill_condition}
                 LIMIT ?
                 """
-                params = (skill_pattern, skill_pattern, skill_pattern, limit)
+                params = tuple(skill_params) + (limit,)
             
             return self._execute_query(query, params)
             
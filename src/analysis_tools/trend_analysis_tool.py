@@ -434,6 +434,11 @@ class TrendAnalysisTool(BaseAnalysisTool):
     
     def _get_skill_timeline_data_vector(self, skill: str, time_period: int) -> list:
         """使用向量搜索获取技能的时间序列数据"""
+        # 快照跟踪的技能直接读取物化统计，避免多轮向量检索
+        snapshot_timeline = self._get_skill_timeline_from_snapshot(skill, time_period)
+        if snapshot_timeline is not None:
+            return snapshot_timeline
+        
         if not self.vector_manager:
             return self._get_skill_timeline_data_traditional(skill, time_period)
         
@@ -483,27 +488,39 @@ class TrendAnalysisTool(BaseAnalysisTool):
             self.logger.warning(f"向量搜索时间序列数据失败: {e}")
             return self._get_skill_timeline_data_traditional(skill, time_period)
     
+    def _get_skill_timeline_from_snapshot(self, skill: str, time_period: int) -> Optional[list]:
+        """从市场统计快照获取技能时间序列，技能未被快照跟踪时返回None"""
+        snapshot_skill = self._resolve_snapshot_skill(skill)
+        snapshots = self._get_snapshots() if snapshot_skill else None
+        if not snapshots:
+            return None
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=time_period)
+        rows = snapshots.get_daily_counts(start_date, end_date, skill=snapshot_skill)
+        return [{'date': row['date'], 'job_count': row['job_count']} for row in rows]
+    
     def _get_skill_timeline_data_traditional(self, skill: str, time_period: int) -> list:
         """传统方式获取技能时间序列数据"""
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=time_period)
             
-            skill_pattern = f"%{self._standardize_skill_name(skill)}%"
+            skill_condition, skill_params = self._build_skill_condition(skill)
             
-            query = """
+            query = f"""
             SELECT 
                 DATE(j.created_at) as date,
                 COUNT(*) as job_count
             FROM jobs j
             JOIN job_details jd ON j.job_id = jd.job_id
-            WHERE (LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?)
+            WHERE {skill_condition}
             AND j.created_at >= ? AND j.created_at <= ?
             GROUP BY DATE(j.created_at)
             ORDER BY date
             """
             
-            params = (skill_pattern, skill_pattern, skill_pattern, start_date.isoformat(), end_date.isoformat())
+            params = tuple(skill_params) + (start_date.isoformat(), end_date.isoformat())
             return self._execute_query(query, params)
             
         except Exception as e:
@@ -610,21 +627,16 @@ class TrendAnalysisTool(BaseAnalysisTool):
     def _get_top_skills_with_trends(self, time_period: int) -> list:
         """获取热门技能及其趋势"""
         try:
-            # 获取热门技能列表
-            query = """
-            SELECT 
-                LOWER(TRIM(jd.keyword)) as skill,
-                COUNT(*) as total_count
-            FROM job_details jd
-            JOIN jobs j ON jd.job_id = j.job_id
-            WHERE jd.keyword IS NOT NULL AND jd.keyword != ''
-            GROUP BY LOWER(TRIM(jd.keyword))
-            HAVING total_count >= 5
-            ORDER BY total_count DESC
-            LIMIT 20
-            """
-            
-            skills_data = self._execute_query(query)
+            snapshots = self._get_snapshots()
+            if snapshots:
+                # 快照中按识别出的技能统计职位数
+                skills_data = [
+                    {'skill': row['skill'], 'total_count': row['job_count']}
+                    for row in snapshots.get_top_skills(limit=20)
+                    if row['job_count'] >= 5
+                ]
+            else:
+                skills_data = self._get_top_keywords()
             
             # 为每个技能计算趋势
             skills_with_trends = []
@@ -648,6 +660,22 @@ class TrendAnalysisTool(BaseAnalysisTool):
             self.logger.error(f"获取技能趋势数据失败: {e}")
             return []
     
+    def _get_top_keywords(self) -> list:
+        """按搜索关键词统计热门技能"""
+        query = """
+        SELECT 
+            LOWER(TRIM(jd.keyword)) as skill,
+            COUNT(*) as total_count
+        FROM job_details jd
+        JOIN jobs j ON jd.job_id = j.job_id
+        WHERE jd.keyword IS NOT NULL AND jd.keyword != ''
+        GROUP BY LOWER(TRIM(jd.keyword))
+        HAVING total_count >= 5
+        ORDER BY total_count DESC
+        LIMIT 20
+        """
+        return self._execute_query(query)
+    
     def _generate_skill_trend_insights(self, skill: str, metrics: dict, related_trends: list) -> list:
         """生成技能趋势洞察"""
         insights = []
@@ -844,13 +872,22 @@ class TrendAnalysisTool(BaseAnalysisTool):
             end_date = datetime.now()
             start_date = end_date - timedelta(days=time_period)
             
+            snapshot_skill = self._resolve_snapshot_skill(skill) if skill else '*'
+            snapshots = self._get_snapshots() if snapshot_skill else None
+            if snapshots:
+                rows = snapshots.get_daily_counts(start_date, end_date, skill=snapshot_skill)
+                return [
+                    {'date': row['date'], 'avg_salary': row['avg_salary'], 'job_count': row['salary_count']}
+                    for row in rows if row['avg_salary'] > 0
+                ]
+            
             conditions = ["jd.salary IS NOT NULL AND jd.salary != ''"]
             params = []
             
             if skill:
-                skill_pattern = f"%{self._standardize_skill_name(skill)}%"
-                conditions.append("(LOWER(jd.keyword) LIKE ? OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?)")
-                params.extend([skill_pattern, skill_pattern, skill_pattern])
+                skill_condition, skill_params = self._build_skill_condition(skill)
+                conditions.append(skill_condition)
+                params.extend(skill_params)
             
             conditions.append("j.created_at >= ? AND j.created_at <= ?")
             params.extend([start_date.isoformat(), end_date.isoformat()])
@@ -1096,31 +1133,13 @@ class TrendAnalysisTool(BaseAnalysisTool):
             start_date = end_date - timedelta(days=time_period)
             mid_date = start_date + timedelta(days=time_period//2)
             
+            snapshot_counts = self._get_city_counts_from_snapshot(start_date, mid_date, end_date)
+            
             for city in major_cities:
-                # 获取前半期和后半期的职位数量
-                city_pattern = f"%{city}%"
-                
-                # 前半期数据
-                early_query = """
-                SELECT COUNT(*) as job_count
-                FROM jobs j
-                JOIN job_details jd ON j.job_id = jd.job_id
-                WHERE LOWER(jd.location) LIKE ?
-                AND j.created_at >= ? AND j.created_at < ?
-                """
-                early_result = self._execute_query(early_query, (city_pattern, start_date.isoformat(), mid_date.isoformat()))
-                early_count = early_result[0]['job_count'] if early_result else 0
-                
-                # 后半期数据
-                late_query = """
-                SELECT COUNT(*) as job_count
-                FROM jobs j
-                JOIN job_details jd ON j.job_id = jd.job_id
-                WHERE LOWER(jd.location) LIKE ?
-                AND j.created_at >= ? AND j.created_at <= ?
-                """
-                late_result = self._execute_query(late_query, (city_pattern, mid_date.isoformat(), end_date.isoformat()))
-                late_count = late_result[0]['job_count'] if late_result else 0
+                if snapshot_counts is not None:
+                    early_count, late_count = snapshot_counts.get(city, (0, 0))
+                else:
+                    early_count, late_count = self._get_city_counts_raw(city, start_date, mid_date, end_date)
                 
                 # 计算变化率
                 if early_count == 0:
@@ -1152,6 +1171,47 @@ class TrendAnalysisTool(BaseAnalysisTool):
             self.logger.error(f"获取地区趋势数据失败: {e}")
             return []
     
+    def _get_city_counts_from_snapshot(self, start_date: datetime, mid_date: datetime,
+                                       end_date: datetime) -> Optional[dict]:
+        """从市场统计快照获取各城市前后半期职位数，快照不可用时返回None"""
+        snapshots = self._get_snapshots()
+        if not snapshots:
+            return None
+        
+        early_end = mid_date - timedelta(days=1)
+        early = {row['city']: row['job_count'] for row in snapshots.get_city_summary(start_date, early_end)}
+        late = {row['city']: row['job_count'] for row in snapshots.get_city_summary(mid_date, end_date)}
+        return {city: (early.get(city, 0), late.get(city, 0)) for city in set(early) | set(late)}
+    
+    def _get_city_counts_raw(self, city: str, start_date: datetime, mid_date: datetime,
+                             end_date: datetime) -> tuple:
+        """直接查询某城市前后半期的职位数"""
+        city_pattern = f"%{city}%"
+        
+        # 前半期数据
+        early_query = """
+        SELECT COUNT(*) as job_count
+        FROM jobs j
+        JOIN job_details jd ON j.job_id = jd.job_id
+        WHERE LOWER(jd.location) LIKE ?
+        AND j.created_at >= ? AND j.created_at < ?
+        """
+        early_result = self._execute_query(early_query, (city_pattern, start_date.isoformat(), mid_date.isoformat()))
+        early_count = early_result[0]['job_count'] if early_result else 0
+        
+        # 后半期数据
+        late_query = """
+        SELECT COUNT(*) as job_count
+        FROM jobs j
+        JOIN job_details jd ON j.job_id = jd.job_id
+        WHERE LOWER(jd.location) LIKE ?
+        AND j.created_at >= ? AND j.created_at <= ?
+        """
+        late_result = self._execute_query(late_query, (city_pattern, mid_date.isoformat(), end_date.isoformat()))
+        late_count = late_result[0]['job_count'] if late_result else 0
+        
+        return early_count, late_count
+    
     def _calculate_location_trend_metrics(self, location_trends: list) -> dict:
         """计算地区趋势指标"""
         if not location_trends:
@@ -1228,6 +1288,11 @@ class TrendAnalysisTool(BaseAnalysisTool):
             end_date = datetime.now()
             start_date = end_date - timedelta(days=time_period)
             
+            snapshots = self._get_snapshots()
+            if snapshots:
+                rows = snapshots.get_daily_counts(start_date, end_date)
+                return [{'date': row['date'], 'job_count': row['job_count']} for row in rows]
+            
             query = """
             SELECT
                 DATE(created_at) as date,
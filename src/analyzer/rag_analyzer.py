@@ -108,7 +108,8 @@ class RAGAnalyzer:
             # 3. 存储到向量数据库
             doc_ids = self.vector_manager.add_job_documents(
                 documents=documents,
-                job_id=job_id
+                job_id=job_id,
+                prune_stale=True
             )
             
             # 4. 计算分析时间
@@ -152,4 +152,14 @@ class DocumentProcessingError(RAGSystemError):
 
 class LLMProcessingError(RAGSystemError):
     """LLM处理相关异常"""
+    pass
+
+
+class ServiceRouteNotFoundError(RAGSystemError):
+    """RAG服务接口不存在"""
+    pass
+
+
+class ServiceConflictError(RAGSystemError):
+    """RAG服务请求与正在执行的任务冲突"""
     pass
\ No newline at end of file
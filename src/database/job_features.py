@@ -0,0 +1,191 @@
+"""
+职位匹配特征表模块
+
+RAG导入职位时把 JobFeatures 写入 job_features 表，评分器按职位ID批量读取。
+进程内保留最近读取的特征，同一职位在多次匹配之间只查一次表。
+特征功能上线前已处理的职位可通过 backfill 从 jobs.structured_data 补齐，无需重新调用LLM。
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional
+
+from .models import DatabaseSchema
+from ..rag.job_features import FEATURE_VERSION, JobFeatures, extract_job_features
+
+logger = logging.getLogger(__name__)
+
+
+class JobFeatureStore:
+    """职位匹配特征表管理器"""
+
+    def __init__(self, db_manager, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化特征表管理器
+
+        Args:
+            db_manager: 数据库管理器（DatabaseManager 或 DatabaseJobReader）
+            config: 配置字典，支持 cache_size（进程内缓存的职位数，默认10000）、
+                    query_chunk_size（每条 IN 查询的职位数，默认500）
+        """
+        self.db_manager = getattr(db_manager, 'db_manager', db_manager)
+        self.config = config or {}
+        self.cache_size = self.config.get('cache_size', 10000)
+        self.query_chunk_size = self.config.get('query_chunk_size', 500)
+        self._cache: 'OrderedDict[str, JobFeatures]' = OrderedDict()
+        self._tables_ready = False
+
+    def ensure_tables(self) -> None:
+        """确保特征表存在"""
+        if self._tables_ready:
+            return
+        with self.db_manager.get_connection() as conn:
+            for statement in DatabaseSchema.get_job_features_statements():
+                conn.execute(statement)
+            conn.commit()
+        self._tables_ready = True
+
+    def save_many(self, features_list: Iterable[JobFeatures]) -> int:
+        """写入（或覆盖）职位特征，返回写入条数"""
+        rows = [
+            (features.job_id, json.dumps(features.skills, ensure_ascii=False), features.required_years,
+             features.salary_min, features.salary_max, features.industry, features.education_level,
+             features.version)
+            for features in features_list
+        ]
+        if not rows:
+            return 0
+
+        self.ensure_tables()
+        with self.db_manager.get_connection() as conn:
+            conn.executemany("""
+            INSERT INTO job_features
+                (job_id, skills, required_years, salary_min, salary_max, industry, education_level, version, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(job_id) DO UPDATE SET
+                skills = excluded.skills,
+                required_years = excluded.required_years,
+                salary_min = excluded.salary_min,
+                salary_max = excluded.salary_max,
+                industry = excluded.industry,
+                education_level = excluded.education_level,
+                version = excluded.version,
+                updated_at = excluded.updated_at
+            """, rows)
+            conn.commit()
+
+        for row in rows:
+            self._cache.pop(row[0], None)
+        return len(rows)
+
+    def load_many(self, job_ids: Iterable[str]) -> Dict[str, JobFeatures]:
+        """
+        按职位ID批量读取特征
+
+        Returns:
+            Dict[str, JobFeatures]: {job_id: 特征}，没有记录或版本过期的职位不在结果中
+        """
+        result = {}
+        missing = []
+        for job_id in dict.fromkeys(job_ids):
+            features = self._cache.get(job_id)
+            if features is not None:
+                self._cache.move_to_end(job_id)
+                result[job_id] = features
+            else:
+                missing.append(job_id)
+
+        if not missing:
+            return result
+
+        self.ensure_tables()
+        with self.db_manager.get_connection() as conn:
+            for start in range(0, len(missing), self.query_chunk_size):
+                chunk = missing[start:start + self.query_chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(f"""
+                SELECT job_id, skills, required_years, salary_min, salary_max, industry, education_level, version
+                FROM job_features
+                WHERE job_id IN ({placeholders}) AND version = ?
+                """, (*chunk, FEATURE_VERSION)).fetchall()
+                for row in rows:
+                    features = self._row_to_features(row)
+                    result[features.job_id] = features
+                    self._remember(features)
+
+        return result
+
+    def delete(self, job_ids: List[str]) -> int:
+        """删除职位特征"""
+        if not job_ids:
+            return 0
+        self.ensure_tables()
+        with self.db_manager.get_connection() as conn:
+            placeholders = ','.join('?' * len(job_ids))
+            cursor = conn.execute(f"DELETE FROM job_features WHERE job_id IN ({placeholders})", list(job_ids))
+            conn.commit()
+        for job_id in job_ids:
+            self._cache.pop(job_id, None)
+        return cursor.rowcount
+
+    def backfill(self, force: bool = False, batch_size: int = 500) -> int:
+        """
+        为已完成RAG处理的职位补齐特征（从 jobs.structured_data 提取）
+
+        Args:
+            force: 是否重新计算已有当前版本特征的职位
+            batch_size: 每批写入的职位数
+
+        Returns:
+            int: 写入的职位数
+        """
+        self.ensure_tables()
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(f"""
+            SELECT j.job_id, j.structured_data,
+                   (SELECT jd.industry FROM job_details jd WHERE jd.job_id = j.job_id
+                    ORDER BY jd.id DESC LIMIT 1) AS industry
+            FROM jobs j
+            WHERE j.rag_processed = 1 AND j.structured_data IS NOT NULL
+              AND (j.is_deleted = 0 OR j.is_deleted IS NULL)
+              {'' if force else 'AND j.job_id NOT IN (SELECT job_id FROM job_features WHERE version = ?)'}
+            ORDER BY j.id
+            """, () if force else (FEATURE_VERSION,)).fetchall()
+
+        written = 0
+        batch = []
+        for row in rows:
+            try:
+                structured = json.loads(row['structured_data'])
+            except (TypeError, ValueError):
+                logger.warning(f"职位 {row['job_id']} 的结构化数据无法解析，跳过特征提取")
+                continue
+            batch.append(extract_job_features(row['job_id'], structured, industry=row['industry']))
+            if len(batch) >= batch_size:
+                written += self.save_many(batch)
+                batch = []
+        written += self.save_many(batch)
+
+        logger.info(f"职位特征补齐完成: {written} 个职位")
+        return written
+
+    def _remember(self, features: JobFeatures) -> None:
+        """放入进程内缓存，超过容量时淘汰最久未使用的职位"""
+        self._cache[features.job_id] = features
+        self._cache.move_to_end(features.job_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _row_to_features(row) -> JobFeatures:
+        return JobFeatures(
+            job_id=row['job_id'],
+            skills=json.loads(row['skills']) if row['skills'] else [],
+            required_years=row['required_years'],
+            salary_min=row['salary_min'],
+            salary_max=row['salary_max'],
+            industry=row['industry'],
+            education_level=row['education_level'],
+            version=row['version']
+        )
@@ -0,0 +1,631 @@
+"""
+市场统计快照模块
+
+按 日期 × 技能 × 城市 × 经验区间 维护物化的职位数量和薪资汇总，
+新职位写入后按 job_details.id 水位线增量刷新，分析工具直接读取快照，
+避免每次提问都扫描全表或发起多轮向量检索。
+
+增量刷新只能累加。已汇总的职位详情被修改或删除、职位被软删除（jobs.is_deleted）或删除，
+以及职位行晚于详情写入时，快照表上的触发器写入失效标记，下一次刷新在同一事务内自动全量重建。
+"""
+
+import re
+import time
+import logging
+import threading
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from .models import DatabaseSchema
+
+logger = logging.getLogger(__name__)
+
+# 汇总维度的通配值
+ALL = '*'
+
+# 主要城市（与分析工具的城市列表保持一致），其余城市归入"其他"
+MAJOR_CITIES = ['北京', '上海', '深圳', '杭州', '广州', '成都', '南京', '武汉', '西安', '苏州']
+OTHER_CITY = '其他'
+
+# 经验区间
+EXPERIENCE_BUCKETS = ['不限', '1年以下', '1-3年', '3-5年', '5-10年', '10年以上']
+
+# 快照跟踪的技能（与技能需求分析工具的热门技能列表一致，补充常见中文方向）
+TRACKED_SKILLS = [
+    'python', 'java', 'javascript', 'react', 'vue', 'node.js',
+    'spring', 'mysql', 'redis', 'docker', 'kubernetes', 'git',
+    'linux', 'aws', 'azure', 'tensorflow', 'pytorch', 'pandas',
+    'numpy', 'django', 'flask', 'express', 'mongodb', 'postgresql',
+    'elasticsearch', 'kafka', 'spark', 'hadoop', 'jenkins', 'nginx',
+    'go', 'rust', 'typescript', 'angular', 'svelte', 'php', 'laravel',
+    'ruby', 'rails', 'c++', 'c#', '.net', 'unity', 'android', 'ios',
+    'swift', 'kotlin', 'flutter', 'react native', 'webpack', 'babel',
+    '机器学习', '深度学习', '大数据', '数据分析', '人工智能'
+]
+
+# 技能别名 -> 快照技能名
+SKILL_ALIASES = {
+    'golang': 'go',
+    'k8s': 'kubernetes',
+    'nodejs': 'node.js',
+    'vue.js': 'vue',
+    'vuejs': 'vue',
+    'reactjs': 'react',
+    'postgres': 'postgresql',
+    'machine learning': '机器学习',
+    'deep learning': '深度学习',
+    'artificial intelligence': '人工智能',
+    'big data': '大数据'
+}
+
+# 薪资区间阈值（月薪，与薪资分析工具的区间划分一致）
+SALARY_RANGE_COLUMNS = ['salary_low', 'salary_medium', 'salary_high', 'salary_very_high']
+
+_SALARY_PATTERNS = [
+    r'(\d+)-(\d+)k',           # 15-25k
+    r'(\d+)k-(\d+)k',          # 15k-25k
+    r'(\d+)-(\d+)万',          # 15-25万
+    r'(\d+)万-(\d+)万',        # 15万-25万
+    r'(\d+)-(\d+)',            # 15000-25000
+    r'(\d+)k',                 # 25k (单个值)
+    r'(\d+)万',                # 25万 (单个值)
+]
+
+
+def parse_salary_range(salary_text: str) -> Dict[str, int]:
+    """
+    解析薪资范围文本
+
+    Args:
+        salary_text: 薪资文本，如"15-25k"、"20万-30万"等
+
+    Returns:
+        包含min、max、avg的字典，无法解析时均为0
+    """
+    if not salary_text:
+        return {'min': 0, 'max': 0, 'avg': 0}
+
+    salary_lower = salary_text.lower().strip()
+
+    for pattern in _SALARY_PATTERNS:
+        match = re.search(pattern, salary_lower)
+        if not match:
+            continue
+
+        if 'k' in pattern:
+            unit = 1000
+        elif '万' in pattern:
+            unit = 10000
+        else:
+            unit = 1
+
+        if len(match.groups()) == 2:
+            min_val, max_val = (int(value) * unit for value in match.groups())
+            return {'min': min_val, 'max': max_val, 'avg': (min_val + max_val) // 2}
+
+        val = int(match.groups()[0]) * unit
+        return {'min': val, 'max': val, 'avg': val}
+
+    return {'min': 0, 'max': 0, 'avg': 0}
+
+
+def salary_range_column(avg_salary: int) -> str:
+    """获取月薪所属的区间列名"""
+    if avg_salary < 15000:
+        return 'salary_low'
+    if avg_salary < 30000:
+        return 'salary_medium'
+    if avg_salary < 50000:
+        return 'salary_high'
+    return 'salary_very_high'
+
+
+def resolve_city(location: Optional[str]) -> str:
+    """将工作地点归一化为主要城市，无法识别时返回"其他" """
+    if location:
+        for city in MAJOR_CITIES:
+            if city in location:
+                return city
+    return OTHER_CITY
+
+
+def resolve_experience_bucket(experience: Optional[str]) -> Optional[str]:
+    """
+    将经验要求文本归入经验区间
+
+    Returns:
+        经验区间名称，文本中既没有年限也没有"不限"/"应届"等描述时返回None
+    """
+    if not experience:
+        return None
+
+    text = experience.strip()
+    if text in EXPERIENCE_BUCKETS:
+        return text
+
+    numbers = re.findall(r'\d+', text)
+    if not numbers:
+        if '不限' in text:
+            return '不限'
+        if any(word in text for word in ('应届', '在校', '无经验', '无需经验')):
+            return '1年以下'
+        return None
+
+    years = int(numbers[0])
+    if years < 1 or ('以下' in text and years <= 1):
+        return '1年以下'
+    if years < 3:
+        return '1-3年'
+    if years < 5:
+        return '3-5年'
+    if years < 10:
+        return '5-10年'
+    return '10年以上'
+
+
+def _compile_skill_patterns() -> List[Tuple[str, 're.Pattern']]:
+    """为快照技能和别名编译匹配正则（英文技能按词边界匹配）"""
+    terms = [(skill, skill) for skill in TRACKED_SKILLS]
+    terms.extend((alias, skill) for alias, skill in SKILL_ALIASES.items())
+
+    patterns = []
+    for term, skill in terms:
+        if re.search(r'[a-z]', term):
+            regex = r'(?<![a-z0-9])' + re.escape(term) + r'(?![a-z0-9+#])'
+        else:
+            regex = re.escape(term)
+        patterns.append((skill, re.compile(regex)))
+    return patterns
+
+
+_SKILL_PATTERNS = _compile_skill_patterns()
+
+
+def detect_skills(text: str) -> List[str]:
+    """识别文本中出现的快照技能"""
+    if not text:
+        return []
+
+    text_lower = text.lower()
+    found = []
+    for skill, pattern in _SKILL_PATTERNS:
+        if skill not in found and pattern.search(text_lower):
+            found.append(skill)
+    return found
+
+
+DateLike = Union[str, date, datetime, None]
+
+
+def _to_date_str(value: DateLike) -> Optional[str]:
+    """将日期参数统一为 YYYY-MM-DD 字符串"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+class MarketSnapshotManager:
+    """市场统计快照管理器"""
+
+    STATE_NAME = 'market_stats_daily'
+    # 失效标记行（由 MARKET_SNAPSHOT_TRIGGERS 写入，重建时删除）
+    STALE_STATE_NAME = 'market_stats_daily:stale'
+
+    def __init__(self, db_manager, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化快照管理器
+
+        Args:
+            db_manager: 数据库管理器（DatabaseManager 或 DatabaseJobReader）
+            config: 配置字典，支持 refresh_interval（秒，默认300）、batch_size（默认1000）
+        """
+        self.db_manager = getattr(db_manager, 'db_manager', db_manager)
+        self.config = config or {}
+        self.refresh_interval = self.config.get('refresh_interval', 300)
+        self.batch_size = self.config.get('batch_size', 1000)
+
+        self._lock = threading.RLock()
+        self._tables_ready = False
+        self._last_refresh: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 刷新
+    # ------------------------------------------------------------------
+
+    def ensure_tables(self) -> bool:
+        """确保快照表存在，业务表尚未创建时返回False"""
+        if self._tables_ready:
+            return True
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_details'"
+            )
+            if cursor.fetchone() is None:
+                return False
+
+            # 失效触发器出现之前建立的快照可能已包含被修改或删除的职位，补建触发器时重建一次
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_market_snapshot_jobs_update'"
+            )
+            missing_triggers = cursor.fetchone() is None
+
+            for statement in DatabaseSchema.get_market_snapshot_statements():
+                cursor.execute(statement)
+            if missing_triggers:
+                cursor.execute("""
+                INSERT INTO market_snapshot_state (name, last_detail_id, refreshed_at)
+                SELECT ?, 0, CURRENT_TIMESTAMP FROM market_snapshot_state WHERE name = ?
+                """, (self.STALE_STATE_NAME, self.STATE_NAME))
+            conn.commit()
+
+        self._tables_ready = True
+        return True
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        增量刷新快照：只汇总水位线之后新增的职位详情
+
+        快照被触发器标记失效时改为全量重建。所有变更在同一事务内提交，查询方不会读到半刷新的快照。
+
+        Returns:
+            刷新统计（processed_jobs、upserted_rows、last_detail_id、rebuilt、duration_ms）
+        """
+        return self._refresh(rebuild=False)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """清空快照并从头重建（与增量刷新相同，在同一事务内完成）"""
+        return self._refresh(rebuild=True)
+
+    def _refresh(self, rebuild: bool) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+
+        with self._lock:
+            if not self.ensure_tables():
+                return {'processed_jobs': 0, 'upserted_rows': 0, 'last_detail_id': 0,
+                        'rebuilt': False, 'duration_ms': 0.0}
+
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                # 写锁下读取失效标记和水位线，刷新期间的写入要么已计入，要么留给下一次刷新
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("SELECT 1 FROM market_snapshot_state WHERE name = ?", (self.STALE_STATE_NAME,))
+                if cursor.fetchone() is not None:
+                    rebuild = True
+                    logger.info("市场快照已失效（职位详情被修改或删除），全量重建")
+
+                if rebuild:
+                    cursor.execute("DELETE FROM market_stats_daily")
+                    cursor.execute("DELETE FROM market_snapshot_state WHERE name IN (?, ?)",
+                                   (self.STATE_NAME, self.STALE_STATE_NAME))
+                watermark = self._get_watermark(cursor)
+
+                processed = 0
+                upserted = 0
+                while True:
+                    # LEFT JOIN：职位行尚不存在的详情也推进水位线，职位行写入后由触发器标记失效重新汇总
+                    cursor.execute("""
+                    SELECT jd.id, j.job_id IS NOT NULL AND COALESCE(j.is_deleted, 0) = 0 AS counted,
+                           COALESCE(DATE(j.created_at), DATE('now')) AS stat_date,
+                           j.title, jd.salary, jd.location, jd.experience,
+                           jd.keyword, jd.description, jd.requirements
+                    FROM job_details jd
+                    LEFT JOIN jobs j ON j.job_id = jd.job_id
+                    WHERE jd.id > ?
+                    ORDER BY jd.id
+                    LIMIT ?
+                    """, (watermark, self.batch_size))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+
+                    counted_rows = [row for row in rows if row['counted']]
+                    aggregates = self._aggregate_rows(counted_rows)
+                    self._upsert_aggregates(cursor, aggregates)
+
+                    processed += len(counted_rows)
+                    upserted += len(aggregates)
+                    watermark = rows[-1]['id']
+
+                cursor.execute("""
+                INSERT INTO market_snapshot_state (name, last_detail_id, refreshed_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(name) DO UPDATE SET
+                    last_detail_id = excluded.last_detail_id,
+                    refreshed_at = excluded.refreshed_at
+                """, (self.STATE_NAME, watermark))
+                conn.commit()
+
+            self._last_refresh = time.monotonic()
+
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        if processed or rebuild:
+            logger.info(f"市场快照{'重建' if rebuild else '增量刷新'}: {processed} 条职位详情, "
+                        f"{upserted} 行汇总, 耗时 {duration_ms:.1f} ms")
+
+        return {
+            'processed_jobs': processed,
+            'upserted_rows': upserted,
+            'last_detail_id': watermark,
+            'rebuilt': rebuild,
+            'duration_ms': duration_ms
+        }
+
+    def ensure_fresh(self) -> bool:
+        """
+        在距上次刷新超过 refresh_interval 时执行增量刷新
+
+        Returns:
+            快照是否可用
+        """
+        try:
+            if self._last_refresh is None or time.monotonic() - self._last_refresh >= self.refresh_interval:
+                self.refresh()
+            return self._tables_ready
+        except Exception as e:
+            logger.warning(f"市场快照刷新失败，将回退到原始查询: {e}")
+            return False
+
+    def start_auto_refresh(self, interval: Optional[float] = None) -> None:
+        """启动后台定时刷新线程"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        interval = interval or self.refresh_interval
+        self._stop_event.clear()
+
+        def _loop():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"市场快照定时刷新失败: {e}")
+
+        self._refresh_thread = threading.Thread(target=_loop, name='market-snapshot-refresh', daemon=True)
+        self._refresh_thread.start()
+        logger.info(f"市场快照定时刷新已启动，间隔 {interval} 秒")
+
+    def stop_auto_refresh(self) -> None:
+        """停止后台定时刷新线程"""
+        self._stop_event.set()
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+
+    def _get_watermark(self, cursor) -> int:
+        """读取已汇总到的 job_details.id"""
+        cursor.execute(
+            "SELECT last_detail_id FROM market_snapshot_state WHERE name = ?", (self.STATE_NAME,)
+        )
+        row = cursor.fetchone()
+        return row['last_detail_id'] if row else 0
+
+    def _aggregate_rows(self, rows) -> Dict[Tuple[str, str, str, str], List[Optional[int]]]:
+        """
+        在内存中聚合一批职位详情
+
+        每个职位同时计入具体维度和 '*' 汇总行，因此汇总行中每个职位只计一次，
+        不会因为一个职位匹配多个技能而重复计数。
+
+        Returns:
+            {(日期, 技能, 城市, 经验区间): [job_count, salary_count, salary_sum,
+             salary_min, salary_max, low, medium, high, very_high]}
+        """
+        aggregates: Dict[Tuple[str, str, str, str], List[Optional[int]]] = {}
+
+        for row in rows:
+            text = ' '.join(filter(None, [row['title'], row['keyword'], row['description'], row['requirements']]))
+            skills = detect_skills(text) + [ALL]
+            cities = (resolve_city(row['location']), ALL)
+            buckets = (resolve_experience_bucket(row['experience']) or '不限', ALL)
+
+            salary = parse_salary_range(row['salary'])['avg']
+            range_index = SALARY_RANGE_COLUMNS.index(salary_range_column(salary)) if salary > 0 else None
+
+            for skill in skills:
+                for city in cities:
+                    for bucket in buckets:
+                        key = (row['stat_date'], skill, city, bucket)
+                        acc = aggregates.get(key)
+                        if acc is None:
+                            acc = aggregates[key] = [0, 0, 0, None, None, 0, 0, 0, 0]
+                        acc[0] += 1
+                        if range_index is not None:
+                            acc[1] += 1
+                            acc[2] += salary
+                            acc[3] = salary if acc[3] is None else min(acc[3], salary)
+                            acc[4] = salary if acc[4] is None else max(acc[4], salary)
+                            acc[5 + range_index] += 1
+
+        return aggregates
+
+    def _upsert_aggregates(self, cursor, aggregates: Dict[Tuple[str, str, str, str], List[Optional[int]]]) -> None:
+        """将聚合结果累加到快照表"""
+        cursor.executemany("""
+        INSERT INTO market_stats_daily (
+            stat_date, skill, city, experience_bucket,
+            job_count, salary_count, salary_sum, salary_min, salary_max,
+            salary_low, salary_medium, salary_high, salary_very_high
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(stat_date, skill, city, experience_bucket) DO UPDATE SET
+            job_count = job_count + excluded.job_count,
+            salary_count = salary_count + excluded.salary_count,
+            salary_sum = salary_sum + excluded.salary_sum,
+            salary_min = COALESCE(MIN(salary_min, excluded.salary_min), salary_min, excluded.salary_min),
+            salary_max = COALESCE(MAX(salary_max, excluded.salary_max), salary_max, excluded.salary_max),
+            salary_low = salary_low + excluded.salary_low,
+            salary_medium = salary_medium + excluded.salary_medium,
+            salary_high = salary_high + excluded.salary_high,
+            salary_very_high = salary_very_high + excluded.salary_very_high,
+            updated_at = CURRENT_TIMESTAMP
+        """, [key + tuple(values) for key, values in aggregates.items()])
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def resolve_skill(skill: Optional[str]) -> Optional[str]:
+        """
+        将技能名映射到快照技能
+
+        Returns:
+            快照技能名；技能未被快照跟踪时返回None，调用方应回退到原始查询
+        """
+        if not skill:
+            return None
+        skill = skill.lower().strip()
+        skill = SKILL_ALIASES.get(skill, skill)
+        return skill if skill in TRACKED_SKILLS else None
+
+    def get_daily_counts(self, start_date: DateLike = None, end_date: DateLike = None,
+                         skill: str = ALL, city: str = ALL,
+                         experience_bucket: str = ALL) -> List[Dict[str, Any]]:
+        """
+        获取按日汇总的职位数量和平均薪资
+
+        Returns:
+            [{'date', 'job_count', 'salary_count', 'avg_salary'}]，按日期升序
+        """
+        conditions, params = self._build_conditions(start_date, end_date, skill=skill,
+                                                    city=city, experience_bucket=experience_bucket)
+        rows = self._query(f"""
+        SELECT stat_date AS date, job_count, salary_count,
+               CASE WHEN salary_count > 0 THEN salary_sum / salary_count ELSE 0 END AS avg_salary
+        FROM market_stats_daily
+        WHERE {conditions}
+        ORDER BY stat_date
+        """, params)
+        return rows
+
+    def get_city_summary(self, start_date: DateLike = None, end_date: DateLike = None,
+                         skill: str = ALL, experience_bucket: str = ALL) -> List[Dict[str, Any]]:
+        """
+        获取各城市的职位数量和薪资汇总（不含"其他"）
+
+        Returns:
+            [{'city', 'job_count', 'salary_count', 'average_salary', 'min_salary', 'max_salary'}]
+        """
+        conditions, params = self._build_conditions(start_date, end_date, skill=skill, city=None,
+                                                    experience_bucket=experience_bucket)
+        rows = self._query(f"""
+        SELECT city, SUM(job_count) AS job_count, SUM(salary_count) AS salary_count,
+               SUM(salary_sum) AS salary_sum, MIN(salary_min) AS min_salary, MAX(salary_max) AS max_salary
+        FROM market_stats_daily
+        WHERE {conditions} AND city NOT IN (?, ?)
+        GROUP BY city
+        """, params + [ALL, OTHER_CITY])
+
+        for row in rows:
+            row['average_salary'] = row['salary_sum'] // row['salary_count'] if row['salary_count'] else 0
+            del row['salary_sum']
+        return rows
+
+    def get_top_skills(self, limit: int = 20, start_date: DateLike = None, end_date: DateLike = None,
+                       city: str = ALL, experience_bucket: str = ALL) -> List[Dict[str, Any]]:
+        """
+        获取职位数量最多的技能
+
+        Returns:
+            [{'skill', 'job_count', 'salary_count', 'avg_salary', 'min_salary', 'max_salary'}]，按职位数降序
+        """
+        conditions, params = self._build_conditions(start_date, end_date, skill=None, city=city,
+                                                    experience_bucket=experience_bucket)
+        rows = self._query(f"""
+        SELECT skill, SUM(job_count) AS job_count, SUM(salary_count) AS salary_count,
+               SUM(salary_sum) AS salary_sum, MIN(salary_min) AS min_salary, MAX(salary_max) AS max_salary
+        FROM market_stats_daily
+        WHERE {conditions} AND skill != ?
+        GROUP BY skill
+        ORDER BY job_count DESC
+        LIMIT ?
+        """, params + [ALL, limit])
+
+        for row in rows:
+            row['avg_salary'] = row['salary_sum'] // row['salary_count'] if row['salary_count'] else 0
+            del row['salary_sum']
+        return rows
+
+    def get_salary_summary(self, start_date: DateLike = None, end_date: DateLike = None,
+                           skill: str = ALL, city: str = ALL,
+                           experience_bucket: str = ALL) -> Dict[str, Any]:
+        """
+        获取薪资汇总及区间分布
+
+        Returns:
+            {'job_count', 'salary_count', 'avg_salary', 'min_salary', 'max_salary',
+             'low', 'medium', 'high', 'very_high'}
+        """
+        conditions, params = self._build_conditions(start_date, end_date, skill=skill,
+                                                    city=city, experience_bucket=experience_bucket)
+        rows = self._query(f"""
+        SELECT COALESCE(SUM(job_count), 0) AS job_count, COALESCE(SUM(salary_count), 0) AS salary_count,
+               COALESCE(SUM(salary_sum), 0) AS salary_sum,
+               MIN(salary_min) AS min_salary, MAX(salary_max) AS max_salary,
+               COALESCE(SUM(salary_low), 0) AS low, COALESCE(SUM(salary_medium), 0) AS medium,
+               COALESCE(SUM(salary_high), 0) AS high, COALESCE(SUM(salary_very_high), 0) AS very_high
+        FROM market_stats_daily
+        WHERE {conditions}
+        """, params)
+
+        summary = rows[0] if rows else {'job_count': 0, 'salary_count': 0, 'salary_sum': 0}
+        summary['avg_salary'] = summary['salary_sum'] // summary['salary_count'] if summary['salary_count'] else 0
+        del summary['salary_sum']
+        return summary
+
+    def get_total_jobs(self) -> int:
+        """获取快照中的职位总数"""
+        return self.get_salary_summary()['job_count']
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取快照状态"""
+        if not self.ensure_tables():
+            return {'available': False}
+
+        rows = self._query(
+            "SELECT last_detail_id, refreshed_at FROM market_snapshot_state WHERE name = ?", [self.STATE_NAME]
+        )
+        row_count = self._query("SELECT COUNT(*) AS row_count FROM market_stats_daily", [])
+        state = rows[0] if rows else {'last_detail_id': 0, 'refreshed_at': None}
+        return {
+            'available': True,
+            'last_detail_id': state['last_detail_id'],
+            'refreshed_at': state['refreshed_at'],
+            'snapshot_rows': row_count[0]['row_count'] if row_count else 0,
+            'auto_refresh': bool(self._refresh_thread and self._refresh_thread.is_alive())
+        }
+
+    def _build_conditions(self, start_date: DateLike, end_date: DateLike, skill: Optional[str] = ALL,
+                          city: Optional[str] = ALL,
+                          experience_bucket: Optional[str] = ALL) -> Tuple[str, List[Any]]:
+        """构建维度和日期范围过滤条件（日期闭区间，维度为None时不过滤）"""
+        conditions = []
+        params: List[Any] = []
+
+        for column, value in (('skill', skill), ('city', city), ('experience_bucket', experience_bucket)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        if start_date is not None:
+            conditions.append("stat_date >= ?")
+            params.append(_to_date_str(start_date))
+        if end_date is not None:
+            conditions.append("stat_date <= ?")
+            params.append(_to_date_str(end_date))
+
+        return " AND ".join(conditions) if conditions else "1 = 1", params
+
+    def _query(self, query: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """执行快照查询"""
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            return [dict(row) for row in cursor.fetchall()]
@@ -0,0 +1,210 @@
+"""
+增量匹配出队表模块
+
+职位完成RAG处理（mark_job_as_processed 写入 rag_processed=1 且生成了向量文档）时，
+触发器在同一事务内把职位ID写入 job_match_outbox。匹配工作进程按自增ID顺序消费，
+只对新职位打分，并在写入 resume_matches 的同一事务内推进水位线：
+- 水位线之前的事件不会被再次消费，职位不会被重复打分
+- 进程在打分与提交之间崩溃时事务整体回滚，下次从原水位线重新消费
+- 提交时校验水位线未被其他工作进程推进，避免并发消费同一批事件
+"""
+
+import json
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from .models import DatabaseSchema
+
+logger = logging.getLogger(__name__)
+
+
+class MatchOutbox:
+    """增量匹配出队表管理器"""
+
+    STATE_NAME = 'resume_matches'
+
+    def __init__(self, db_manager, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化出队表管理器
+
+        Args:
+            db_manager: 数据库管理器（DatabaseManager 或 DatabaseJobReader）
+            config: 配置字典，支持 batch_size（每批消费的事件数，默认200）
+        """
+        self.db_manager = getattr(db_manager, 'db_manager', db_manager)
+        self.config = config or {}
+        self.batch_size = self.config.get('batch_size', 200)
+        self._tables_ready = False
+
+    def ensure_tables(self) -> bool:
+        """确保出队表、状态表、档案表及触发器存在，业务表尚未创建时返回False"""
+        if self._tables_ready:
+            return True
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'"
+            )
+            if cursor.fetchone() is None:
+                return False
+
+            for statement in DatabaseSchema.get_match_outbox_statements():
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT OR IGNORE INTO match_outbox_state (name, last_event_id) VALUES (?, 0)",
+                (self.STATE_NAME,)
+            )
+            conn.commit()
+
+        self._tables_ready = True
+        return True
+
+    # ------------------------------------------------------------------
+    # 简历档案
+    # ------------------------------------------------------------------
+
+    def register_profile(self, profile_id: str, profile_data: Dict[str, Any], active: bool = True) -> None:
+        """登记（或更新）参与增量匹配的简历档案"""
+        self.ensure_tables()
+        with self.db_manager.get_connection() as conn:
+            conn.execute("""
+            INSERT INTO match_profiles (profile_id, profile_data, active, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(profile_id) DO UPDATE SET
+                profile_data = excluded.profile_data,
+                active = excluded.active,
+                updated_at = excluded.updated_at
+            """, (profile_id, json.dumps(profile_data, ensure_ascii=False), 1 if active else 0))
+            conn.commit()
+
+    def deactivate_profile(self, profile_id: str) -> bool:
+        """停用简历档案，停用后新职位不再与其匹配"""
+        self.ensure_tables()
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute(
+                "UPDATE match_profiles SET active = 0, updated_at = CURRENT_TIMESTAMP WHERE profile_id = ?",
+                (profile_id,)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def get_active_profiles(self) -> Dict[str, Dict[str, Any]]:
+        """获取全部启用的简历档案 {profile_id: profile_data}"""
+        if not self.ensure_tables():
+            return {}
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT profile_id, profile_data FROM match_profiles WHERE active = 1 ORDER BY profile_id"
+            ).fetchall()
+        return {row['profile_id']: json.loads(row['profile_data']) for row in rows}
+
+    # ------------------------------------------------------------------
+    # 事件消费
+    # ------------------------------------------------------------------
+
+    def get_watermark(self) -> int:
+        """读取已消费到的 job_match_outbox.id"""
+        if not self.ensure_tables():
+            return 0
+        with self.db_manager.get_connection() as conn:
+            return self._get_watermark(conn.cursor())
+
+    def latest_event_id(self) -> int:
+        """当前最新事件ID"""
+        if not self.ensure_tables():
+            return 0
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM job_match_outbox").fetchone()
+            return row['max_id']
+
+    def pending_count(self) -> int:
+        """水位线之后尚未消费的事件数"""
+        if not self.ensure_tables():
+            return 0
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM job_match_outbox WHERE id > ?", (self._get_watermark(cursor),)
+            )
+            return cursor.fetchone()[0]
+
+    def fetch_pending(self, limit: Optional[int] = None) -> Tuple[int, int, List[str]]:
+        """
+        读取水位线之后的一批事件
+
+        同一职位的多次事件合并为一次；已删除的职位不再打分，但其事件仍计入水位线。
+
+        Returns:
+            (当前水位线, 本批最后的事件ID, 需要打分的职位ID列表)，没有新事件时两个ID相等
+        """
+        if not self.ensure_tables():
+            return 0, 0, []
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            watermark = self._get_watermark(cursor)
+            cursor.execute("""
+            SELECT o.id, o.job_id, j.job_id AS live_job_id
+            FROM job_match_outbox o
+            LEFT JOIN jobs j ON j.job_id = o.job_id AND (j.is_deleted = 0 OR j.is_deleted IS NULL)
+            WHERE o.id > ?
+            ORDER BY o.id
+            LIMIT ?
+            """, (watermark, limit or self.batch_size))
+            rows = cursor.fetchall()
+
+        if not rows:
+            return watermark, watermark, []
+
+        job_ids = list(dict.fromkeys(row['job_id'] for row in rows if row['live_job_id']))
+        return watermark, rows[-1]['id'], job_ids
+
+    def commit(self, matches: List[Dict[str, Any]], expected_watermark: int, last_event_id: int) -> Optional[int]:
+        """
+        在同一事务内写入匹配结果、推进水位线并清理已消费的事件
+
+        Args:
+            matches: 匹配结果记录（batch_save_resume_matches 的格式）
+            expected_watermark: fetch_pending 时读到的水位线
+            last_event_id: 本批最后的事件ID
+
+        Returns:
+            新增的匹配记录数；水位线已被其他工作进程推进时回滚并返回None
+        """
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+            UPDATE match_outbox_state
+            SET last_event_id = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE name = ? AND last_event_id = ?
+            """, (last_event_id, self.STATE_NAME, expected_watermark))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                logger.warning(f"增量匹配水位线已被推进（期望 {expected_watermark}），放弃本批结果")
+                return None
+
+            saved, _ = self.db_manager.write_resume_matches(cursor, matches)
+            cursor.execute("DELETE FROM job_match_outbox WHERE id <= ?", (last_event_id,))
+            conn.commit()
+        return saved
+
+    def advance_watermark(self, event_id: int) -> None:
+        """将水位线推进到指定事件（只前进不后退）并清理已覆盖的事件，水位线由全部档案共用，调用方需保证这些事件已为全部档案打分"""
+        if not self.ensure_tables():
+            return
+        with self.db_manager.get_connection() as conn:
+            conn.execute("""
+            UPDATE match_outbox_state
+            SET last_event_id = MAX(last_event_id, ?), updated_at = CURRENT_TIMESTAMP
+            WHERE name = ?
+            """, (event_id, self.STATE_NAME))
+            conn.execute("DELETE FROM job_match_outbox WHERE id <= ?", (event_id,))
+            conn.commit()
+
+    def _get_watermark(self, cursor) -> int:
+        cursor.execute(
+            "SELECT last_event_id FROM match_outbox_state WHERE name = ?", (self.STATE_NAME,)
+        )
+        row = cursor.fetchone()
+        return row['last_event_id'] if row else 0
@@ -0,0 +1,126 @@
+"""
+匹配监控聚合计数模块
+
+MatchingMonitor 每次检查原本都要对 jobs 和 resume_matches 全表执行 COUNT(*)/AVG，
+表越大检查越慢。这里把职位总数、匹配总数、分数和、高质量匹配数保存在单行的
+matching_stats 表中，由 jobs / resume_matches 上的触发器在写入的同一事务内增量维护，
+监控检查只需读取一行。
+
+计数行在首次建表时按当前数据全量统计一次（与创建触发器在同一写事务内，期间的写入不会漏计），
+此后如需对账可调用 rebuild()。
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+from .models import DatabaseSchema
+
+logger = logging.getLogger(__name__)
+
+_COUNTER_FIELDS = ('total_jobs', 'total_matches', 'scored_matches', 'score_sum', 'high_quality_matches')
+
+# 全量统计（高质量匹配的分数下限与 MATCHING_STATS_TRIGGERS 一致）
+_REBUILD_SQL = """
+INSERT OR REPLACE INTO matching_stats
+    (id, total_jobs, total_matches, scored_matches, score_sum, high_quality_matches, updated_at)
+SELECT
+    1,
+    (SELECT COUNT(*) FROM jobs),
+    COUNT(*),
+    COALESCE(SUM(match_score > 0), 0),
+    COALESCE(SUM(CASE WHEN match_score > 0 THEN match_score ELSE 0 END), 0),
+    COALESCE(SUM(match_score >= 0.7), 0),
+    CURRENT_TIMESTAMP
+FROM resume_matches
+"""
+
+
+class MatchingStatsStore:
+    """匹配监控聚合计数管理器"""
+
+    def __init__(self, db_manager, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化聚合计数管理器
+
+        Args:
+            db_manager: 数据库管理器（DatabaseManager 或 DatabaseJobReader）
+            config: 配置字典，支持 unmatched_limit（每次取出的未匹配职位数，默认50）
+        """
+        self.db_manager = getattr(db_manager, 'db_manager', db_manager)
+        self.config = config or {}
+        self.unmatched_limit = self.config.get('unmatched_limit', 50)
+        self._tables_ready = False
+
+    def ensure_tables(self) -> bool:
+        """确保计数表、触发器和索引存在（首次创建时全量统计一次），业务表尚未创建时返回False"""
+        if self._tables_ready:
+            return True
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('jobs', 'resume_matches')"
+            )
+            if cursor.fetchone()[0] < 2:
+                return False
+
+            # 写锁下建触发器并统计初值，避免统计与触发器生效之间的写入漏计或重复计数
+            cursor.execute("BEGIN IMMEDIATE")
+            for statement in DatabaseSchema.get_matching_stats_statements():
+                cursor.execute(statement)
+            cursor.execute("SELECT 1 FROM matching_stats WHERE id = 1")
+            if cursor.fetchone() is None:
+                cursor.execute(_REBUILD_SQL)
+                logger.info("匹配监控聚合计数已初始化")
+            conn.commit()
+
+        self._tables_ready = True
+        return True
+
+    def read(self) -> Dict[str, Any]:
+        """
+        读取聚合计数
+
+        Returns:
+            Dict[str, Any]: total_jobs、total_matches、scored_matches、score_sum、
+                            high_quality_matches 及 avg_score（match_score > 0 的平均分）
+        """
+        counters: Dict[str, Any] = {name: 0 for name in _COUNTER_FIELDS}
+        if self.ensure_tables():
+            with self.db_manager.get_connection() as conn:
+                row = conn.execute(
+                    f"SELECT {', '.join(_COUNTER_FIELDS)} FROM matching_stats WHERE id = 1"
+                ).fetchone()
+            if row is not None:
+                counters = {name: row[name] or 0 for name in _COUNTER_FIELDS}
+
+        scored = counters['scored_matches']
+        counters['avg_score'] = counters['score_sum'] / scored if scored > 0 else 0.0
+        return counters
+
+    def rebuild(self) -> Dict[str, Any]:
+        """按当前数据重新全量统计（对账用），返回新的计数"""
+        if not self.ensure_tables():
+            return self.read()
+        with self.db_manager.get_connection() as conn:
+            conn.execute(_REBUILD_SQL)
+            conn.commit()
+        return self.read()
+
+    def unmatched_job_ids(self, limit: Optional[int] = None) -> List[str]:
+        """
+        已完成RAG处理但还没有任何匹配记录的职位ID
+
+        通过部分索引 idx_jobs_rag_processed_job_id 遍历已处理职位，
+        用 NOT EXISTS 在 idx_resume_matches_job_id 上逐个探测，不再物化整张匹配表的 job_id 子查询。
+        """
+        if not self.ensure_tables():
+            return []
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute("""
+            SELECT j.job_id FROM jobs j
+            WHERE j.rag_processed = 1
+              AND NOT EXISTS (SELECT 1 FROM resume_matches m WHERE m.job_id = j.job_id)
+            LIMIT ?
+            """, (limit or self.unmatched_limit,)).fetchall()
+        return [row['job_id'] for row in rows]
@@ -134,6 +134,267 @@ class DatabaseSchema:
     )
     """
     
+    # 职位全文索引表（FTS5 + trigram分词，支持中文子串匹配）
+    # rowid 与 job_details.id 保持一致，由下方触发器自动同步
+    JOB_SEARCH_FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS job_search_fts USING fts5(
+        job_id UNINDEXED,
+        title,
+        description,
+        requirements,
+        keyword,
+        tokenize = 'trigram'
+    )
+    """
+
+    # 全文索引同步触发器
+    FTS_TRIGGERS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_job_details_fts_insert AFTER INSERT ON job_details
+        BEGIN
+            INSERT INTO job_search_fts(rowid, job_id, title, description, requirements, keyword)
+            VALUES (NEW.id, NEW.job_id, (SELECT title FROM jobs WHERE job_id = NEW.job_id),
+                    NEW.description, NEW.requirements, NEW.keyword);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_job_details_fts_update AFTER UPDATE ON job_details
+        BEGIN
+            DELETE FROM job_search_fts WHERE rowid = OLD.id;
+            INSERT INTO job_search_fts(rowid, job_id, title, description, requirements, keyword)
+            VALUES (NEW.id, NEW.job_id, (SELECT title FROM jobs WHERE job_id = NEW.job_id),
+                    NEW.description, NEW.requirements, NEW.keyword);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_job_details_fts_delete AFTER DELETE ON job_details
+        BEGIN
+            DELETE FROM job_search_fts WHERE rowid = OLD.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_fts_insert AFTER INSERT ON jobs
+        BEGIN
+            UPDATE job_search_fts SET title = NEW.title
+            WHERE rowid IN (SELECT id FROM job_details WHERE job_id = NEW.job_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_fts_update AFTER UPDATE OF title ON jobs
+        BEGIN
+            UPDATE job_search_fts SET title = NEW.title
+            WHERE rowid IN (SELECT id FROM job_details WHERE job_id = NEW.job_id);
+        END
+        """
+    ]
+
+    # 全文索引回填（用于已有数据库首次建立索引）
+    FTS_REBUILD = """
+    INSERT INTO job_search_fts(rowid, job_id, title, description, requirements, keyword)
+    SELECT jd.id, jd.job_id, j.title, jd.description, jd.requirements, jd.keyword
+    FROM job_details jd
+    LEFT JOIN jobs j ON j.job_id = jd.job_id
+    """
+
+    # 市场统计快照表（日期 × 技能 × 城市 × 经验区间，'*' 表示该维度的汇总行）
+    MARKET_STATS_DAILY_TABLE = """
+    CREATE TABLE IF NOT EXISTS market_stats_daily (
+        stat_date DATE NOT NULL,
+        skill VARCHAR(50) NOT NULL,
+        city VARCHAR(20) NOT NULL,
+        experience_bucket VARCHAR(20) NOT NULL,
+        job_count INTEGER DEFAULT 0,
+        salary_count INTEGER DEFAULT 0,
+        salary_sum INTEGER DEFAULT 0,
+        salary_min INTEGER,
+        salary_max INTEGER,
+        salary_low INTEGER DEFAULT 0,
+        salary_medium INTEGER DEFAULT 0,
+        salary_high INTEGER DEFAULT 0,
+        salary_very_high INTEGER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (stat_date, skill, city, experience_bucket)
+    )
+    """
+
+    # 快照刷新状态表（记录已汇总到的 job_details.id 水位线；name 为 market_stats_daily:stale 的行是失效标记）
+    MARKET_SNAPSHOT_STATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS market_snapshot_state (
+        name VARCHAR(50) PRIMARY KEY,
+        last_detail_id INTEGER DEFAULT 0,
+        refreshed_at TIMESTAMP
+    )
+    """
+
+    MARKET_SNAPSHOT_INDEXES = [
+        "CREATE INDEX IF NOT EXISTS idx_market_stats_dims ON market_stats_daily(skill, city, experience_bucket, stat_date)"
+    ]
+
+    # 已汇总进快照（id 不超过水位线）的职位详情被修改或删除、所属职位被修改/软删除/删除，
+    # 或水位线之前因职位尚未写入而跳过的详情补上了职位时，写入失效标记，下次刷新自动重建
+    MARKET_SNAPSHOT_TRIGGERS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_market_snapshot_details_update
+        AFTER UPDATE OF job_id, salary, location, experience, keyword, description, requirements ON job_details
+        WHEN OLD.id <= (SELECT COALESCE(MAX(last_detail_id), 0) FROM market_snapshot_state WHERE name = 'market_stats_daily')
+        BEGIN
+            INSERT OR REPLACE INTO market_snapshot_state (name, last_detail_id, refreshed_at) VALUES ('market_stats_daily:stale', 0, CURRENT_TIMESTAMP);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_market_snapshot_details_delete AFTER DELETE ON job_details
+        WHEN OLD.id <= (SELECT COALESCE(MAX(last_detail_id), 0) FROM market_snapshot_state WHERE name = 'market_stats_daily')
+        BEGIN
+            INSERT OR REPLACE INTO market_snapshot_state (name, last_detail_id, refreshed_at) VALUES ('market_stats_daily:stale', 0, CURRENT_TIMESTAMP);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_market_snapshot_jobs_update
+        AFTER UPDATE OF title, created_at, is_deleted ON jobs
+        WHEN (OLD.title IS NOT NEW.title OR OLD.created_at IS NOT NEW.created_at OR OLD.is_deleted IS NOT NEW.is_deleted)
+            AND EXISTS (SELECT 1 FROM job_details WHERE job_id = NEW.job_id AND id <= (SELECT COALESCE(MAX(last_detail_id), 0) FROM market_snapshot_state WHERE name = 'market_stats_daily'))
+        BEGIN
+            INSERT OR REPLACE INTO market_snapshot_state (name, last_detail_id, refreshed_at) VALUES ('market_stats_daily:stale', 0, CURRENT_TIMESTAMP);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_market_snapshot_jobs_delete AFTER DELETE ON jobs
+        WHEN EXISTS (SELECT 1 FROM job_details WHERE job_id = OLD.job_id AND id <= (SELECT COALESCE(MAX(last_detail_id), 0) FROM market_snapshot_state WHERE name = 'market_stats_daily'))
+        BEGIN
+            INSERT OR REPLACE INTO market_snapshot_state (name, last_detail_id, refreshed_at) VALUES ('market_stats_daily:stale', 0, CURRENT_TIMESTAMP);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_market_snapshot_jobs_insert AFTER INSERT ON jobs
+        WHEN EXISTS (SELECT 1 FROM job_details WHERE job_id = NEW.job_id AND id <= (SELECT COALESCE(MAX(last_detail_id), 0) FROM market_snapshot_state WHERE name = 'market_stats_daily'))
+        BEGIN
+            INSERT OR REPLACE INTO market_snapshot_state (name, last_detail_id, refreshed_at) VALUES ('market_stats_daily:stale', 0, CURRENT_TIMESTAMP);
+        END
+        """
+    ]
+
+    # 增量匹配出队表（职位完成RAG处理后由触发器写入，匹配工作进程按自增ID顺序消费）
+    JOB_MATCH_OUTBOX_TABLE = """
+    CREATE TABLE IF NOT EXISTS job_match_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id VARCHAR(100) NOT NULL,
+        event VARCHAR(20) DEFAULT 'processed',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+
+    # 增量匹配状态表（记录已消费到的 job_match_outbox.id 水位线）
+    MATCH_OUTBOX_STATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS match_outbox_state (
+        name VARCHAR(50) PRIMARY KEY,
+        last_event_id INTEGER DEFAULT 0,
+        updated_at TIMESTAMP
+    )
+    """
+
+    # 参与增量匹配的简历档案（profile_data 为 GenericResumeProfile.to_dict() 的JSON）
+    MATCH_PROFILES_TABLE = """
+    CREATE TABLE IF NOT EXISTS match_profiles (
+        profile_id VARCHAR(100) PRIMARY KEY,
+        profile_data TEXT NOT NULL,
+        active BOOLEAN DEFAULT TRUE,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+
+    # RAG处理完成（生成了向量文档）时写入出队表，与 mark_job_as_processed 的更新在同一事务内
+    MATCH_OUTBOX_TRIGGERS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_match_outbox AFTER UPDATE OF rag_processed ON jobs
+        WHEN NEW.rag_processed = 1 AND NEW.vector_doc_count > 0
+        BEGIN
+            INSERT INTO job_match_outbox(job_id, event) VALUES (NEW.job_id, 'processed');
+        END
+        """
+    ]
+
+    # 职位匹配特征表（RAG导入时提取一次，skills 为JSON列表，education_level 为 不限0 ~ 博士5）
+    JOB_FEATURES_TABLE = """
+    CREATE TABLE IF NOT EXISTS job_features (
+        job_id VARCHAR(100) PRIMARY KEY,
+        skills TEXT,
+        required_years INTEGER,
+        salary_min INTEGER,
+        salary_max INTEGER,
+        industry TEXT,
+        education_level INTEGER,
+        version INTEGER DEFAULT 1,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+
+    # 匹配监控聚合计数（单行，由下方触发器随 jobs / resume_matches 的写入增量维护，监控检查只读这一行）
+    # scored_matches / score_sum 只统计 match_score > 0 的匹配，high_quality_matches 统计 match_score >= 0.7
+    MATCHING_STATS_TABLE = """
+    CREATE TABLE IF NOT EXISTS matching_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_jobs INTEGER DEFAULT 0,
+        total_matches INTEGER DEFAULT 0,
+        scored_matches INTEGER DEFAULT 0,
+        score_sum REAL DEFAULT 0,
+        high_quality_matches INTEGER DEFAULT 0,
+        updated_at TIMESTAMP
+    )
+    """
+
+    MATCHING_STATS_TRIGGERS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matching_stats_jobs_insert AFTER INSERT ON jobs BEGIN
+            UPDATE matching_stats SET total_jobs = total_jobs + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matching_stats_jobs_delete AFTER DELETE ON jobs BEGIN
+            UPDATE matching_stats SET total_jobs = total_jobs - 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matching_stats_matches_insert AFTER INSERT ON resume_matches BEGIN
+            UPDATE matching_stats SET
+                total_matches = total_matches + 1,
+                scored_matches = scored_matches + (NEW.match_score > 0),
+                score_sum = score_sum + CASE WHEN NEW.match_score > 0 THEN NEW.match_score ELSE 0 END,
+                high_quality_matches = high_quality_matches + (NEW.match_score >= 0.7),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matching_stats_matches_delete AFTER DELETE ON resume_matches BEGIN
+            UPDATE matching_stats SET
+                total_matches = total_matches - 1,
+                scored_matches = scored_matches - (OLD.match_score > 0),
+                score_sum = score_sum - CASE WHEN OLD.match_score > 0 THEN OLD.match_score ELSE 0 END,
+                high_quality_matches = high_quality_matches - (OLD.match_score >= 0.7),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matching_stats_matches_update AFTER UPDATE OF match_score ON resume_matches BEGIN
+            UPDATE matching_stats SET
+                scored_matches = scored_matches - (OLD.match_score > 0) + (NEW.match_score > 0),
+                score_sum = score_sum
+                    - CASE WHEN OLD.match_score > 0 THEN OLD.match_score ELSE 0 END
+                    + CASE WHEN NEW.match_score > 0 THEN NEW.match_score ELSE 0 END,
+                high_quality_matches = high_quality_matches - (OLD.match_score >= 0.7) + (NEW.match_score >= 0.7),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+        """
+    ]
+
+    # 未匹配职位的反连接：已处理职位走部分索引，逐个到 resume_matches(job_id) 索引中探测是否存在匹配
+    MATCHING_STATS_INDEXES = [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_rag_processed_job_id ON jobs(job_id) WHERE rag_processed = 1",
+        "CREATE INDEX IF NOT EXISTS idx_resume_matches_job_id ON resume_matches(job_id)"
+    ]
+
     # 日志表
     LOGS_TABLE = """
     CREATE TABLE IF NOT EXISTS logs (
@@ -183,6 +444,36 @@ class DatabaseSchema:
         """获取所有索引的创建语句"""
         return cls.INDEXES
 
+    @classmethod
+    def get_fulltext_statements(cls) -> list:
+        """获取全文索引表及同步触发器的创建语句"""
+        return [cls.JOB_SEARCH_FTS_TABLE] + cls.FTS_TRIGGERS
+
+    @classmethod
+    def get_market_snapshot_statements(cls) -> list:
+        """获取市场统计快照表、索引及失效触发器的创建语句"""
+        return ([cls.MARKET_STATS_DAILY_TABLE, cls.MARKET_SNAPSHOT_STATE_TABLE]
+                + cls.MARKET_SNAPSHOT_INDEXES + cls.MARKET_SNAPSHOT_TRIGGERS)
+
+    @classmethod
+    def get_match_outbox_statements(cls) -> list:
+        """获取增量匹配出队表、状态表、简历档案表及触发器的创建语句"""
+        return [
+            cls.JOB_MATCH_OUTBOX_TABLE,
+            cls.MATCH_OUTBOX_STATE_TABLE,
+            cls.MATCH_PROFILES_TABLE
+        ] + cls.MATCH_OUTBOX_TRIGGERS
+
+    @classmethod
+    def get_job_features_statements(cls) -> list:
+        """获取职位匹配特征表的创建语句"""
+        return [cls.JOB_FEATURES_TABLE]
+
+    @classmethod
+    def get_matching_stats_statements(cls) -> list:
+        """获取匹配监控聚合计数表、维护触发器及未匹配职位索引的创建语句"""
+        return [cls.MATCHING_STATS_TABLE] + cls.MATCHING_STATS_TRIGGERS + cls.MATCHING_STATS_INDEXES
+
 
 class ApplicationStatus:
     """投递状态常量"""
@@ -4,6 +4,7 @@
 提供数据库的CRUD操作和统计功能
 """
 
+import re
 import sqlite3
 import logging
 from pathlib import Path
@@ -28,6 +29,9 @@ class DatabaseManager:
         self.db_path = Path(db_path)
         self.logger = logging.getLogger(__name__)
         
+        # 全文索引可用状态（None表示尚未检查）
+        self._fulltext_available: Optional[bool] = None
+        
         # 确保数据库目录存在
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -63,10 +67,144 @@ class DatabaseManager:
                 
                 conn.commit()
                 self.logger.info("数据库初始化完成")
+            
+            self.ensure_fulltext_index()
                 
         except Exception as e:
             raise DatabaseError(f"数据库初始化失败: {e}")
     
+    def ensure_fulltext_index(self) -> bool:
+        """
+        确保职位全文索引（FTS5）及同步触发器存在
+        
+        首次创建时会从 job_details 回填已有数据。SQLite 不支持 FTS5 或
+        trigram 分词器时返回 False，调用方应回退到 LIKE 查询。
+        
+        Returns:
+            全文索引是否可用
+        """
+        if self._fulltext_available is not None:
+            return self._fulltext_available
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_details'"
+                )
+                if cursor.fetchone() is None:
+                    # 业务表尚未创建，暂不建立索引，下次再检查
+                    return False
+                
+                for statement in DatabaseSchema.get_fulltext_statements():
+                    cursor.execute(statement)
+                
+                cursor.execute("SELECT COUNT(*) FROM job_search_fts")
+                indexed = cursor.fetchone()[0]
+                if indexed == 0:
+                    cursor.execute(DatabaseSchema.FTS_REBUILD)
+                    if cursor.rowcount > 0:
+                        self.logger.info(f"全文索引回填完成: {cursor.rowcount} 条职位详情")
+                
+                conn.commit()
+                self._fulltext_available = True
+                
+        except Exception as e:
+            self.logger.warning(f"全文索引不可用，将回退到LIKE查询: {e}")
+            self._fulltext_available = False
+        
+        return self._fulltext_available
+    
+    @staticmethod
+    def build_fulltext_query(text: str, columns: Optional[List[str]] = None,
+                             phrase: bool = False) -> Optional[str]:
+        """
+        将自由文本转换为 FTS5 MATCH 表达式
+        
+        trigram 分词器要求每个词至少3个字符。
+        - 默认（检索打分用）：过短的词被忽略，其余词之间为OR关系
+        - phrase=True（过滤用）：整段文本作为一个短语，等价于原来的 LIKE 子串匹配；
+          任何一个词过短时返回 None，由调用方回退到 LIKE，而不是丢弃该词
+        若没有任何可用的词则返回 None。
+        
+        Args:
+            text: 查询文本，如 "Python 机器学习"
+            columns: 限定检索的列（None表示全部列）
+            phrase: 是否按整段短语匹配
+            
+        Returns:
+            MATCH 表达式或 None
+        """
+        if not text:
+            return None
+        
+        if phrase:
+            words = text.lower().split()
+            if not words or any(len(word) < 3 for word in words):
+                return None
+            expression = '"{}"'.format(' '.join(words).replace('"', '""'))
+        else:
+            terms = [term for term in re.findall(r'[\w.+#-]+', text.lower()) if len(term) >= 3]
+            if not terms:
+                return None
+            
+            # 去重并保持顺序，词之间为OR关系
+            unique_terms = list(dict.fromkeys(terms))
+            expression = ' OR '.join('"{}"'.format(term.replace('"', '""')) for term in unique_terms)
+        
+        if columns:
+            return f"{{{' '.join(columns)}}} : ({expression})"
+        return expression
+    
+    def search_jobs_fulltext(self, query: str, limit: int = 100,
+                             columns: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """
+        基于全文索引检索职位（BM25排序）
+        
+        Args:
+            query: 查询文本
+            limit: 返回数量上限
+            columns: 限定检索的列
+            
+        Returns:
+            [(job_id, lexical_score)] 列表，按相关性降序；
+            lexical_score 为归一化到 (0, 1] 的 BM25 分数
+        """
+        match_query = self.build_fulltext_query(query, columns)
+        if not match_query or not self.ensure_fulltext_index():
+            return []
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # bm25() 越小越相关；同一职位可能有多条详情，保留最优值
+                cursor.execute("""
+                    SELECT job_id, bm25(job_search_fts) AS rank
+                    FROM job_search_fts
+                    WHERE job_search_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                """, (match_query, limit * 2))
+                
+                rows = []
+                seen_job_ids = set()
+                for row in cursor.fetchall():
+                    if row['job_id'] not in seen_job_ids:
+                        seen_job_ids.add(row['job_id'])
+                        rows.append(row)
+                rows = rows[:limit]
+            
+            if not rows:
+                return []
+            
+            best_rank = abs(rows[0]['rank']) or 1.0
+            return [(row['job_id'], min(abs(row['rank']) / best_rank, 1.0)) for row in rows]
+            
+        except Exception as e:
+            self.logger.error(f"全文检索失败: {e}")
+            return []
+    
     def job_exists(self, job_id: str) -> bool:
         """
         检查职位是否已存在
@@ -111,11 +249,28 @@ class DatabaseManager:
                 if submitted_at and isinstance(submitted_at, (int, float)):
                     submitted_at = datetime.fromtimestamp(submitted_at).isoformat()
                 
-                # 插入或更新
+                # 指纹相同的其他职位视为重复，先删除（与原 INSERT OR REPLACE 的行为一致）
+                if job_data.get('job_fingerprint'):
+                    cursor.execute(
+                        "DELETE FROM jobs WHERE job_fingerprint = ? AND job_id != ?",
+                        (job_data['job_fingerprint'], job_data['job_id'])
+                    )
+                
+                # 插入或更新：用 ON CONFLICT DO UPDATE 代替 INSERT OR REPLACE，
+                # REPLACE 删除旧行时不触发 DELETE 触发器，会使 matching_stats 的职位计数重复累加。
+                # 重新保存的职位与原来一样重置RAG处理状态
                 sql = """
-                INSERT OR REPLACE INTO jobs
+                INSERT INTO jobs
                 (job_id, title, company, url, job_fingerprint, application_status, match_score, website, created_at, submitted_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    title = excluded.title, company = excluded.company, url = excluded.url,
+                    job_fingerprint = excluded.job_fingerprint, application_status = excluded.application_status,
+                    match_score = excluded.match_score, website = excluded.website,
+                    created_at = excluded.created_at, submitted_at = excluded.submitted_at,
+                    semantic_score = NULL, vector_id = NULL, structured_data = NULL,
+                    rag_processed = FALSE, rag_processed_at = NULL, vector_doc_count = 0,
+                    is_deleted = FALSE, deleted_at = NULL
                 """
                 
                 cursor.execute(sql, (
@@ -821,92 +976,11 @@ class DatabaseManager:
             成功保存的数量
         """
         success_count = 0
-        skipped_count = 0
         
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                now = datetime.now().isoformat()
-                
-                # 收集所有job_id和resume_profile_id
-                job_profile_pairs = [(match['job_id'], match.get('resume_profile_id', 'default')) for match in matches]
-                
-                # 检查哪些匹配记录已经被处理过（已投递）
-                processed_jobs = set()
-                if job_profile_pairs:
-                    # 逐个查询已处理的匹配记录（SQLite不支持元组IN查询）
-                    for job_id, profile_id in job_profile_pairs:
-                        cursor.execute("""
-                            SELECT job_id, resume_profile_id FROM resume_matches
-                            WHERE job_id = ? AND resume_profile_id = ? AND processed = 1
-                        """, (job_id, profile_id))
-                        
-                        result = cursor.fetchone()
-                        if result:
-                            processed_jobs.add((result['job_id'], result['resume_profile_id']))
-                    
-                    if processed_jobs:
-                        self.logger.info(f"发现 {len(processed_jobs)} 个已投递的职位，将跳过处理")
-                
-                # 分离需要处理和需要跳过的匹配记录
-                matches_to_process = []
-                for match_data in matches:
-                    job_id = match_data['job_id']
-                    profile_id = match_data.get('resume_profile_id', 'default')
-                    
-                    if (job_id, profile_id) in processed_jobs:
-                        skipped_count += 1
-                        self.logger.debug(f"跳过已投递职位的匹配记录: {job_id}")
-                    else:
-                        matches_to_process.append(match_data)
-                
-                # 对于未投递的职位，删除旧记录
-                if matches_to_process:
-                    unprocessed_pairs = [(match['job_id'], match.get('resume_profile_id', 'default'))
-                                       for match in matches_to_process]
-                    
-                    delete_sql = """
-                        DELETE FROM resume_matches
-                        WHERE job_id = ? AND resume_profile_id = ? AND (processed = 0 OR processed IS NULL)
-                    """
-                    deleted_count = 0
-                    for job_id, profile_id in unprocessed_pairs:
-                        cursor.execute(delete_sql, (job_id, profile_id))
-                        deleted_count += cursor.rowcount
-                    
-                    if deleted_count > 0:
-                        self.logger.info(f"删除了 {deleted_count} 条未投递职位的旧匹配记录")
-                
-                # 插入新记录（仅未投递的职位）
-                if matches_to_process:
-                    insert_sql = """
-                    INSERT INTO resume_matches
-                    (job_id, resume_profile_id, match_score, priority_level, semantic_score,
-                     skill_match_score, experience_match_score, location_match_score,
-                     salary_match_score, match_details, match_reasons, created_at, processed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                    """
-                    
-                    for match_data in matches_to_process:
-                        try:
-                            cursor.execute(insert_sql, (
-                                match_data['job_id'],
-                                match_data.get('resume_profile_id', 'default'),
-                                match_data['match_score'],
-                                match_data['priority_level'],
-                                match_data.get('semantic_score'),
-                                match_data.get('skill_match_score'),
-                                match_data.get('experience_match_score'),
-                                match_data.get('location_match_score'),
-                                match_data.get('salary_match_score'),
-                                match_data.get('match_details'),
-                                match_data.get('match_reasons'),
-                                now
-                            ))
-                            success_count += 1
-                        except Exception as e:
-                            self.logger.warning(f"保存单个匹配结果失败: {e}")
-                            continue
+                success_count, skipped_count = self.write_resume_matches(cursor, matches)
                 
                 conn.commit()
                 self.logger.info(f"批量保存简历匹配结果: {success_count} 新增, {skipped_count} 跳过 (已投递)")
@@ -916,6 +990,103 @@ class DatabaseManager:
         
         return success_count
     
+    def write_resume_matches(self, cursor, matches: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        在调用方的事务内写入简历匹配结果（不提交），规则同 batch_save_resume_matches
+        
+        Args:
+            cursor: 数据库游标
+            matches: 匹配结果列表
+            
+        Returns:
+            (新增数量, 跳过数量)
+        """
+        success_count = 0
+        skipped_count = 0
+        now = datetime.now().isoformat()
+        
+        # 收集所有job_id和resume_profile_id
+        job_profile_pairs = [(match['job_id'], match.get('resume_profile_id', 'default')) for match in matches]
+        
+        # 检查哪些匹配记录已经被处理过（已投递）
+        processed_jobs = set()
+        if job_profile_pairs:
+            # 逐个查询已处理的匹配记录（SQLite不支持元组IN查询）
+            for job_id, profile_id in job_profile_pairs:
+                cursor.execute("""
+                    SELECT job_id, resume_profile_id FROM resume_matches
+                    WHERE job_id = ? AND resume_profile_id = ? AND processed = 1
+                """, (job_id, profile_id))
+                
+                result = cursor.fetchone()
+                if result:
+                    processed_jobs.add((result['job_id'], result['resume_profile_id']))
+            
+            if processed_jobs:
+                self.logger.info(f"发现 {len(processed_jobs)} 个已投递的职位，将跳过处理")
+        
+        # 分离需要处理和需要跳过的匹配记录
+        matches_to_process = []
+        for match_data in matches:
+            job_id = match_data['job_id']
+            profile_id = match_data.get('resume_profile_id', 'default')
+            
+            if (job_id, profile_id) in processed_jobs:
+                skipped_count += 1
+                self.logger.debug(f"跳过已投递职位的匹配记录: {job_id}")
+            else:
+                matches_to_process.append(match_data)
+        
+        # 对于未投递的职位，删除旧记录
+        if matches_to_process:
+            unprocessed_pairs = [(match['job_id'], match.get('resume_profile_id', 'default'))
+                               for match in matches_to_process]
+            
+            delete_sql = """
+                DELETE FROM resume_matches
+                WHERE job_id = ? AND resume_profile_id = ? AND (processed = 0 OR processed IS NULL)
+            """
+            deleted_count = 0
+            for job_id, profile_id in unprocessed_pairs:
+                cursor.execute(delete_sql, (job_id, profile_id))
+                deleted_count += cursor.rowcount
+            
+            if deleted_count > 0:
+                self.logger.info(f"删除了 {deleted_count} 条未投递职位的旧匹配记录")
+        
+        # 插入新记录（仅未投递的职位）
+        if matches_to_process:
+            insert_sql = """
+            INSERT INTO resume_matches
+            (job_id, resume_profile_id, match_score, priority_level, semantic_score,
+             skill_match_score, experience_match_score, location_match_score,
+             salary_match_score, match_details, match_reasons, created_at, processed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """
+            
+            for match_data in matches_to_process:
+                try:
+                    cursor.execute(insert_sql, (
+                        match_data['job_id'],
+                        match_data.get('resume_profile_id', 'default'),
+                        match_data['match_score'],
+                        match_data['priority_level'],
+                        match_data.get('semantic_score'),
+                        match_data.get('skill_match_score'),
+                        match_data.get('experience_match_score'),
+                        match_data.get('location_match_score'),
+                        match_data.get('salary_match_score'),
+                        match_data.get('match_details'),
+                        match_data.get('match_reasons'),
+                        now
+                    ))
+                    success_count += 1
+                except Exception as e:
+                    self.logger.warning(f"保存单个匹配结果失败: {e}")
+                    continue
+        
+        return success_count, skipped_count
+    
     def get_resume_matches(self, job_id: str = None, resume_profile_id: str = None,
                           priority_level: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """
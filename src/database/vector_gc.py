@@ -0,0 +1,207 @@
+"""
+向量集合垃圾回收模块
+
+职位被软删除（jobs.is_deleted）、被 cleanup_old_records / cleanup_duplicate_jobs 清理，
+或挂起职位被 delete_suspended_job 删除后，其向量仍留在 ChromaDB 中，
+每次检索都要多取结果再按职位过滤。这里按批次流式比对 SQLite jobs 表与向量库的 job_id 元数据，
+批量删除孤儿向量并压实HNSW索引，同时报告回收的磁盘空间和回收前后的查询延迟。
+"""
+
+import os
+import time
+import logging
+from typing import Dict, Any, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 默认的延迟探测查询
+DEFAULT_LATENCY_QUERIES = ['Python开发工程师', '数据分析师', '前端开发 React', '机器学习算法工程师']
+
+
+def directory_size(path: str) -> int:
+    """统计目录占用的字节数"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class VectorGarbageCollector:
+    """向量集合垃圾回收器"""
+
+    def __init__(self, db_manager, vector_manager, config: Dict = None):
+        """
+        初始化垃圾回收器
+
+        Args:
+            db_manager: 数据库管理器（DatabaseManager）
+            vector_manager: 向量存储管理器（ChromaDBManager）
+            config: 配置字典（rag_system.vector_gc）
+        """
+        self.db_manager = db_manager
+        self.vector_manager = vector_manager
+        self.config = config or {}
+
+        self.batch_size = self.config.get('batch_size', 1000)
+        # 不属于 jobs 表的文档（如简历向量）不参与回收
+        self.protected_prefixes = tuple(self.config.get('protected_prefixes', ['resume_']))
+        self.latency_queries = self.config.get('latency_queries', DEFAULT_LATENCY_QUERIES)
+        self.latency_rounds = self.config.get('latency_rounds', 5)
+        self.latency_k = self.config.get('latency_k', 20)
+
+    def find_orphans(self) -> Dict[str, Any]:
+        """
+        流式扫描向量库，找出 jobs 表中已不存在或已软删除的职位的向量
+
+        Returns:
+            Dict: scanned、orphan_ids、orphan_doc_keys、orphan_jobs
+        """
+        collection = self.vector_manager.vectorstore._collection
+        total = collection.count()
+
+        live_cache: Dict[str, bool] = {}
+        orphan_ids: List[str] = []
+        orphan_doc_keys: List[str] = []
+        orphan_jobs = set()
+        scanned = 0
+
+        for offset in range(0, total, self.batch_size):
+            page = collection.get(include=['metadatas'], limit=self.batch_size, offset=offset)
+            ids = page.get('ids') or []
+            metadatas = page.get('metadatas') or [{}] * len(ids)
+            scanned += len(ids)
+
+            unknown = {
+                (metadata or {}).get('job_id') for metadata in metadatas
+            } - live_cache.keys() - {None, ''}
+            unknown = [job_id for job_id in unknown if not str(job_id).startswith(self.protected_prefixes)]
+            live_cache.update(self._lookup_live_jobs(unknown))
+
+            for vector_id, metadata in zip(ids, metadatas):
+                metadata = metadata or {}
+                job_id = metadata.get('job_id')
+                if not job_id or str(job_id).startswith(self.protected_prefixes):
+                    continue
+                if not live_cache.get(job_id, True):
+                    orphan_ids.append(vector_id)
+                    orphan_doc_keys.append(metadata.get('doc_id') or vector_id)
+                    orphan_jobs.add(job_id)
+
+        return {
+            'scanned': scanned,
+            'orphan_ids': orphan_ids,
+            'orphan_doc_keys': orphan_doc_keys,
+            'orphan_jobs': sorted(orphan_jobs)
+        }
+
+    def _lookup_live_jobs(self, job_ids: Iterable[str]) -> Dict[str, bool]:
+        """查询一批 job_id 是否仍为有效职位"""
+        job_ids = list(job_ids)
+        result = {job_id: False for job_id in job_ids}
+        if not job_ids:
+            return result
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            # SQLite 默认最多 999 个绑定参数
+            for start in range(0, len(job_ids), 900):
+                chunk = job_ids[start:start + 900]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT job_id FROM jobs
+                    WHERE job_id IN ({placeholders}) AND (is_deleted = 0 OR is_deleted IS NULL)
+                """, chunk)
+                for row in cursor.fetchall():
+                    result[row[0]] = True
+        return result
+
+    def measure_query_latency(self) -> Optional[Dict[str, float]]:
+        """
+        测量向量检索延迟（查询向量预先计算，只计索引检索耗时）
+
+        Returns:
+            Dict: avg_ms、p50_ms、max_ms、samples；嵌入模型不可用时返回 None
+        """
+        if not self.latency_queries or self.latency_rounds <= 0:
+            return None
+        try:
+            embeddings = self.vector_manager.embed_queries(list(self.latency_queries))
+        except Exception as e:
+            logger.warning(f"查询向量化失败，跳过延迟测量: {e}")
+            return None
+
+        samples = []
+        for _ in range(self.latency_rounds):
+            for embedding in embeddings:
+                start = time.perf_counter()
+                self.vector_manager.similarity_search_by_vector_with_score(embedding, k=self.latency_k)
+                samples.append((time.perf_counter() - start) * 1000)
+
+        samples.sort()
+        return {
+            'avg_ms': round(sum(samples) / len(samples), 3),
+            'p50_ms': round(samples[len(samples) // 2], 3),
+            'max_ms': round(samples[-1], 3),
+            'samples': len(samples)
+        }
+
+    def run(self, dry_run: bool = False, compact: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        执行垃圾回收
+
+        Args:
+            dry_run: 只统计不删除
+            compact: 删除后是否压实集合（默认取配置 compact，缺省为 True）
+
+        Returns:
+            Dict: 回收报告
+        """
+        if compact is None:
+            compact = self.config.get('compact', True)
+
+        started = time.perf_counter()
+        persist_directory = self.vector_manager.persist_directory
+        size_before = directory_size(persist_directory)
+        latency_before = self.measure_query_latency()
+
+        orphans = self.find_orphans()
+        orphan_ids = orphans['orphan_ids']
+        report = {
+            'dry_run': dry_run,
+            'scanned': orphans['scanned'],
+            'orphan_jobs': len(orphans['orphan_jobs']),
+            'orphan_vectors': len(orphan_ids),
+            'deleted_vectors': 0,
+            'compacted_documents': None,
+            'size_before_bytes': size_before,
+            'size_after_bytes': size_before,
+            'reclaimed_bytes': 0,
+            'latency_before': latency_before,
+            'latency_after': latency_before
+        }
+
+        if not dry_run:
+            for start in range(0, len(orphan_ids), self.batch_size):
+                batch_ids = orphan_ids[start:start + self.batch_size]
+                batch_keys = orphans['orphan_doc_keys'][start:start + self.batch_size]
+                if not self.vector_manager.delete_documents_by_ids(batch_ids, batch_keys):
+                    raise RuntimeError(f"批量删除孤儿向量失败（已删除 {report['deleted_vectors']} 个）")
+                report['deleted_vectors'] += len(batch_ids)
+
+            if compact and (orphan_ids or self.config.get('compact_always', False)):
+                report['compacted_documents'] = self.vector_manager.compact_collection(self.batch_size)
+
+            report['size_after_bytes'] = directory_size(persist_directory)
+            report['reclaimed_bytes'] = size_before - report['size_after_bytes']
+            report['latency_after'] = self.measure_query_latency()
+
+        report['duration_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"向量垃圾回收完成: 扫描 {report['scanned']} 个, 孤儿职位 {report['orphan_jobs']} 个, "
+            f"删除向量 {report['deleted_vectors']} 个, 回收 {report['reclaimed_bytes']} 字节"
+        )
+        return report
@@ -13,6 +13,7 @@ import os
 from pathlib import Path
 
 from ..rag.vector_manager import ChromaDBManager
+from ..rag.document_ids import compute_content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,9 @@ logger = logging.getLogger(__name__)
 class VectorDatabaseOperations:
     """向量数据库操作类"""
     
+    # 增量更新比对元数据时忽略的字段
+    VOLATILE_METADATA_KEYS = frozenset({'created_at', 'updated_at'})
+    
     def __init__(self, vector_manager: ChromaDBManager, config: Dict = None):
         """
         初始化向量数据库操作
@@ -161,27 +165,38 @@ class VectorDatabaseOperations:
                 'execution_time': execution_time
             }
     
+    @staticmethod
+    def _split_document(doc: Any) -> Tuple[str, Dict[str, Any]]:
+        """取出文档内容和元数据（兼容 Document 对象和字典）"""
+        if isinstance(doc, dict):
+            return doc.get('page_content', ''), doc.get('metadata', {})
+        return getattr(doc, 'page_content', ''), getattr(doc, 'metadata', {})
+    
     def _record_document_metadata(self, documents: List[Dict[str, Any]], 
-                                doc_ids: List[str], job_id: str):
-        """记录文档元数据"""
+                                doc_ids: List[str], job_id: str,
+                                doc_keys: Optional[List[str]] = None):
+        """
+        记录文档元数据
+        
+        doc_keys 为各文档在元数据库中的 doc_id（增量更新只写入部分文档时必须传入，
+        否则按文档在本次列表中的位置生成，会与其他文档的记录错位）
+        """
         
         with sqlite3.connect(self.metadata_db_path) as conn:
             cursor = conn.cursor()
             
             for i, (doc, doc_id) in enumerate(zip(documents, doc_ids)):
-                metadata = doc.get('metadata', {})
-                content = doc.get('page_content', '')
+                content, metadata = self._split_document(doc)
                 
                 # 计算内容哈希
-                import hashlib
-                content_hash = hashlib.md5(content.encode()).hexdigest()
+                content_hash = metadata.get('content_hash') or compute_content_hash(content)
                 
                 cursor.execute('''
                     INSERT OR REPLACE INTO vector_documents 
                     (doc_id, job_id, doc_type, content_hash, metadata_json, vector_id)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (
-                    metadata.get('doc_id', f'{job_id}_doc_{i}'),
+                    doc_keys[i] if doc_keys else metadata.get('doc_id', f'{job_id}_doc_{i}'),
                     job_id,
                     metadata.get('type', 'unknown'),
                     content_hash,
@@ -191,14 +206,81 @@ class VectorDatabaseOperations:
             
             conn.commit()
     
+    def _load_stored_documents(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        """读取职位当前有效文档的哈希和元数据，按doc_id索引"""
+        with sqlite3.connect(self.metadata_db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT doc_id, content_hash, metadata_json, vector_id
+                FROM vector_documents
+                WHERE job_id = ? AND is_active = TRUE
+            ''', (job_id,))
+            
+            stored = {}
+            for doc_id, content_hash, metadata_json, vector_id in cursor.fetchall():
+                try:
+                    metadata = json.loads(metadata_json) if metadata_json else {}
+                except (TypeError, ValueError):
+                    metadata = {}
+                stored[doc_id] = {
+                    'content_hash': content_hash,
+                    'metadata': metadata,
+                    'vector_id': vector_id
+                }
+            return stored
+    
+    def _diff_job_documents(self, job_id: str, new_documents: List[Any],
+                            stored: Dict[str, Dict[str, Any]]) -> Dict[str, List]:
+        """
+        比对新文档与已存储文档
+        
+        Returns:
+            Dict: changed（需重新嵌入，含新增）、metadata_only（仅元数据变化）、
+                  unchanged（无变化）、removed（已不存在的旧文档）
+        """
+        diff = {'changed': [], 'metadata_only': [], 'unchanged': [], 'removed': []}
+        seen = set()
+        
+        for i, doc in enumerate(new_documents):
+            content, metadata = self._split_document(doc)
+            doc_key = metadata.get('doc_id', f'{job_id}_doc_{i}')
+            seen.add(doc_key)
+            
+            content_hash = metadata.get('content_hash') or compute_content_hash(content)
+            metadata['content_hash'] = content_hash
+            
+            previous = stored.get(doc_key)
+            if previous is None or not previous['vector_id'] or previous['content_hash'] != content_hash:
+                diff['changed'].append((doc_key, doc, previous))
+                continue
+            
+            # 只比较业务字段，时间戳每次生成都不同
+            new_fields = self.vector_manager._filter_complex_metadata(metadata)
+            new_fields['job_id'] = job_id
+            old_fields = previous['metadata']
+            if any(new_fields.get(key) != old_fields.get(key)
+                   for key in set(new_fields) | set(old_fields)
+                   if key not in self.VOLATILE_METADATA_KEYS):
+                new_fields['created_at'] = old_fields.get('created_at', new_fields.get('created_at'))
+                diff['metadata_only'].append((doc_key, new_fields, previous))
+            else:
+                diff['unchanged'].append(doc_key)
+        
+        diff['removed'] = [(doc_key, previous) for doc_key, previous in stored.items() if doc_key not in seen]
+        return diff
+    
     def update_job_documents(self, job_id: str, 
                            new_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        更新职位文档
+        增量更新职位文档
+        
+        按内容哈希与已存储文档比对：只对内容变化或新增的文档重新嵌入并覆盖写入，
+        只删除已不存在的文档，仅元数据变化的文档直接更新元数据。
+        元数据库中没有该职位记录时退回整体删除后重建。
         
         Args:
             job_id: 职位ID
-            new_documents: 新文档列表
+            new_documents: 新文档列表（DocumentCreator.create_job_documents 的输出）
             
         Returns:
             Dict: 操作结果
@@ -206,23 +288,73 @@ class VectorDatabaseOperations:
         operation_start = datetime.now()
         
         try:
-            # 1. 删除旧文档
-            delete_result = self.delete_job_documents(job_id)
-            
-            if not delete_result['success']:
-                raise Exception(f"删除旧文档失败: {delete_result.get('error')}")
-            
-            # 2. 添加新文档
-            doc_ids = self.vector_manager.add_job_documents(new_documents, job_id)
-            
-            # 3. 更新元数据
-            self._record_document_metadata(new_documents, doc_ids, job_id)
+            stored = self._load_stored_documents(job_id)
+            if not stored:
+                return self._replace_job_documents(job_id, new_documents, operation_start)
+            
+            diff = self._diff_job_documents(job_id, new_documents, stored)
+            
+            # 1. 删除已不存在的文档
+            removed = diff['removed']
+            if removed:
+                if not self.vector_manager.delete_documents_by_ids(
+                    [previous['vector_id'] for _, previous in removed if previous['vector_id']],
+                    [doc_key for doc_key, _ in removed]
+                ):
+                    raise Exception("删除过期文档失败")
+                with sqlite3.connect(self.metadata_db_path) as conn:
+                    conn.executemany('''
+                        UPDATE vector_documents 
+                        SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
+                        WHERE doc_id = ?
+                    ''', [(doc_key,) for doc_key, _ in removed])
+                    conn.commit()
+            
+            # 2. 重新嵌入内容变化和新增的文档（确定性ID，按ID upsert），再删除被替换的旧版本向量
+            changed = diff['changed']
+            doc_ids = []
+            if changed:
+                changed_docs = [doc for _, doc, _ in changed]
+                doc_ids = self.vector_manager.add_job_documents(changed_docs, job_id)
+                
+                current_ids = set(doc_ids)
+                stale_ids = [previous['vector_id'] for _, _, previous in changed
+                             if previous and previous['vector_id'] and previous['vector_id'] not in current_ids]
+                # 旧版本与新版本共用词法索引标识，只从向量库删除
+                if stale_ids and not self.vector_manager.delete_documents_by_ids(stale_ids, doc_keys=[]):
+                    raise Exception("删除旧版本文档失败")
+                self._record_document_metadata(changed_docs, doc_ids, job_id,
+                                               doc_keys=[doc_key for doc_key, _, _ in changed])
+            
+            # 3. 仅元数据变化的文档直接更新元数据
+            metadata_only = diff['metadata_only']
+            for doc_key, metadata, previous in metadata_only:
+                if not self.vector_manager.update_document_metadata(previous['vector_id'], metadata):
+                    raise Exception(f"更新文档 {doc_key} 的元数据失败")
+            if metadata_only:
+                with sqlite3.connect(self.metadata_db_path) as conn:
+                    conn.executemany('''
+                        UPDATE vector_documents 
+                        SET metadata_json = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE doc_id = ?
+                    ''', [(json.dumps(metadata), doc_key) for doc_key, metadata, _ in metadata_only])
+                    conn.commit()
             
             execution_time = (datetime.now() - operation_start).total_seconds()
             
+            # 以需要嵌入的文档数估算相对整体重建的加速比
+            total = len(new_documents)
+            embedded = len(changed)
+            speedup = round(total / embedded, 2) if embedded else float(total or 1)
+            
             self._log_operation(
                 operation_type='update_job',
-                operation_details=f'Updated job {job_id} with {len(new_documents)} documents',
+                operation_details=(
+                    f'Incrementally updated job {job_id}: {total} documents, '
+                    f'{embedded} re-embedded, {len(metadata_only)} metadata-only, '
+                    f'{len(removed)} removed, {len(diff["unchanged"])} unchanged, '
+                    f'estimated speedup {speedup}x vs full rebuild'
+                ),
                 success=True,
                 execution_time=execution_time
             )
@@ -230,8 +362,13 @@ class VectorDatabaseOperations:
             return {
                 'success': True,
                 'job_id': job_id,
-                'updated_documents': len(new_documents),
+                'mode': 'incremental',
+                'updated_documents': embedded,
+                'metadata_updated_documents': len(metadata_only),
+                'removed_documents': len(removed),
+                'unchanged_documents': len(diff['unchanged']),
                 'document_ids': doc_ids,
+                'estimated_speedup': speedup,
                 'execution_time': execution_time
             }
             
@@ -253,6 +390,40 @@ class VectorDatabaseOperations:
                 'execution_time': execution_time
             }
     
+    def _replace_job_documents(self, job_id: str, new_documents: List[Any],
+                               operation_start: datetime) -> Dict[str, Any]:
+        """整体删除后重建职位文档"""
+        
+        # 1. 删除旧文档
+        delete_result = self.delete_job_documents(job_id)
+        
+        if not delete_result['success']:
+            raise Exception(f"删除旧文档失败: {delete_result.get('error')}")
+        
+        # 2. 添加新文档
+        doc_ids = self.vector_manager.add_job_documents(new_documents, job_id)
+        
+        # 3. 更新元数据
+        self._record_document_metadata(new_documents, doc_ids, job_id)
+        
+        execution_time = (datetime.now() - operation_start).total_seconds()
+        
+        self._log_operation(
+            operation_type='update_job',
+            operation_details=f'Updated job {job_id} with {len(new_documents)} documents (full rebuild)',
+            success=True,
+            execution_time=execution_time
+        )
+        
+        return {
+            'success': True,
+            'job_id': job_id,
+            'mode': 'full',
+            'updated_documents': len(new_documents),
+            'document_ids': doc_ids,
+            'execution_time': execution_time
+        }
+    
     def delete_job_documents(self, job_id: str) -> Dict[str, Any]:
         """
         删除职位文档
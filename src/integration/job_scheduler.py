@@ -13,8 +13,17 @@ from enum import Enum
 from collections import defaultdict
 import json
 
+from ..utils.metrics import default_registry
+
 logger = logging.getLogger(__name__)
 
+# 调度器指标（写入全局指标注册表，由 /metrics 端点导出）
+QUEUE_DEPTH = default_registry.gauge('job_scheduler_queue_depth', '各优先级队列中等待执行的任务数', ['priority'])
+RUNNING_TASKS = default_registry.gauge('job_scheduler_running_tasks', '正在执行的任务数')
+TASKS_SCHEDULED = default_registry.counter('job_scheduler_tasks_scheduled_total', '已调度的任务数', ['task_type'])
+TASKS_FINISHED = default_registry.counter('job_scheduler_tasks_total', '已结束的任务数', ['task_type', 'status'])
+TASK_DURATION = default_registry.histogram('job_scheduler_task_duration_seconds', '任务执行耗时（秒）', ['task_type'])
+
 class TaskStatus(Enum):
     """任务状态枚举"""
     PENDING = "pending"
@@ -157,11 +166,14 @@ class JobScheduler:
             raise ValueError(f"Task dependencies not met: {task.task_id}")
         
         # 添加到相应优先级队列
-        await self.task_queues[task.priority].put(task)
+        queue = self.task_queues[task.priority]
+        await queue.put(task)
         
         # 更新统计
         self.stats['total_tasks_scheduled'] += 1
         self.stats['queue_sizes'][task.priority.name] += 1
+        TASKS_SCHEDULED.inc(labels={'task_type': task.task_type})
+        QUEUE_DEPTH.set(queue.qsize(), {'priority': task.priority.name})
         
         logger.info(f"任务已调度: {task.task_id}, 优先级: {task.priority.name}")
         return task.task_id
@@ -310,6 +322,7 @@ class JobScheduler:
                 try:
                     task = await asyncio.wait_for(queue.get(), timeout=0.1)
                     self.stats['queue_sizes'][priority.name] -= 1
+                    QUEUE_DEPTH.set(queue.qsize(), {'priority': priority.name})
                     return task
                 except asyncio.TimeoutError:
                     continue
@@ -321,6 +334,7 @@ class JobScheduler:
         task.started_at = datetime.now()
         task.status = TaskStatus.RUNNING
         self.running_tasks[task.task_id] = task
+        RUNNING_TASKS.set(len(self.running_tasks))
         
         logger.info(f"开始执行任务: {task.task_id} (工作线程: {worker_name})")
         
@@ -348,9 +362,12 @@ class JobScheduler:
             # 移动到完成列表
             del self.running_tasks[task.task_id]
             self.completed_tasks[task.task_id] = task
+            RUNNING_TASKS.set(len(self.running_tasks))
             
             # 更新统计
             execution_time = (task.completed_at - task.started_at).total_seconds()
+            TASKS_FINISHED.inc(labels={'task_type': task.task_type, 'status': TaskStatus.COMPLETED.value})
+            TASK_DURATION.observe(execution_time, {'task_type': task.task_type})
             self.stats['total_tasks_completed'] += 1
             self.stats['total_execution_time'] += execution_time
             self.stats['average_task_time'] = (
@@ -376,9 +393,13 @@ class JobScheduler:
         if task.task_id in self.running_tasks:
             del self.running_tasks[task.task_id]
         self.failed_tasks[task.task_id] = task
+        RUNNING_TASKS.set(len(self.running_tasks))
         
         # 更新统计
         self.stats['total_tasks_failed'] += 1
+        TASKS_FINISHED.inc(labels={'task_type': task.task_type, 'status': TaskStatus.FAILED.value})
+        if task.started_at:
+            TASK_DURATION.observe((datetime.now() - task.started_at).total_seconds(), {'task_type': task.task_type})
         
         # 检查是否需要重试
         if task.retry_count < task.max_retries:
@@ -13,13 +13,23 @@ from dataclasses import dataclass
 from ..extraction.content_extractor import ContentExtractor
 from ..rag.rag_system_coordinator import RAGSystemCoordinator
 from ..matcher.generic_resume_matcher import GenericResumeJobMatcher
+from ..matcher.incremental_matching import IncrementalMatchingWorker, get_profile_id, match_result_to_record
 from .data_bridge import DataBridge
 from .job_scheduler import JobScheduler
 from .decision_engine import DecisionEngine
 from .submission_integration import SubmissionIntegration
+from ..utils.metrics import default_registry
 
 logger = logging.getLogger(__name__)
 
+# 流水线阶段指标（写入全局指标注册表，由 /metrics 端点导出）
+STAGE_DURATION = default_registry.histogram('pipeline_stage_duration_seconds', '流水线阶段耗时（秒）', ['stage'])
+STAGE_RUNS = default_registry.counter('pipeline_stage_runs_total', '流水线阶段执行次数', ['stage', 'status'])
+STAGE_ITEMS = default_registry.counter('pipeline_stage_items_total', '流水线阶段处理的条目数', ['stage'])
+STAGE_THROUGHPUT = default_registry.gauge(
+    'pipeline_stage_throughput_items_per_second', '最近一次阶段执行的吞吐量（条目/秒）', ['stage']
+)
+
 @dataclass
 class PipelineConfig:
     """流水线配置"""
@@ -69,6 +79,14 @@ class MasterController:
         matcher_config = self._get_consistent_matcher_config(config)
         self.resume_matcher = GenericResumeJobMatcher(vector_manager, matcher_config)
         
+        # 增量匹配：只对出队表中的新职位打分（首次运行某份简历时仍做全量匹配）
+        incremental_config = config.get('integration_system', {}).get('incremental_matching', {})
+        self.incremental_worker = None
+        if incremental_config.get('enabled', False):
+            self.incremental_worker = IncrementalMatchingWorker(
+                self.resume_matcher, self.rag_coordinator.db_reader, incremental_config
+            )
+        
         self.decision_engine = DecisionEngine(config)
         self.submission_integration = SubmissionIntegration(config)
         self.data_bridge = DataBridge(config)
@@ -321,7 +339,7 @@ class MasterController:
                     continue
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['extraction'] = stage_time
+            self._record_stage('extraction', stage_time, len(combined_results))
             
             result = {
                 'success': True,
@@ -336,6 +354,7 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"职位提取失败: {e}")
+            self._record_stage('extraction', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_extraction_result = result
             return result
@@ -398,7 +417,7 @@ class MasterController:
             )
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['rag_processing'] = stage_time
+            self._record_stage('rag_processing', stage_time, rag_result.get('total_imported', 0))
             
             result = {
                 'success': True,
@@ -413,6 +432,7 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"RAG处理失败: {e}")
+            self._record_stage('rag_processing', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_rag_result = result
             return result
@@ -439,7 +459,7 @@ class MasterController:
             )
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['rag_processing'] = stage_time
+            self._record_stage('rag_processing', stage_time, rag_result.get('total_imported', 0))
             
             result = {
                 'success': True,
@@ -454,6 +474,7 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"RAG处理失败: {e}")
+            self._record_stage('rag_processing', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_rag_result = result
             return result
@@ -471,18 +492,32 @@ class MasterController:
             else:
                 resume_profile_obj = resume_profile
             
-            # 执行简历匹配 - 使用更大的 top_k 值以匹配更多职位
-            # 与 batch_rematch_jobs.py 保持一致，处理所有可能的匹配
-            matching_result = await self.resume_matcher.find_matching_jobs(
-                resume_profile=resume_profile_obj,
-                top_k=1000  # 增加到1000，确保能处理所有职位
-            )
-            
-            # 保存匹配结果到数据库
-            saved_count = await self._save_matching_results_to_database(matching_result, resume_profile_obj)
+            # 简历已登记增量匹配时只对新职位打分
+            if self.incremental_worker and self.incremental_worker.is_registered(get_profile_id(resume_profile_obj)):
+                return await self._execute_incremental_matching(resume_profile_obj, stage_start)
+            
+            async def full_match():
+                # 执行简历匹配 - 使用更大的 top_k 值以匹配更多职位
+                # 与 batch_rematch_jobs.py 保持一致，处理所有可能的匹配
+                matching_result = await self.resume_matcher.find_matching_jobs(
+                    resume_profile=resume_profile_obj,
+                    top_k=1000  # 增加到1000，确保能处理所有职位
+                )
+                
+                # 保存匹配结果到数据库
+                saved_count = await self._save_matching_results_to_database(matching_result, resume_profile_obj)
+                return matching_result, saved_count
+            
+            if self.incremental_worker:
+                # 已登记的简历先消费完待处理事件，再全量匹配并登记新简历（不推进共用的水位线）
+                (matching_result, saved_count), _ = await self.incremental_worker.onboard_profile(
+                    resume_profile_obj, full_match
+                )
+            else:
+                matching_result, saved_count = await full_match()
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['matching'] = stage_time
+            self._record_stage('matching', stage_time, matching_result.matching_summary.total_matches)
             
             result = {
                 'success': True,
@@ -500,10 +535,33 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"简历匹配失败: {e}")
+            self._record_stage('matching', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_matching_result = result
             return result
     
+    async def _execute_incremental_matching(self, resume_profile, stage_start: float) -> Dict[str, Any]:
+        """增量匹配：消费出队表中的新职位，对全部启用的简历档案打分"""
+        # 更新档案内容（简历可能已修改），新内容只影响之后的新职位
+        self.incremental_worker.register_profile(resume_profile)
+        totals = await self.incremental_worker.run_pending()
+        
+        stage_time = time.time() - stage_start
+        self._record_stage('matching', stage_time, totals['saved'])
+        
+        result = {
+            'success': True,
+            'mode': 'incremental',
+            'new_jobs': totals['jobs'],
+            'total_matches': totals['saved'],
+            'matches': [],
+            'saved_to_database': totals['saved'],
+            'processing_time': stage_time
+        }
+        
+        self._last_matching_result = result
+        return result
+    
     async def _execute_resume_matching(self, rag_result: Dict[str, Any], resume_profile: Dict[str, Any]) -> Dict[str, Any]:
         """执行简历匹配阶段（保留原方法用于兼容性）"""
         stage_start = time.time()
@@ -524,7 +582,7 @@ class MasterController:
             )
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['matching'] = stage_time
+            self._record_stage('matching', stage_time, matching_result.matching_summary.total_matches)
             
             result = {
                 'success': True,
@@ -541,6 +599,7 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"简历匹配失败: {e}")
+            self._record_stage('matching', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_matching_result = result
             return result
@@ -554,34 +613,11 @@ class MasterController:
             db_manager = DatabaseManager(self.config.get('database_path', 'data/jobs.db'))
             
             # 准备匹配结果数据
-            match_records = []
-            resume_profile_id = getattr(resume_profile, 'profile_id', 'default')
-            
-            for match in matching_result.matches:
-                # 获取优先级，如果没有则根据分数计算
-                priority_level = getattr(match, 'priority_level', None)
-                if not priority_level:
-                    if match.overall_score >= 0.8:
-                        priority_level = 'high'
-                    elif match.overall_score >= 0.6:
-                        priority_level = 'medium'
-                    else:
-                        priority_level = 'low'
-                
-                match_data = {
-                    'job_id': match.job_id,
-                    'resume_profile_id': resume_profile_id,
-                    'match_score': match.overall_score,
-                    'priority_level': priority_level,
-                    'semantic_score': match.dimension_scores.get('semantic_similarity', 0) if hasattr(match, 'dimension_scores') else None,
-                    'skill_match_score': match.dimension_scores.get('skills_match', 0) if hasattr(match, 'dimension_scores') else None,
-                    'experience_match_score': match.dimension_scores.get('experience_match', 0) if hasattr(match, 'dimension_scores') else None,
-                    'location_match_score': match.dimension_scores.get('industry_match', 0) if hasattr(match, 'dimension_scores') else None,
-                    'salary_match_score': match.dimension_scores.get('salary_match', 0) if hasattr(match, 'dimension_scores') else None,
-                    'match_details': str(match.dimension_scores) if hasattr(match, 'dimension_scores') else '{}',
-                    'match_reasons': f"MasterController匹配: {match.job_title} at {match.company}" if hasattr(match, 'job_title') and hasattr(match, 'company') else f"职位ID: {match.job_id}"
-                }
-                match_records.append(match_data)
+            resume_profile_id = get_profile_id(resume_profile)
+            match_records = [
+                match_result_to_record(match, resume_profile_id, 'MasterController匹配')
+                for match in matching_result.matches
+            ]
             
             # 批量保存到数据库
             saved_count = db_manager.batch_save_resume_matches(match_records)
@@ -645,7 +681,7 @@ class MasterController:
             )
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['decision'] = stage_time
+            self._record_stage('decision', stage_time, decision_result.get('total_evaluated', 0))
             
             result = {
                 'success': True,
@@ -660,6 +696,7 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"智能决策失败: {e}")
+            self._record_stage('decision', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_decision_result = result
             return result
@@ -677,7 +714,7 @@ class MasterController:
             )
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['resume_submission'] = stage_time
+            self._record_stage('resume_submission', stage_time, submission_result.get('total_processed', 0))
             
             result = {
                 'success': submission_result.get('success', False),
@@ -696,6 +733,7 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"简历投递失败: {e}")
+            self._record_stage('resume_submission', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_submission_result = result
             return result
@@ -712,7 +750,7 @@ class MasterController:
             )
             
             stage_time = time.time() - stage_start
-            self.execution_stats['stage_timings']['submission'] = stage_time
+            self._record_stage('submission', stage_time, submission_result.get('total_attempts', 0))
             
             result = {
                 'success': True,
@@ -728,10 +766,21 @@ class MasterController:
             
         except Exception as e:
             logger.error(f"自动投递失败: {e}")
+            self._record_stage('submission', time.time() - stage_start, success=False)
             result = {'success': False, 'error': str(e)}
             self._last_submission_result = result
             return result
     
+    def _record_stage(self, stage: str, stage_time: float, items: int = 0, success: bool = True):
+        """记录阶段耗时和吞吐量指标，成功时同时更新 stage_timings"""
+        if success:
+            self.execution_stats['stage_timings'][stage] = stage_time
+            STAGE_ITEMS.inc(items, {'stage': stage})
+            STAGE_THROUGHPUT.set(items / stage_time if stage_time > 0 else 0, {'stage': stage})
+        
+        STAGE_DURATION.observe(stage_time, {'stage': stage})
+        STAGE_RUNS.inc(labels={'stage': stage, 'status': 'success' if success else 'failed'})
+    
     def get_current_status(self) -> Dict[str, Any]:
         """获取当前执行状态"""
         return {
@@ -14,6 +14,8 @@ from enum import Enum
 from collections import defaultdict, deque
 from pathlib import Path
 
+from ..utils.metrics import MetricsRegistry, MetricsHTTPServer, default_registry
+
 logger = logging.getLogger(__name__)
 
 class MetricType(Enum):
@@ -66,15 +68,30 @@ class PerformanceReport:
     generated_at: datetime
 
 class MetricsCollector:
-    """指标收集器"""
+    """
+    指标收集器
     
-    def __init__(self, config: Dict[str, Any]):
+    计数器、仪表盘和计时器写入指标注册表（src/utils/metrics.py，默认为全局注册表，
+    MasterController / JobScheduler / ResumeSubmissionEngine 的阶段指标也写入其中），
+    可通过 start_http_server() 以 OpenMetrics 格式在本机 /metrics 暴露。
+    同时保留最近 metric_history_size 条记录，用于告警检查和按时间窗口的报告摘要。
+    """
+    
+    def __init__(self, config: Dict[str, Any], registry: Optional[MetricsRegistry] = None):
         self.config = config
         self.monitoring_config = config.get('monitoring', {})
         
         # 指标存储
-        self.metrics = defaultdict(deque)
+        self.registry = registry or default_registry
         self.metric_history_size = self.monitoring_config.get('metric_history_size', 1000)
+        self.metrics = defaultdict(lambda: deque(maxlen=self.metric_history_size))
+        
+        # /metrics 抓取端点
+        endpoint_config = self.monitoring_config.get('metrics_endpoint', {})
+        self.endpoint_enabled = endpoint_config.get('enabled', False)
+        self.endpoint_host = endpoint_config.get('host', '127.0.0.1')
+        self.endpoint_port = endpoint_config.get('port', 9108)
+        self.http_server: Optional[MetricsHTTPServer] = None
         
         # 系统指标
         self.system_metrics = {}
@@ -101,6 +118,9 @@ class MetricsCollector:
         self.is_collecting = True
         self.stats['collection_start_time'] = datetime.now()
         
+        if self.endpoint_enabled:
+            self.start_http_server()
+        
         # 启动收集任务
         self.collection_task = asyncio.create_task(self._collection_loop())
         logger.info("指标收集已启动")
@@ -119,8 +139,30 @@ class MetricsCollector:
             except asyncio.CancelledError:
                 pass
         
+        self.stop_http_server()
         logger.info("指标收集已停止")
     
+    def start_http_server(self, host: str = None, port: int = None) -> MetricsHTTPServer:
+        """启动本机 /metrics 抓取端点（port=0 时自动分配端口）"""
+        if self.http_server is None:
+            self.http_server = MetricsHTTPServer(
+                self.registry,
+                host or self.endpoint_host,
+                self.endpoint_port if port is None else port
+            )
+            self.http_server.start()
+        return self.http_server
+    
+    def stop_http_server(self):
+        """停止 /metrics 抓取端点"""
+        if self.http_server:
+            self.http_server.stop()
+            self.http_server = None
+    
+    def render_metrics(self) -> str:
+        """以 OpenMetrics 文本格式导出当前指标"""
+        return self.registry.render()
+    
     def record_metric(self, name: str, value: float, metric_type: MetricType = MetricType.GAUGE,
                      labels: Dict[str, str] = None, description: str = ""):
         """记录指标"""
@@ -133,12 +175,20 @@ class MetricsCollector:
             description=description
         )
         
-        # 添加到历史记录
+        # 添加到历史记录（deque 的 maxlen 限制历史记录大小）
         self.metrics[name].append(metric)
         
-        # 限制历史记录大小
-        if len(self.metrics[name]) > self.metric_history_size:
-            self.metrics[name].popleft()
+        # 写入指标注册表
+        labelnames = sorted(metric.labels)
+        try:
+            if metric_type == MetricType.COUNTER:
+                self.registry.counter(name, description, labelnames).inc(value, metric.labels)
+            elif metric_type == MetricType.GAUGE:
+                self.registry.gauge(name, description, labelnames).set(value, metric.labels)
+            else:
+                self.registry.histogram(name, description, labelnames).observe(value, metric.labels)
+        except ValueError as e:
+            logger.warning(f"指标写入注册表失败: {e}")
         
         self.stats['total_metrics_collected'] += 1
         self.stats['last_collection_time'] = datetime.now()
@@ -152,7 +202,7 @@ class MetricsCollector:
         self.record_metric(name, value, MetricType.GAUGE, labels)
     
     def record_timer(self, name: str, duration: float, labels: Dict[str, str] = None):
-        """记录计时器"""
+        """记录计时器（秒），在注册表中以直方图聚合"""
         self.record_metric(name, duration, MetricType.TIMER, labels)
     
     def get_metric_history(self, name: str, limit: int = 100) -> List[Metric]:
@@ -213,30 +263,57 @@ class MetricsCollector:
     async def _collect_system_metrics(self):
         """收集系统指标"""
         try:
-            # 简化的系统指标收集
-            import os
             import threading
             
-            # 进程数量
+            # 线程数量
             self.set_gauge('system_process_count', len(threading.enumerate()))
             
             # 当前时间戳
             self.set_gauge('system_timestamp', time.time())
             
-            # 内存使用（简化版）
-            try:
-                import psutil
-                memory = psutil.virtual_memory()
-                self.set_gauge('system_memory_usage', memory.percent / 100)
-                cpu_percent = psutil.cpu_percent(interval=0.1)
-                self.set_gauge('system_cpu_usage', cpu_percent / 100)
-            except ImportError:
-                # 如果没有psutil，使用简化指标
-                self.set_gauge('system_memory_usage', 0.5)  # 默认值
-                self.set_gauge('system_cpu_usage', 0.3)     # 默认值
+            # 内存和CPU使用率：无法获取时不写入，避免用假数据触发或掩盖告警
+            memory_usage, cpu_usage = self._read_system_usage()
+            if memory_usage is not None:
+                self.set_gauge('system_memory_usage', memory_usage)
+            if cpu_usage is not None:
+                self.set_gauge('system_cpu_usage', cpu_usage)
             
         except Exception as e:
             logger.error(f"收集系统指标失败: {e}")
+    
+    def _read_system_usage(self) -> tuple:
+        """
+        读取系统内存和CPU使用率（0-1）
+        
+        优先使用 psutil（cpu_percent 使用非阻塞模式，返回与上次调用之间的平均值）；
+        未安装时内存读取 /proc/meminfo，CPU 使用1分钟负载除以核数估算；都不可用时返回 None。
+        """
+        try:
+            import psutil
+            return psutil.virtual_memory().percent / 100, psutil.cpu_percent(interval=None) / 100
+        except ImportError:
+            pass
+        
+        import os
+        
+        memory_usage = None
+        try:
+            meminfo = {}
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    key, _, rest = line.partition(':')
+                    meminfo[key] = int(rest.split()[0])
+            memory_usage = 1 - meminfo['MemAvailable'] / meminfo['MemTotal']
+        except (OSError, KeyError, ValueError, IndexError, ZeroDivisionError):
+            pass
+        
+        cpu_usage = None
+        try:
+            cpu_usage = min(os.getloadavg()[0] / (os.cpu_count() or 1), 1.0)
+        except (OSError, AttributeError):
+            pass
+        
+        return memory_usage, cpu_usage
 
 
 class AlertManager:
@@ -21,9 +21,26 @@ from .generic_resume_models import (
     MATCH_THRESHOLDS
 )
 
-from .generic_resume_vectorizer import GenericResumeVectorizer
-from .multi_dimensional_scorer import MultiDimensionalScorer
-from .generic_resume_matcher import GenericResumeJobMatcher
+import importlib
+
+# 数据模型只依赖标准库，直接导入；核心组件依赖LangChain和向量库，按需导入
+_LAZY_EXPORTS = {
+    'GenericResumeVectorizer': '.generic_resume_vectorizer',
+    'MultiDimensionalScorer': '.multi_dimensional_scorer',
+    'GenericResumeJobMatcher': '.generic_resume_matcher',
+    'MatchBatch': '.match_batch',
+    'MatchTrace': '.match_trace',
+    'SkillEmbeddingTable': '.skill_embeddings',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     # 数据模型
@@ -41,6 +58,9 @@ __all__ = [
     'GenericResumeVectorizer',
     'MultiDimensionalScorer',
     'GenericResumeJobMatcher',
+    'MatchBatch',
+    'MatchTrace',
+    'SkillEmbeddingTable',
     
     # 工具函数
     'get_match_level_from_score',
@@ -5,14 +5,25 @@
 """
 
 import asyncio
+import logging
+import os
 import time
+from contextlib import nullcontext
 from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
 from langchain.schema import Document
 
 from ..rag.semantic_search import SemanticSearchEngine
 from ..rag.vector_manager import ChromaDBManager
+from ..rag.job_features import SKILL_KEYWORDS, JobFeatures, collect_job_features, parse_skill_list
 from ..utils.logger import get_logger
+from .generic_resume_vectorizer import GenericResumeVectorizer
+from .topk import BoundedTopK
+from .match_batch import MatchBatch
+from .match_trace import (
+    MatchTrace, OUTCOME_BELOW_THRESHOLD, OUTCOME_FAILED, OUTCOME_MATCHED, OUTCOME_PRUNED,
+    active_trace, reset_active_trace, set_active_trace
+)
 from .generic_resume_models import (
     GenericResumeProfile, DynamicSkillWeights, MatchLevel, RecommendationPriority,
     create_default_skill_weights, JobMatchResult, ResumeMatchingResult,
@@ -20,6 +31,10 @@ from .generic_resume_models import (
 )
 
 
+# 延迟加载属性的未加载标记（加载失败或未启用时为None）
+_NOT_LOADED = object()
+
+
 class GenericResumeJobMatcher:
     """通用简历职位匹配引擎"""
     
@@ -32,6 +47,8 @@ class GenericResumeJobMatcher:
         
         # 初始化组件
         self.search_engine = SemanticSearchEngine(vector_manager, config)
+        self._resume_vectorizer: Optional[GenericResumeVectorizer] = None
+        self._job_feature_store = None
         
         # 匹配参数配置 - 提高阈值降低匹配率，确保质量
         self.default_search_k = config.get('default_search_k', 80)  # 增加搜索范围
@@ -46,6 +63,17 @@ class GenericResumeJobMatcher:
         if config:
             self.skill_weights.update_from_config(config)
         
+        # 技能嵌入表：向量化的技能等价判断（首次使用时加载）
+        self.skill_embedding_config = (self.config.get('resume_matching_advanced') or {}).get('skill_embeddings') \
+            or self.config.get('skill_embeddings', {})
+        self.skill_similarity_threshold = self.skill_embedding_config.get('threshold', 0.82)
+        self.skill_rule_fallback = self.skill_embedding_config.get('rule_fallback', True)
+        self._skill_embedding_table = _NOT_LOADED
+        
+        # explain 模式：每次匹配自动记录按列追踪（也可以调用时传入 MatchTrace）
+        self.trace_enabled = self.config.get('match_trace', {}).get('enabled', False)
+        self.last_trace: Optional[MatchTrace] = None
+        
         # 性能监控
         self.performance_stats = {
             'total_matches': 0,
@@ -134,9 +162,22 @@ class GenericResumeJobMatcher:
     async def find_matching_jobs(self,
                                 resume_profile: GenericResumeProfile,
                                 filters: Dict[str, Any] = None,
-                                top_k: int = 20) -> ResumeMatchingResult:
-        """为任意用户查找匹配的职位"""
+                                top_k: int = 20,
+                                trace: Optional[MatchTrace] = None) -> ResumeMatchingResult:
+        """
+        为任意用户查找匹配的职位
+        
+        传入 MatchTrace（或配置 match_trace.enabled）时进入 explain 模式：按阶段计时，
+        并逐个记录候选职位的维度分数、分数上界和去向，追踪对象保存在 self.last_trace
+        """
         start_time = time.time()
+        if trace is None and self.trace_enabled:
+            trace = MatchTrace()
+        if trace is not None:
+            trace.resume_name = resume_profile.name
+            self.last_trace = trace
+            trace_token = set_active_trace(trace)
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         
         try:
             self.logger.info(f"🔍 开始为 {resume_profile.name} 查找匹配职位，目标数量: {top_k}")
@@ -144,53 +185,116 @@ class GenericResumeJobMatcher:
             
             # 1. 构建个性化查询
             query = self._build_personalized_query(resume_profile)
-            self.logger.debug(f"🔤 构建查询: {query[:100]}...")
+            if debug:
+                self.logger.debug(f"🔤 构建查询: {query[:100]}...")
+            if trace is not None:
+                trace.query = query
             
             # 2. 执行语义搜索
             search_k = min(self.default_search_k, top_k * 3)
             self.logger.info(f"🔍 执行语义搜索，搜索范围: {search_k}")
-            search_results = await self._execute_semantic_search(
-                query, filters, k=search_k
-            )
+            with self._trace_phase(trace, 'search'):
+                search_results = await self._execute_semantic_search(
+                    query, filters, k=search_k, resume_profile=resume_profile
+                )
             
             self.logger.info(f"📄 语义搜索返回 {len(search_results)} 个候选文档")
             
             # 3. 按职位ID分组文档
-            jobs_by_id = self._group_results_by_job(search_results)
+            with self._trace_phase(trace, 'grouping'):
+                jobs_by_id = self._group_results_by_job(search_results)
             self.logger.info(f"📋 分组后得到 {len(jobs_by_id)} 个候选职位")
+            with self._trace_phase(trace, 'features'):
+                job_features = self._load_job_features(jobs_by_id)
             
-            # 4. 计算匹配分数
-            matching_jobs = []
+            # 4. 计算匹配分数：先算廉价维度得到分数上界，按上界降序精确打分，
+            #    有界堆只保留前 top_k，上界进不了前 top_k 的候选直接跳过
+            candidates = []
             failed_matches = 0
+            partial_ns: Dict[int, int] = {}
+            for order, (job_id, job_docs) in enumerate(jobs_by_id.items()):
+                if trace is not None:
+                    job_started = time.perf_counter_ns()
+                try:
+                    job_metadata = self._extract_job_metadata(job_docs, job_id, job_features.get(job_id))
+                    partial_scores = self._calculate_partial_scores(resume_profile, job_docs, job_metadata)
+                    candidates.append((self._score_upper_bound(partial_scores), order, job_id,
+                                       job_docs, job_metadata, partial_scores))
+                except Exception as e:
+                    failed_matches += 1
+                    self.logger.warning(f"❌ 计算职位 {job_id} 匹配度失败: {str(e)}")
+                    if trace is not None:
+                        trace.record(job_id, OUTCOME_FAILED)
+                if trace is not None:
+                    partial_ns[order] = time.perf_counter_ns() - job_started
+                    trace.add_phase_ns('partial_scoring', partial_ns[order])
+            candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+            
+            top_heap = BoundedTopK(top_k)
+            successful_matches = 0
             below_threshold = 0
-            
-            for job_id, job_docs in jobs_by_id.items():
+            pruned_candidates = 0
+            for index, (upper_bound, order, job_id, job_docs, job_metadata, partial_scores) in enumerate(candidates):
+                if upper_bound < self.min_score_threshold:
+                    below_threshold += len(candidates) - index
+                    if trace is not None:
+                        self._trace_skipped(trace, candidates[index:], OUTCOME_BELOW_THRESHOLD, partial_ns)
+                    break
+                if upper_bound < top_heap.threshold:
+                    pruned_candidates += len(candidates) - index
+                    if trace is not None:
+                        self._trace_skipped(trace, candidates[index:], OUTCOME_PRUNED, partial_ns)
+                    break
+                if not top_heap.can_enter(upper_bound, order):
+                    pruned_candidates += 1
+                    if trace is not None:
+                        self._trace_skipped(trace, candidates[index:index + 1], OUTCOME_PRUNED, partial_ns)
+                    continue
+                
+                if trace is not None:
+                    skills_started = time.perf_counter_ns()
                 try:
-                    match_result = await self._calculate_match_score(
-                        resume_profile, job_docs, job_id
+                    dimension_scores = self._complete_dimension_scores(
+                        resume_profile, job_docs, job_metadata, partial_scores
                     )
-                    
-                    if match_result:
-                        if match_result.overall_score >= self.min_score_threshold:
-                            matching_jobs.append(match_result)
-                            self.logger.debug(f"✅ 职位 {job_id} 匹配成功，分数: {match_result.overall_score:.3f}")
-                        else:
-                            below_threshold += 1
-                            self.logger.debug(f"⚠️ 职位 {job_id} 分数过低: {match_result.overall_score:.3f} < {self.min_score_threshold}")
-                    else:
-                        failed_matches += 1
-                        
+                    overall_score = self._calculate_weighted_score(dimension_scores)
                 except Exception as e:
                     failed_matches += 1
                     self.logger.warning(f"❌ 计算职位 {job_id} 匹配度失败: {str(e)}")
+                    if trace is not None:
+                        self._trace_skipped(trace, candidates[index:index + 1], OUTCOME_FAILED, partial_ns)
                     continue
+                
+                matched = overall_score >= self.min_score_threshold
+                if trace is not None:
+                    skills_ns = time.perf_counter_ns() - skills_started
+                    trace.add_phase_ns('skills_scoring', skills_ns)
+                    trace.record(job_id, OUTCOME_MATCHED if matched else OUTCOME_BELOW_THRESHOLD, upper_bound,
+                                 overall_score, dimension_scores, partial_ns.get(order, 0) + skills_ns)
+                
+                if matched:
+                    successful_matches += 1
+                    top_heap.push(overall_score, order, (job_docs, job_metadata, dimension_scores))
+                    if debug:
+                        self.logger.debug(f"✅ 职位 {job_id} 匹配成功，分数: {overall_score:.3f}")
+                else:
+                    below_threshold += 1
+                    if debug:
+                        self.logger.debug(f"⚠️ 职位 {job_id} 分数过低: {overall_score:.3f} < {self.min_score_threshold}")
             
             # 记录匹配统计
-            self.logger.info(f"📊 匹配统计: 成功{len(matching_jobs)}, 低分{below_threshold}, 失败{failed_matches}")
-            
-            # 5. 排序和筛选结果
-            matching_jobs.sort(key=lambda x: x.overall_score, reverse=True)
-            top_matches = matching_jobs[:top_k]
+            self.logger.info(f"📊 匹配统计: 成功{successful_matches}, 低分{below_threshold}, "
+                             f"失败{failed_matches}, 提前跳过{pruned_candidates}")
+            
+            # 5. 只为最终的前 top_k 生成匹配分析和结果对象
+            top_matches = []
+            with self._trace_phase(trace, 'analysis'):
+                for overall_score, (job_docs, job_metadata, dimension_scores) in top_heap.items():
+                    match_result = self._build_match_result(
+                        resume_profile, job_docs, job_metadata, dimension_scores, overall_score
+                    )
+                    if match_result:
+                        top_matches.append(match_result)
             
             if top_matches:
                 best_score = top_matches[0].overall_score
@@ -202,22 +306,31 @@ class GenericResumeJobMatcher:
             summary = self._generate_matching_summary(top_matches, processing_time)
             insights = self._generate_career_insights(top_matches, resume_profile)
             
+            query_metadata = {
+                'query': query,
+                'filters': filters,
+                'search_results_count': len(search_results),
+                'candidate_jobs_count': len(jobs_by_id),
+                # 完成评分且达到阈值的职位数；分数上界无法进入前 top_k 而未评分的候选单独计入 pruned_candidates
+                'successful_matches': successful_matches,
+                'failed_matches': failed_matches,
+                'below_threshold': below_threshold,
+                'pruned_candidates': pruned_candidates,
+                'processing_time': processing_time
+            }
+            if trace is not None:
+                trace.mark_selected(match.job_id for match in top_matches)
+                trace.count('search_results', len(search_results))
+                trace.count('candidate_jobs', len(jobs_by_id))
+                query_metadata['trace'] = trace.summary()
+            
             # 7. 创建完整结果
             result = ResumeMatchingResult(
                 matching_summary=summary,
                 matches=top_matches,
                 career_insights=insights,
                 resume_profile=resume_profile,
-                query_metadata={
-                    'query': query,
-                    'filters': filters,
-                    'search_results_count': len(search_results),
-                    'candidate_jobs_count': len(jobs_by_id),
-                    'successful_matches': len(matching_jobs),
-                    'failed_matches': failed_matches,
-                    'below_threshold': below_threshold,
-                    'processing_time': processing_time
-                }
+                query_metadata=query_metadata
             )
             
             # 更新性能统计
@@ -225,20 +338,118 @@ class GenericResumeJobMatcher:
             
             self.logger.info(f"✅ 匹配完成，返回 {len(top_matches)} 个职位，耗时 {processing_time:.2f}秒")
             
-            # 记录匹配率警告
+            # 记录匹配率警告（只统计完成评分且达到阈值的职位，提前跳过的候选未评分，不计入）
             if len(jobs_by_id) > 0:
-                match_rate = len(matching_jobs) / len(jobs_by_id)
+                match_rate = successful_matches / len(jobs_by_id)
+                pruned_note = f"，{pruned_candidates} 个候选提前跳过未评分" if pruned_candidates else ""
                 if match_rate < 0.2:
-                    self.logger.warning(f"⚠️ 匹配率过低: {match_rate:.1%} ({len(matching_jobs)}/{len(jobs_by_id)})")
+                    self.logger.warning(f"⚠️ 匹配率过低: {match_rate:.1%} ({successful_matches}/{len(jobs_by_id)}){pruned_note}")
                 else:
-                    self.logger.info(f"📈 匹配率: {match_rate:.1%} ({len(matching_jobs)}/{len(jobs_by_id)})")
+                    self.logger.info(f"📈 匹配率: {match_rate:.1%} ({successful_matches}/{len(jobs_by_id)}){pruned_note}")
             
             return result
             
         except Exception as e:
             self.logger.error(f"💥 职位匹配失败: {str(e)}")
             raise
+        finally:
+            if trace is not None:
+                reset_active_trace(trace_token)
+    
+    @staticmethod
+    def _trace_phase(trace: Optional[MatchTrace], name: str):
+        """阶段计时（未追踪时为空上下文）"""
+        return trace.phase(name) if trace is not None else nullcontext()
+    
+    @staticmethod
+    def _trace_skipped(trace: MatchTrace, candidates: List[Tuple], outcome: str, partial_ns: Dict[int, int]) -> None:
+        """记录未做技能匹配的候选（只有廉价维度分数和分数上界）"""
+        for upper_bound, order, job_id, _, _, partial_scores in candidates:
+            trace.record(job_id, outcome, upper_bound, dimension_scores=partial_scores,
+                         score_ns=partial_ns.get(order, 0))
     
+    async def score_jobs(self,
+                         resume_profile: GenericResumeProfile,
+                         job_ids: List[str],
+                         docs_per_job: int = 10) -> List[JobMatchResult]:
+        """
+        只对指定职位打分（增量匹配使用）
+
+        语义检索限定在这些职位的文档内，评分规则与 find_matching_jobs 相同，
+        返回达到最低阈值的结果（按分数降序）。
+        """
+        batch = await self.score_jobs_batch(resume_profile, job_ids, docs_per_job)
+        matching_jobs = [match for match in batch if match is not None]
+        self.logger.info(f"📌 增量打分: {len(job_ids)} 个职位, {len(matching_jobs)} 个达到阈值")
+        return matching_jobs
+
+    async def score_jobs_batch(self,
+                               resume_profile: GenericResumeProfile,
+                               job_ids: List[str],
+                               docs_per_job: int = 10) -> MatchBatch:
+        """
+        只对指定职位打分，结果按列存入 MatchBatch
+
+        只保留达到最低阈值的职位（按分数降序），匹配分析在访问某一行时才生成，
+        只需要分数的调用方（批量重匹配写库）可以直接读取列数据。
+        整批检索共享 len(job_ids) * docs_per_job 的结果预算，文档多的职位可能占满预算，
+        因此每个职位最多取 docs_per_job 个文档，整批检索中没有命中的职位再单独检索；
+        仍然没有文档或打分失败的职位记入 batch.unscored_job_ids。
+        """
+        batch = MatchBatch(len(job_ids), materializer=self._batch_materializer(resume_profile))
+        if not job_ids:
+            return batch
+
+        query = self._build_personalized_query(resume_profile)
+        job_filter = {'job_id': job_ids[0]} if len(job_ids) == 1 else {'job_id': {'$in': list(job_ids)}}
+        search_results = await self._execute_semantic_search(
+            query, job_filter, k=len(job_ids) * docs_per_job, resume_profile=resume_profile
+        )
+
+        jobs_by_id = self._group_results_by_job(search_results)
+        for job_id in job_ids:
+            if job_id in jobs_by_id:
+                continue
+            job_results = await self._execute_semantic_search(
+                query, {'job_id': job_id}, k=docs_per_job, resume_profile=resume_profile
+            )
+            jobs_by_id.update(self._group_results_by_job(job_results))
+
+        job_features = self._load_job_features(jobs_by_id)
+        for job_id in job_ids:
+            job_docs = jobs_by_id.get(job_id)
+            if not job_docs:
+                batch.unscored_job_ids.append(job_id)
+                continue
+            job_docs = job_docs[:docs_per_job]
+            try:
+                job_metadata = self._extract_job_metadata(job_docs, job_id, job_features.get(job_id))
+                partial_scores = self._calculate_partial_scores(resume_profile, job_docs, job_metadata)
+                dimension_scores = self._complete_dimension_scores(resume_profile, job_docs, job_metadata, partial_scores)
+                overall_score = self._calculate_weighted_score(dimension_scores)
+            except Exception as e:
+                self.logger.error(f"💥 计算职位 {job_id} 匹配度失败: {str(e)}")
+                batch.unscored_job_ids.append(job_id)
+                continue
+            batch.append(
+                job_id, job_metadata.get('job_title', 'Unknown Position'),
+                job_metadata.get('company', 'Unknown Company'), overall_score, dimension_scores,
+                location=job_metadata.get('location'), salary_range=job_metadata.get('salary_range'),
+                confidence_level=self._calculate_confidence_level(dimension_scores),
+                payload=(job_docs, job_metadata)
+            )
+
+        return batch.filter(self.min_score_threshold).ranked()
+
+    def _batch_materializer(self, resume_profile: GenericResumeProfile):
+        """MatchBatch 按需生成完整结果：用行内保留的职位文档和元数据生成匹配分析"""
+        def materialize(batch: MatchBatch, index: int) -> Optional[JobMatchResult]:
+            job_docs, job_metadata = batch.payloads[index]
+            return self._build_match_result(
+                resume_profile, job_docs, job_metadata, batch.dimension_dict(index), float(batch.scores[index])
+            )
+        return materialize
+
     def _build_personalized_query(self, resume_profile: GenericResumeProfile) -> str:
         """构建个性化查询"""
         query_parts = []
@@ -278,18 +489,39 @@ class GenericResumeJobMatcher:
         query = " ".join(query_parts)
         return query
     
+    @property
+    def resume_vectorizer(self) -> GenericResumeVectorizer:
+        """简历分段向量化器（缓存分段向量，首次使用时创建）"""
+        if self._resume_vectorizer is None:
+            self._resume_vectorizer = GenericResumeVectorizer(self.vector_manager, self.config)
+        return self._resume_vectorizer
+    
     async def _execute_semantic_search(self,
                                      query: str,
                                      filters: Dict[str, Any] = None,
-                                     k: int = 60) -> List[Tuple[Document, float]]:
-        """执行语义搜索 - 支持时间感知搜索"""
+                                     k: int = 60,
+                                     resume_profile: Optional[GenericResumeProfile] = None) -> List[Tuple[Document, float]]:
+        """执行语义搜索 - 支持时间感知搜索，启用简历索引时使用简历分段多向量检索"""
         try:
             # 检查是否启用时间感知搜索
             time_aware_config = self.config.get('time_aware_search', {})
             enable_time_aware = time_aware_config.get('enable_time_boost', True)
             search_strategy = time_aware_config.get('search_strategy', 'hybrid')
             
-            if enable_time_aware and hasattr(self.vector_manager, 'time_aware_similarity_search'):
+            if resume_profile is not None and getattr(self.vector_manager, 'resume_index_enabled', False):
+                # 简历分段向量按内容哈希缓存，只有简历变化时才重新向量化
+                loop = asyncio.get_event_loop()
+                documents, embeddings = await loop.run_in_executor(
+                    None, self.resume_vectorizer.get_section_embeddings, resume_profile
+                )
+                search_results = self.vector_manager.multi_vector_search(
+                    embeddings, k=k, filters=filters,
+                    weights=[doc.metadata.get('weight', 1.0) for doc in documents]
+                )
+                self.logger.info(f"🧩 简历分段多向量检索: {len(embeddings)} 个分段, {len(search_results)} 个结果")
+                if enable_time_aware:
+                    search_results = self.vector_manager.rerank_by_time(search_results, search_strategy)
+            elif enable_time_aware and hasattr(self.vector_manager, 'time_aware_similarity_search'):
                 # 使用时间感知搜索
                 self.logger.info(f"🕒 使用时间感知搜索，策略: {search_strategy}")
                 search_results = self.vector_manager.time_aware_similarity_search(
@@ -313,68 +545,194 @@ class GenericResumeJobMatcher:
             self.logger.error(f"语义搜索失败: {str(e)}")
             return []
     
+    @property
+    def job_feature_store(self):
+        """职位特征表（数据库文件存在时首次使用创建，否则为None）"""
+        if self._job_feature_store is None:
+            db_path = self.config.get('database_path', 'data/jobs.db')
+            if os.path.exists(db_path):
+                from ..database.operations import DatabaseManager
+                from ..database.job_features import JobFeatureStore
+                self._job_feature_store = JobFeatureStore(DatabaseManager(db_path), self.config.get('job_features'))
+        return self._job_feature_store
+    
+    @property
+    def skill_embedding_table(self):
+        """技能嵌入表（未启用、未构建或与当前嵌入模型不一致时为None）"""
+        if self._skill_embedding_table is _NOT_LOADED:
+            self._skill_embedding_table = self._init_skill_embedding_table()
+        return self._skill_embedding_table
+    
+    def _skill_embedding_dir(self) -> str:
+        default_dir = os.path.join(getattr(self.vector_manager, 'persist_directory', './data'), 'skill_embeddings')
+        return self.skill_embedding_config.get('path', default_dir)
+    
+    def _embedding_model_id(self) -> str:
+        from .skill_embeddings import embedding_model_id
+        return embedding_model_id((getattr(self.vector_manager, 'config', None) or {}).get('embeddings', {}))
+    
+    def _init_skill_embedding_table(self):
+        """加载技能嵌入表"""
+        if not self.skill_embedding_config.get('enabled', False):
+            return None
+        
+        try:
+            from .skill_embeddings import SkillEmbeddingTable
+            
+            table_dir = self._skill_embedding_dir()
+            if not SkillEmbeddingTable.exists(table_dir):
+                self.logger.warning(f"技能嵌入表未构建: {table_dir}，请运行 python rag_cli.py skill-embeddings build")
+                return None
+            
+            embeddings = getattr(self.vector_manager, 'embeddings', None)
+            embed_fn = embeddings.embed_documents if embeddings is not None and \
+                self.skill_embedding_config.get('embed_unknown', True) else None
+            table = SkillEmbeddingTable(table_dir, embed_fn).load()
+            
+            model_id = self._embedding_model_id()
+            if model_id and table.model and table.model != model_id:
+                self.logger.warning(f"技能嵌入表由 {table.model} 构建，与当前嵌入模型 {model_id} 不一致，"
+                                    f"请重新运行 python rag_cli.py skill-embeddings build")
+                return None
+            self.logger.info(f"技能嵌入表已加载: {table.rows} 个技能, {table.dim} 维")
+            return table
+        except Exception as e:
+            self.logger.warning(f"技能嵌入表加载失败: {e}，技能匹配仅使用映射规则")
+            return None
+    
+    def canonical_skills(self) -> List[str]:
+        """技能嵌入表收录的规范技能：技能关键词、技能权重以及中英文映射和变体中的全部技能"""
+        from .skill_embeddings import collect_canonical_skills
+        
+        groups = [SKILL_KEYWORDS, self.skill_weights.base_weights]
+        for aliases in (self._get_skill_mappings(), self._get_skill_variants()):
+            groups.append(aliases)
+            groups.extend(aliases.values())
+        return collect_canonical_skills(*groups)
+    
+    def build_skill_embedding_table(self, batch_size: int = 256) -> Dict[str, Any]:
+        """用当前嵌入模型向量化规范技能并写入技能嵌入表，返回元信息"""
+        from .skill_embeddings import SkillEmbeddingTable
+        
+        table = SkillEmbeddingTable.build(
+            self._skill_embedding_dir(), self.canonical_skills(), self.vector_manager.embeddings.embed_documents,
+            model=self._embedding_model_id(), batch_size=batch_size
+        )
+        self._skill_embedding_table = table if self.skill_embedding_config.get('enabled', False) else _NOT_LOADED
+        return dict(table.meta, path=str(table.table_dir))
+    
+    def _load_job_features(self, jobs_by_id: Dict[str, List[Document]]) -> Dict[str, JobFeatures]:
+        """批量获取候选职位的导入时特征（文档元数据优先，其余一次查表）"""
+        return collect_job_features(
+            {job_id: [doc.metadata for doc in job_docs] for job_id, job_docs in jobs_by_id.items()},
+            store=self.job_feature_store
+        )
+    
     def _group_results_by_job(self, search_results: List[Tuple[Document, float]]) -> Dict[str, List[Document]]:
         """按职位ID分组搜索结果，过滤已删除职位"""
         jobs_by_id = defaultdict(list)
+        trace = active_trace()
         
         for doc, score in search_results:
             job_id = doc.metadata.get('job_id')
             if job_id:
                 # 检查职位是否已被删除
-                if self._is_job_available(job_id):
+                if trace is not None:
+                    with trace.phase('availability'):
+                        available = self._is_job_available(job_id)
+                else:
+                    available = self._is_job_available(job_id)
+                if available:
                     doc.metadata['search_score'] = score
                     jobs_by_id[job_id].append(doc)
                 else:
-                    self.logger.debug(f"跳过已删除职位: {job_id}")
+                    self.logger.debug("跳过已删除职位: %s", job_id)
         
         return dict(jobs_by_id)
     
     async def _calculate_match_score(self,
                                    resume_profile: GenericResumeProfile,
                                    job_docs: List[Document],
-                                   job_id: str) -> Optional[JobMatchResult]:
+                                   job_id: str,
+                                   job_features: Optional[JobFeatures] = None) -> Optional[JobMatchResult]:
         """计算匹配分数"""
         try:
             # 提取职位元数据
-            job_metadata = self._extract_job_metadata(job_docs, job_id)
-            job_title = job_metadata.get('job_title', 'Unknown Position')
+            job_metadata = self._extract_job_metadata(job_docs, job_id, job_features)
             
-            self.logger.debug(f"🔢 开始计算职位 {job_id} ({job_title}) 的匹配分数")
+            self.logger.debug("🔢 开始计算职位 %s (%s) 的匹配分数", job_id, job_metadata.get('job_title', 'Unknown Position'))
             
             # 计算各维度分数
-            semantic_score = self._calculate_semantic_similarity(resume_profile, job_docs)
-            skills_score = self._calculate_skills_match(resume_profile, job_docs, job_metadata)
-            experience_score = self._calculate_experience_match(resume_profile, job_metadata)
-            industry_score = self._calculate_industry_match(resume_profile, job_metadata)
-            salary_score = self._calculate_salary_match(resume_profile, job_metadata)
-            
-            # 记录各维度分数
-            self.logger.debug(f"📊 {job_id} 各维度分数: 语义{semantic_score:.3f}, 技能{skills_score:.3f}, "
-                            f"经验{experience_score:.3f}, 行业{industry_score:.3f}, 薪资{salary_score:.3f}")
-            
-            # 计算加权总分
-            dimension_scores = {
-                'semantic_similarity': semantic_score,
-                'skills_match': skills_score,
-                'experience_match': experience_score,
-                'industry_match': industry_score,
-                'salary_match': salary_score
-            }
+            partial_scores = self._calculate_partial_scores(resume_profile, job_docs, job_metadata)
+            dimension_scores = self._complete_dimension_scores(resume_profile, job_docs, job_metadata, partial_scores)
+            overall_score = self._calculate_weighted_score(dimension_scores)
             
-            overall_score = (
-                semantic_score * self.matching_weights['semantic_similarity'] +
-                skills_score * self.matching_weights['skills_match'] +
-                experience_score * self.matching_weights['experience_match'] +
-                industry_score * self.matching_weights['industry_match'] +
-                salary_score * self.matching_weights['salary_match']
-            )
+            return self._build_match_result(resume_profile, job_docs, job_metadata, dimension_scores, overall_score)
             
-            self.logger.debug(f"🎯 {job_id} 加权总分: {overall_score:.3f} "
-                            f"(权重: 语义{self.matching_weights['semantic_similarity']}, "
-                            f"技能{self.matching_weights['skills_match']}, "
-                            f"经验{self.matching_weights['experience_match']}, "
-                            f"行业{self.matching_weights['industry_match']}, "
-                            f"薪资{self.matching_weights['salary_match']})")
+        except Exception as e:
+            self.logger.error(f"💥 计算职位 {job_id} 匹配度失败: {str(e)}")
+            return None
+    
+    def _calculate_partial_scores(self,
+                                  resume_profile: GenericResumeProfile,
+                                  job_docs: List[Document],
+                                  job_metadata: Dict[str, Any]) -> Dict[str, float]:
+        """计算廉价维度分数（技能匹配需要逐项比对技能映射，放到第二阶段）"""
+        return {
+            'semantic_similarity': self._calculate_semantic_similarity(resume_profile, job_docs),
+            'experience_match': self._calculate_experience_match(resume_profile, job_metadata),
+            'industry_match': self._calculate_industry_match(resume_profile, job_metadata),
+            'salary_match': self._calculate_salary_match(resume_profile, job_metadata)
+        }
+    
+    def _complete_dimension_scores(self,
+                                   resume_profile: GenericResumeProfile,
+                                   job_docs: List[Document],
+                                   job_metadata: Dict[str, Any],
+                                   partial_scores: Dict[str, float]) -> Dict[str, float]:
+        """补齐技能匹配分数，返回完整的维度分数"""
+        return {
+            'semantic_similarity': partial_scores['semantic_similarity'],
+            'skills_match': self._calculate_skills_match(resume_profile, job_docs, job_metadata),
+            'experience_match': partial_scores['experience_match'],
+            'industry_match': partial_scores['industry_match'],
+            'salary_match': partial_scores['salary_match']
+        }
+    
+    def _calculate_weighted_score(self, dimension_scores: Dict[str, float]) -> float:
+        """计算加权总分"""
+        return (
+            dimension_scores['semantic_similarity'] * self.matching_weights['semantic_similarity'] +
+            dimension_scores['skills_match'] * self.matching_weights['skills_match'] +
+            dimension_scores['experience_match'] * self.matching_weights['experience_match'] +
+            dimension_scores['industry_match'] * self.matching_weights['industry_match'] +
+            dimension_scores['salary_match'] * self.matching_weights['salary_match']
+        )
+    
+    def _score_upper_bound(self, partial_scores: Dict[str, float]) -> float:
+        """加权总分上界：未计算的维度按满分1.0计"""
+        return self._calculate_weighted_score({'skills_match': 1.0, **partial_scores})
+    
+    def _build_match_result(self,
+                            resume_profile: GenericResumeProfile,
+                            job_docs: List[Document],
+                            job_metadata: Dict[str, Any],
+                            dimension_scores: Dict[str, float],
+                            overall_score: float) -> Optional[JobMatchResult]:
+        """生成匹配分析并创建匹配结果对象"""
+        job_id = job_metadata.get('job_id', 'unknown')
+        job_title = job_metadata.get('job_title', 'Unknown Position')
+        try:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📊 {job_id} 各维度分数: 语义{dimension_scores['semantic_similarity']:.3f}, "
+                                f"技能{dimension_scores['skills_match']:.3f}, 经验{dimension_scores['experience_match']:.3f}, "
+                                f"行业{dimension_scores['industry_match']:.3f}, 薪资{dimension_scores['salary_match']:.3f}")
+                self.logger.debug(f"🎯 {job_id} 加权总分: {overall_score:.3f} "
+                                f"(权重: 语义{self.matching_weights['semantic_similarity']}, "
+                                f"技能{self.matching_weights['skills_match']}, "
+                                f"经验{self.matching_weights['experience_match']}, "
+                                f"行业{self.matching_weights['industry_match']}, "
+                                f"薪资{self.matching_weights['salary_match']})")
             
             # 生成匹配分析
             match_analysis = self._generate_match_analysis(
@@ -382,8 +740,8 @@ class GenericResumeJobMatcher:
             )
             
             # 创建匹配结果
-            match_result = JobMatchResult(
-                job_id=job_metadata.get('job_id', 'unknown'),
+            return JobMatchResult(
+                job_id=job_id,
                 job_title=job_title,
                 company=job_metadata.get('company', 'Unknown Company'),
                 location=job_metadata.get('location'),
@@ -397,10 +755,8 @@ class GenericResumeJobMatcher:
                 processing_time=time.time()
             )
             
-            return match_result
-            
         except Exception as e:
-            self.logger.error(f"💥 计算职位 {job_id} 匹配度失败: {str(e)}")
+            self.logger.error(f"💥 生成职位 {job_id} 匹配结果失败: {str(e)}")
             return None
     
     def _calculate_semantic_similarity(self,
@@ -414,12 +770,12 @@ class GenericResumeJobMatcher:
             # 优先使用向量搜索分数
             vector_score = self._get_vector_similarity_score(job_docs)
             if vector_score > 0:
-                self.logger.debug(f"使用向量搜索分数: {vector_score:.3f}")
+                self.logger.debug("使用向量搜索分数: %.3f", vector_score)
                 return vector_score
             
             # 回退策略：基于文档质量和类型的评分
             fallback_score = self._calculate_fallback_similarity(job_docs)
-            self.logger.debug(f"使用回退策略分数: {fallback_score:.3f}")
+            self.logger.debug("使用回退策略分数: %.3f", fallback_score)
             return fallback_score
             
         except Exception as e:
@@ -523,11 +879,11 @@ class GenericResumeJobMatcher:
             total_job_skill_weight = 0
             matched_skill_weight = 0
             
-            for job_skill in job_skills:
+            for job_skill, is_matched in zip(job_skills, self._match_job_skills(job_skills, resume_skills)):
                 skill_weight = self.skill_weights.get_skill_weight(job_skill)
                 total_job_skill_weight += skill_weight
                 
-                if self._is_skill_matched(job_skill, resume_skills):
+                if is_matched:
                     matched_skills.append(job_skill)
                     matched_skill_weight += skill_weight
             
@@ -616,7 +972,7 @@ class GenericResumeJobMatcher:
             job_min = job_salary_range.get('min', 0)
             job_max = job_salary_range.get('max', float('inf'))
             
-            self.logger.debug(f"薪资匹配计算: 简历期望 {resume_min}-{resume_max}, 职位提供 {job_min}-{job_max}")
+            self.logger.debug("薪资匹配计算: 简历期望 %s-%s, 职位提供 %s-%s", resume_min, resume_max, job_min, job_max)
             
             # 1. 检查是否有重叠
             overlap_min = max(resume_min, job_min)
@@ -631,7 +987,7 @@ class GenericResumeJobMatcher:
                 if resume_range_size > 0 and job_range_size > 0:
                     overlap_ratio = overlap_size / min(resume_range_size, job_range_size)
                     score = min(1.0, overlap_ratio)
-                    self.logger.debug(f"薪资有重叠，重叠度: {overlap_ratio:.3f}, 分数: {score:.3f}")
+                    self.logger.debug("薪资有重叠，重叠度: %.3f, 分数: %.3f", overlap_ratio, score)
                     return score
             
             # 2. 没有重叠，但检查是否在合理范围内
@@ -652,7 +1008,7 @@ class GenericResumeJobMatcher:
                 else:  # 差距超过60%
                     score = 0.2
                 
-                self.logger.debug(f"薪资无重叠，差距比例: {gap_ratio:.3f}, 分数: {score:.3f}")
+                self.logger.debug("薪资无重叠，差距比例: %.3f, 分数: %.3f", gap_ratio, score)
                 return score
             
             # 3. 特殊情况：如果简历期望明显低于职位提供，给高分
@@ -699,8 +1055,11 @@ class GenericResumeJobMatcher:
         
         return " ".join(text_parts)
     
-    def _extract_job_metadata(self, job_docs: List[Document], job_id: str) -> Dict[str, Any]:
-        """提取职位元数据"""
+    def _extract_job_metadata(self,
+                              job_docs: List[Document],
+                              job_id: str,
+                              job_features: Optional[JobFeatures] = None) -> Dict[str, Any]:
+        """提取职位元数据（有导入时特征时，技能、经验、薪资、行业直接取自特征）"""
         metadata = {'job_id': job_id}
         
         for doc in job_docs:
@@ -719,7 +1078,7 @@ class GenericResumeJobMatcher:
             if 'skills' in doc_metadata:
                 if 'skills' not in metadata:
                     metadata['skills'] = []
-                metadata['skills'].extend(doc_metadata['skills'])
+                metadata['skills'].extend(parse_skill_list(doc_metadata['skills']))
             
             if 'required_experience_years' in doc_metadata:
                 metadata['required_experience_years'] = doc_metadata['required_experience_years']
@@ -729,10 +1088,24 @@ class GenericResumeJobMatcher:
         
         metadata['description'] = " ".join([doc.page_content for doc in job_docs])
         
+        if job_features is not None:
+            metadata['job_features'] = job_features
+            metadata['skills'] = list(job_features.skills)
+            metadata['required_experience_years'] = job_features.required_years
+            metadata['education_level'] = job_features.education_level
+            if job_features.salary_range:
+                metadata['salary_range'] = job_features.salary_range
+            if job_features.industry:
+                metadata['industry'] = job_features.industry
+        
         return metadata
     
     def _extract_job_skills(self, job_docs: List[Document], job_metadata: Dict[str, Any]) -> List[str]:
         """提取职位技能要求"""
+        # 导入时已提取的技能直接使用
+        if job_metadata.get('job_features') is not None:
+            return list(job_metadata['job_features'].skills)
+        
         skills = []
         
         # 从元数据中获取技能
@@ -742,83 +1115,8 @@ class GenericResumeJobMatcher:
         # 从文档内容中提取技能（简化版本）
         job_text = " ".join([doc.page_content for doc in job_docs]).lower()
         
-        # 扩展的技能关键词 - 包含占彬简历的核心技能
-        common_skills = [
-            # 编程语言
-            'python', 'java', 'javascript', 'typescript', 'c#', 'c++', 'golang', 'go',
-            
-            # Web前端技术
-            'react', 'vue', 'angular', 'node.js', 'html', 'css', 'bootstrap',
-            'jquery', 'webpack', 'npm', 'yarn', 'sass', 'less',
-            
-            # 后端框架
-            'spring', 'django', 'flask', '.net', 'asp.net',
-            
-            # 数据库技术
-            'mysql', 'postgresql', 'mongodb', 'redis', 'azure sql', 'cosmos db',
-            'sql server', 'oracle', 'sqlite', 'cassandra', 'elasticsearch',
-            
-            # 云平台技术 (重点扩展Azure)
-            'azure', 'microsoft azure', 'aws', 'gcp', 'google cloud',
-            'azure data factory', 'azure functions', 'azure storage',
-            'azure data lake storage', 'azure data lake storage gen2',
-            'azure synapse', 'azure databricks', 'azure devops',
-            'azure app service', 'azure kubernetes service', 'aks',
-            
-            # 大数据和数据工程技能 (占彬的核心领域)
-            'databricks', 'delta lake', 'spark', 'pyspark', 'spark sql',
-            'hadoop', 'hdfs', 'hive', 'kafka', 'airflow', 'nifi',
-            'ssis', 'informatica', 'talend', 'pentaho',
-            'etl', 'elt', 'data pipeline', 'data integration',
-            'oltp', 'olap', 'data warehouse', 'data mart',
-            'data lineage', 'data governance', 'data quality',
-            'metadata management', 'data catalog',
-            
-            # AI/ML技能 (占彬的专长)
-            'machine learning', 'deep learning', 'ai', 'artificial intelligence',
-            'tensorflow', 'pytorch', 'scikit-learn', 'keras', 'xgboost',
-            'computer vision', 'opencv', 'yolo', 'resnet', 'cnn', 'rnn', 'lstm',
-            'attention mechanism', 'transformer', 'bert', 'gpt',
-            'numpy', 'pandas', 'matplotlib', 'seaborn', 'plotly',
-            'jupyter', 'anaconda', 'mlflow', 'kubeflow',
-            'langchain', 'llamaindex', 'openai api', 'azure openai',
-            'rag', 'retrieval augmented generation', 'prompt engineering',
-            
-            # 数据科学和分析
-            'data science', 'data analysis', 'data visualization',
-            'tableau', 'power bi', 'qlik', 'looker', 'grafana',
-            'r', 'stata', 'spss', 'sas',
-            
-            # DevOps和基础设施
-            'docker', 'kubernetes', 'jenkins', 'gitlab ci', 'github actions',
-            'terraform', 'ansible', 'chef', 'puppet',
-            'linux', 'ubuntu', 'centos', 'windows server',
-            'nginx', 'apache', 'iis',
-            
-            # 项目管理和方法论
-            'agile', 'scrum', 'kanban', 'waterfall', 'devops',
-            'ci/cd', 'continuous integration', 'continuous deployment',
-            'git', 'github', 'gitlab', 'bitbucket', 'svn',
-            
-            # 架构和设计模式
-            'microservices', 'api', 'rest', 'graphql', 'soap',
-            'event driven', 'message queue', 'rabbitmq', 'activemq',
-            'design patterns', 'solid principles', 'clean architecture',
-            
-            # 制药和医疗行业特定技能
-            'pharmaceutical', 'clinical data', 'regulatory compliance',
-            'gxp', 'fda', 'ich', 'clinical trials', 'pharmacovigilance',
-            
-            # 中文技能关键词 (占彬简历中的中文技能)
-            '数据工程', '数据架构', '数据治理', '数据质量', '数据血缘',
-            '元数据管理', '机器学习', '深度学习', '计算机视觉',
-            '人工智能', '数据科学', '大数据', '云计算',
-            '敏捷开发', '项目管理', '技术管理', '架构设计',
-            '湖仓一体', '实时处理', '批处理', '流处理'
-        ]
-        
         # 只添加在职位文本中找到的技能关键词
-        for skill in common_skills:
+        for skill in SKILL_KEYWORDS:
             if skill.lower() in job_text:
                 skills.append(skill)
         
@@ -830,6 +1128,31 @@ class GenericResumeJobMatcher:
         
         return unique_skills
     
+    def _match_job_skills(self, job_skills: List[str], resume_skills: List[str]) -> List[bool]:
+        """
+        判断每个职位技能是否匹配
+        
+        启用技能嵌入表时先做一次职位技能 × 简历技能的余弦相似度矩阵运算，
+        未达到阈值的技能再按映射规则判断（rule_fallback 为 false 时只保留精确匹配）
+        """
+        table = self.skill_embedding_table
+        if table is None or not job_skills:
+            return [self._is_skill_matched(job_skill, resume_skills) for job_skill in job_skills]
+        
+        from .skill_embeddings import normalize_skill
+        
+        vector_matched = table.match(job_skills, resume_skills, self.skill_similarity_threshold)
+        resume_skill_set = {normalize_skill(skill) for skill in resume_skills}
+        matched = []
+        for job_skill, is_matched in zip(job_skills, vector_matched):
+            if not is_matched:
+                if self.skill_rule_fallback:
+                    is_matched = self._is_skill_matched(job_skill, resume_skills)
+                else:
+                    is_matched = normalize_skill(job_skill) in resume_skill_set
+            matched.append(is_matched)
+        return matched
+    
     def _is_skill_matched(self, job_skill: str, resume_skills: List[str]) -> bool:
         """判断技能是否匹配 - 增强版本支持中英文映射和智能匹配"""
         job_skill_lower = job_skill.lower().strip()
@@ -1143,8 +1466,8 @@ class GenericResumeJobMatcher:
         # 确保job_skills是有效的技能列表，过滤掉单个字符和无效技能
         valid_job_skills = [skill for skill in job_skills if skill and len(skill.strip()) > 1 and skill.strip().isalpha()]
         
-        for job_skill in valid_job_skills:
-            if self._is_skill_matched(job_skill, resume_skills):
+        for job_skill, is_matched in zip(valid_job_skills, self._match_job_skills(valid_job_skills, resume_skills)):
+            if is_matched:
                 analysis.matched_skills.append(job_skill)
             else:
                 analysis.missing_skills.append(job_skill)
@@ -690,4 +690,53 @@ class ResumeMatchingResult:
     matches: List[JobMatchResult]
     career_insights: CareerInsights
     resume_profile: Union[GenericResumeProfile, Any]  # 支持任意简历类型
-    query_metadata: Dict[str, Any] = field(default_factory=dict)
\ No newline at end of file
+    query_metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典（不含简历档案）"""
+        summary = self.matching_summary
+        return {
+            'matching_summary': {
+                'total_matches': summary.total_matches,
+                'high_priority': summary.high_priority,
+                'medium_priority': summary.medium_priority,
+                'low_priority': summary.low_priority,
+                'average_score': summary.average_score,
+                'processing_time': summary.processing_time,
+                'timestamp': summary.timestamp
+            },
+            'matches': [
+                {
+                    'job_id': match.job_id,
+                    'job_title': match.job_title,
+                    'company': match.company,
+                    'location': match.location,
+                    'salary_range': match.salary_range,
+                    'overall_score': match.overall_score,
+                    'dimension_scores': match.dimension_scores,
+                    'match_level': match.match_level.value,
+                    'recommendation_priority': match.recommendation_priority.value,
+                    'match_analysis': {
+                        'strengths': match.match_analysis.strengths,
+                        'weaknesses': match.match_analysis.weaknesses,
+                        'recommendations': match.match_analysis.recommendations,
+                        'matched_skills': match.match_analysis.matched_skills,
+                        'missing_skills': match.match_analysis.missing_skills,
+                        'skill_gap_score': match.match_analysis.skill_gap_score,
+                        'experience_alignment': match.match_analysis.experience_alignment,
+                        'industry_fit': match.match_analysis.industry_fit
+                    },
+                    'confidence_level': match.confidence_level,
+                    'timestamp': match.timestamp
+                }
+                for match in self.matches
+            ],
+            'career_insights': {
+                'top_matching_positions': self.career_insights.top_matching_positions,
+                'skill_gap_analysis': self.career_insights.skill_gap_analysis,
+                'salary_analysis': self.career_insights.salary_analysis,
+                'market_trends': self.career_insights.market_trends,
+                'career_recommendations': self.career_insights.career_recommendations
+            },
+            'query_metadata': self.query_metadata
+        }
\ No newline at end of file
@@ -2,10 +2,12 @@
 """
 通用简历向量化模块
 支持任意用户的灵活向量化系统
+简历分段向量存放在独立的简历集合中，按分段内容哈希缓存，简历未变化时不重新向量化
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from langchain.schema import Document
 from datetime import datetime
 
@@ -14,6 +16,20 @@ from ..utils.logger import get_logger
 from .generic_resume_models import GenericResumeProfile, WorkExperience, Project
 
 
+def get_resume_id(profile: GenericResumeProfile) -> str:
+    """简历ID（按姓名生成）"""
+    return f"resume_{profile.name.lower().replace(' ', '_')}"
+
+
+def compute_sections_hash(documents: List[Document]) -> str:
+    """简历分段内容哈希（只取参与向量化的文本，不受时间戳等元数据影响）"""
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.page_content.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()[:16]
+
+
 class GenericResumeVectorizer:
     """通用简历向量化处理器"""
     
@@ -21,10 +37,13 @@ class GenericResumeVectorizer:
         self.vector_manager = vector_manager
         self.config = config or {}
         self.logger = get_logger(__name__)
-        self.resume_collection = "resume_profiles"
+        self.resume_collection = vector_manager.resume_index_config.get('collection_name', 'resume_profiles')
+        
+        # 进程内分段向量缓存 {内容哈希: (分段文档, 分段向量)}
+        self._section_cache: Dict[str, Tuple[List[Document], List[List[float]]]] = {}
         
         # 文档类型权重
-        self.document_weights = config.get('document_weights', {
+        self.document_weights = self.config.get('document_weights', {
             'personal_overview': 1.0,
             'skills_overview': 1.0,
             'experience_overview': 0.9,
@@ -36,20 +55,18 @@ class GenericResumeVectorizer:
         })
     
     async def vectorize_and_store(self, resume_profile: GenericResumeProfile) -> List[str]:
-        """向量化并存储简历"""
+        """向量化并存储简历（写入独立的简历集合）"""
         try:
             self.logger.info(f"开始向量化简历: {resume_profile.name}")
             
-            # 创建简历文档
-            documents = self._create_resume_documents(resume_profile)
+            loop = asyncio.get_event_loop()
+            documents, _ = await loop.run_in_executor(None, self.get_section_embeddings, resume_profile)
+            resume_id = get_resume_id(resume_profile)
             
-            self.logger.info(f"创建了 {len(documents)} 个简历文档")
-            
-            # 存储到向量数据库
-            doc_ids = await self.vector_manager.add_job_documents_async(
-                documents, job_id=f"resume_{resume_profile.name.lower().replace(' ', '_')}"
-            )
+            # 清理旧版本写入职位集合的简历向量，避免污染职位检索
+            self.vector_manager.delete_documents(resume_id)
             
+            doc_ids = [f"{resume_id}:section:{index}" for index in range(len(documents))]
             self.logger.info(f"成功存储简历向量，文档ID: {doc_ids}")
             return doc_ids
             
@@ -57,6 +74,30 @@ class GenericResumeVectorizer:
             self.logger.error(f"简历向量化失败: {str(e)}")
             raise
     
+    def get_section_embeddings(self, resume_profile: GenericResumeProfile) -> Tuple[List[Document], List[List[float]]]:
+        """
+        获取简历分段文档及其向量
+        
+        依次查找进程内缓存和简历集合（按分段内容哈希校验），都未命中时才重新向量化。
+        
+        Returns:
+            (分段文档, 分段向量)
+        """
+        documents = self._create_resume_documents(resume_profile)
+        content_hash = compute_sections_hash(documents)
+        cached = self._section_cache.get(content_hash)
+        if cached is not None:
+            return cached
+        
+        resume_id = get_resume_id(resume_profile)
+        stored = self.vector_manager.load_resume_sections(resume_id, content_hash)
+        if stored is None:
+            self.logger.info(f"简历 {resume_profile.name} 内容已变化或尚未缓存，重新向量化 {len(documents)} 个分段")
+            stored = (documents, self.vector_manager.store_resume_sections(resume_id, content_hash, documents))
+        
+        self._section_cache[content_hash] = stored
+        return stored
+    
     def _create_resume_documents(self, profile: GenericResumeProfile) -> List[Document]:
         """创建简历文档"""
         documents = []
@@ -133,7 +174,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "personal_overview",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "current_position": profile.current_position,
             "current_company": profile.current_company,
@@ -185,7 +226,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "skills_overview",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "all_skills": all_skills,
             "skill_categories": skill_categories_meta,
@@ -235,7 +276,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "experience_overview",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "total_experience_years": profile.total_experience_years,
             "companies": companies,
@@ -282,7 +323,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "education_overview",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "degrees": degrees,
             "majors": majors,
@@ -328,7 +369,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "projects_overview",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "project_names": project_names,
             "project_technologies": list(set(all_project_technologies)),
@@ -372,7 +413,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "career_objectives",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "preferred_positions": profile.preferred_positions,
             "salary_min": profile.expected_salary_range.get('min', 0),
@@ -418,7 +459,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "work_experience",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "company": work_exp.company,
             "position": work_exp.position,
@@ -466,7 +507,7 @@ class GenericResumeVectorizer:
         
         metadata = {
             "document_type": "project_detail",
-            "resume_id": f"resume_{profile.name.lower().replace(' ', '_')}",
+            "resume_id": get_resume_id(profile),
             "person_name": profile.name,
             "project_name": project.name,
             "project_description": project.description,
@@ -484,11 +525,7 @@ class GenericResumeVectorizer:
     def update_resume_profile(self, resume_profile: GenericResumeProfile) -> bool:
         """更新简历档案"""
         try:
-            # 先删除旧的简历文档
-            resume_id = f"resume_{resume_profile.name.lower().replace(' ', '_')}"
-            self.vector_manager.delete_documents(resume_id)
-            
-            # 重新向量化和存储
+            # 分段内容变化时 get_section_embeddings 会替换简历集合中的旧分段
             asyncio.run(self.vectorize_and_store(resume_profile))
             
             self.logger.info(f"成功更新简历档案: {resume_profile.name}")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+增量匹配工作进程
+消费职位出队表（job_match_outbox），只对新完成RAG处理的职位与全部启用的简历档案打分，
+稳态下的开销与新增职位数成正比，而不是与职位库规模成正比
+"""
+
+import json
+import time
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, TYPE_CHECKING
+
+from ..database.match_outbox import MatchOutbox
+from ..utils.logger import get_logger
+from .generic_resume_models import GenericResumeProfile, JobMatchResult
+
+if TYPE_CHECKING:
+    from .generic_resume_matcher import GenericResumeJobMatcher
+
+
+def get_profile_id(resume_profile: GenericResumeProfile) -> str:
+    """简历档案ID（与 resume_matches.resume_profile_id 一致，未设置时为 default）"""
+    return getattr(resume_profile, 'profile_id', None) or 'default'
+
+
+def match_result_to_record(match: JobMatchResult, resume_profile_id: str, source: str) -> Dict[str, Any]:
+    """将匹配结果转换为 resume_matches 记录（batch_save_resume_matches 的格式）"""
+    if match.overall_score >= 0.8:
+        priority_level = 'high'
+    elif match.overall_score >= 0.6:
+        priority_level = 'medium'
+    else:
+        priority_level = 'low'
+
+    dimension_scores = match.dimension_scores or {}
+    return {
+        'job_id': match.job_id,
+        'resume_profile_id': resume_profile_id,
+        'match_score': match.overall_score,
+        'priority_level': priority_level,
+        'semantic_score': dimension_scores.get('semantic_similarity', 0),
+        'skill_match_score': dimension_scores.get('skills_match', 0),
+        'experience_match_score': dimension_scores.get('experience_match', 0),
+        'location_match_score': dimension_scores.get('industry_match', 0),
+        'salary_match_score': dimension_scores.get('salary_match', 0),
+        'match_details': json.dumps(dimension_scores, ensure_ascii=False),
+        'match_reasons': f"{source}: {match.job_title} at {match.company}"
+    }
+
+
+class IncrementalMatchingWorker:
+    """增量匹配工作进程"""
+
+    def __init__(self, matcher: 'GenericResumeJobMatcher', db_manager, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化增量匹配工作进程
+
+        Args:
+            matcher: 简历匹配器（需提供 score_jobs）
+            db_manager: 数据库管理器（DatabaseManager 或 DatabaseJobReader）
+            config: integration_system.incremental_matching 配置
+        """
+        self.matcher = matcher
+        self.config = config or {}
+        self.outbox = MatchOutbox(db_manager, self.config)
+        self.docs_per_job = self.config.get('docs_per_job', 10)
+        self.logger = get_logger(__name__)
+
+    def register_profile(self, resume_profile: GenericResumeProfile, profile_id: Optional[str] = None) -> str:
+        """登记简历档案，之后新完成处理的职位都会与其匹配"""
+        profile_id = profile_id or get_profile_id(resume_profile)
+        self.outbox.register_profile(profile_id, resume_profile.to_dict())
+        return profile_id
+
+    def is_registered(self, profile_id: str) -> bool:
+        return profile_id in self.outbox.get_active_profiles()
+
+    async def onboard_profile(self, resume_profile: GenericResumeProfile, full_match: Callable[[], Awaitable[Any]],
+                              profile_id: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        首次匹配一份简历：已登记的档案先消费完待处理事件，再对新简历全量匹配并登记
+
+        水位线由全部档案共用，全量匹配不推进水位线，否则其他档案尚未打分的事件会被一并清理。
+        全量匹配期间新到的事件留给下一次增量消费，届时新简历也参与打分（重复打分只替换未投递的记录）。
+
+        Args:
+            resume_profile: 简历档案
+            full_match: 执行全量匹配并保存结果的协程函数
+            profile_id: 档案ID（默认取 get_profile_id）
+
+        Returns:
+            (full_match 的返回值, 排空待处理事件的统计)
+        """
+        drained = await self.run_pending()
+        result = await full_match()
+        self.register_profile(resume_profile, profile_id)
+        return result, drained
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        消费一批事件
+
+        Returns:
+            本批统计（events_to、jobs、profiles、saved、duration_ms）；没有新事件时 jobs 为0
+        """
+        start_time = time.perf_counter()
+        watermark, last_event_id, job_ids = self.outbox.fetch_pending()
+        stats = {'events_to': last_event_id, 'jobs': len(job_ids), 'profiles': 0, 'saved': 0, 'duration_ms': 0.0}
+        if last_event_id == watermark:
+            return stats
+
+        records = []
+        if job_ids:
+            profiles = self.outbox.get_active_profiles()
+            stats['profiles'] = len(profiles)
+            for profile_id, profile_data in profiles.items():
+                resume_profile = GenericResumeProfile.from_dict(profile_data)
+                matches = await self.matcher.score_jobs(resume_profile, job_ids, self.docs_per_job)
+                records.extend(match_result_to_record(match, profile_id, '增量匹配') for match in matches)
+
+        saved = self.outbox.commit(records, watermark, last_event_id)
+        if saved is None:
+            stats['skipped'] = True
+            return stats
+
+        stats['saved'] = saved
+        stats['duration_ms'] = (time.perf_counter() - start_time) * 1000
+        self.logger.info(f"增量匹配: 事件至 #{last_event_id}, {len(job_ids)} 个职位 × {stats['profiles']} 份简历, "
+                         f"新增 {saved} 条匹配, 耗时 {stats['duration_ms']:.1f} ms")
+        return stats
+
+    async def run_pending(self, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        消费全部未处理的事件
+
+        Args:
+            max_batches: 最多处理的批次数，None表示直到没有新事件
+
+        Returns:
+            累计统计（batches、jobs、saved、events_to）
+        """
+        totals = {'batches': 0, 'jobs': 0, 'saved': 0, 'events_to': self.outbox.get_watermark()}
+        while max_batches is None or totals['batches'] < max_batches:
+            stats = await self.run_once()
+            if stats['events_to'] == totals['events_to'] or stats.get('skipped'):
+                break
+            totals['batches'] += 1
+            totals['jobs'] += stats['jobs']
+            totals['saved'] += stats['saved']
+            totals['events_to'] = stats['events_to']
+        return totals
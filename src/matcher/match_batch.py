@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+匹配结果批次（结构化数组）
+批量重匹配和监控修复一次会为成千上万个职位打分，其中大部分在阈值过滤后即被丢弃。
+MatchBatch 按列保存职位ID、总分和各维度分数（NumPy数组），
+阈值过滤、排序和写库记录都直接在列上完成，
+只有最终被访问的匹配才按需生成完整的 JobMatchResult（含匹配分析）。
+Python 3.8 的 dataclass 不支持 slots=True，因此采用列存储而不是给结果模型加 __slots__。
+"""
+
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .generic_resume_models import (
+    JobMatchResult, MatchAnalysis,
+    get_match_level_from_score, get_recommendation_priority_from_score
+)
+
+# 维度分数的列顺序（与 DEFAULT_MATCHING_WEIGHTS 的键一致）
+DIMENSIONS = ('semantic_similarity', 'skills_match', 'experience_match', 'industry_match', 'salary_match')
+
+# materializer(batch, index) -> JobMatchResult，用于按需生成完整结果（例如补充匹配分析）
+Materializer = Callable[['MatchBatch', int], JobMatchResult]
+
+
+def _salary_value(value: float) -> Optional[float]:
+    if math.isnan(value):
+        return None
+    return int(value) if float(value).is_integer() else value
+
+
+class MatchBatch:
+    """按列存储的一批职位匹配结果"""
+
+    __slots__ = ('job_ids', 'job_titles', 'companies', 'locations', 'payloads', 'materializer',
+                 'unscored_job_ids', '_scores', '_dimensions', '_confidence', '_salary', '_size')
+
+    def __init__(self, capacity: int = 64, materializer: Optional[Materializer] = None):
+        """
+        Args:
+            capacity: 初始容量（追加超过容量时按倍数扩容）
+            materializer: 生成完整结果的函数，默认只根据列数据构造（匹配分析为空）
+        """
+        capacity = max(1, capacity)
+        self.job_ids: List[str] = []
+        self.job_titles: List[str] = []
+        self.companies: List[str] = []
+        self.locations: List[Optional[str]] = []
+        # 每行附带的对象（例如生成匹配分析所需的职位文档和元数据），阈值过滤后随行保留
+        self.payloads: List[Any] = []
+        self.materializer = materializer
+        # 请求打分但没有检索到文档或打分失败的职位ID，子批次原样继承
+        self.unscored_job_ids: List[str] = []
+        self._scores = np.empty(capacity, dtype=np.float64)
+        self._dimensions = np.empty((capacity, len(DIMENSIONS)), dtype=np.float64)
+        self._confidence = np.empty(capacity, dtype=np.float64)
+        # 薪资下限、上限，NaN 表示缺失；第三列为是否有薪资区间
+        self._salary = np.empty((capacity, 3), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def scores(self) -> np.ndarray:
+        """总分列（只读视图）"""
+        view = self._scores[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def dimension_scores(self) -> np.ndarray:
+        """维度分数矩阵，列顺序见 DIMENSIONS（只读视图）"""
+        view = self._dimensions[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self) -> int:
+        """数值列占用的字节数"""
+        return sum(array[:self._size].nbytes for array in (self._scores, self._dimensions,
+                                                           self._confidence, self._salary))
+
+    def append(self,
+               job_id: str,
+               job_title: str,
+               company: str,
+               overall_score: float,
+               dimension_scores: Dict[str, float],
+               location: Optional[str] = None,
+               salary_range: Optional[Dict[str, Any]] = None,
+               confidence_level: float = 0.0,
+               payload: Any = None) -> int:
+        """追加一行，返回行号"""
+        if self._size == len(self._scores):
+            self._grow()
+        index = self._size
+        self.job_ids.append(job_id)
+        self.job_titles.append(job_title)
+        self.companies.append(company)
+        self.locations.append(location)
+        self.payloads.append(payload)
+        self._scores[index] = overall_score
+        self._dimensions[index] = [dimension_scores.get(name, 0.0) for name in DIMENSIONS]
+        self._confidence[index] = confidence_level
+        if salary_range is None:
+            self._salary[index] = (np.nan, np.nan, 0.0)
+        else:
+            self._salary[index] = (
+                np.nan if salary_range.get('min') is None else salary_range['min'],
+                np.nan if salary_range.get('max') is None else salary_range['max'],
+                1.0
+            )
+        self._size += 1
+        return index
+
+    def _grow(self) -> None:
+        capacity = len(self._scores) * 2
+        self._scores = np.resize(self._scores, capacity)
+        self._dimensions = np.resize(self._dimensions, (capacity, len(DIMENSIONS)))
+        self._confidence = np.resize(self._confidence, capacity)
+        self._salary = np.resize(self._salary, (capacity, 3))
+
+    def take(self, indices: Sequence[int]) -> 'MatchBatch':
+        """按行号取出子批次（保持给定顺序）"""
+        indices = np.asarray(indices, dtype=np.intp)
+        subset = MatchBatch(len(indices), self.materializer)
+        subset.job_ids = [self.job_ids[i] for i in indices]
+        subset.job_titles = [self.job_titles[i] for i in indices]
+        subset.companies = [self.companies[i] for i in indices]
+        subset.locations = [self.locations[i] for i in indices]
+        subset.payloads = [self.payloads[i] for i in indices]
+        subset.unscored_job_ids = list(self.unscored_job_ids)
+        subset._scores[:len(indices)] = self._scores[indices]
+        subset._dimensions[:len(indices)] = self._dimensions[indices]
+        subset._confidence[:len(indices)] = self._confidence[indices]
+        subset._salary[:len(indices)] = self._salary[indices]
+        subset._size = len(indices)
+        return subset
+
+    def filter(self, min_score: float) -> 'MatchBatch':
+        """保留总分不低于 min_score 的行"""
+        return self.take(np.flatnonzero(self.scores >= min_score))
+
+    def ranked(self, top_k: Optional[int] = None) -> 'MatchBatch':
+        """按总分降序（同分保持原顺序）取前 top_k 行"""
+        order = np.argsort(-self.scores, kind='stable')
+        return self.take(order if top_k is None else order[:top_k])
+
+    def dimension_dict(self, index: int) -> Dict[str, float]:
+        """第 index 行的维度分数字典"""
+        return {name: float(value) for name, value in zip(DIMENSIONS, self._dimensions[index])}
+
+    def salary_range(self, index: int) -> Optional[Dict[str, Any]]:
+        """第 index 行的薪资区间（与 JobMatchResult.salary_range 格式一致）"""
+        salary_min, salary_max, has_salary = self._salary[index]
+        if not has_salary:
+            return None
+        return {'min': _salary_value(salary_min), 'max': _salary_value(salary_max)}
+
+    def materialize(self, index: int) -> JobMatchResult:
+        """生成第 index 行的完整匹配结果"""
+        if not 0 <= index < self._size:
+            raise IndexError(f"匹配批次行号越界: {index}")
+        if self.materializer is not None:
+            return self.materializer(self, index)
+        return self.build_result(index)
+
+    def build_result(self, index: int, match_analysis: Optional[MatchAnalysis] = None) -> JobMatchResult:
+        """只根据列数据构造 JobMatchResult"""
+        overall_score = float(self._scores[index])
+        return JobMatchResult(
+            job_id=self.job_ids[index],
+            job_title=self.job_titles[index],
+            company=self.companies[index],
+            location=self.locations[index],
+            salary_range=self.salary_range(index),
+            overall_score=overall_score,
+            dimension_scores=self.dimension_dict(index),
+            match_level=get_match_level_from_score(overall_score),
+            match_analysis=match_analysis or MatchAnalysis(),
+            recommendation_priority=get_recommendation_priority_from_score(overall_score),
+            confidence_level=float(self._confidence[index])
+        )
+
+    def __getitem__(self, index: int) -> JobMatchResult:
+        if index < 0:
+            index += self._size
+        return self.materialize(index)
+
+    def __iter__(self) -> Iterator[JobMatchResult]:
+        for index in range(self._size):
+            yield self.materialize(index)
+
+    def to_list(self) -> List[JobMatchResult]:
+        """生成全部行的完整匹配结果"""
+        return list(self)
+
+    def row_dict(self, index: int) -> Dict[str, Any]:
+        """第 index 行的评分字段（与 ResumeMatchingResult.to_dict() 中单条匹配的格式一致，不含匹配分析）"""
+        overall_score = float(self._scores[index])
+        return {
+            'job_id': self.job_ids[index],
+            'job_title': self.job_titles[index],
+            'company': self.companies[index],
+            'location': self.locations[index],
+            'salary_range': self.salary_range(index),
+            'overall_score': overall_score,
+            'dimension_scores': self.dimension_dict(index),
+            'match_level': get_match_level_from_score(overall_score).value,
+            'recommendation_priority': get_recommendation_priority_from_score(overall_score).value,
+            'confidence_level': float(self._confidence[index])
+        }
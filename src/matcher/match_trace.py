@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+匹配评分追踪（explain 模式）
+
+find_matching_jobs 评分异常或变慢时，原来只能翻看 _calculate_match_score 的调试日志。
+MatchTrace 按列记录每个候选职位的各维度分数、分数上界、结果去向和评分耗时，
+并按阶段（检索、分组、可用性检查、特征加载、廉价维度、技能匹配、匹配分析）累计耗时，
+可导出为 JSON 或 Parquet（需安装 pyarrow）。
+
+未传入追踪对象时匹配流程不做任何追踪相关的计时和格式化。
+"""
+
+import json
+import math
+import time
+from array import array
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .match_batch import DIMENSIONS
+
+# 候选职位的去向
+OUTCOME_SELECTED = 'selected'                # 进入最终的前 top_k
+OUTCOME_MATCHED = 'matched'                  # 达到阈值但被挤出前 top_k
+OUTCOME_BELOW_THRESHOLD = 'below_threshold'  # 精确分数或分数上界低于阈值
+OUTCOME_PRUNED = 'pruned'                    # 分数上界进不了前 top_k，跳过技能匹配
+OUTCOME_FAILED = 'failed'                    # 评分出错
+
+# 阶段名称（按流程顺序）；availability 是 grouping 中逐个检查职位是否已删除的耗时
+PHASES = ('search', 'grouping', 'availability', 'features', 'partial_scoring', 'skills_scoring', 'analysis')
+
+# 当前匹配的追踪对象（asyncio 任务间相互隔离），供不接收追踪参数的内部方法计时
+_active_trace: ContextVar[Optional['MatchTrace']] = ContextVar('match_trace', default=None)
+
+
+def active_trace() -> Optional['MatchTrace']:
+    """当前上下文中的追踪对象（未追踪时为None）"""
+    return _active_trace.get()
+
+
+def set_active_trace(trace: 'MatchTrace'):
+    """设置当前上下文的追踪对象，返回用于恢复的 token"""
+    return _active_trace.set(trace)
+
+
+def reset_active_trace(token) -> None:
+    _active_trace.reset(token)
+
+
+class _PhaseTimer:
+    """累计某个阶段耗时的上下文管理器"""
+
+    __slots__ = ('trace', 'name', 'started')
+
+    def __init__(self, trace: 'MatchTrace', name: str):
+        self.trace = trace
+        self.name = name
+        self.started = 0
+
+    def __enter__(self) -> '_PhaseTimer':
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.trace.add_phase_ns(self.name, time.perf_counter_ns() - self.started)
+        return False
+
+
+class MatchTrace:
+    """一次匹配的按列追踪缓冲区"""
+
+    def __init__(self, resume_name: str = '', query: str = ''):
+        self.resume_name = resume_name
+        self.query = query
+        self.created_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.phase_ns: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.job_ids: List[str] = []
+        self.outcomes: List[str] = []
+        # 未计算的分数记为 NaN
+        self.upper_bounds = array('d')
+        self.overall_scores = array('d')
+        self.dimensions = {name: array('d') for name in DIMENSIONS}
+        self.score_ns = array('q')
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    # ------------------------------------------------------------------ 记录
+
+    def phase(self, name: str) -> _PhaseTimer:
+        """阶段计时：with trace.phase('search'): ..."""
+        return _PhaseTimer(self, name)
+
+    def add_phase_ns(self, name: str, elapsed_ns: int) -> None:
+        self.phase_ns[name] = self.phase_ns.get(name, 0) + elapsed_ns
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self,
+               job_id: str,
+               outcome: str,
+               upper_bound: Optional[float] = None,
+               overall_score: Optional[float] = None,
+               dimension_scores: Optional[Dict[str, float]] = None,
+               score_ns: int = 0) -> int:
+        """记录一个候选职位，返回行号"""
+        dimension_scores = dimension_scores or {}
+        index = len(self.job_ids)
+        self.job_ids.append(job_id)
+        self.outcomes.append(outcome)
+        self.upper_bounds.append(math.nan if upper_bound is None else upper_bound)
+        self.overall_scores.append(math.nan if overall_score is None else overall_score)
+        for name in DIMENSIONS:
+            value = dimension_scores.get(name)
+            self.dimensions[name].append(math.nan if value is None else value)
+        self.score_ns.append(score_ns)
+        self._rows[job_id] = index
+        return index
+
+    def mark_selected(self, job_ids: Iterable[str]) -> None:
+        """把进入最终结果的职位标记为 selected"""
+        for job_id in job_ids:
+            index = self._rows.get(job_id)
+            if index is not None:
+                self.outcomes[index] = OUTCOME_SELECTED
+
+    # ------------------------------------------------------------------ 导出
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """按列导出（NaN 转为 None）"""
+        def column(values) -> List[Optional[float]]:
+            return [None if math.isnan(value) else value for value in values]
+
+        columns = {
+            'job_id': list(self.job_ids),
+            'outcome': list(self.outcomes),
+            'upper_bound': column(self.upper_bounds),
+            'overall_score': column(self.overall_scores),
+        }
+        for name in DIMENSIONS:
+            columns[name] = column(self.dimensions[name])
+        columns['score_ms'] = [value / 1e6 for value in self.score_ns]
+        return columns
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """按行导出"""
+        columns = self.to_columns()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    def summary(self) -> Dict[str, Any]:
+        """各阶段耗时、候选去向和计数（可JSON序列化）"""
+        phases = {name: round(self.phase_ns[name] / 1e6, 3) for name in PHASES if name in self.phase_ns}
+        phases.update({name: round(value / 1e6, 3) for name, value in self.phase_ns.items() if name not in phases})
+        return {
+            'resume_name': self.resume_name,
+            'created_at': self.created_at,
+            'candidates': len(self),
+            'outcomes': dict(Counter(self.outcomes)),
+            'phases_ms': phases,
+            'counters': dict(self.counters)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), 'query': self.query, 'jobs': self.to_columns()}
+
+    def dump(self, path: str) -> str:
+        """
+        导出追踪结果
+
+        .parquet 文件每行一个候选职位（阶段耗时写入文件元数据），其余后缀写 JSON。
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.suffix == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.table(self.to_columns())
+            metadata = dict(table.schema.metadata or {})
+            metadata[b'match_trace'] = json.dumps({**self.summary(), 'query': self.query},
+                                                  ensure_ascii=False).encode('utf-8')
+            pq.write_table(table.replace_schema_metadata(metadata), str(target))
+        else:
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return str(target)
@@ -6,15 +6,14 @@
 
 import asyncio
 import time
-import schedule
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-import sqlite3
 import json
 
 from ..utils.logger import get_logger
 from ..database.operations import DatabaseManager
+from ..database.matching_stats import MatchingStatsStore
 from .generic_resume_matcher import GenericResumeJobMatcher
 from .generic_resume_models import GenericResumeProfile
 from ..rag.vector_manager import ChromaDBManager
@@ -62,6 +61,9 @@ class MatchingMonitor:
         # 初始化匹配器
         self.matcher = GenericResumeJobMatcher(vector_manager, config)
         
+        # 聚合计数（由触发器增量维护，检查时只读一行）
+        self.stats_store = MatchingStatsStore(db_manager, self.config.get('matching_stats', {}))
+        
         # 统计历史
         self.stats_history: List[MatchingStats] = []
         self.alerts: List[MatchingAlert] = []
@@ -107,39 +109,21 @@ class MatchingMonitor:
             raise
     
     async def _collect_database_stats(self) -> MatchingStats:
-        """收集数据库统计信息"""
+        """收集数据库统计信息（读取触发器维护的聚合计数，不再全表扫描）"""
         try:
-            conn = sqlite3.connect(self.db_manager.db_path)
-            cursor = conn.cursor()
-            
-            # 总职位数
-            cursor.execute("SELECT COUNT(*) FROM jobs")
-            total_jobs = cursor.fetchone()[0]
-            
-            # 总匹配数
-            cursor.execute("SELECT COUNT(*) FROM resume_matches")
-            total_matches = cursor.fetchone()[0]
-            
-            # 平均匹配分数
-            cursor.execute("SELECT AVG(match_score) FROM resume_matches WHERE match_score > 0")
-            avg_score_result = cursor.fetchone()[0]
-            avg_score = avg_score_result if avg_score_result else 0.0
-            
-            # 高质量匹配数（分数 >= 0.7）
-            cursor.execute("SELECT COUNT(*) FROM resume_matches WHERE match_score >= 0.7")
-            high_quality_matches = cursor.fetchone()[0]
+            counters = self.stats_store.read()
+            total_jobs = counters['total_jobs']
+            total_matches = counters['total_matches']
             
             # 计算匹配率
             match_rate = total_matches / total_jobs if total_jobs > 0 else 0.0
             
-            conn.close()
-            
             return MatchingStats(
                 total_jobs=total_jobs,
                 total_matches=total_matches,
                 match_rate=match_rate,
-                avg_score=avg_score,
-                high_quality_matches=high_quality_matches
+                avg_score=counters['avg_score'],
+                high_quality_matches=counters['high_quality_matches']
             )
             
         except Exception as e:
@@ -247,19 +231,8 @@ class MatchingMonitor:
         try:
             self.logger.info("🔧 开始修复低匹配率问题")
             
-            # 1. 获取未匹配的职位
-            conn = sqlite3.connect(self.db_manager.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT job_id FROM jobs 
-                WHERE job_id NOT IN (SELECT DISTINCT job_id FROM resume_matches)
-                AND rag_processed = 1
-                LIMIT 50
-            """)
-            
-            unmatched_jobs = [row[0] for row in cursor.fetchall()]
-            conn.close()
+            # 1. 获取未匹配的职位（反连接走 resume_matches.job_id 索引）
+            unmatched_jobs = self.stats_store.unmatched_job_ids()
             
             if not unmatched_jobs:
                 self.logger.info("没有找到未匹配的已处理职位")
@@ -270,13 +243,13 @@ class MatchingMonitor:
             # 2. 创建默认简历档案（这里应该从实际简历数据创建）
             resume_profile = await self._get_default_resume_profile()
             
-            # 3. 重新运行匹配
-            result = await self.matcher.find_matching_jobs(resume_profile, top_k=len(unmatched_jobs))
+            # 3. 只对未匹配职位打分（不再回到全量职位库检索）
+            matches = await self.matcher.score_jobs(resume_profile, unmatched_jobs)
             
             # 4. 保存匹配结果
-            if result.matches:
-                await self._save_match_results(result.matches)
-                self.logger.info(f"✅ 重新匹配完成，新增 {len(result.matches)} 个匹配")
+            if matches:
+                await self._save_match_results(matches)
+                self.logger.info(f"✅ 重新匹配完成，新增 {len(matches)} 个匹配")
             
         except Exception as e:
             self.logger.error(f"修复低匹配率失败: {str(e)}")
@@ -315,55 +288,34 @@ class MatchingMonitor:
         )
     
     async def _save_match_results(self, matches: List):
-        """保存匹配结果到数据库"""
-        try:
-            conn = sqlite3.connect(self.db_manager.db_path)
-            cursor = conn.cursor()
-            
-            for match in matches:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO resume_matches 
-                    (job_id, resume_profile_id, match_score, priority_level, 
-                     semantic_score, skill_match_score, experience_match_score, 
-                     location_match_score, salary_match_score, match_details, 
-                     match_reasons, created_at, processed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), 0)
-                """, (
-                    match.job_id,
-                    'default',
-                    match.overall_score,
-                    match.match_level.value if hasattr(match.match_level, 'value') else str(match.match_level),
-                    match.dimension_scores.get('semantic_similarity', 0),
-                    match.dimension_scores.get('skills_match', 0),
-                    match.dimension_scores.get('experience_match', 0),
-                    match.dimension_scores.get('industry_match', 0),
-                    match.dimension_scores.get('salary_match', 0),
-                    json.dumps(match.dimension_scores),
-                    f"自动匹配修复: {match.job_title} at {match.company}"
-                ))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            self.logger.error(f"保存匹配结果失败: {str(e)}")
+        """保存匹配结果到数据库（按 job_id + resume_profile_id 更新或插入，不产生重复记录）"""
+        for match in matches:
+            saved = self.db_manager.save_resume_match({
+                'job_id': match.job_id,
+                'resume_profile_id': 'default',
+                'match_score': match.overall_score,
+                'priority_level': match.match_level.value if hasattr(match.match_level, 'value') else str(match.match_level),
+                'semantic_score': match.dimension_scores.get('semantic_similarity', 0),
+                'skill_match_score': match.dimension_scores.get('skills_match', 0),
+                'experience_match_score': match.dimension_scores.get('experience_match', 0),
+                'location_match_score': match.dimension_scores.get('industry_match', 0),
+                'salary_match_score': match.dimension_scores.get('salary_match', 0),
+                'match_details': json.dumps(match.dimension_scores),
+                'match_reasons': f"自动匹配修复: {match.job_title} at {match.company}"
+            })
+            if not saved:
+                self.logger.error(f"保存匹配结果失败: {match.job_id}")
     
-    def start_scheduled_monitoring(self):
-        """启动定时监控"""
+    async def start_scheduled_monitoring(self):
+        """启动定时监控（立即检查一次，之后每隔 check_interval_hours 检查一次）"""
         self.logger.info(f"🕐 启动定时匹配监控，检查间隔: {self.check_interval_hours}小时")
         
-        # 设置定时任务
-        schedule.every(self.check_interval_hours).hours.do(
-            lambda: asyncio.create_task(self.run_matching_check())
-        )
-        
-        # 立即执行一次检查
-        asyncio.create_task(self.run_matching_check())
-        
-        # 运行调度器
         while True:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次调度
+            try:
+                await self.run_matching_check()
+            except Exception as e:
+                self.logger.error(f"定时匹配检查失败: {str(e)}")
+            await asyncio.sleep(self.check_interval_hours * 3600)
     
     def get_monitoring_report(self) -> Dict[str, Any]:
         """获取监控报告"""
@@ -440,9 +392,10 @@ class MatchingMonitor:
 
 # 独立运行脚本
 async def main():
-    """主函数"""
+    """主函数（--schedule 时按 check_interval_hours 持续定时检查）"""
     import sys
     import os
+    import argparse
     
     # 添加项目根目录到路径
     sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -450,6 +403,10 @@ async def main():
     from src.database.operations import DatabaseManager
     from src.rag.vector_manager import ChromaDBManager
     
+    parser = argparse.ArgumentParser(description='匹配质量监控')
+    parser.add_argument('--schedule', action='store_true', help='启动定时监控（按检查间隔持续运行）')
+    args = parser.parse_args()
+    
     # 初始化组件
     db_manager = DatabaseManager('data/jobs.db')
     vector_manager = ChromaDBManager()
@@ -457,6 +414,10 @@ async def main():
     # 创建监控器
     monitor = MatchingMonitor(db_manager, vector_manager)
     
+    if args.schedule:
+        await monitor.start_scheduled_monitoring()
+        return
+    
     # 运行检查
     stats = await monitor.run_matching_check()
     
@@ -12,6 +12,7 @@ from langchain.schema import Document
 import numpy as np
 
 from ..utils.logger import get_logger
+from ..rag.job_features import parse_skill_list
 from .generic_resume_models import (
     GenericResumeProfile, JobMatchResult, MatchAnalysis,
     create_default_skill_weights, DEFAULT_MATCHING_WEIGHTS,
@@ -413,11 +414,15 @@ class MultiDimensionalScorer:
     
     def _extract_job_skills(self, job_documents: List[Document], job_metadata: Dict[str, Any]) -> List[str]:
         """提取职位技能要求"""
+        # 导入时已提取的技能直接使用
+        if job_metadata.get('job_features') is not None:
+            return list(job_metadata['job_features'].skills)
+        
         skills = []
         
         # 从元数据中提取
         if 'skills' in job_metadata:
-            skills.extend(job_metadata['skills'])
+            skills.extend(parse_skill_list(job_metadata['skills']))
         
         # 从文档内容中提取
         job_text = " ".join([doc.page_content for doc in job_documents])
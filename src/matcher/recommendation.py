@@ -13,7 +13,9 @@ from collections import defaultdict, Counter
 
 from ..rag.vector_manager import ChromaDBManager
 from ..rag.semantic_search import SemanticSearchEngine
+from ..rag.job_features import find_job_features, parse_skill_list
 from .semantic_scorer import SemanticScorer
+from .topk import BoundedTopK
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +35,11 @@ class JobRecommendationEngine:
         self.config = config or {}
         
         # 初始化组件
-        self.search_engine = SemanticSearchEngine(vector_manager, config.get('search', {}))
-        self.semantic_scorer = SemanticScorer(config.get('scorer', {}))
+        self.search_engine = SemanticSearchEngine(vector_manager, self.config.get('search', {}))
+        self.semantic_scorer = SemanticScorer(self.config.get('scorer', {}))
+        
+        # 批量检索：各策略的查询一次向量化、并发检索（关闭时逐条串行搜索）
+        self.batched_retrieval = self.config.get('batched_retrieval', True)
         
         # 推荐策略配置
         self.recommendation_strategies = {
@@ -106,6 +111,12 @@ class JobRecommendationEngine:
                                     k: int, filters: Dict = None) -> List[Dict[str, Any]]:
         """基于内容的推荐"""
         
+        queries = self._content_based_queries(user_profile, k)
+        return self._recommend_from_queries(queries, user_profile, filters, k)
+    
+    def _content_based_queries(self, user_profile: Dict[str, Any], k: int) -> List[Tuple[str, str, int]]:
+        """基于内容推荐的搜索请求：技能、期望职位和经验组成一个混合搜索查询"""
+        
         # 构建查询文本
         query_parts = []
         
@@ -128,62 +139,37 @@ class JobRecommendationEngine:
         
         query = ' '.join(query_parts)
         
-        # 执行搜索
-        search_results = self.search_engine.search(
-            query=query,
-            strategy='hybrid',
-            k=k,
-            filters=filters
-        )
-        
-        # 按职位分组并计算推荐分数
-        recommendations = self._group_and_score_results(search_results, user_profile)
-        
-        return recommendations
+        return [(query, 'hybrid', k)]
     
     def _collaborative_recommendation(self, user_profile: Dict[str, Any], 
                                     k: int, filters: Dict = None) -> List[Dict[str, Any]]:
         """协同过滤推荐（简化版）"""
         
+        queries = self._collaborative_queries(user_profile, k)
+        return self._recommend_from_queries(queries, user_profile, filters, k)
+    
+    def _collaborative_queries(self, user_profile: Dict[str, Any], k: int) -> List[Tuple[str, str, int]]:
+        """协同过滤推荐的搜索请求"""
+        
         # 由于缺乏用户行为数据，这里实现一个简化的协同过滤
         # 基于相似技能背景的用户喜欢的职位类型
         
-        user_skills = set(skill.lower() for skill in user_profile.get('skills', []))
-        
-        # 搜索包含相似技能的职位
-        recommendations = []
+        user_skills = dict.fromkeys(skill.lower() for skill in user_profile.get('skills', []))
         
-        for skill in list(user_skills)[:3]:  # 最多使用3个技能
-            skill_results = self.search_engine.search(
-                query=skill,
-                strategy='similarity',
-                k=k // 3,
-                filters=filters
-            )
-            recommendations.extend(skill_results)
-        
-        # 去重并评分
-        unique_recommendations = self._deduplicate_results(recommendations)
-        scored_recommendations = self._group_and_score_results(unique_recommendations, user_profile)
-        
-        return scored_recommendations
+        # 搜索包含相似技能的职位，最多使用3个技能
+        return [(skill, 'similarity', max(1, k // 3)) for skill in list(user_skills)[:3]]
     
     def _hybrid_recommendation(self, user_profile: Dict[str, Any], 
                              k: int, filters: Dict = None) -> List[Dict[str, Any]]:
         """混合推荐策略"""
         
-        # 获取不同策略的推荐结果
-        content_recs = self._content_based_recommendation(user_profile, k // 2, filters)
-        collaborative_recs = self._collaborative_recommendation(user_profile, k // 2, filters)
-        
-        # 合并结果
-        all_recommendations = content_recs + collaborative_recs
-        
-        # 去重
-        unique_recommendations = self._deduplicate_results(all_recommendations)
+        # 合并不同策略的搜索请求，一次检索、一次分组评分
+        queries = (self._content_based_queries(user_profile, k // 2) +
+                   self._collaborative_queries(user_profile, k // 2))
+        recommendations = self._recommend_from_queries(queries, user_profile, filters, k)
         
         # 重新评分
-        final_recommendations = self._rescore_hybrid_results(unique_recommendations, user_profile)
+        final_recommendations = self._rescore_hybrid_results(recommendations, user_profile)
         
         return final_recommendations[:k]
     
@@ -197,27 +183,41 @@ class JobRecommendationEngine:
         recent_filters = filters.copy() if filters else {}
         # 这里可以添加时间过滤条件
         
-        # 搜索热门技能相关职位
-        trending_skills = ['python', 'ai', 'machine learning', 'react', 'cloud']
-        
-        recommendations = []
-        for skill in trending_skills:
-            skill_results = self.search_engine.search(
-                query=skill,
-                strategy='similarity',
-                k=k // len(trending_skills),
-                filters=recent_filters
-            )
-            recommendations.extend(skill_results)
+        queries = self._trending_queries(user_profile, k)
+        return self._recommend_from_queries(queries, user_profile, recent_filters, k)
+    
+    def _trending_queries(self, user_profile: Dict[str, Any], k: int) -> List[Tuple[str, str, int]]:
+        """热门趋势推荐的搜索请求：每个热门技能一个查询"""
         
-        # 评分和排序
-        scored_recommendations = self._group_and_score_results(recommendations, user_profile)
+        trending_skills = ['python', 'ai', 'machine learning', 'react', 'cloud']
+        return [(skill, 'similarity', max(1, k // len(trending_skills))) for skill in trending_skills]
+    
+    def _recommend_from_queries(self, queries: List[Tuple[str, str, int]], user_profile: Dict[str, Any],
+                                filters: Dict = None, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """执行搜索请求，合并全部结果后按职位分组评分，保留分数最高的 top_k 个"""
         
-        return scored_recommendations
+        if self.batched_retrieval:
+            result_lists = self.search_engine.search_batch(queries, filters)
+        else:
+            result_lists = [
+                self.search_engine.search(query=query, strategy=strategy, k=k, filters=filters)
+                for query, strategy, k in queries
+            ]
+        
+        # 多个查询命中的同一文档只计一次
+        merged_results = {}
+        for results in result_lists:
+            for result in results:
+                metadata = result.get('metadata', {})
+                doc_key = metadata.get('doc_id') or (metadata.get('job_id'), result.get('content'))
+                merged_results.setdefault(doc_key, result)
+        
+        return self._group_and_score_results(list(merged_results.values()), user_profile, top_k)
     
     def _group_and_score_results(self, search_results: List[Dict[str, Any]], 
-                               user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """按职位分组并计算推荐分数"""
+                               user_profile: Dict[str, Any],
+                               top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按职位分组并计算推荐分数，只为分数最高的 top_k 个（默认全部）生成推荐结果"""
         
         # 按职位ID分组
         jobs_by_id = defaultdict(list)
@@ -229,23 +229,38 @@ class JobRecommendationEngine:
             if job_id:
                 jobs_by_id[job_id].append(result)
         
-        # 计算每个职位的推荐分数
-        recommendations = []
+        # 计算每个职位的推荐分数，有界堆只保留前 top_k
+        top_heap = BoundedTopK(len(jobs_by_id) if top_k is None else top_k)
         
-        for job_id, job_docs in jobs_by_id.items():
-            recommendation = self._calculate_recommendation_score(job_docs, user_profile)
-            if recommendation:
-                recommendations.append(recommendation)
+        for order, job_docs in enumerate(jobs_by_id.values()):
+            scored = self._score_recommendation(job_docs, user_profile)
+            if scored:
+                top_heap.push(round(scored[0], 3), order, scored)
         
-        # 按推荐分数排序
-        recommendations.sort(key=lambda x: x['recommendation_score'], reverse=True)
-        
-        return recommendations
+        # 按推荐分数降序组装推荐结果
+        return [self._build_recommendation(job_info, scores, score)
+                for _, (score, job_info, scores) in top_heap.items()]
     
     def _calculate_recommendation_score(self, job_docs: List[Dict[str, Any]], 
                                       user_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """计算单个职位的推荐分数"""
         
+        scored = self._score_recommendation(job_docs, user_profile)
+        if not scored:
+            return None
+        
+        recommendation_score, job_info, scores = scored
+        return self._build_recommendation(job_info, scores, recommendation_score)
+    
+    def _score_recommendation(self, job_docs: List[Dict[str, Any]], 
+                              user_profile: Dict[str, Any]) -> Optional[Tuple[float, Dict[str, Any], Dict[str, float]]]:
+        """
+        计算单个职位的各维度分数和综合推荐分数
+        
+        Returns:
+            (推荐分数, 职位信息, 各维度分数)；失败时返回None
+        """
+        
         try:
             if not job_docs:
                 return None
@@ -280,22 +295,28 @@ class JobRecommendationEngine:
                 for dimension in scores
             )
             
-            return {
-                'job_id': job_info['job_id'],
-                'job_title': job_info['job_title'],
-                'company': job_info['company'],
-                'location': job_info.get('location'),
-                'salary_range': job_info.get('salary_range'),
-                'recommendation_score': round(recommendation_score, 3),
-                'dimension_scores': {k: round(v, 3) for k, v in scores.items()},
-                'job_info': job_info,
-                'timestamp': datetime.now().isoformat()
-            }
+            return recommendation_score, job_info, scores
             
         except Exception as e:
             logger.error(f"计算推荐分数失败: {e}")
             return None
     
+    def _build_recommendation(self, job_info: Dict[str, Any], scores: Dict[str, float],
+                              recommendation_score: float) -> Dict[str, Any]:
+        """组装推荐结果"""
+        
+        return {
+            'job_id': job_info['job_id'],
+            'job_title': job_info['job_title'],
+            'company': job_info['company'],
+            'location': job_info.get('location'),
+            'salary_range': job_info.get('salary_range'),
+            'recommendation_score': round(recommendation_score, 3),
+            'dimension_scores': {k: round(v, 3) for k, v in scores.items()},
+            'job_info': job_info,
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def _extract_job_info_from_docs(self, job_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """从职位文档中提取信息"""
         
@@ -328,7 +349,7 @@ class JobRecommendationEngine:
             
             # 技能信息
             if metadata.get('skills'):
-                job_info['skills'].extend(metadata['skills'])
+                job_info['skills'].extend(parse_skill_list(metadata['skills']))
             
             # 内容信息
             doc_type = metadata.get('type')
@@ -339,8 +360,13 @@ class JobRecommendationEngine:
             elif doc_type == 'requirement':
                 job_info['requirements'].append(content)
         
-        # 去重技能
-        job_info['skills'] = list(set(job_info['skills']))
+        # 导入时已提取的特征直接使用，否则对文档元数据中的技能去重
+        features = find_job_features(doc.get('metadata', {}) for doc in job_docs)
+        if features is not None:
+            job_info['skills'] = list(features.skills)
+            job_info['required_years'] = features.required_years
+        else:
+            job_info['skills'] = list(set(job_info['skills']))
         
         return job_info
     
@@ -378,11 +404,15 @@ class JobRecommendationEngine:
         if not job_experience or job_experience == '不限':
             return 1.0
         
-        # 提取职位要求的年限
-        required_years = self._extract_years_from_text(job_experience)
+        # 提取职位要求的年限（导入时已解析的直接使用）
+        required_years = job_info.get('required_years')
+        if required_years is None:
+            required_years = self._extract_years_from_text(job_experience)
         
         if required_years is None:
             return 0.8
+        if required_years == 0:
+            return 1.0
         
         if user_years >= required_years:
             # 经验超出要求，但不要过度奖励
@@ -11,6 +11,8 @@ from datetime import datetime
 import re
 from collections import Counter
 
+from ..rag.job_features import find_job_features, parse_skill_list
+
 logger = logging.getLogger(__name__)
 
 
@@ -217,16 +219,17 @@ class SemanticScorer:
     def _extract_job_keywords(self, job_documents: List[Dict[str, Any]]) -> List[str]:
         """提取职位关键词"""
         
-        keywords = []
+        # 导入时已提取的技能直接使用，不再逐个文档解析元数据
+        features = find_job_features(doc.get('metadata', {}) for doc in job_documents)
+        keywords = list(features.skills) if features is not None else []
         
         for doc in job_documents:
             metadata = doc.get('metadata', {})
             content = doc.get('content', '')
             
             # 从元数据提取技能
-            skills = metadata.get('skills', [])
-            if skills:
-                keywords.extend([skill.lower().strip() for skill in skills])
+            if features is None:
+                keywords.extend([skill.lower() for skill in parse_skill_list(metadata.get('skills'))])
             
             # 从内容提取关键词
             if content:
@@ -374,6 +377,11 @@ class SemanticScorer:
         
         resume_years = resume_data.get('experience_years', 0)
         
+        # 导入时已解析的经验年限
+        features = find_job_features(doc.get('metadata', {}) for doc in job_documents)
+        if features is not None and features.required_years is not None:
+            return self._score_experience_years(resume_years, features.required_years)
+        
         # 从职位文档中提取经验要求
         job_experience_requirements = []
         for doc in job_documents:
@@ -390,17 +398,21 @@ class SemanticScorer:
         for req in job_experience_requirements:
             required_years = self._extract_years_from_requirement(req)
             if required_years is not None:
-                if resume_years >= required_years:
-                    match_scores.append(1.0)
-                elif resume_years >= required_years * 0.8:
-                    match_scores.append(0.8)
-                elif resume_years >= required_years * 0.5:
-                    match_scores.append(0.5)
-                else:
-                    match_scores.append(0.2)
+                match_scores.append(self._score_experience_years(resume_years, required_years))
         
         return max(match_scores) if match_scores else 0.5
     
+    def _score_experience_years(self, resume_years: float, required_years: int) -> float:
+        """按工作年限与要求年限的比例评分"""
+        if resume_years >= required_years:
+            return 1.0
+        elif resume_years >= required_years * 0.8:
+            return 0.8
+        elif resume_years >= required_years * 0.5:
+            return 0.5
+        else:
+            return 0.2
+    
     def _extract_years_from_requirement(self, requirement: str) -> Optional[int]:
         """从经验要求中提取年限"""
         
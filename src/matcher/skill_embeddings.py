@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+技能嵌入表
+
+技能是否等价原本只由 _is_skill_matched 中的精确匹配、中英文映射、变体映射和子串规则逐对判断，
+手写映射之外的同义词无法识别，且每个职位技能都要对全部简历技能走一遍 Python 循环。
+这里用配置的嵌入模型把规范技能（技能关键词、技能权重、映射和变体中的技能）各向量化一次，
+归一化后保存为内存映射的 float32 矩阵；匹配时对职位技能 × 简历技能做一次矩阵乘法，
+余弦相似度达到阈值即视为匹配。表外技能按需向量化并缓存在进程内。
+
+文件结构（table_dir 下）:
+    skill_embeddings.json  元信息（模型、维度、技能数、构建时间）
+    skill_vectors.npy      归一化技能向量矩阵（np.load(mmap_mode='r') 映射读取）
+    skill_names.json       行号 -> 技能名（小写）
+"""
+
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'skill_embeddings.json'
+VECTORS_FILE = 'skill_vectors.npy'
+NAMES_FILE = 'skill_names.json'
+
+# embed_fn(texts) -> 向量列表，例如 Embeddings.embed_documents
+EmbedFunction = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def normalize_skill(skill: str) -> str:
+    """技能名的规范形式（小写、去首尾空白）"""
+    return str(skill).lower().strip()
+
+
+def collect_canonical_skills(*groups: Iterable[str]) -> List[str]:
+    """合并多组技能名，规范化并按首次出现的顺序去重"""
+    skills: Dict[str, None] = {}
+    for group in groups:
+        for skill in group:
+            name = normalize_skill(skill)
+            if name:
+                skills.setdefault(name, None)
+    return list(skills)
+
+
+def embedding_model_id(embeddings_config: Dict[str, Any]) -> str:
+    """嵌入配置对应的模型标识（本地模型路径优先），用于判断技能表是否由当前模型构建"""
+    return str(embeddings_config.get('local_model_path') or embeddings_config.get('model_name') or '')
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+
+class SkillEmbeddingTable:
+    """内存映射的规范技能向量表"""
+
+    def __init__(self, table_dir: str, embed_fn: Optional[EmbedFunction] = None, cache_size: int = 4096):
+        """
+        Args:
+            table_dir: 技能表目录
+            embed_fn: 表外技能的向量化函数（None 表示表外技能不参与向量匹配）
+            cache_size: 表外技能向量缓存的最大条数
+        """
+        self.table_dir = Path(table_dir)
+        self.embed_fn = embed_fn
+        self.cache_size = cache_size
+        self.meta: Dict[str, Any] = {}
+        self.names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = None
+        self._extra: Dict[str, Optional[np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ 构建
+
+    @classmethod
+    def build(cls, table_dir: str, skills: Iterable[str], embed_fn: EmbedFunction,
+              model: str = '', batch_size: int = 256) -> 'SkillEmbeddingTable':
+        """
+        向量化规范技能并写入技能表
+
+        Args:
+            table_dir: 技能表目录
+            skills: 规范技能名（规范化并去重后写入）
+            embed_fn: 向量化函数
+            model: 嵌入模型标识（见 embedding_model_id）
+            batch_size: 每批向量化的技能数
+
+        Returns:
+            SkillEmbeddingTable: 已加载的技能表（表外技能同样使用 embed_fn）
+        """
+        started = time.perf_counter()
+        names = collect_canonical_skills(skills)
+        if not names:
+            raise ValueError("技能列表为空，无法构建技能嵌入表")
+
+        target = Path(table_dir)
+        target.mkdir(parents=True, exist_ok=True)
+
+        vectors = None
+        for start in range(0, len(names), batch_size):
+            matrix = _normalize_rows(np.asarray(embed_fn(names[start:start + batch_size]), dtype=np.float32))
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(target / f'{VECTORS_FILE}.tmp', mode='w+', dtype=np.float32,
+                                                    shape=(len(names), matrix.shape[1]))
+            vectors[start:start + len(matrix)] = matrix
+        dim = vectors.shape[1]
+        vectors.flush()
+        del vectors
+        (target / f'{VECTORS_FILE}.tmp').replace(target / VECTORS_FILE)
+
+        with open(target / NAMES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(names, f, ensure_ascii=False)
+
+        meta = {
+            'model': model,
+            'dim': dim,
+            'rows': len(names),
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'build_seconds': round(time.perf_counter() - started, 3)
+        }
+        with open(target / META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"技能嵌入表构建完成: {len(names)} 个技能, {dim} 维, 耗时 {meta['build_seconds']} 秒")
+        return cls(table_dir, embed_fn).load()
+
+    # ------------------------------------------------------------------ 加载与匹配
+
+    @staticmethod
+    def exists(table_dir: str) -> bool:
+        return (Path(table_dir) / META_FILE).exists()
+
+    def load(self) -> 'SkillEmbeddingTable':
+        """以内存映射方式加载技能表"""
+        with open(self.table_dir / META_FILE, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(self.table_dir / NAMES_FILE, 'r', encoding='utf-8') as f:
+            self.names = json.load(f)
+        self._rows = {name: row for row, name in enumerate(self.names)}
+        self._vectors = np.load(self.table_dir / VECTORS_FILE, mmap_mode='r')
+        return self
+
+    @property
+    def rows(self) -> int:
+        return len(self.names)
+
+    @property
+    def dim(self) -> int:
+        return int(self.meta.get('dim', 0))
+
+    @property
+    def model(self) -> str:
+        return self.meta.get('model', '')
+
+    def __contains__(self, skill: str) -> bool:
+        return normalize_skill(skill) in self._rows
+
+    def _embed_missing(self, names: List[str]) -> None:
+        """向量化表外技能并写入缓存（失败或维度不一致时记为无向量）"""
+        missing = [name for name in dict.fromkeys(names) if name not in self._extra]
+        if not missing:
+            return
+        vectors: List[Optional[np.ndarray]] = [None] * len(missing)
+        if self.embed_fn is not None:
+            try:
+                matrix = np.asarray(self.embed_fn(missing), dtype=np.float32)
+                if matrix.ndim == 2 and matrix.shape[1] == self.dim:
+                    vectors = list(_normalize_rows(matrix))
+                else:
+                    logger.warning(f"表外技能向量维度 {matrix.shape} 与技能表 ({self.dim}) 不一致，跳过向量匹配")
+            except Exception as e:
+                logger.warning(f"表外技能向量化失败: {e}")
+        with self._lock:
+            if len(self._extra) + len(missing) > self.cache_size:
+                self._extra.clear()
+            self._extra.update(zip(missing, vectors))
+
+    def vectors(self, skills: Sequence[str]) -> np.ndarray:
+        """
+        技能向量矩阵（表外且无法向量化的技能为零向量，与任何技能的相似度都为0）
+
+        Returns:
+            np.ndarray: (len(skills), dim) 的 float32 矩阵
+        """
+        names = [normalize_skill(skill) for skill in skills]
+        matrix = np.zeros((len(names), self.dim), dtype=np.float32)
+        table_rows = [(index, self._rows[name]) for index, name in enumerate(names) if name in self._rows]
+        if table_rows:
+            indices, rows = zip(*table_rows)
+            matrix[list(indices)] = self._vectors[list(rows)]
+
+        missing = [name for name in names if name not in self._rows]
+        if missing:
+            self._embed_missing(missing)
+            for index, name in enumerate(names):
+                vector = self._extra.get(name) if name not in self._rows else None
+                if vector is not None:
+                    matrix[index] = vector
+        return matrix
+
+    def similarity(self, job_skills: Sequence[str], resume_skills: Sequence[str]) -> np.ndarray:
+        """职位技能 × 简历技能的余弦相似度矩阵"""
+        if not job_skills or not resume_skills:
+            return np.zeros((len(job_skills), len(resume_skills)), dtype=np.float32)
+        # 两侧一起取向量，表外技能只向量化一次
+        matrix = self.vectors(list(job_skills) + list(resume_skills))
+        return matrix[:len(job_skills)] @ matrix[len(job_skills):].T
+
+    def match(self, job_skills: Sequence[str], resume_skills: Sequence[str], threshold: float) -> List[bool]:
+        """每个职位技能是否有简历技能的余弦相似度达到阈值"""
+        if not job_skills:
+            return []
+        if not resume_skills:
+            return [False] * len(job_skills)
+        return (self.similarity(job_skills, resume_skills).max(axis=1) >= threshold).tolist()
@@ -7,13 +7,16 @@
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 import asyncio
+import time
 from datetime import datetime
 import json
 import numpy as np
 
 from ..rag.vector_manager import ChromaDBManager
 from ..rag.semantic_search import SemanticSearchEngine
+from ..rag.job_features import find_job_features, parse_skill_list
 from .semantic_scorer import SemanticScorer
+from .topk import BoundedTopK
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +36,8 @@ class SmartMatchingEngine:
         self.config = config or {}
         
         # 初始化组件
-        self.search_engine = SemanticSearchEngine(vector_manager, config.get('search', {}))
-        self.semantic_scorer = SemanticScorer(config.get('scorer', {}))
+        self.search_engine = SemanticSearchEngine(vector_manager, self.config.get('search', {}))
+        self.semantic_scorer = SemanticScorer(self.config.get('scorer', {}))
         
         # 匹配权重配置
         self.weights = self.config.get('weights', {
@@ -44,6 +47,9 @@ class SmartMatchingEngine:
             'salary_match': 0.1
         })
         
+        # 批量匹配时并发打分的简历数上限
+        self.batch_concurrency = self.config.get('batch_concurrency', 4)
+        
         # 匹配阈值
         self.thresholds = self.config.get('thresholds', {
             'excellent': 0.85,
@@ -82,23 +88,58 @@ class SmartMatchingEngine:
             # 3. 按职位分组
             jobs_by_id = self._group_results_by_job(search_results)
             
-            # 4. 计算匹配分数
-            matching_jobs = []
-            for job_id, job_docs in jobs_by_id.items():
-                match_result = await self._calculate_job_match(resume_data, job_docs)
-                if match_result:
-                    matching_jobs.append(match_result)
-            
-            # 5. 排序和筛选
-            matching_jobs.sort(key=lambda x: x['overall_score'], reverse=True)
-            
-            logger.info(f"简历匹配完成，找到 {len(matching_jobs)} 个匹配职位")
-            return matching_jobs[:k]
+            # 4. 计算匹配分数并取前k
+            return self._rank_jobs(resume_data, jobs_by_id, k)
             
         except Exception as e:
             logger.error(f"简历匹配失败: {e}")
             return []
     
+    def _rank_jobs(self, resume_data: Dict[str, Any], jobs_by_id: Dict[str, List[Dict]], k: int,
+                   job_infos: Dict[str, Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        为简历计算候选职位的匹配分数，返回前k个匹配结果
+        
+        语义分数直接来自检索结果，先据此得到分数上界，按上界降序打分，
+        有界堆只保留前k，进不了前k的职位不再提取信息和计算其他维度
+        
+        Args:
+            resume_data: 简历数据
+            jobs_by_id: 该简历检索到的职位文档（按职位分组）
+            k: 返回匹配职位数量
+            job_infos: 已提取的职位信息（批量匹配的共享候选池），缺失时从文档提取
+        """
+        candidates = []
+        for order, (job_id, job_docs) in enumerate(jobs_by_id.items()):
+            semantic_score = self._calculate_semantic_match(resume_data, job_docs)
+            candidates.append((round(self._score_upper_bound(semantic_score), 3), order, job_id, job_docs, semantic_score))
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        
+        top_heap = BoundedTopK(k)
+        scored_count = 0
+        for upper_bound, order, job_id, job_docs, semantic_score in candidates:
+            if upper_bound < top_heap.threshold:
+                break
+            if not top_heap.can_enter(upper_bound, order):
+                continue
+            
+            job_info = job_infos.get(job_id) if job_infos else None
+            job_scores = self._calculate_job_scores(resume_data, job_docs, semantic_score, job_info)
+            if job_scores:
+                scored_count += 1
+                top_heap.push(round(job_scores[1]['overall'], 3), order, job_scores)
+        
+        # 只为最终的前k生成匹配分析
+        matching_jobs = []
+        for _, (job_info, scores) in top_heap.items():
+            match_result = self._build_job_match(resume_data, job_info, scores)
+            if match_result:
+                matching_jobs.append(match_result)
+        
+        logger.info(f"简历匹配完成，{len(jobs_by_id)} 个候选职位中精确打分 {scored_count} 个，"
+                    f"返回 {len(matching_jobs)} 个匹配职位")
+        return matching_jobs
+    
     def _build_user_profile(self, resume_data: Dict[str, Any]) -> str:
         """构建用户画像查询文本"""
         
@@ -157,26 +198,52 @@ class SmartMatchingEngine:
                                  job_docs: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """计算单个职位的匹配度"""
         
+        job_scores = self._calculate_job_scores(
+            resume_data, job_docs, self._calculate_semantic_match(resume_data, job_docs)
+        )
+        if not job_scores:
+            return None
+        
+        job_info, scores = job_scores
+        return self._build_job_match(resume_data, job_info, scores)
+    
+    def _score_upper_bound(self, semantic_score: float) -> float:
+        """综合分数上界：除语义外的维度按满分1.0计"""
+        return semantic_score * self.weights['semantic_similarity'] + sum(
+            weight for dimension, weight in self.weights.items() if dimension != 'semantic_similarity'
+        )
+    
+    def _calculate_job_scores(self, resume_data: Dict[str, Any], job_docs: List[Dict[str, Any]],
+                              semantic_score: float,
+                              job_info: Dict[str, Any] = None) -> Optional[Tuple[Dict[str, Any], Dict[str, float]]]:
+        """
+        计算职位的各维度分数（不生成匹配分析）
+        
+        Args:
+            job_info: 已提取的职位信息，为空时从 job_docs 提取
+        
+        Returns:
+            (职位信息, 各维度及综合分数)；失败时返回None
+        """
+        
         try:
             if not job_docs:
                 return None
             
             # 获取职位基本信息
-            job_info = self._extract_job_info(job_docs)
-            
-            # 1. 语义相似度匹配
-            semantic_score = self._calculate_semantic_match(resume_data, job_docs)
+            if job_info is None:
+                job_info = self._extract_job_info(job_docs)
             
-            # 2. 技能匹配度
+            # 1. 技能匹配度
             skills_score = self._calculate_skills_match(resume_data, job_info)
             
-            # 3. 经验匹配度
+            # 2. 经验匹配度
             experience_score = self._calculate_experience_match(resume_data, job_info)
             
-            # 4. 薪资匹配度
+            # 3. 薪资匹配度
             salary_score = self._calculate_salary_match(resume_data, job_info)
             
-            # 5. 计算综合分数
+            # 4. 计算综合分数
             overall_score = (
                 semantic_score * self.weights['semantic_similarity'] +
                 skills_score * self.weights['skills_match'] +
@@ -184,16 +251,24 @@ class SmartMatchingEngine:
                 salary_score * self.weights['salary_match']
             )
             
-            # 6. 生成匹配分析
-            match_analysis = self._generate_match_analysis(
-                resume_data, job_info, {
-                    'semantic': semantic_score,
-                    'skills': skills_score,
-                    'experience': experience_score,
-                    'salary': salary_score,
-                    'overall': overall_score
-                }
-            )
+            return job_info, {
+                'semantic': semantic_score,
+                'skills': skills_score,
+                'experience': experience_score,
+                'salary': salary_score,
+                'overall': overall_score
+            }
+            
+        except Exception as e:
+            logger.error(f"计算职位匹配度失败: {e}")
+            return None
+    
+    def _build_job_match(self, resume_data: Dict[str, Any], job_info: Dict[str, Any],
+                         scores: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """生成匹配分析并组装匹配结果"""
+        
+        try:
+            match_analysis = self._generate_match_analysis(resume_data, job_info, scores)
             
             return {
                 'job_id': job_info['job_id'],
@@ -201,14 +276,14 @@ class SmartMatchingEngine:
                 'company': job_info['company'],
                 'location': job_info.get('location'),
                 'salary_range': job_info.get('salary_range'),
-                'overall_score': round(overall_score, 3),
+                'overall_score': round(scores['overall'], 3),
                 'dimension_scores': {
-                    'semantic_similarity': round(semantic_score, 3),
-                    'skills_match': round(skills_score, 3),
-                    'experience_match': round(experience_score, 3),
-                    'salary_match': round(salary_score, 3)
+                    'semantic_similarity': round(scores['semantic'], 3),
+                    'skills_match': round(scores['skills'], 3),
+                    'experience_match': round(scores['experience'], 3),
+                    'salary_match': round(scores['salary'], 3)
                 },
-                'match_level': self._get_match_level(overall_score),
+                'match_level': self._get_match_level(scores['overall']),
                 'match_analysis': match_analysis,
                 'timestamp': datetime.now().isoformat()
             }
@@ -254,7 +329,7 @@ class SmartMatchingEngine:
             
             # 技能信息
             if metadata.get('skills'):
-                job_info['skills'].extend(metadata['skills'])
+                job_info['skills'].extend(parse_skill_list(metadata['skills']))
             
             # 教育和经验要求
             if not job_info['education'] and metadata.get('education'):
@@ -271,8 +346,13 @@ class SmartMatchingEngine:
             elif doc_type == 'requirement':
                 job_info['requirements'].append(content)
         
-        # 去重技能
-        job_info['skills'] = list(set(job_info['skills']))
+        # 导入时已提取的特征直接使用，否则对文档元数据中的技能去重
+        features = find_job_features(doc.get('metadata', {}) for doc in job_docs)
+        if features is not None:
+            job_info['skills'] = list(features.skills)
+            job_info['required_years'] = features.required_years
+        else:
+            job_info['skills'] = list(set(job_info['skills']))
         
         return job_info
     
@@ -326,8 +406,10 @@ class SmartMatchingEngine:
         if not job_experience or job_experience == '不限':
             return 1.0  # 无经验要求，完全匹配
         
-        # 从职位经验要求中提取年限
-        required_years = self._extract_years_from_text(job_experience)
+        # 从职位经验要求中提取年限（导入时已解析的直接使用）
+        required_years = job_info.get('required_years')
+        if required_years is None:
+            required_years = self._extract_years_from_text(job_experience)
         
         if required_years is None:
             return 0.8  # 无法解析经验要求，给中等分数
@@ -474,40 +556,108 @@ class SmartMatchingEngine:
         return analysis
     
     async def batch_match_resumes(self, resumes_data: List[Dict[str, Any]], 
-                                filters: Dict = None, k: int = 10) -> List[Dict[str, Any]]:
-        """批量简历匹配"""
+                                filters: Dict = None, k: int = 10,
+                                max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """
+        批量简历匹配
         
-        results = []
+        全部简历的查询一次批量检索，检索到的职位组成共享候选池，每个职位只提取一次信息；
+        各简历按并发上限并发打分（语义分数仍取自该简历自己的检索结果）。
         
+        Args:
+            resumes_data: 简历数据列表
+            filters: 过滤条件
+            k: 每份简历返回的匹配职位数量
+            max_concurrency: 并发打分的简历数上限，默认取配置 batch_concurrency
+            
+        Returns:
+            List[Dict]: 与输入顺序一致的匹配结果，processing_time 为该简历的打分耗时（秒）
+        """
+        
+        if not resumes_data:
+            return []
+        
+        start_time = time.time()
+        
+        # 1. 构建全部查询，一次批量检索
+        queries = {}
+        errors = {}
         for i, resume_data in enumerate(resumes_data):
             try:
-                matches = await self.match_resume_to_jobs(
-                    resume_data=resume_data,
-                    filters=filters,
-                    k=k
-                )
-                
-                results.append({
-                    'resume_index': i,
-                    'resume_id': resume_data.get('resume_id', f'resume_{i}'),
-                    'matches': matches,
-                    'match_count': len(matches),
-                    'success': True
-                })
-                
+                queries[i] = self._build_user_profile(resume_data)
             except Exception as e:
-                logger.error(f"简历 {i} 匹配失败: {e}")
-                results.append({
-                    'resume_index': i,
-                    'resume_id': resume_data.get('resume_id', f'resume_{i}'),
-                    'matches': [],
-                    'match_count': 0,
-                    'success': False,
-                    'error': str(e)
-                })
-        
-        logger.info(f"批量匹配完成，处理了 {len(resumes_data)} 份简历")
-        return results
+                errors[i] = e
+        
+        indexes = list(queries)
+        search_results = {}
+        try:
+            search_lists = self.search_engine.search_batch(
+                [(queries[i], 'hybrid', k * 2) for i in indexes], filters, return_exceptions=True
+            )
+            for i, results in zip(indexes, search_lists):
+                # 单个查询检索失败时返回异常对象，只记入该简历的结果
+                if isinstance(results, Exception):
+                    errors[i] = results
+                else:
+                    search_results[i] = results
+        except Exception as e:
+            # 批量检索失败时逐份检索，单份简历的检索错误只记入该简历的结果
+            logger.warning(f"批量检索失败，改为逐份检索: {e}")
+            for i in indexes:
+                try:
+                    search_results[i] = self.search_engine.search(
+                        query=queries[i], strategy='hybrid', k=k * 2, filters=filters
+                    )
+                except Exception as search_error:
+                    errors[i] = search_error
+        jobs_by_resume = {i: self._group_results_by_job(results) for i, results in search_results.items()}
+        
+        # 2. 共享候选池：合并各简历检索到的职位文档，每个职位提取一次信息
+        pool_docs: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for jobs_by_id in jobs_by_resume.values():
+            for job_id, job_docs in jobs_by_id.items():
+                docs = pool_docs.setdefault(job_id, {})
+                for doc in job_docs:
+                    metadata = doc.get('metadata', {})
+                    docs.setdefault(metadata.get('doc_id') or doc.get('content'), doc)
+        job_infos = {job_id: self._extract_job_info(list(docs.values())) for job_id, docs in pool_docs.items()}
+        
+        # 3. 并发为各简历打分
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.batch_concurrency))
+        loop = asyncio.get_event_loop()
+        
+        async def match_one(i: int, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+            result = {
+                'resume_index': i,
+                'resume_id': resume_data.get('resume_id', f'resume_{i}'),
+                'matches': [],
+                'match_count': 0,
+                'success': False,
+                'processing_time': 0.0
+            }
+            if i in errors:
+                logger.error(f"简历 {i} 匹配失败: {errors[i]}")
+                result['error'] = str(errors[i])
+                return result
+            
+            async with semaphore:
+                resume_start = time.time()
+                try:
+                    matches = await loop.run_in_executor(
+                        None, self._rank_jobs, resume_data, jobs_by_resume[i], k, job_infos
+                    )
+                    result.update(matches=matches, match_count=len(matches), success=True)
+                except Exception as e:
+                    logger.error(f"简历 {i} 匹配失败: {e}")
+                    result['error'] = str(e)
+                result['processing_time'] = time.time() - resume_start
+            return result
+        
+        results = await asyncio.gather(*(match_one(i, resume_data) for i, resume_data in enumerate(resumes_data)))
+        
+        logger.info(f"批量匹配完成，处理了 {len(resumes_data)} 份简历，共享候选池 {len(job_infos)} 个职位，"
+                    f"耗时 {time.time() - start_time:.2f}秒")
+        return list(results)
     
     def get_matching_statistics(self, match_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """获取匹配统计信息"""
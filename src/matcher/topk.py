@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+流式 top-k 选择
+用有界小顶堆保留分数最高的k个候选，配合分数上界跳过不可能进入前k的候选，
+排序结果与对全部候选稳定降序排序后取前k一致
+"""
+
+import heapq
+from typing import Any, List, Tuple
+
+
+class BoundedTopK:
+    """保留分数最高的k个元素的有界小顶堆"""
+
+    def __init__(self, k: int):
+        """
+        Args:
+            k: 保留的元素数量
+        """
+        self.k = max(0, k)
+        # 堆元素为 (分数, -顺序号, 元素)：同分时顺序靠后的元素视为更小，先被淘汰
+        self._heap: List[Tuple[float, int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    @property
+    def threshold(self) -> float:
+        """进入前k所需超过的分数（未满时为负无穷）"""
+        return self._heap[0][0] if self.is_full and self._heap else float('-inf')
+
+    def can_enter(self, upper_bound: float, order: int) -> bool:
+        """分数上界为 upper_bound、顺序号为 order 的候选是否可能进入前k"""
+        if self.k == 0:
+            return False
+        if not self.is_full:
+            return True
+        return (upper_bound, -order) > self._heap[0][:2]
+
+    def push(self, score: float, order: int, item: Any) -> bool:
+        """
+        加入候选
+
+        Args:
+            score: 精确分数
+            order: 候选的原始顺序号（同分时顺序号小的优先，与稳定排序一致）
+            item: 候选元素
+
+        Returns:
+            bool: 是否进入前k
+        """
+        if not self.can_enter(score, order):
+            return False
+        entry = (score, -order, item)
+        if self.is_full:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            heapq.heappush(self._heap, entry)
+        return True
+
+    def items(self) -> List[Tuple[float, Any]]:
+        """按分数降序返回 (分数, 元素)"""
+        return [(score, item) for score, _, item in
+                sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))]
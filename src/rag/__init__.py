@@ -9,13 +9,31 @@ RAG智能分析模块
 - RAGChain: RAG检索问答链
 - DocumentCreator: 文档创建器
 - SemanticSearch: 语义搜索引擎
+- LexicalIndex: BM25词法索引
 """
 
-from .job_processor import LangChainJobProcessor, JobStructure
-from .vector_manager import ChromaDBManager
-from .rag_chain import JobRAGSystem
-from .document_creator import DocumentCreator
-from .semantic_search import SemanticSearchEngine
+import importlib
+
+# 组件按需导入：导入子模块（如 src.rag.lexical_index）时不再连带加载
+# LangChain、ChromaDB 和嵌入模型相关依赖，缩短命令行冷启动时间
+_LAZY_EXPORTS = {
+    'LangChainJobProcessor': '.job_processor',
+    'JobStructure': '.job_processor',
+    'ChromaDBManager': '.vector_manager',
+    'JobRAGSystem': '.rag_chain',
+    'DocumentCreator': '.document_creator',
+    'SemanticSearchEngine': '.semantic_search',
+    'BM25Index': '.lexical_index',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     'LangChainJobProcessor',
@@ -23,7 +41,8 @@ __all__ = [
     'ChromaDBManager',
     'JobRAGSystem',
     'DocumentCreator',
-    'SemanticSearchEngine'
+    'SemanticSearchEngine',
+    'BM25Index'
 ]
 
 __version__ = '1.0.0'
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+紧凑二级向量索引
+
+ChromaDB 中保存完整的 768/1024 维 float32 向量，候选召回都在全维度上进行。
+这里在 Chroma 旁边维护一个降维（PCA 或 Matryoshka 截断，如 128 维）并以 float16 / int8
+存储的内存映射 NumPy 矩阵：候选召回在紧凑索引上做分块暴力检索，再从 Chroma 读取候选的
+完整向量按全精度重新打分。
+
+文件结构（index_dir 下）:
+    compact_index.json     元信息（方法、维度、存储类型、构建时的集合文档数等）
+    compact_vectors.npy    紧凑向量矩阵（np.load(mmap_mode='r') 映射读取）
+    compact_norms.npy      紧凑向量的平方范数（L2距离用）
+    compact_ids.json       行号 -> 向量库ID
+    projection.npz         PCA 均值和主成分 / int8 缩放系数
+"""
+
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'compact_index.json'
+VECTORS_FILE = 'compact_vectors.npy'
+NORMS_FILE = 'compact_norms.npy'
+IDS_FILE = 'compact_ids.json'
+PROJECTION_FILE = 'projection.npz'
+
+# 分块检索的行数，限制单次检索的临时内存
+SEARCH_BLOCK_ROWS = 65536
+
+
+class CompactIndex:
+    """降维 + 低精度存储的内存映射向量索引"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = Path(index_dir)
+        self.meta: Dict[str, Any] = {}
+        self.ids: List[str] = []
+        self._vectors = None
+        self._norms = None
+        self._mean = None
+        self._components = None
+        self._scale = None
+
+    # ------------------------------------------------------------------ 构建
+
+    @classmethod
+    def build(cls, index_dir: str, batches: Callable[[], Iterable[Tuple[List[str], Sequence]]],
+              total: int, dim: int = 128, method: str = 'pca', dtype: str = 'float16',
+              fit_sample: int = 50000, space: str = 'l2') -> 'CompactIndex':
+        """
+        从全维度向量构建紧凑索引
+
+        Args:
+            index_dir: 索引目录
+            batches: 返回 (ids, embeddings) 批次迭代器的函数（PCA 拟合和写入各遍历一次）
+            total: 向量总数
+            dim: 降维后的维度
+            method: pca（主成分投影）或 truncate（Matryoshka 截断前 dim 维）
+            dtype: float16 或 int8
+            fit_sample: PCA 拟合使用的最大样本数
+            space: 集合的距离空间（l2 / cosine / ip）
+
+        Returns:
+            CompactIndex: 已加载的索引
+        """
+        if method not in ('pca', 'truncate'):
+            raise ValueError(f"不支持的降维方法: {method}")
+        if dtype not in ('float16', 'int8'):
+            raise ValueError(f"不支持的存储类型: {dtype}")
+
+        started = time.perf_counter()
+        target = Path(index_dir)
+        target.mkdir(parents=True, exist_ok=True)
+
+        # 1. 拟合投影
+        sample = []
+        sampled = 0
+        full_dim = None
+        for _, embeddings in batches():
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            full_dim = matrix.shape[1]
+            sample.append(matrix[:max(fit_sample - sampled, 0)])
+            sampled += len(sample[-1])
+            if sampled >= fit_sample:
+                break
+        if not sampled:
+            raise ValueError("集合为空，无法构建紧凑索引")
+
+        dim = min(dim, full_dim)
+        if method == 'pca':
+            data = np.concatenate(sample)
+            mean = data.mean(axis=0)
+            centered = data - mean
+            eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+            order = np.argsort(eigenvalues)[::-1][:dim]
+            components = eigenvectors[:, order].T.astype(np.float32)
+            explained = float(eigenvalues[order].sum() / max(eigenvalues.sum(), 1e-12))
+        else:
+            mean = np.zeros(full_dim, dtype=np.float32)
+            components = np.eye(full_dim, dtype=np.float32)[:dim]
+            explained = None
+
+        # 2. 投影并写入内存映射文件
+        projected_file = target / f'{VECTORS_FILE}.tmp'
+        projected = np.lib.format.open_memmap(projected_file, mode='w+', dtype=np.float32, shape=(total, dim))
+        ids: List[str] = []
+        for batch_ids, embeddings in batches():
+            matrix = (np.asarray(embeddings, dtype=np.float32) - mean) @ components.T
+            if method == 'truncate':
+                matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+            projected[len(ids):len(ids) + len(batch_ids)] = matrix
+            ids.extend(batch_ids)
+        rows = len(ids)
+
+        scale = None
+        vectors = np.lib.format.open_memmap(target / VECTORS_FILE, mode='w+', dtype=np.dtype(dtype), shape=(rows, dim))
+        if dtype == 'int8':
+            scale = np.zeros(dim, dtype=np.float32)
+            for start in range(0, rows, SEARCH_BLOCK_ROWS):
+                scale = np.maximum(scale, np.abs(projected[start:start + SEARCH_BLOCK_ROWS]).max(axis=0))
+            scale = np.clip(scale / 127.0, 1e-12, None)
+        norms = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            block = projected[start:start + SEARCH_BLOCK_ROWS]
+            if dtype == 'int8':
+                stored = np.clip(np.rint(block / scale), -127, 127).astype(np.int8)
+                restored = stored.astype(np.float32) * scale
+            else:
+                stored = block.astype(np.float16)
+                restored = stored.astype(np.float32)
+            vectors[start:start + len(block)] = stored
+            norms[start:start + len(block)] = (restored * restored).sum(axis=1)
+        vectors.flush()
+        del vectors, projected
+        projected_file.unlink()
+
+        np.save(target / NORMS_FILE, norms)
+        np.savez(target / PROJECTION_FILE, mean=mean, components=components,
+                 scale=scale if scale is not None else np.ones(dim, dtype=np.float32))
+        with open(target / IDS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(ids, f)
+
+        meta = {
+            'method': method,
+            'dim': dim,
+            'full_dim': full_dim,
+            'dtype': dtype,
+            'space': space,
+            'rows': rows,
+            'explained_variance': explained,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'build_seconds': round(time.perf_counter() - started, 3)
+        }
+        with open(target / META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"紧凑索引构建完成: {rows} 行, {full_dim} -> {dim} 维 ({method}, {dtype}), "
+                    f"耗时 {meta['build_seconds']} 秒")
+        index = cls(index_dir)
+        index.load()
+        return index
+
+    # ------------------------------------------------------------------ 加载与检索
+
+    @staticmethod
+    def exists(index_dir: str) -> bool:
+        return (Path(index_dir) / META_FILE).exists()
+
+    def load(self) -> 'CompactIndex':
+        """以内存映射方式加载索引"""
+        with open(self.index_dir / META_FILE, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(self.index_dir / IDS_FILE, 'r', encoding='utf-8') as f:
+            self.ids = json.load(f)
+        self._vectors = np.load(self.index_dir / VECTORS_FILE, mmap_mode='r')
+        self._norms = np.load(self.index_dir / NORMS_FILE)
+        projection = np.load(self.index_dir / PROJECTION_FILE)
+        self._mean = projection['mean']
+        self._components = projection['components']
+        self._scale = projection['scale']
+        return self
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+    def project(self, embedding: Sequence[float]) -> np.ndarray:
+        """把全维度查询向量投影到紧凑空间"""
+        vector = (np.asarray(embedding, dtype=np.float32) - self._mean) @ self._components.T
+        if self.meta.get('method') == 'truncate':
+            vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        return vector.astype(np.float32)
+
+    def search(self, embedding: Sequence[float], n: int) -> List[str]:
+        """
+        在紧凑索引上分块暴力检索候选
+
+        Args:
+            embedding: 全维度查询向量
+            n: 候选数量
+
+        Returns:
+            List[str]: 按紧凑空间距离排序的候选向量库ID
+        """
+        if not self.rows or n <= 0:
+            return []
+
+        query = self.project(embedding)
+        if self.meta.get('dtype') == 'int8':
+            # int8 存储时把缩放系数并入查询向量，矩阵乘法仍在原始整数上进行
+            query = query * self._scale
+        inner_product_space = self.meta.get('space') == 'ip'
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self.rows, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            dots = block @ query
+            # 距离越小越相似；L2距离中查询范数对排序无影响，可省略
+            scores = -dots if inner_product_space else self._norms[start:start + len(block)] - 2 * dots
+
+            rows = np.arange(start, start + len(block))
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores.astype(np.float32)])
+            if len(best_rows) > n:
+                keep = np.argpartition(best_scores, n - 1)[:n]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(best_scores)
+        return [self.ids[row] for row in best_rows[order]]
+
+    def is_stale(self, collection_count: int, max_stale_ratio: float) -> bool:
+        """集合文档数相对构建时变化超过阈值时视为过期"""
+        rows = max(self.rows, 1)
+        return abs(collection_count - self.rows) / rows > max_stale_ratio
+
+
+def exact_distances(query: Sequence[float], embeddings: Sequence[Sequence[float]], space: str = 'l2') -> np.ndarray:
+    """按集合距离空间计算全精度距离（与 ChromaDB 的 l2 / cosine / ip 定义一致）"""
+    query = np.asarray(query, dtype=np.float32)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if space == 'ip':
+        return 1.0 - matrix @ query
+    if space == 'cosine':
+        norms = np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+        return 1.0 - (matrix @ query) / np.clip(norms, 1e-12, None)
+    diff = matrix - query
+    return (diff * diff).sum(axis=1)
+
+
+def recall_at_k(expected: Sequence[str], actual: Sequence[str]) -> float:
+    """recall@k：期望结果中被召回的比例"""
+    if not expected:
+        return 1.0
+    return len(set(expected) & set(actual)) / len(expected)
@@ -6,7 +6,7 @@
 
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Iterator
+from typing import Dict, Any, List, Optional, Iterator, Tuple
 from pathlib import Path
 
 from ..database.operations import DatabaseManager
@@ -304,6 +304,7 @@ class DatabaseJobReader:
                            website: str = None,
                            status: str = None,
                            rag_processed: bool = None,
+                           keyword: str = None,
                            limit: int = 100) -> List[Dict]:
         """
         根据条件获取职位数据
@@ -312,6 +313,7 @@ class DatabaseJobReader:
             website: 网站筛选
             status: 状态筛选
             rag_processed: RAG处理状态筛选
+            keyword: 关键词筛选（标题/描述/要求/关键词，优先使用全文索引）
             limit: 限制数量
             
         Returns:
@@ -337,6 +339,19 @@ class DatabaseJobReader:
                     conditions.append("j.rag_processed = ?")
                     params.append(1 if rag_processed else 0)
                 
+                if keyword:
+                    match_query = self.db_manager.build_fulltext_query(keyword, phrase=True)
+                    if match_query and self.db_manager.ensure_fulltext_index():
+                        conditions.append("j.job_id IN (SELECT job_id FROM job_search_fts WHERE job_search_fts MATCH ?)")
+                        params.append(match_query)
+                    else:
+                        keyword_pattern = f"%{keyword.lower()}%"
+                        conditions.append(
+                            "(LOWER(j.title) LIKE ? OR LOWER(jd.keyword) LIKE ? "
+                            "OR LOWER(jd.description) LIKE ? OR LOWER(jd.requirements) LIKE ?)"
+                        )
+                        params.extend([keyword_pattern] * 4)
+                
                 where_clause = ""
                 if conditions:
                     where_clause = "WHERE " + " AND ".join(conditions)
@@ -370,6 +385,22 @@ class DatabaseJobReader:
             self.logger.error(f"根据条件获取职位失败: {e}")
             return []
     
+    def search_jobs_fulltext(self, query: str, limit: int = 100) -> List[Tuple[str, float]]:
+        """
+        全文检索职位，返回词法相关性信号
+        
+        可作为 SemanticSearchEngine 的 lexical_searcher 使用，
+        与向量相似度融合进行混合检索。
+        
+        Args:
+            query: 查询文本
+            limit: 返回数量上限
+            
+        Returns:
+            [(job_id, lexical_score)] 列表，按相关性降序
+        """
+        return self.db_manager.search_jobs_fulltext(query, limit=limit)
+    
     def validate_job_data(self, job_data: Dict) -> bool:
         """
         验证职位数据完整性
@@ -12,6 +12,8 @@ from datetime import datetime
 import hashlib
 
 from .job_processor import JobStructure
+from .document_ids import compute_content_hash
+from .job_features import extract_job_features
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +68,8 @@ class DocumentCreator:
             "created_at": timestamp,
             "doc_id_prefix": doc_id_prefix
         }
+        # 匹配特征（技能、经验年限、学历等级等）随每个文档写入，评分时无需再从文本提取
+        base_metadata.update(extract_job_features(job_id, job_structure).to_metadata())
         
         # 1. 创建职位概览文档
         if 'overview' in self.document_types:
@@ -105,9 +109,18 @@ class DocumentCreator:
             )
             documents.append(comprehensive_doc)
         
+        # 7. 记录内容哈希，供增量更新时比对
+        for doc in documents:
+            doc.metadata['content_hash'] = self.compute_content_hash(doc.page_content)
+        
         logger.info(f"为职位 {job_structure.job_title} 创建了 {len(documents)} 个文档")
         return documents
     
+    @staticmethod
+    def compute_content_hash(content: str) -> str:
+        """计算文档内容哈希（与向量元数据库 vector_documents.content_hash 一致）"""
+        return compute_content_hash(content)
+    
     def _generate_doc_id_prefix(self, job_structure: JobStructure, job_id: str = None) -> str:
         """生成文档ID前缀"""
         if job_id:
@@ -0,0 +1,126 @@
+"""
+向量文档ID工具
+
+由 (job_id, 文档类型, 分块序号, 内容哈希) 生成稳定的向量库ID，
+使重复导入变为幂等的覆盖写入（upsert），并提供重复向量审计所需的分组逻辑。
+"""
+
+import hashlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 内容哈希在ID中保留的长度
+ID_HASH_LENGTH = 16
+
+
+def compute_content_hash(content: str) -> str:
+    """计算文档内容哈希（与向量元数据库 vector_documents.content_hash 一致）"""
+    return hashlib.md5((content or '').encode()).hexdigest()
+
+
+def make_document_id(job_id: Optional[str], doc_type: Optional[str], index: int, content_hash: str) -> str:
+    """
+    生成确定性的向量库ID
+
+    Args:
+        job_id: 职位ID
+        doc_type: 文档类型（overview、responsibility 等）
+        index: 同类型文档中的分块序号
+        content_hash: 内容哈希
+
+    Returns:
+        形如 "{job_id}:{doc_type}:{index}:{hash}" 的ID
+    """
+    return f"{job_id or 'unknown'}:{doc_type or 'unknown'}:{index}:{content_hash[:ID_HASH_LENGTH]}"
+
+
+def is_deterministic_id(vector_id: str, job_id: Optional[str] = None) -> bool:
+    """判断向量库ID是否由 make_document_id 生成（旧数据为随机UUID）"""
+    parts = str(vector_id).rsplit(':', 3)
+    if len(parts) != 4 or not parts[2].isdigit() or len(parts[3]) != ID_HASH_LENGTH:
+        return False
+    return job_id is None or parts[0] == str(job_id)
+
+
+def assign_document_ids(job_id: Optional[str], items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """
+    为同一职位的一组文档分配确定性ID
+
+    分块序号优先取元数据 index，否则按同类型文档出现顺序编号。
+
+    Args:
+        job_id: 职位ID
+        items: (内容, 元数据) 序列
+
+    Returns:
+        与输入顺序一致的ID列表
+    """
+    occurrences: Dict[str, int] = defaultdict(int)
+    ids = []
+    for content, metadata in items:
+        doc_type = metadata.get('type') or metadata.get('document_type') or 'unknown'
+        position = occurrences[doc_type]
+        occurrences[doc_type] += 1
+
+        index = metadata.get('index')
+        if not isinstance(index, int) or isinstance(index, bool):
+            index = position
+
+        content_hash = metadata.get('content_hash') or compute_content_hash(content)
+        ids.append(make_document_id(job_id or metadata.get('job_id'), doc_type, index, content_hash))
+    return ids
+
+
+def find_duplicate_vectors(records: Iterable[Tuple[str, str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    找出重复向量
+
+    同一职位下类型、分块序号和内容哈希都相同的文档视为重复；每组保留一条
+    （优先保留确定性ID，其次保留最先出现的），其余列为待删除。
+
+    Args:
+        records: (向量库ID, 内容, 元数据) 序列
+
+    Returns:
+        Dict: scanned、legacy_ids（非确定性ID数量）、duplicate_groups、redundant_ids
+    """
+    groups: Dict[Tuple[str, str, str, str], List[str]] = defaultdict(list)
+    scanned = 0
+    legacy = 0
+
+    for vector_id, content, metadata in records:
+        metadata = metadata or {}
+        scanned += 1
+        job_id = metadata.get('job_id') or 'unknown'
+        if not is_deterministic_id(vector_id, job_id):
+            legacy += 1
+        key = (
+            str(job_id),
+            metadata.get('type') or metadata.get('document_type') or 'unknown',
+            str(metadata.get('index', '')),
+            metadata.get('content_hash') or compute_content_hash(content)
+        )
+        groups[key].append(vector_id)
+
+    duplicate_groups = []
+    redundant_ids = []
+    for (job_id, doc_type, _, content_hash), vector_ids in groups.items():
+        if len(vector_ids) < 2:
+            continue
+        keep = next((vid for vid in vector_ids if is_deterministic_id(vid, job_id)), vector_ids[0])
+        extra = [vid for vid in vector_ids if vid != keep]
+        duplicate_groups.append({
+            'job_id': job_id,
+            'type': doc_type,
+            'content_hash': content_hash,
+            'keep': keep,
+            'redundant': extra
+        })
+        redundant_ids.extend(extra)
+
+    return {
+        'scanned': scanned,
+        'legacy_ids': legacy,
+        'duplicate_groups': duplicate_groups,
+        'redundant_ids': redundant_ids
+    }
@@ -0,0 +1,336 @@
+"""
+多进程嵌入工作池
+
+单个 Python 进程用 PyTorch 在 CPU 上做嵌入，无法用满多核机器（import_database_jobs、全量重建索引）。
+这里把大批量嵌入请求切分到多个工作进程：
+- 每个工作进程只加载一次模型，可配置线程数并绑定到固定CPU核
+- 结果写入共享内存（float32 矩阵），主进程直接读取，不经过 pickle 传递向量列表
+- 小请求（单条查询等）仍在主进程内的模型上执行，避免进程间往返
+
+工作进程使用 spawn 方式启动（Windows 兼容），模型工厂必须是可导入的顶层函数。
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FLOAT_SIZE = 4
+
+# 工作进程启动时用于探测向量维度的文本
+_PROBE_TEXT = '维度探测'
+
+
+def _encode(model: Any, texts: List[str]):
+    """
+    调用模型编码，尽量直接得到 numpy 矩阵
+
+    HuggingFaceEmbeddings.embed_documents 会把 numpy 结果转成列表，
+    这里优先调用其底层 SentenceTransformer.encode，省掉一次列表转换。
+    """
+    client = getattr(model, 'client', None)
+    if client is not None and hasattr(client, 'encode'):
+        encode_kwargs = dict(getattr(model, 'encode_kwargs', None) or {})
+        encode_kwargs.pop('show_progress_bar', None)
+        return client.encode(texts, show_progress_bar=False, **encode_kwargs)
+    return model.embed_documents(texts)
+
+
+def _write_rows(buf: memoryview, row_offset: int, dim: int, vectors) -> None:
+    """把一批向量写入共享内存的指定行"""
+    start = row_offset * dim * FLOAT_SIZE
+    try:
+        import numpy as np
+        matrix = np.asarray(vectors, dtype=np.float32)
+        buf[start:start + matrix.nbytes] = matrix.reshape(-1).tobytes()
+    except ImportError:
+        data = array('f', (value for vector in vectors for value in vector))
+        buf[start:start + len(data) * FLOAT_SIZE] = data.tobytes()
+
+
+def _read_rows(buf: memoryview, rows: int, dim: int) -> List[List[float]]:
+    """从共享内存读取向量矩阵"""
+    try:
+        import numpy as np
+        return np.frombuffer(buf, dtype=np.float32, count=rows * dim).reshape(rows, dim).tolist()
+    except ImportError:
+        data = array('f')
+        data.frombytes(bytes(buf[:rows * dim * FLOAT_SIZE]))
+        return [data[i * dim:(i + 1) * dim].tolist() for i in range(rows)]
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """在工作进程中打开主进程创建的共享内存（不登记到资源跟踪器，避免工作进程退出时误删）"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+def _configure_worker(worker_index: int, threads: int, pin_cores: bool) -> List[int]:
+    """设置工作进程的线程数和CPU亲和性，返回绑定的核"""
+    if threads > 0:
+        for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+            os.environ[var] = str(threads)
+
+    cores: List[int] = []
+    if pin_cores and hasattr(os, 'sched_setaffinity'):
+        available = sorted(os.sched_getaffinity(0))
+        per_worker = max(threads, 1)
+        start = (worker_index * per_worker) % len(available)
+        cores = [available[(start + i) % len(available)] for i in range(per_worker)]
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            cores = []
+    return cores
+
+
+def _worker_main(worker_index: int, factory: Callable, factory_args: Tuple, threads: int,
+                 pin_cores: bool, tasks, results) -> None:
+    """工作进程入口：加载模型后循环处理分片任务"""
+    try:
+        cores = _configure_worker(worker_index, threads, pin_cores)
+        model = factory(*factory_args)
+        if threads > 0 and 'torch' in sys.modules:
+            sys.modules['torch'].set_num_threads(threads)
+        dim = len(_encode(model, [_PROBE_TEXT])[0])
+    except Exception as e:
+        results.put(('failed', worker_index, f'{type(e).__name__}: {e}'))
+        return
+
+    results.put(('ready', worker_index, {'dim': dim, 'cores': cores, 'pid': os.getpid()}))
+
+    attached: Dict[str, shared_memory.SharedMemory] = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        request_id, shm_name, row_offset, texts = task
+        try:
+            shm = attached.get(shm_name)
+            if shm is None:
+                # 同一时间只有一个请求，旧请求的共享内存可以关闭
+                for old in attached.values():
+                    old.close()
+                attached = {shm_name: _attach_shared_memory(shm_name)}
+                shm = attached[shm_name]
+            _write_rows(shm.buf, row_offset, dim, _encode(model, texts))
+            results.put(('done', request_id, len(texts)))
+        except Exception as e:
+            results.put(('error', request_id, f'{type(e).__name__}: {e}'))
+
+    for shm in attached.values():
+        shm.close()
+
+
+class EmbeddingWorkerPool:
+    """嵌入工作进程池"""
+
+    def __init__(self, factory: Callable, factory_args: Sequence = (), workers: int = 0,
+                 threads_per_worker: int = 1, pin_cores: bool = True, chunk_size: int = 64,
+                 startup_timeout: float = 600.0, task_timeout: float = 600.0):
+        """
+        Args:
+            factory: 创建嵌入模型的顶层函数（在工作进程中调用）
+            factory_args: 工厂参数（需可 pickle）
+            workers: 工作进程数（0 表示 CPU核数 / 每进程线程数）
+            threads_per_worker: 每个工作进程的计算线程数
+            pin_cores: 是否把工作进程绑定到固定CPU核（仅Linux）
+            chunk_size: 每个分片的文本数
+            startup_timeout: 等待模型加载的超时秒数
+            task_timeout: 单个分片的超时秒数
+        """
+        cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+        self.threads_per_worker = max(int(threads_per_worker), 1)
+        self.workers = int(workers) or max(cpu_count // self.threads_per_worker, 1)
+        self.factory = factory
+        self.factory_args = tuple(factory_args)
+        self.pin_cores = pin_cores
+        self.chunk_size = max(int(chunk_size), 1)
+        self.startup_timeout = startup_timeout
+        self.task_timeout = task_timeout
+
+        self.dim: Optional[int] = None
+        self.worker_info: Dict[int, Dict[str, Any]] = {}
+        self._processes: List[multiprocessing.Process] = []
+        self._tasks = None
+        self._results = None
+        self._request_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._request_counter = 0
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._processes)
+
+    def start(self) -> None:
+        """启动工作进程并等待模型加载完成"""
+        with self._start_lock:
+            if self._processes:
+                return
+
+            context = multiprocessing.get_context('spawn')
+            self._tasks = context.Queue()
+            self._results = context.Queue()
+            for index in range(self.workers):
+                process = context.Process(
+                    target=_worker_main,
+                    args=(index, self.factory, self.factory_args, self.threads_per_worker,
+                          self.pin_cores, self._tasks, self._results),
+                    name=f'embedding-worker-{index}',
+                    daemon=True
+                )
+                process.start()
+                self._processes.append(process)
+
+            start_time = time.perf_counter()
+            try:
+                while len(self.worker_info) < self.workers:
+                    remaining = self.startup_timeout - (time.perf_counter() - start_time)
+                    status, index, payload = self._results.get(timeout=max(remaining, 0.1))
+                    if status == 'failed':
+                        raise RuntimeError(f"嵌入工作进程 {index} 启动失败: {payload}")
+                    if status == 'ready':
+                        self.worker_info[index] = payload
+            except queue.Empty:
+                self.shutdown()
+                raise RuntimeError(f"嵌入工作进程在 {self.startup_timeout} 秒内未完成模型加载")
+            except Exception:
+                self.shutdown()
+                raise
+
+            dims = {info['dim'] for info in self.worker_info.values()}
+            if len(dims) != 1:
+                self.shutdown()
+                raise RuntimeError(f"嵌入工作进程的向量维度不一致: {dims}")
+            self.dim = dims.pop()
+
+            logger.info(
+                f"嵌入工作池已启动: {self.workers} 个进程, 每进程 {self.threads_per_worker} 线程, "
+                f"维度 {self.dim}, 启动耗时 {time.perf_counter() - start_time:.2f} 秒"
+            )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """把文本切分为分片并行嵌入，结果经共享内存返回"""
+        if not texts:
+            return []
+        self.start()
+
+        with self._request_lock:
+            self._request_counter += 1
+            request_id = self._request_counter
+            shm = shared_memory.SharedMemory(create=True, size=len(texts) * self.dim * FLOAT_SIZE)
+            try:
+                shards = 0
+                for offset in range(0, len(texts), self.chunk_size):
+                    self._tasks.put((request_id, shm.name, offset, list(texts[offset:offset + self.chunk_size])))
+                    shards += 1
+
+                completed = 0
+                while completed < shards:
+                    try:
+                        status, result_id, payload = self._results.get(timeout=self.task_timeout)
+                    except queue.Empty:
+                        self._check_workers()
+                        raise RuntimeError(f"嵌入分片在 {self.task_timeout} 秒内未完成")
+                    if result_id != request_id:
+                        continue
+                    if status == 'error':
+                        self._drain(request_id, shards - completed - 1)
+                        raise RuntimeError(f"嵌入工作进程处理失败: {payload}")
+                    completed += 1
+
+                return _read_rows(shm.buf, len(texts), self.dim)
+            finally:
+                shm.close()
+                shm.unlink()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def _drain(self, request_id: int, pending: int) -> None:
+        """失败后收取同一请求剩余分片的结果，避免串到下一个请求"""
+        while pending > 0:
+            try:
+                _, result_id, _ = self._results.get(timeout=self.task_timeout)
+            except queue.Empty:
+                return
+            if result_id == request_id:
+                pending -= 1
+
+    def _check_workers(self) -> None:
+        dead = [process.name for process in self._processes if not process.is_alive()]
+        if dead:
+            self.shutdown()
+            raise RuntimeError(f"嵌入工作进程已退出: {', '.join(dead)}")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """停止所有工作进程"""
+        processes, self._processes = self._processes, []
+        for _ in processes:
+            try:
+                self._tasks.put(None)
+            except Exception:
+                pass
+        for process in processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.worker_info = {}
+        self.dim = None
+
+
+class PooledEmbeddings:
+    """
+    大批量请求走工作池、小请求走本进程模型的嵌入包装
+
+    与 LazyEmbeddings 接口一致（load / is_loaded / embed_documents / embed_query）。
+    """
+
+    def __init__(self, local, pool: EmbeddingWorkerPool, min_texts: int = 64):
+        """
+        Args:
+            local: 本进程内的嵌入模型（LazyEmbeddings）
+            pool: 嵌入工作池（首次大批量请求时启动）
+            min_texts: 使用工作池的最小文本数
+        """
+        self.local = local
+        self.pool = pool
+        self.min_texts = min_texts
+        self._pool_failed = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.local.is_loaded
+
+    def load(self):
+        return self.local.load()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if len(texts) >= self.min_texts and not self._pool_failed:
+            try:
+                return self.pool.embed_documents(texts)
+            except Exception as e:
+                # 工作池启动失败后不再反复重试，之后的请求都在本进程执行
+                self._pool_failed = not self.pool.is_running
+                logger.warning(f"嵌入工作池不可用: {e}，改为本进程嵌入")
+        return self.local.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.local.embed_query(text)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
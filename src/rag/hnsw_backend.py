@@ -0,0 +1,623 @@
+"""
+进程内 HNSW 向量后端
+
+ChromaDB 的每次查询都要经过 LangChain 封装和 SQLite 持久化层，按职位集合批量读取向量也很慢。
+这里提供一个进程内实现，作为 ChromaDB 的可选替代（vector_db.backend: hnsw）：
+- 嵌入矩阵:   float32 内存映射文件（行号即 HNSW 标签），按需倍增扩容
+- 近邻索引:   hnswlib（删除只打标记，compact() 时重建）
+- 元数据:     列式存储（每个元数据键一列），job_id 等列维护值到行号的倒排，
+              过滤条件命中的行数较少时直接在嵌入矩阵上精确计算，不经过 HNSW
+
+元数据变更以追加日志方式持久化（与 BM25 索引一致），persist() 时写快照并保存 HNSW 索引；
+未保存进索引的行在下次加载时从嵌入矩阵补齐。
+
+目录结构（path 下）:
+    hnsw_backend.json   维度、距离空间、容量、已写入索引的行数
+    embeddings.f32      嵌入矩阵
+    hnsw_index.bin      hnswlib 索引
+    metadata.jsonl      列式元数据日志
+"""
+
+import os
+import json
+import shutil
+import logging
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .compact_index import exact_distances
+from .vector_backends import VectorBackend, match_where
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'hnsw_backend.json'
+MATRIX_FILE = 'embeddings.f32'
+INDEX_FILE = 'hnsw_index.bin'
+STORE_FILE = 'metadata.jsonl'
+
+FLOAT_SIZE = 4
+MIN_CAPACITY = 1024
+
+
+class ColumnarMetadataStore:
+    """列式元数据存储（行号与嵌入矩阵行号一致，删除的行保留占位）"""
+
+    def __init__(self, persist_path: Optional[str] = None, indexed_columns: Iterable[str] = ('job_id',)):
+        """
+        Args:
+            persist_path: 持久化日志路径（None表示仅内存）
+            indexed_columns: 维护值到行号倒排的列（用于等值/IN过滤）
+        """
+        self.persist_path = persist_path
+        self.indexed_columns = set(indexed_columns)
+        self._reset()
+        if self.persist_path:
+            self._load()
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    @property
+    def rows(self) -> int:
+        """已分配的行数（含已删除的行）"""
+        return len(self.ids)
+
+    def is_live(self, row: int) -> bool:
+        return bool(self.live[row])
+
+    def live_rows(self) -> List[int]:
+        return [row for row in range(len(self.ids)) if self.live[row]]
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        return {key: values[row] for key, values in self.columns.items() if values[row] is not None}
+
+    def put(self, vector_id: str, document: Optional[str], metadata: Optional[Dict[str, Any]]) -> Tuple[int, Optional[int]]:
+        """
+        追加一行（同ID的旧行标记删除）
+
+        Returns:
+            Tuple[int, Optional[int]]: (新行号, 被替换的旧行号)
+        """
+        replaced = self.row_of.get(vector_id)
+        if replaced is not None:
+            self._kill(replaced)
+        row = len(self.ids)
+        self._place(row, vector_id, document, metadata or {})
+        self._journal.append({'op': 'put', 'row': row, 'id': vector_id, 'document': document, 'metadata': metadata or {}})
+        return row, replaced
+
+    def update(self, row: int, document: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """更新行的文本和元数据（元数据按键合并，值为None的键被移除）"""
+        if document is not None:
+            self.documents[row] = document
+        if metadata:
+            merged = self.metadata(row)
+            merged.update(metadata)
+            self._set_metadata(row, {key: value for key, value in merged.items() if value is not None})
+        self._journal.append({'op': 'update', 'row': row, 'document': document, 'metadata': metadata})
+
+    def delete(self, rows: Sequence[int]) -> None:
+        for row in rows:
+            self._kill(row)
+        if rows:
+            self._journal.append({'op': 'delete', 'rows': list(rows)})
+
+    def filter_rows(self, where: Optional[Dict[str, Any]], rows: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        返回满足 where 条件的有效行
+
+        条件中含倒排列的等值/IN子句时，先用倒排取候选行，再逐行校验完整条件。
+        """
+        if rows is None:
+            candidates = self._indexed_candidates(where) if where else None
+            rows = sorted(candidates) if candidates is not None else range(len(self.ids))
+        return [row for row in rows if self.live[row] and (not where or match_where(self.metadata(row), where))]
+
+    def flush(self) -> int:
+        """把未写入的变更追加到持久化日志，返回写入条数"""
+        entries, self._journal = self._journal, []
+        if not self.persist_path or not entries:
+            return 0
+
+        is_new = not os.path.exists(self.persist_path)
+        with open(self.persist_path, 'a', encoding='utf-8') as f:
+            if is_new:
+                f.write(json.dumps(self._header(), ensure_ascii=False) + '\n')
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.journal_entries += len(entries)
+        return len(entries)
+
+    def compact(self) -> None:
+        """把当前状态重写为快照日志（只保留有效行）"""
+        if not self.persist_path:
+            return
+
+        self._journal = []
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(dict(self._header(), rows=len(self.ids)), ensure_ascii=False) + '\n')
+            for row in self.live_rows():
+                entry = {'op': 'put', 'row': row, 'id': self.ids[row],
+                         'document': self.documents[row], 'metadata': self.metadata(row)}
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.persist_path)
+        self.journal_entries = 0
+
+    # ------------------------------------------------------------------ 内部实现
+
+    def _reset(self):
+        self.ids: List[Optional[str]] = []
+        self.documents: List[Optional[str]] = []
+        self.columns: Dict[str, List[Any]] = {}
+        self.live = bytearray()
+        self.row_of: Dict[str, int] = {}
+        self._value_rows: Dict[str, Dict[Any, Set[int]]] = {column: defaultdict(set) for column in self.indexed_columns}
+        self._live_count = 0
+        self._journal: List[Dict[str, Any]] = []
+        self.journal_entries = 0
+
+    def _header(self) -> Dict[str, Any]:
+        return {'op': 'header', 'version': 1}
+
+    def _grow(self, rows: int) -> None:
+        """扩展到指定行数（新增行为已删除的占位行）"""
+        missing = rows - len(self.ids)
+        if missing <= 0:
+            return
+        self.ids.extend([None] * missing)
+        self.documents.extend([None] * missing)
+        self.live.extend(b'\x00' * missing)
+        for values in self.columns.values():
+            values.extend([None] * missing)
+
+    def _place(self, row: int, vector_id: str, document: Optional[str], metadata: Dict[str, Any]) -> None:
+        self._grow(row + 1)
+        self.ids[row] = vector_id
+        self.documents[row] = document
+        self.live[row] = 1
+        self.row_of[vector_id] = row
+        self._live_count += 1
+        self._set_metadata(row, metadata)
+
+    def _set_metadata(self, row: int, metadata: Dict[str, Any]) -> None:
+        self._unindex(row)
+        for key, values in self.columns.items():
+            values[row] = metadata.get(key)
+        for key, value in metadata.items():
+            if key not in self.columns:
+                self.columns[key] = [None] * len(self.ids)
+                self.columns[key][row] = value
+        for column in self.indexed_columns:
+            value = metadata.get(column)
+            if value is not None:
+                self._value_rows[column][value].add(row)
+
+    def _unindex(self, row: int) -> None:
+        for column in self.indexed_columns:
+            values = self.columns.get(column)
+            value = values[row] if values is not None else None
+            if value is not None:
+                rows = self._value_rows[column].get(value)
+                if rows is not None:
+                    rows.discard(row)
+                    if not rows:
+                        del self._value_rows[column][value]
+
+    def _kill(self, row: int) -> None:
+        if not self.live[row]:
+            return
+        self._unindex(row)
+        self.live[row] = 0
+        self._live_count -= 1
+        if self.row_of.get(self.ids[row]) == row:
+            del self.row_of[self.ids[row]]
+
+    def _indexed_candidates(self, where: Dict[str, Any]) -> Optional[Set[int]]:
+        """从倒排列取候选行（无法利用倒排时返回None）"""
+        if '$and' in where:
+            for clause in where['$and']:
+                candidates = self._indexed_candidates(clause)
+                if candidates is not None:
+                    return candidates
+            return None
+        if len(where) != 1:
+            return None
+
+        column, condition = next(iter(where.items()))
+        if column not in self.indexed_columns:
+            return None
+        if isinstance(condition, dict):
+            if set(condition) == {'$eq'}:
+                values = [condition['$eq']]
+            elif set(condition) == {'$in'}:
+                values = condition['$in']
+            else:
+                return None
+        else:
+            values = [condition]
+
+        rows: Set[int] = set()
+        for value in values:
+            rows |= self._value_rows[column].get(value, set())
+        return rows
+
+    def _load(self):
+        """重放持久化日志"""
+        if not os.path.exists(self.persist_path):
+            return
+
+        with open(self.persist_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程中断可能留下不完整的末行
+                    logger.warning("HNSW后端元数据日志存在损坏行，已跳过")
+                    continue
+
+                op = entry.get('op')
+                if op == 'header':
+                    self._grow(entry.get('rows', 0))
+                elif op == 'put':
+                    replaced = self.row_of.get(entry['id'])
+                    if replaced is not None:
+                        self._kill(replaced)
+                    self._place(entry['row'], entry['id'], entry.get('document'), entry.get('metadata') or {})
+                elif op == 'update':
+                    self.update(entry['row'], entry.get('document'), entry.get('metadata'))
+                elif op == 'delete':
+                    for row in entry['rows']:
+                        self._kill(row)
+                self.journal_entries += 1
+
+        self._journal = []
+
+
+class HnswBackend(VectorBackend):
+    """内存映射嵌入矩阵 + hnswlib 索引 + 列式元数据的向量后端"""
+
+    def __init__(self, path: str, name: str = 'job_positions', space: str = 'l2', m: int = 16,
+                 ef_construction: int = 200, ef_search: int = 64, brute_force_threshold: int = 2000,
+                 snapshot_every: int = 5000, indexed_columns: Sequence[str] = ('job_id',)):
+        """
+        Args:
+            path: 存储目录
+            name: 集合名称
+            space: 距离空间（l2 / cosine / ip，定义与 ChromaDB 一致）
+            m: HNSW 图的出度
+            ef_construction: 建索引时的候选队列长度
+            ef_search: 查询时的候选队列长度
+            brute_force_threshold: 过滤后行数不超过该值时精确计算
+            snapshot_every: 元数据日志超过该条数时写快照
+            indexed_columns: 维护倒排的元数据列
+        """
+        import hnswlib
+
+        self._hnswlib = hnswlib
+        self.path = Path(path)
+        self.name = name
+        self.space = space
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.brute_force_threshold = brute_force_threshold
+        self.snapshot_every = snapshot_every
+        self.indexed_columns = list(indexed_columns)
+        self._lock = threading.RLock()
+        self._load_state()
+
+    # ------------------------------------------------------------------ VectorBackend 接口
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {'hnsw:space': self.space, 'backend': 'hnsw'}
+
+    def count(self) -> int:
+        return len(self.store)
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        """添加向量（已存在的ID跳过，与 ChromaDB add 一致）"""
+        self._write(ids, embeddings, documents, metadatas, overwrite=False)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write(ids, embeddings, documents, metadatas, overwrite=True)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> Dict[str, Any]:
+        include = include if include is not None else ['documents', 'metadatas']
+        with self._lock:
+            if ids is not None:
+                rows = [self.store.row_of[vector_id] for vector_id in ids if vector_id in self.store.row_of]
+                rows = self.store.filter_rows(where, rows)
+            else:
+                rows = self.store.filter_rows(where)
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return self._rows_result(rows, include)
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None) -> Dict[str, Any]:
+        include = include if include is not None else ['documents', 'metadatas', 'distances']
+        result: Dict[str, List] = {'ids': [], 'distances': [], 'documents': [], 'metadatas': [], 'embeddings': []}
+        with self._lock:
+            allowed = self.store.filter_rows(where) if where else None
+            for embedding in query_embeddings:
+                rows, distances = self._search(np.asarray(embedding, dtype=np.float32), n_results, allowed)
+                page = self._rows_result(rows, include)
+                result['ids'].append(page['ids'])
+                result['distances'].append([float(d) for d in distances])
+                for key in ('documents', 'metadatas', 'embeddings'):
+                    result[key].append(page.get(key))
+
+        for key in ('documents', 'metadatas', 'embeddings', 'distances'):
+            if key not in include:
+                result[key] = None
+        return result
+
+    def delete(self, ids=None, where=None) -> None:
+        with self._lock:
+            if ids is not None:
+                rows = [self.store.row_of[vector_id] for vector_id in ids if vector_id in self.store.row_of]
+                rows = self.store.filter_rows(where, rows)
+            elif where:
+                rows = self.store.filter_rows(where)
+            else:
+                rows = []
+            self.store.delete(rows)
+            for row in rows:
+                self._mark_deleted(row)
+            self._after_write()
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None) -> None:
+        with self._lock:
+            for i, vector_id in enumerate(ids):
+                row = self.store.row_of.get(vector_id)
+                if row is None:
+                    logger.warning(f"更新的向量不存在: {vector_id}")
+                    continue
+                if embeddings is not None:
+                    vector = np.asarray(embeddings[i], dtype=np.float32)
+                    self._matrix[row] = vector
+                    # hnswlib 对已存在的标签执行 add_items 即原地更新向量
+                    self._index.add_items(vector[None, :], [row])
+                self.store.update(
+                    row,
+                    documents[i] if documents is not None else None,
+                    metadatas[i] if metadatas is not None else None
+                )
+            self._after_write()
+
+    def persist(self) -> None:
+        """刷新嵌入矩阵、保存HNSW索引并写元数据快照"""
+        with self._lock:
+            if self._matrix is None:
+                self.store.flush()
+                return
+            self._matrix.flush()
+            self._index.save_index(str(self.path / INDEX_FILE))
+            self.store.compact()
+            self._indexed_rows = self.store.rows
+            self._save_meta()
+
+    def compact(self) -> int:
+        """
+        重建存储：只保留有效行，回收嵌入矩阵和HNSW索引中已删除的行
+
+        在临时目录中写入完整副本后再替换原目录，中途失败不影响原数据。
+
+        Returns:
+            int: 保留的向量数
+        """
+        with self._lock:
+            rows = self.store.live_rows()
+            temp_path = self.path.with_name(f'{self.path.name}__compacting')
+            if temp_path.exists():
+                shutil.rmtree(temp_path)
+
+            target = HnswBackend(
+                str(temp_path), name=self.name, space=self.space, m=self.m,
+                ef_construction=self.ef_construction, ef_search=self.ef_search,
+                brute_force_threshold=self.brute_force_threshold, snapshot_every=self.snapshot_every,
+                indexed_columns=self.indexed_columns
+            )
+            batch_size = 10000
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                target.add(
+                    ids=[self.store.ids[row] for row in batch],
+                    embeddings=np.asarray(self._matrix[batch]),
+                    documents=[self.store.documents[row] for row in batch],
+                    metadatas=[self.store.metadata(row) for row in batch]
+                )
+            target.close()
+
+            self._release()
+            old_path = self.path.with_name(f'{self.path.name}__old')
+            os.replace(self.path, old_path)
+            os.replace(temp_path, self.path)
+            shutil.rmtree(old_path)
+
+            self._load_state()
+            logger.info(f"HNSW后端压实完成: {len(rows)} 个向量")
+            return len(rows)
+
+    def close(self) -> None:
+        self.persist()
+        self._release()
+
+    # ------------------------------------------------------------------ 内部实现
+
+    def _load_state(self) -> None:
+        """读取目录中的元信息、元数据日志、嵌入矩阵和HNSW索引"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self._indexed_rows = 0
+        meta_path = self.path / META_FILE
+        if meta_path.exists():
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self.dim = meta['dim']
+            self.space = meta.get('space', self.space)
+            self.capacity = meta['capacity']
+            self._indexed_rows = meta.get('indexed_rows', 0)
+
+        self.store = ColumnarMetadataStore(str(self.path / STORE_FILE), self.indexed_columns)
+        self._matrix = None
+        self._index = None
+        if self.dim is not None:
+            self._open(self._indexed_rows)
+
+    def _open(self, indexed_rows: int) -> None:
+        """映射嵌入矩阵并加载（或重建）HNSW索引"""
+        self._matrix = np.memmap(self.path / MATRIX_FILE, dtype=np.float32, mode='r+',
+                                 shape=(self.capacity, self.dim))
+        self._index = self._hnswlib.Index(space=self.space, dim=self.dim)
+        index_path = self.path / INDEX_FILE
+        if index_path.exists() and indexed_rows:
+            self._index.load_index(str(index_path), max_elements=self.capacity)
+        else:
+            self._index.init_index(max_elements=self.capacity, ef_construction=self.ef_construction, M=self.m)
+            indexed_rows = 0
+        self._index.set_ef(self.ef_search)
+
+        # 补齐上次保存索引之后写入的行，并同步删除标记
+        missing = list(range(indexed_rows, self.store.rows))
+        for start in range(0, len(missing), 10000):
+            batch = missing[start:start + 10000]
+            self._index.add_items(np.asarray(self._matrix[batch]), batch)
+        for row in range(self.store.rows):
+            if not self.store.is_live(row):
+                self._mark_deleted(row)
+
+        if missing:
+            logger.info(f"HNSW索引已从嵌入矩阵补齐 {len(missing)} 行")
+
+    def _release(self) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+        self._matrix = None
+        self._index = None
+
+    def _save_meta(self) -> None:
+        meta = {
+            'name': self.name,
+            'dim': self.dim,
+            'space': self.space,
+            'capacity': self.capacity,
+            'indexed_rows': self._indexed_rows
+        }
+        tmp_path = self.path / f'{META_FILE}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path / META_FILE)
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """嵌入矩阵和HNSW索引容量不足时倍增扩容"""
+        if rows <= self.capacity:
+            return
+
+        new_capacity = max(rows, self.capacity * 2, MIN_CAPACITY)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self.path / MATRIX_FILE, 'ab') as f:
+            f.truncate(new_capacity * self.dim * FLOAT_SIZE)
+
+        first_open = self.capacity == 0
+        self.capacity = new_capacity
+        self._save_meta()
+        if first_open:
+            self._open(indexed_rows=0)
+        else:
+            self._matrix = np.memmap(self.path / MATRIX_FILE, dtype=np.float32, mode='r+',
+                                     shape=(self.capacity, self.dim))
+            self._index.resize_index(self.capacity)
+
+    def _write(self, ids, embeddings, documents, metadatas, overwrite: bool) -> None:
+        if not len(ids):
+            return
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"向量维度不一致: {vectors.shape[1]} != {self.dim}")
+            self._ensure_capacity(self.store.rows + len(ids))
+
+            rows, positions = [], []
+            for i, vector_id in enumerate(ids):
+                if not overwrite and vector_id in self.store.row_of:
+                    logger.debug(f"向量已存在，跳过: {vector_id}")
+                    continue
+                row, replaced = self.store.put(
+                    vector_id,
+                    documents[i] if documents is not None else None,
+                    metadatas[i] if metadatas is not None else None
+                )
+                if replaced is not None:
+                    self._mark_deleted(replaced)
+                rows.append(row)
+                positions.append(i)
+
+            if rows:
+                self._matrix[rows[0]:rows[-1] + 1] = vectors[positions]
+                self._index.add_items(vectors[positions], rows)
+            self._after_write()
+
+    def _after_write(self) -> None:
+        """追加元数据日志；日志过长时写快照，缩短下次加载的重放时间"""
+        self.store.flush()
+        if self.store.journal_entries > self.snapshot_every:
+            self.persist()
+
+    def _mark_deleted(self, row: int) -> None:
+        try:
+            self._index.mark_deleted(row)
+        except RuntimeError:
+            # 已标记删除
+            pass
+
+    def _search(self, query: np.ndarray, k: int, allowed: Optional[List[int]]) -> Tuple[List[int], List[float]]:
+        """HNSW近邻检索；过滤后的行数较少时直接精确计算"""
+        if allowed is not None and len(allowed) <= self.brute_force_threshold:
+            return self._exact_search(query, k, allowed)
+
+        available = len(allowed) if allowed is not None else len(self.store)
+        k = min(k, available)
+        if k <= 0:
+            return [], []
+
+        allowed_set = set(allowed) if allowed is not None else None
+        try:
+            labels, distances = self._index.knn_query(
+                query[None, :], k=k,
+                filter=(lambda label: label in allowed_set) if allowed_set is not None else None
+            )
+        except RuntimeError:
+            # 删除标记过多时 HNSW 可能凑不满 k 个结果，改为精确计算
+            return self._exact_search(query, k, allowed if allowed is not None else self.store.live_rows())
+        return [int(label) for label in labels[0]], distances[0].tolist()
+
+    def _exact_search(self, query: np.ndarray, k: int, rows: List[int]) -> Tuple[List[int], List[float]]:
+        if not rows or k <= 0:
+            return [], []
+        distances = exact_distances(query, self._matrix[rows], self.space)
+        order = np.argsort(distances)[:k]
+        return [rows[i] for i in order], [float(distances[i]) for i in order]
+
+    def _rows_result(self, rows: List[int], include: List[str]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {'ids': [self.store.ids[row] for row in rows]}
+        result['documents'] = [self.store.documents[row] for row in rows] if 'documents' in include else None
+        result['metadatas'] = [self.store.metadata(row) for row in rows] if 'metadatas' in include else None
+        result['embeddings'] = (
+            np.asarray(self._matrix[rows]).tolist() if rows else []
+        ) if 'embeddings' in include else None
+        return result
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+职位特征模块
+
+职位在RAG导入时一次性提取匹配所需的特征（技能、经验年限、薪资区间、行业、学历等级），
+以扁平字段写入每个向量文档的元数据，并保存到 SQLite job_features 表。
+各评分器优先读取检索结果元数据中的特征，缺失时按职位ID批量查表，
+匹配时只做比较和算术，不再对职位文本重复做正则提取和关键词扫描。
+"""
+
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 特征提取规则变化时递增，旧版本的元数据和表记录视为缺失
+FEATURE_VERSION = 1
+
+# 从职位文本中识别的技能关键词（小写，按子串匹配）
+SKILL_KEYWORDS = [
+    # 编程语言
+    'python', 'java', 'javascript', 'typescript', 'c#', 'c++', 'golang', 'go',
+
+    # Web前端技术
+    'react', 'vue', 'angular', 'node.js', 'html', 'css', 'bootstrap',
+    'jquery', 'webpack', 'npm', 'yarn', 'sass', 'less',
+
+    # 后端框架
+    'spring', 'django', 'flask', '.net', 'asp.net',
+
+    # 数据库技术
+    'mysql', 'postgresql', 'mongodb', 'redis', 'azure sql', 'cosmos db',
+    'sql server', 'oracle', 'sqlite', 'cassandra', 'elasticsearch',
+
+    # 云平台技术
+    'azure', 'microsoft azure', 'aws', 'gcp', 'google cloud',
+    'azure data factory', 'azure functions', 'azure storage',
+    'azure data lake storage', 'azure data lake storage gen2',
+    'azure synapse', 'azure databricks', 'azure devops',
+    'azure app service', 'azure kubernetes service', 'aks',
+
+    # 大数据和数据工程
+    'databricks', 'delta lake', 'spark', 'pyspark', 'spark sql',
+    'hadoop', 'hdfs', 'hive', 'kafka', 'airflow', 'nifi',
+    'ssis', 'informatica', 'talend', 'pentaho',
+    'etl', 'elt', 'data pipeline', 'data integration',
+    'oltp', 'olap', 'data warehouse', 'data mart',
+    'data lineage', 'data governance', 'data quality',
+    'metadata management', 'data catalog',
+
+    # AI/ML
+    'machine learning', 'deep learning', 'ai', 'artificial intelligence',
+    'tensorflow', 'pytorch', 'scikit-learn', 'keras', 'xgboost',
+    'computer vision', 'opencv', 'yolo', 'resnet', 'cnn', 'rnn', 'lstm',
+    'attention mechanism', 'transformer', 'bert', 'gpt',
+    'numpy', 'pandas', 'matplotlib', 'seaborn', 'plotly',
+    'jupyter', 'anaconda', 'mlflow', 'kubeflow',
+    'langchain', 'llamaindex', 'openai api', 'azure openai',
+    'rag', 'retrieval augmented generation', 'prompt engineering',
+
+    # 数据科学和分析
+    'data science', 'data analysis', 'data visualization',
+    'tableau', 'power bi', 'qlik', 'looker', 'grafana',
+    'r', 'stata', 'spss', 'sas',
+
+    # DevOps和基础设施
+    'docker', 'kubernetes', 'jenkins', 'gitlab ci', 'github actions',
+    'terraform', 'ansible', 'chef', 'puppet',
+    'linux', 'ubuntu', 'centos', 'windows server',
+    'nginx', 'apache', 'iis',
+
+    # 项目管理和方法论
+    'agile', 'scrum', 'kanban', 'waterfall', 'devops',
+    'ci/cd', 'continuous integration', 'continuous deployment',
+    'git', 'github', 'gitlab', 'bitbucket', 'svn',
+
+    # 架构和设计模式
+    'microservices', 'api', 'rest', 'graphql', 'soap',
+    'event driven', 'message queue', 'rabbitmq', 'activemq',
+    'design patterns', 'solid principles', 'clean architecture',
+
+    # 制药和医疗行业
+    'pharmaceutical', 'clinical data', 'regulatory compliance',
+    'gxp', 'fda', 'ich', 'clinical trials', 'pharmacovigilance',
+
+    # 中文技能关键词
+    '数据工程', '数据架构', '数据治理', '数据质量', '数据血缘',
+    '元数据管理', '机器学习', '深度学习', '计算机视觉',
+    '人工智能', '数据科学', '大数据', '云计算',
+    '敏捷开发', '项目管理', '技术管理', '架构设计',
+    '湖仓一体', '实时处理', '批处理', '流处理'
+]
+
+# 学历关键词 -> 等级（取文本中最先出现的关键词）
+EDUCATION_LEVELS = {
+    '不限': 0,
+    '高中': 1,
+    '中专': 1,
+    '大专': 2,
+    '专科': 2,
+    '本科': 3,
+    '学士': 3,
+    '硕士': 4,
+    '研究生': 4,
+    '博士': 5
+}
+
+# 元数据中技能列表的分隔符（Chroma 元数据只支持标量）
+SKILL_SEPARATOR = '|'
+
+_NO_EXPERIENCE_TERMS = ('不限', '无经验', '经验不限', '应届')
+
+_YEARS_PATTERNS = [
+    re.compile(r'(\d+)\s*[-~～至到]\s*\d+\s*年'),
+    re.compile(r'(\d+)\s*\+?\s*年'),
+    re.compile(r'(\d+)\+?\s*years?', re.IGNORECASE)
+]
+
+
+def parse_skill_list(value: Any) -> List[str]:
+    """把列表或逗号/顿号/竖线分隔的字符串解析为技能列表（保留原大小写）"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        items = re.split(r'[,，、|/;；]', value)
+    else:
+        items = value
+    return [str(item).strip() for item in items if item and str(item).strip()]
+
+
+def extract_required_years(text: Optional[str]) -> Optional[int]:
+    """
+    从经验要求中提取最低年限
+
+    Returns:
+        Optional[int]: 年限；无经验要求（不限、应届等）返回0，无法解析返回None
+    """
+    if not text:
+        return None
+    for pattern in _YEARS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return int(match.group(1))
+    if any(term in text for term in _NO_EXPERIENCE_TERMS):
+        return 0
+    return None
+
+
+def extract_education_level(text: Optional[str]) -> Optional[int]:
+    """从学历要求中提取等级（不限0 ~ 博士5），无法识别返回None"""
+    if not text:
+        return None
+    positions = [(text.find(keyword), level) for keyword, level in EDUCATION_LEVELS.items() if keyword in text]
+    return min(positions)[1] if positions else None
+
+
+def extract_skill_keywords(text: str) -> List[str]:
+    """识别文本中出现的技能关键词"""
+    text = text.lower()
+    return [skill for skill in SKILL_KEYWORDS if skill in text]
+
+
+@dataclass
+class JobFeatures:
+    """职位匹配特征"""
+    job_id: str
+    skills: List[str] = field(default_factory=list)
+    required_years: Optional[int] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    industry: Optional[str] = None
+    education_level: Optional[int] = None
+    version: int = FEATURE_VERSION
+
+    @property
+    def salary_range(self) -> Optional[Dict[str, int]]:
+        """薪资区间（与评分器使用的 {'min', 'max'} 格式一致），无薪资信息返回None"""
+        if self.salary_min is None and self.salary_max is None:
+            return None
+        return {'min': self.salary_min, 'max': self.salary_max}
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """转换为可直接写入向量文档元数据的扁平字段"""
+        metadata = {
+            'feature_version': self.version,
+            'feature_skills': SKILL_SEPARATOR.join(self.skills),
+            'required_experience_years': self.required_years,
+            'education_level': self.education_level
+        }
+        if self.industry:
+            metadata['industry'] = self.industry
+        return metadata
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any]) -> Optional['JobFeatures']:
+        """从向量文档元数据还原特征，未写入特征或版本过期时返回None"""
+        if not metadata or metadata.get('feature_version') != FEATURE_VERSION:
+            return None
+        skills = metadata.get('feature_skills') or ''
+        return cls(
+            job_id=metadata.get('job_id'),
+            skills=[skill for skill in skills.split(SKILL_SEPARATOR) if skill],
+            required_years=metadata.get('required_experience_years'),
+            salary_min=metadata.get('salary_min'),
+            salary_max=metadata.get('salary_max'),
+            industry=metadata.get('industry') or None,
+            education_level=metadata.get('education_level')
+        )
+
+
+def _field(structured: Any, name: str) -> Any:
+    """兼容字典和 JobStructure 对象读取字段"""
+    if isinstance(structured, dict):
+        return structured.get(name)
+    return getattr(structured, name, None)
+
+
+def extract_job_features(job_id: str, structured: Any, industry: Optional[str] = None) -> JobFeatures:
+    """
+    从结构化职位数据提取特征
+
+    Args:
+        job_id: 职位ID
+        structured: JobStructure 或 jobs.structured_data 解析后的字典
+        industry: 行业（来自 job_details，结构化数据中没有时使用）
+
+    Returns:
+        JobFeatures: 职位特征
+    """
+    text_parts = [_field(structured, 'job_title') or '']
+    for name in ('responsibilities', 'requirements'):
+        text_parts.extend(_field(structured, name) or [])
+
+    skills = []
+    for skill in parse_skill_list(_field(structured, 'skills')) + extract_skill_keywords(' '.join(text_parts)):
+        skill = skill.lower()
+        if skill not in skills:
+            skills.append(skill)
+
+    required_years = extract_required_years(_field(structured, 'experience'))
+    if required_years is None:
+        required_years = extract_required_years(' '.join(_field(structured, 'requirements') or []))
+
+    return JobFeatures(
+        job_id=job_id,
+        skills=skills,
+        required_years=required_years,
+        salary_min=_field(structured, 'salary_min'),
+        salary_max=_field(structured, 'salary_max'),
+        industry=_field(structured, 'industry') or industry or None,
+        education_level=extract_education_level(_field(structured, 'education'))
+    )
+
+
+def find_job_features(metadatas: Iterable[Dict[str, Any]]) -> Optional[JobFeatures]:
+    """从同一职位的文档元数据中取出导入时写入的特征"""
+    for metadata in metadatas:
+        features = JobFeatures.from_metadata(metadata)
+        if features is not None:
+            return features
+    return None
+
+
+def collect_job_features(metadatas_by_job: Dict[str, List[Dict[str, Any]]],
+                         store=None) -> Dict[str, JobFeatures]:
+    """
+    批量获取候选职位的特征
+
+    先读检索结果元数据，元数据中没有特征的职位（特征功能上线前导入的向量）
+    再通过 JobFeatureStore 一次批量查表；两处都没有的职位不在返回结果中，
+    由评分器按原有方式从文档提取。
+
+    Args:
+        metadatas_by_job: {job_id: 该职位各文档的元数据}
+        store: JobFeatureStore（可选）
+
+    Returns:
+        Dict[str, JobFeatures]: {job_id: 特征}
+    """
+    features_by_job = {}
+    missing = []
+    for job_id, metadatas in metadatas_by_job.items():
+        features = find_job_features(metadatas)
+        if features is not None:
+            features.job_id = job_id
+            features_by_job[job_id] = features
+        else:
+            missing.append(job_id)
+
+    if missing and store is not None:
+        try:
+            features_by_job.update(store.load_many(missing))
+        except Exception as e:
+            logger.warning(f"批量读取职位特征失败: {e}")
+
+    return features_by_job
@@ -0,0 +1,385 @@
+"""
+BM25词法索引
+
+面向中文职位文档的BM25倒排索引，支持增量更新和日志式持久化，
+并提供倒数排名融合（RRF），用于与向量检索结果进行混合排序。
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple, Iterable, Sequence, Hashable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import jieba
+    jieba.setLogLevel(logging.WARNING)
+    JIEBA_AVAILABLE = True
+except ImportError:
+    jieba = None
+    JIEBA_AVAILABLE = False
+
+
+_CJK_PATTERN = re.compile(r'[一-鿿]+')
+_TOKEN_PATTERN = re.compile(r'[一-鿿]+|[a-z0-9][a-z0-9.+#-]*')
+
+
+def _bigram_tokenize(text: str) -> List[str]:
+    """英文按词切分，中文连续片段切分为二元组（单字片段保留单字）"""
+    tokens = []
+    for segment in _TOKEN_PATTERN.findall(text.lower()):
+        if _CJK_PATTERN.fullmatch(segment):
+            if len(segment) == 1:
+                tokens.append(segment)
+            else:
+                tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            tokens.append(segment.rstrip('.-'))
+    return [token for token in tokens if token]
+
+
+def _jieba_tokenize(text: str) -> List[str]:
+    """jieba搜索引擎模式分词，仅保留中文词和英文/数字词"""
+    tokens = []
+    for word in jieba.cut_for_search(text.lower()):
+        word = word.strip()
+        if word and _TOKEN_PATTERN.fullmatch(word):
+            tokens.append(word)
+    return tokens
+
+
+def resolve_tokenizer_name(name: str = 'auto') -> str:
+    """解析分词器名称（auto: 已安装jieba时使用jieba，否则使用二元组）"""
+    if name == 'auto':
+        return 'jieba' if JIEBA_AVAILABLE else 'bigram'
+    if name == 'jieba' and not JIEBA_AVAILABLE:
+        logger.warning("未安装jieba，分词器回退为bigram")
+        return 'bigram'
+    return name
+
+
+def tokenize(text: str, tokenizer: str = 'bigram') -> List[str]:
+    """
+    对文本进行分词
+
+    Args:
+        text: 原始文本
+        tokenizer: 分词器名称（jieba / bigram）
+
+    Returns:
+        词元列表
+    """
+    if not text:
+        return []
+    if tokenizer == 'jieba' and JIEBA_AVAILABLE:
+        return _jieba_tokenize(text)
+    return _bigram_tokenize(text)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[Hashable, float]]:
+    """
+    倒数排名融合（Reciprocal Rank Fusion）
+
+    score(d) = Σ weight_i / (k + rank_i(d))，rank从1开始。
+
+    Args:
+        rankings: 多个按相关性降序排列的结果键列表
+        k: 平滑常数，越大越弱化头部排名的优势
+        weights: 各排名列表的权重（默认均为1）
+
+    Returns:
+        [(key, fused_score)] 列表，按融合分数降序
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[Hashable, float] = defaultdict(float)
+
+    for ranking, weight in zip(rankings, weights):
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] += weight / (k + rank)
+
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """BM25倒排索引（文档级，记录文档所属职位）"""
+
+    def __init__(self, persist_path: Optional[str] = None, tokenizer: str = 'auto',
+                 k1: float = 1.5, b: float = 0.75):
+        """
+        初始化BM25索引
+
+        Args:
+            persist_path: 持久化日志文件路径（None表示仅内存）
+            tokenizer: 分词器（auto / jieba / bigram）
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.persist_path = persist_path
+        self.tokenizer = resolve_tokenizer_name(tokenizer)
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {doc_id: tf}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}                 # doc_id -> {term: tf}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_jobs: Dict[str, Optional[str]] = {}
+        self._job_docs: Dict[str, set] = defaultdict(set)
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+        if self.persist_path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    @property
+    def average_doc_length(self) -> float:
+        """平均文档长度"""
+        return self._total_length / len(self._doc_terms) if self._doc_terms else 0.0
+
+    def add_document(self, doc_id: str, text: str, job_id: Optional[str] = None):
+        """添加或替换单个文档"""
+        self.add_documents([(doc_id, text, job_id)])
+
+    def add_documents(self, documents: Iterable[Tuple[str, str, Optional[str]]]):
+        """
+        批量添加或替换文档
+
+        Args:
+            documents: (doc_id, text, job_id) 元组序列
+        """
+        journal = []
+        with self._lock:
+            for doc_id, text, job_id in documents:
+                term_counts = dict(Counter(tokenize(text, self.tokenizer)))
+                self._insert(doc_id, term_counts, job_id)
+                journal.append({'op': 'add', 'doc_id': doc_id, 'job_id': job_id, 'tf': term_counts})
+            self._append_journal(journal)
+
+    def remove_document(self, doc_id: str) -> bool:
+        """删除单个文档"""
+        with self._lock:
+            removed = self._delete(doc_id)
+            if removed:
+                self._append_journal([{'op': 'remove', 'doc_id': doc_id}])
+            return removed
+
+    def remove_job(self, job_id: str) -> int:
+        """
+        删除职位的全部文档
+
+        Returns:
+            删除的文档数
+        """
+        with self._lock:
+            doc_ids = list(self._job_docs.get(job_id, ()))
+            for doc_id in doc_ids:
+                self._delete(doc_id)
+            if doc_ids:
+                self._append_journal([{'op': 'remove_job', 'job_id': job_id}])
+            return len(doc_ids)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25检索文档
+
+        Args:
+            query: 查询文本
+            k: 返回数量
+
+        Returns:
+            [(doc_id, bm25_score)] 列表，按分数降序
+        """
+        query_terms = tokenize(query, self.tokenizer)
+        if not query_terms:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if doc_count == 0:
+                return []
+
+            avgdl = self.average_doc_length or 1.0
+            scores: Dict[str, float] = defaultdict(float)
+
+            for term, query_tf in Counter(query_terms).items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    length_norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avgdl)
+                    scores[doc_id] += query_tf * idf * tf * (self.k1 + 1) / (tf + length_norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def search_jobs(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25检索职位（取职位下文档的最高分）
+
+        Returns:
+            [(job_id, bm25_score)] 列表，按分数降序
+        """
+        job_scores: Dict[str, float] = {}
+        for doc_id, score in self.search(query, k * 5):
+            job_id = self._doc_jobs.get(doc_id)
+            if job_id and score > job_scores.get(job_id, 0.0):
+                job_scores[job_id] = score
+        return sorted(job_scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def get_job_id(self, doc_id: str) -> Optional[str]:
+        """获取文档所属职位ID"""
+        return self._doc_jobs.get(doc_id)
+
+    def clear(self):
+        """清空索引（同时清空持久化日志）"""
+        with self._lock:
+            self._reset()
+            self.compact()
+
+    def compact(self):
+        """将当前索引状态重写为紧凑的持久化日志"""
+        if not self.persist_path:
+            return
+
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self._header(), ensure_ascii=False) + '\n')
+                for doc_id, term_counts in self._doc_terms.items():
+                    entry = {'op': 'add', 'doc_id': doc_id, 'job_id': self._doc_jobs.get(doc_id), 'tf': term_counts}
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.persist_path)
+
+        logger.info(f"BM25索引已压缩保存: {len(self)} 个文档 -> {self.persist_path}")
+
+    def get_stats(self) -> Dict[str, float]:
+        """获取索引统计信息"""
+        return {
+            'document_count': len(self._doc_terms),
+            'job_count': len(self._job_docs),
+            'vocabulary_size': len(self._postings),
+            'average_doc_length': round(self.average_doc_length, 2),
+            'tokenizer': self.tokenizer
+        }
+
+    def _insert(self, doc_id: str, term_counts: Dict[str, int], job_id: Optional[str]):
+        """写入内存索引（存在同ID文档时先删除）"""
+        self._delete(doc_id)
+
+        for term, tf in term_counts.items():
+            self._postings[term][doc_id] = tf
+
+        length = sum(term_counts.values())
+        self._doc_terms[doc_id] = term_counts
+        self._doc_lengths[doc_id] = length
+        self._doc_jobs[doc_id] = job_id
+        self._total_length += length
+        if job_id:
+            self._job_docs[job_id].add(doc_id)
+
+    def _delete(self, doc_id: str) -> bool:
+        """从内存索引删除文档"""
+        term_counts = self._doc_terms.pop(doc_id, None)
+        if term_counts is None:
+            return False
+
+        for term in term_counts:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        job_id = self._doc_jobs.pop(doc_id, None)
+        if job_id and job_id in self._job_docs:
+            self._job_docs[job_id].discard(doc_id)
+            if not self._job_docs[job_id]:
+                del self._job_docs[job_id]
+        return True
+
+    def _reset(self):
+        """重置内存索引"""
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._doc_jobs = {}
+        self._job_docs = defaultdict(set)
+        self._total_length = 0
+
+    def _header(self) -> Dict[str, str]:
+        return {'op': 'header', 'tokenizer': self.tokenizer, 'version': 1}
+
+    def _append_journal(self, entries: List[Dict]):
+        """追加写入持久化日志"""
+        if not self.persist_path or not entries:
+            return
+
+        try:
+            is_new = not os.path.exists(self.persist_path)
+            if is_new:
+                os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            with open(self.persist_path, 'a', encoding='utf-8') as f:
+                if is_new:
+                    f.write(json.dumps(self._header(), ensure_ascii=False) + '\n')
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"写入BM25索引日志失败: {e}")
+
+    def _load(self):
+        """重放持久化日志恢复索引"""
+        if not os.path.exists(self.persist_path):
+            return
+
+        replayed = 0
+        tokenizer_mismatch = False
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 进程中断可能留下不完整的末行
+                        logger.warning("BM25索引日志存在损坏行，已跳过")
+                        continue
+
+                    op = entry.get('op')
+                    if op == 'header':
+                        if entry.get('tokenizer') != self.tokenizer:
+                            logger.warning(f"BM25索引分词器不一致 ({entry.get('tokenizer')} != {self.tokenizer})，"
+                                           f"需要重建索引")
+                            self._reset()
+                            tokenizer_mismatch = True
+                            break
+                    elif op == 'add':
+                        self._insert(entry['doc_id'], entry.get('tf', {}), entry.get('job_id'))
+                    elif op == 'remove':
+                        self._delete(entry['doc_id'])
+                    elif op == 'remove_job':
+                        for doc_id in list(self._job_docs.get(entry['job_id'], ())):
+                            self._delete(doc_id)
+                    replayed += 1
+
+            if tokenizer_mismatch:
+                # 旧日志与当前分词器不兼容，重写为空索引
+                self.compact()
+                return
+
+            logger.info(f"BM25索引加载完成: {len(self)} 个文档 (重放 {replayed} 条日志)")
+        except OSError as e:
+            logger.error(f"加载BM25索引失败: {e}")
+            self._reset()
@@ -0,0 +1,336 @@
+"""
+ONNX Runtime 嵌入后端
+
+将 sentence-transformers 模型导出为 ONNX 并做动态 INT8 量化，用 onnxruntime 在 CPU 上推理，
+替代全精度 PyTorch 推理（RAG 导入和每次匹配查询中最大的CPU开销）。
+
+导出目录结构:
+    model.onnx            FP32 模型
+    model_int8.onnx       动态INT8量化模型
+    tokenizer 文件        与原模型一致
+    onnx_export.json      池化方式、最大长度、来源模型等导出信息
+
+onnxruntime、transformers、torch、numpy 仅在导出/推理时导入，本模块本身不依赖它们。
+"""
+
+import json
+import math
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+EXPORT_INFO_FILE = 'onnx_export.json'
+FP32_MODEL_FILE = 'model.onnx'
+INT8_MODEL_FILE = 'model_int8.onnx'
+ONNX_MODELS_DIR = './models/onnx'
+
+
+def _read_pooling_mode(model_path: Path) -> str:
+    """读取 sentence-transformers 的池化配置（mean / cls），缺省为 mean"""
+    pooling_config = model_path / '1_Pooling' / 'config.json'
+    if pooling_config.exists():
+        with open(pooling_config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if config.get('pooling_mode_cls_token'):
+            return 'cls'
+    return 'mean'
+
+
+def export_onnx_model(model_path: str, output_dir: str, quantize: bool = True,
+                      max_length: int = 512, opset: int = 14) -> Dict[str, Any]:
+    """
+    导出 ONNX 模型（可选动态INT8量化）
+
+    Args:
+        model_path: 本地 sentence-transformers 模型目录
+        output_dir: 导出目录
+        quantize: 是否生成INT8量化模型
+        max_length: 最大序列长度
+        opset: ONNX opset 版本
+
+    Returns:
+        Dict: 导出信息（同时写入 onnx_export.json）
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    source = Path(model_path)
+    target = Path(output_dir)
+    target.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(str(source))
+    model = AutoModel.from_pretrained(str(source))
+    model.eval()
+
+    sample = tokenizer(['导出示例文本'], padding=True, truncation=True,
+                       max_length=max_length, return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    fp32_path = target / FP32_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+    tokenizer.save_pretrained(str(target))
+
+    info = {
+        'source_model': str(source),
+        'pooling': _read_pooling_mode(source),
+        'max_length': max_length,
+        'input_names': input_names,
+        'embedding_dim': model.config.hidden_size,
+        'fp32_model': FP32_MODEL_FILE,
+        'int8_model': None,
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(fp32_path), str(target / INT8_MODEL_FILE), weight_type=QuantType.QInt8)
+        info['int8_model'] = INT8_MODEL_FILE
+
+    with open(target / EXPORT_INFO_FILE, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"ONNX模型导出完成: {target} (量化: {quantize})")
+    return info
+
+
+def is_exported(model_dir: str) -> bool:
+    """判断目录中是否已有导出的ONNX模型"""
+    return (Path(model_dir) / EXPORT_INFO_FILE).exists()
+
+
+def read_export_info(model_dir: str) -> Dict[str, Any]:
+    """读取导出信息（onnx_export.json）"""
+    with open(Path(model_dir) / EXPORT_INFO_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _model_basename(model_ref: str) -> str:
+    """模型目录名（兼容Windows路径分隔符；HuggingFace 模型ID取最后一段）"""
+    return model_ref.replace('\\', '/').rstrip('/').split('/')[-1]
+
+
+def default_model_dir(model_name: str) -> str:
+    """配置的模型对应的默认导出目录（与 download_models.py export-onnx 的输出目录一致）"""
+    return str(Path(ONNX_MODELS_DIR) / _model_basename(model_name))
+
+
+def validate_export(export_info: Dict[str, Any], model_name: Optional[str] = None,
+                    expected_dim: Optional[int] = None, embedding_dim: Optional[int] = None):
+    """
+    校验导出的模型与配置的模型、已有集合的向量维度一致
+
+    Args:
+        export_info: 导出信息
+        model_name: 配置的模型名或本地路径（按目录名比较，HuggingFace 模型ID取最后一段）
+        expected_dim: 已有集合的向量维度
+        embedding_dim: 模型输出维度（缺省取导出信息中的 embedding_dim）
+
+    Raises:
+        ValueError: 来源模型或向量维度不一致
+    """
+    source_model = export_info.get('source_model')
+    if model_name and source_model and _model_basename(source_model) != _model_basename(model_name):
+        raise ValueError(f"ONNX模型来源 {source_model} 与配置的模型 {model_name} 不一致，请重新导出")
+
+    embedding_dim = embedding_dim or export_info.get('embedding_dim')
+    if expected_dim and embedding_dim and int(embedding_dim) != int(expected_dim):
+        raise ValueError(f"ONNX模型输出维度 {embedding_dim} 与向量集合维度 {expected_dim} 不一致")
+
+
+class OnnxEmbeddings:
+    """
+    基于 onnxruntime 的句向量模型
+
+    与 HuggingFaceEmbeddings 接口一致（embed_documents / embed_query），
+    由 ChromaDBManager 在 embeddings.backend: onnx 时通过 LazyEmbeddings 包装使用。
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True, intra_op_threads: int = 0,
+                 inter_op_threads: int = 1, batch_size: int = 32, normalize_embeddings: bool = True,
+                 max_length: Optional[int] = None):
+        """
+        Args:
+            model_dir: 导出目录（export_onnx_model 的 output_dir）
+            quantized: 是否使用INT8量化模型（未导出量化模型时回退FP32）
+            intra_op_threads: 单个算子内的线程数（0 表示由 onnxruntime 按物理核数决定）
+            inter_op_threads: 算子间并行线程数
+            batch_size: 推理批大小
+            normalize_embeddings: 是否做L2归一化
+            max_length: 最大序列长度（默认取导出信息）
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        self.export_info = read_export_info(model_dir)
+
+        model_file = self.export_info['fp32_model']
+        if quantized:
+            if self.export_info.get('int8_model'):
+                model_file = self.export_info['int8_model']
+            else:
+                logger.warning(f"{model_dir} 中没有INT8量化模型，使用FP32模型")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(
+            str(self.model_dir / model_file), sess_options=options, providers=['CPUExecutionProvider']
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.input_names = {item.name for item in self.session.get_inputs()}
+        output_dim = self.session.get_outputs()[0].shape[-1]
+        self.embedding_dim = output_dim if isinstance(output_dim, int) else self.export_info.get('embedding_dim')
+        self.pooling = self.export_info.get('pooling', 'mean')
+        self.max_length = max_length or self.export_info.get('max_length', 512)
+        self.batch_size = batch_size
+        self.normalize_embeddings = normalize_embeddings
+        self.model_file = model_file
+
+        logger.info(f"ONNX嵌入模型已加载: {self.model_dir / model_file} "
+                    f"(线程: intra={intra_op_threads or 'auto'}, inter={inter_op_threads})")
+
+    def _encode_batch(self, texts: List[str]):
+        import numpy as np
+
+        encoded = self.tokenizer(texts, padding=True, truncation=True,
+                                 max_length=self.max_length, return_tensors='np')
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.pooling == 'cls':
+            vectors = hidden[:, 0]
+        else:
+            mask = encoded['attention_mask'][..., None].astype(hidden.dtype)
+            vectors = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize_embeddings:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """批量向量化（按长度排序分批以减少填充）"""
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            vectors = self._encode_batch([texts[i] for i in indices])
+            for i, vector in zip(indices, vectors):
+                results[i] = vector.tolist()
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def cosine_drift(reference: Sequence[Sequence[float]], candidate: Sequence[Sequence[float]]) -> Dict[str, float]:
+    """
+    计算两组向量逐条的余弦相似度，用于量化前后的精度一致性检查
+
+    Returns:
+        Dict: mean / min 余弦相似度，以及 max_drift（1 - 最小相似度）
+    """
+    if len(reference) != len(candidate) or not reference:
+        raise ValueError("参考向量与候选向量数量必须一致且不为空")
+
+    similarities = []
+    for ref, cand in zip(reference, candidate):
+        dot = sum(a * b for a, b in zip(ref, cand))
+        norm = math.sqrt(sum(a * a for a in ref)) * math.sqrt(sum(b * b for b in cand))
+        similarities.append(dot / norm if norm else 0.0)
+
+    return {
+        'mean_cosine': sum(similarities) / len(similarities),
+        'min_cosine': min(similarities),
+        'max_drift': 1 - min(similarities),
+        'samples': len(similarities)
+    }
+
+
+def benchmark_throughput(embed: Callable[[List[str]], List[List[float]]], texts: List[str],
+                         rounds: int = 3, warmup: int = 1) -> Dict[str, float]:
+    """
+    测量嵌入吞吐量
+
+    Args:
+        embed: embed_documents 函数
+        texts: 测试文本
+        rounds: 计时轮数
+        warmup: 预热轮数
+
+    Returns:
+        Dict: texts_per_second、avg_batch_ms
+    """
+    for _ in range(warmup):
+        embed(texts)
+
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        embed(texts)
+        durations.append(time.perf_counter() - start)
+
+    avg = sum(durations) / len(durations)
+    return {
+        'texts_per_second': round(len(texts) / avg, 2) if avg else 0.0,
+        'avg_batch_ms': round(avg * 1000, 2),
+        'rounds': rounds
+    }
+
+
+def build_onnx_embeddings(embeddings_config: Dict, model_name: Optional[str] = None,
+                          expected_dim: Optional[int] = None) -> OnnxEmbeddings:
+    """
+    按 embeddings 配置构建ONNX嵌入模型（embeddings.onnx 小节）
+
+    Args:
+        embeddings_config: embeddings 配置
+        model_name: 配置的模型名或本地路径；未指定 onnx.model_dir 时据此确定导出目录，
+                    并校验导出的来源模型与之一致
+        expected_dim: 已有集合的向量维度，与模型输出维度不一致时报错
+
+    Raises:
+        FileNotFoundError: 未导出ONNX模型
+        ValueError: 导出的模型与配置的模型或集合维度不一致
+    """
+    onnx_config = embeddings_config.get('onnx', {})
+    model_dir = onnx_config.get('model_dir') or default_model_dir(model_name or 'text2vec-base-chinese')
+    if not is_exported(model_dir):
+        raise FileNotFoundError(
+            f"ONNX模型不存在: {model_dir}，请先运行 python scripts/download_models.py export-onnx"
+        )
+    validate_export(read_export_info(model_dir), model_name, expected_dim)
+
+    embeddings = OnnxEmbeddings(
+        model_dir,
+        quantized=onnx_config.get('quantized', True),
+        intra_op_threads=onnx_config.get('intra_op_threads', 0),
+        inter_op_threads=onnx_config.get('inter_op_threads', 1),
+        batch_size=embeddings_config.get('batch_size', 32),
+        normalize_embeddings=embeddings_config.get('normalize_embeddings', True),
+        max_length=onnx_config.get('max_length')
+    )
+    # 旧版本导出信息没有记录维度，加载后按模型输出再校验一次
+    validate_export(embeddings.export_info, expected_dim=expected_dim, embedding_dim=embeddings.embedding_dim)
+    return embeddings
@@ -4,15 +4,15 @@
 提供性能监控、质量评估和优化建议
 """
 
-import time
-import psutil
 import logging
+from collections import deque
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
-import asyncio
 from contextlib import asynccontextmanager
 
+from ..utils.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,9 +52,10 @@ class PerformanceMonitor:
     
     def __init__(self, config: Dict = None):
         self.config = config or {}
-        self.metrics_history: List[PerformanceMetrics] = []
         self.enable_monitoring = self.config.get('enable_monitoring', True)
         self.max_history_size = self.config.get('max_history_size', 1000)
+        self.metrics_history: deque = deque(maxlen=self.max_history_size)
+        self.tracer = tracer
         
         logger.info("性能监控器初始化完成")
     
@@ -63,6 +64,9 @@ class PerformanceMonitor:
         """
         监控操作性能的上下文管理器
         
+        计时和父子关系由统一追踪器（src/utils/tracing.py）记录，内存和CPU取自后台采样，
+        不在操作前后同步调用 psutil。
+        
         Args:
             operation: 操作名称
             metadata: 额外的元数据
@@ -71,70 +75,41 @@ class PerformanceMonitor:
             yield
             return
         
-        # 记录开始状态
-        start_time = time.time()
-        start_memory = self._get_memory_usage()
-        start_cpu = self._get_cpu_usage()
-        
-        success = True
-        error_message = None
-        
+        span = None
         try:
-            yield
-        except Exception as e:
-            success = False
-            error_message = str(e)
-            raise
+            with self.tracer.span(operation, **(metadata or {})) as span:
+                yield
         finally:
-            # 记录结束状态
-            end_time = time.time()
-            end_memory = self._get_memory_usage()
-            end_cpu = self._get_cpu_usage()
-            
-            # 创建性能指标
-            metrics = PerformanceMetrics(
-                operation=operation,
-                start_time=start_time,
-                end_time=end_time,
-                duration=end_time - start_time,
-                memory_usage_mb=max(end_memory - start_memory, 0),
-                cpu_usage_percent=(start_cpu + end_cpu) / 2,
-                success=success,
-                error_message=error_message,
-                metadata=metadata or {}
-            )
-            
-            # 记录指标
-            self._record_metrics(metrics)
-            
-            # 记录日志
-            if success:
-                logger.info(f"操作完成: {operation}, 耗时: {metrics.duration:.3f}s, 内存: {metrics.memory_usage_mb:.1f}MB")
-            else:
-                logger.error(f"操作失败: {operation}, 耗时: {metrics.duration:.3f}s, 错误: {error_message}")
+            if span is not None:
+                self._record_span(span, metadata)
     
-    def _get_memory_usage(self) -> float:
-        """获取当前内存使用量（MB）"""
-        try:
-            process = psutil.Process()
-            return process.memory_info().rss / 1024 / 1024
-        except Exception:
-            return 0.0
-    
-    def _get_cpu_usage(self) -> float:
-        """获取当前CPU使用率"""
-        try:
-            return psutil.cpu_percent(interval=0.1)
-        except Exception:
-            return 0.0
+    def _record_span(self, span, metadata: Dict = None):
+        """将追踪Span转换为性能指标并记录"""
+        duration = span.duration_ns / 1e9
+        metrics = PerformanceMetrics(
+            operation=span.name,
+            start_time=span.start_time,
+            end_time=span.start_time + duration,
+            duration=duration,
+            memory_usage_mb=max(span.memory_delta_mb, 0),
+            cpu_usage_percent=span.cpu_percent,
+            success=span.success,
+            error_message=span.error_message,
+            metadata=metadata or {}
+        )
+        
+        # 记录指标
+        self._record_metrics(metrics)
+        
+        # 记录日志
+        if metrics.success:
+            logger.info(f"操作完成: {span.name}, 耗时: {metrics.duration:.3f}s, 内存: {metrics.memory_usage_mb:.1f}MB")
+        else:
+            logger.error(f"操作失败: {span.name}, 耗时: {metrics.duration:.3f}s, 错误: {metrics.error_message}")
     
     def _record_metrics(self, metrics: PerformanceMetrics):
-        """记录性能指标"""
+        """记录性能指标（历史记录大小由 deque 的 maxlen 限制）"""
         self.metrics_history.append(metrics)
-        
-        # 限制历史记录大小
-        if len(self.metrics_history) > self.max_history_size:
-            self.metrics_history = self.metrics_history[-self.max_history_size:]
     
     def get_performance_summary(self, operation: str = None) -> Dict[str, Any]:
         """
@@ -149,7 +124,7 @@ class PerformanceMonitor:
         if operation:
             filtered_metrics = [m for m in self.metrics_history if m.operation == operation]
         else:
-            filtered_metrics = self.metrics_history
+            filtered_metrics = list(self.metrics_history)
         
         if not filtered_metrics:
             return {'message': '没有性能数据'}
@@ -179,6 +154,7 @@ class PerformanceMonitor:
                 'max': max(memory_usages),
                 'avg': sum(memory_usages) / len(memory_usages)
             },
+            'latency_percentiles': self.tracer.get_summary(operation),
             'recent_errors': [
                 m.error_message for m in filtered_metrics[-10:] 
                 if not m.success and m.error_message
@@ -14,9 +14,12 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache, wraps
 import psutil
 import gc
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from ..utils.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -26,18 +29,18 @@ class PerformanceMetrics:
     start_time: float
     end_time: float
     duration: float
-    memory_before: float
+    memory_before: float  # 进程RSS（MB），取自后台采样
     memory_after: float
     memory_delta: float
-    cpu_percent: float
+    cpu_percent: float    # 进程CPU使用率，取自后台采样
     success: bool
     error_message: Optional[str] = None
 
 class PerformanceMonitor:
     """性能监控器"""
     
-    def __init__(self):
-        self.metrics: List[PerformanceMetrics] = []
+    def __init__(self, max_history: int = 10000):
+        self.metrics: deque = deque(maxlen=max_history)
         self._lock = threading.Lock()
     
     def record_operation(self, operation_name: str, start_time: float, end_time: float, 
@@ -107,87 +110,46 @@ class PerformanceMonitor:
         return grouped
 
 def performance_monitor(operation_name: str):
-    """性能监控装饰器"""
+    """
+    性能监控装饰器
+    
+    计时由统一追踪器（src/utils/tracing.py）以 Span 记录，内存和CPU读取后台采样值，
+    调用路径上不再同步查询系统内存和CPU。实例带有 performance_monitor 时同时写入其指标。
+    """
+    def record(args, span):
+        monitor = getattr(args[0], 'performance_monitor', None) if args else None
+        if monitor:
+            monitor.record_operation(
+                operation_name=operation_name,
+                start_time=span.start_time,
+                end_time=span.start_time + span.duration_ns / 1e9,
+                memory_before=span.start_rss_mb,
+                memory_after=span.end_rss_mb,
+                cpu_percent=span.cpu_percent,
+                success=span.success,
+                error_message=span.error_message
+            )
+    
     def decorator(func):
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            monitor = getattr(args[0], 'performance_monitor', None) if args else None
-            if not monitor:
-                return await func(*args, **kwargs)
-            
-            # 记录开始状态
-            start_time = time.time()
-            memory_before = psutil.virtual_memory().used / (1024**3)
-            cpu_before = psutil.cpu_percent()
-            
-            success = True
-            error_message = None
-            result = None
-            
+            span = None
             try:
-                result = await func(*args, **kwargs)
-            except Exception as e:
-                success = False
-                error_message = str(e)
-                raise
+                with tracer.span(operation_name) as span:
+                    return await func(*args, **kwargs)
             finally:
-                # 记录结束状态
-                end_time = time.time()
-                memory_after = psutil.virtual_memory().used / (1024**3)
-                cpu_after = psutil.cpu_percent()
-                
-                monitor.record_operation(
-                    operation_name=operation_name,
-                    start_time=start_time,
-                    end_time=end_time,
-                    memory_before=memory_before,
-                    memory_after=memory_after,
-                    cpu_percent=(cpu_before + cpu_after) / 2,
-                    success=success,
-                    error_message=error_message
-                )
-            
-            return result
+                if span is not None:
+                    record(args, span)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            monitor = getattr(args[0], 'performance_monitor', None) if args else None
-            if not monitor:
-                return func(*args, **kwargs)
-            
-            # 记录开始状态
-            start_time = time.time()
-            memory_before = psutil.virtual_memory().used / (1024**3)
-            cpu_before = psutil.cpu_percent()
-            
-            success = True
-            error_message = None
-            result = None
-            
+            span = None
             try:
-                result = func(*args, **kwargs)
-            except Exception as e:
-                success = False
-                error_message = str(e)
-                raise
+                with tracer.span(operation_name) as span:
+                    return func(*args, **kwargs)
             finally:
-                # 记录结束状态
-                end_time = time.time()
-                memory_after = psutil.virtual_memory().used / (1024**3)
-                cpu_after = psutil.cpu_percent()
-                
-                monitor.record_operation(
-                    operation_name=operation_name,
-                    start_time=start_time,
-                    end_time=end_time,
-                    memory_before=memory_before,
-                    memory_after=memory_after,
-                    cpu_percent=(cpu_before + cpu_after) / 2,
-                    success=success,
-                    error_message=error_message
-                )
-            
-            return result
+                if span is not None:
+                    record(args, span)
         
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
     return decorator
@@ -537,6 +499,8 @@ class PerformanceOptimizer:
         """获取性能报告"""
         return {
             'performance_metrics': self.performance_monitor.get_metrics_summary(),
+            'trace_summary': tracer.get_summary(),
+            'process_resources': tracer.get_resource_usage(),
             'cache_stats': self.cache_manager.get_stats(),
             'memory_usage': self.memory_manager.get_memory_usage(),
             'configuration': {
@@ -0,0 +1,385 @@
+"""
+RAG常驻服务
+
+在后台进程中保持 ChromaDBManager、RAGSystemCoordinator 和 GenericResumeJobMatcher 常驻，
+通过本机 HTTP（JSON）接口提供搜索、匹配、导入和状态查询，
+避免每次运行命令行或批处理脚本时重复加载嵌入模型、打开向量库。
+
+接口:
+    GET  /health   服务存活检查
+    GET  /status   RAG系统状态和处理进度
+    GET  /stats    各接口请求耗时统计
+    POST /search   {"query": str, "k": int, "filters": dict}
+    POST /match    {"resume": dict, "top_k": int, "filters": dict, "matcher_config": dict}
+                   matcher_config 可选，给出时用该配置的匹配器（按配置缓存）代替常驻匹配器
+    POST /import   {"batch_size": int, "force_reprocess": bool, "max_jobs": int}
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List
+
+from ..core.exceptions import RAGSystemError, ServiceConflictError, ServiceRouteNotFoundError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+def get_service_address(config: Dict[str, Any]) -> tuple:
+    """从配置中读取服务监听地址（rag_system.service.host/port）"""
+    service_config = config.get('rag_system', {}).get('service', {})
+    return service_config.get('host', DEFAULT_HOST), service_config.get('port', DEFAULT_PORT)
+
+
+class RequestStats:
+    """按接口统计请求耗时（保留最近 window 次用于分位数）"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._window = window
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, endpoint: str, elapsed_ms: float, success: bool) -> None:
+        """记录一次请求"""
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'recent': deque(maxlen=self._window)
+            })
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['recent'].append(elapsed_ms)
+            if not success:
+                stats['errors'] += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """获取各接口的次数、错误数和耗时分位数"""
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._stats.items():
+                recent = sorted(stats['recent'])
+                result[endpoint] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                    'p50_ms': round(recent[len(recent) // 2], 3),
+                    'p95_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3),
+                    'max_ms': round(stats['max_ms'], 3)
+                }
+            return result
+
+
+class RAGService:
+    """RAG常驻服务"""
+
+    def __init__(self, config: Dict[str, Any], host: Optional[str] = None, port: Optional[int] = None,
+                 coordinator=None, matcher=None):
+        """
+        初始化RAG服务
+
+        Args:
+            config: 系统配置字典（与 rag_cli.py 使用的配置相同）
+            host: 监听地址，默认读取 rag_system.service.host（127.0.0.1）
+            port: 监听端口，默认读取 rag_system.service.port（8765）
+            coordinator: 已初始化的RAG系统协调器（可选，默认启动时创建）
+            matcher: 简历匹配器（可选，默认启动时创建）
+        """
+        self.config = config
+        self.service_config = config.get('rag_system', {}).get('service', {})
+        default_host, default_port = get_service_address(config)
+        self.host = host or default_host
+        self.port = port if port is not None else default_port
+        self.max_concurrency = self.service_config.get('max_concurrency', 8)
+
+        self.coordinator = coordinator
+        self.matcher = matcher
+        self.request_stats = RequestStats()
+
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._import_lock = threading.Lock()
+        self._matchers_lock = threading.Lock()
+        self._matchers: Dict[str, Any] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._started_at: Optional[float] = None
+        self._warmed_up = False
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+
+    def warm_up(self) -> None:
+        """创建并预热常驻组件（协调器、匹配器、嵌入模型），重复调用无副作用"""
+        if self._warmed_up:
+            return
+
+        start_time = time.perf_counter()
+
+        if self.coordinator is None:
+            from .rag_system_coordinator import RAGSystemCoordinator
+            self.coordinator = RAGSystemCoordinator(self.config)
+            if not self.coordinator.initialize_system():
+                raise RAGSystemError("RAG系统初始化失败")
+
+        if self.matcher is None:
+            self.matcher = self._create_matcher(self.config.get('resume_matching', {}))
+
+        embeddings = getattr(self.coordinator.vector_manager, 'embeddings', None)
+        if hasattr(embeddings, 'load'):
+            embeddings.load()
+
+        self._warmed_up = True
+        logger.info(f"RAG服务组件预热完成，耗时 {time.perf_counter() - start_time:.2f} 秒")
+
+    def _create_matcher(self, matcher_config: Dict[str, Any]):
+        """用常驻向量管理器创建简历匹配器"""
+        from ..matcher.generic_resume_matcher import GenericResumeJobMatcher
+        return GenericResumeJobMatcher(self.coordinator.vector_manager, matcher_config)
+
+    def _get_matcher(self, matcher_config: Optional[Dict[str, Any]]):
+        """请求未指定匹配器配置时用常驻匹配器，否则按配置缓存匹配器"""
+        if not matcher_config:
+            return self.matcher
+        if not isinstance(matcher_config, dict):
+            raise ValueError("matcher_config 必须是对象")
+
+        key = json.dumps(matcher_config, sort_keys=True, ensure_ascii=False, default=str)
+        with self._matchers_lock:
+            matcher = self._matchers.get(key)
+            if matcher is None:
+                matcher = self._matchers[key] = self._create_matcher(matcher_config)
+            return matcher
+
+    def start(self, block: bool = True) -> None:
+        """
+        启动服务
+
+        Args:
+            block: 是否阻塞当前线程直到服务停止
+        """
+        self.warm_up()
+
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._started_at = time.monotonic()
+        logger.info(f"RAG服务已启动: http://{self.host}:{self.port}")
+
+        if block:
+            try:
+                self._server.serve_forever()
+            finally:
+                self._server.server_close()
+        else:
+            threading.Thread(target=self._server.serve_forever, name='rag-service', daemon=True).start()
+
+    def shutdown(self) -> None:
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            logger.info("RAG服务已停止")
+
+    # ------------------------------------------------------------------
+    # 请求处理
+    # ------------------------------------------------------------------
+
+    def handle(self, method: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """分发请求，返回JSON响应体；路由不存在时抛出 ServiceRouteNotFoundError"""
+        routes = {
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/status'): self.handle_status,
+            ('GET', '/stats'): self.handle_stats,
+            ('POST', '/search'): self.handle_search,
+            ('POST', '/match'): self.handle_match,
+            ('POST', '/import'): self.handle_import,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            raise ServiceRouteNotFoundError(f"未知接口: {method} {path}")
+
+        with self._semaphore:
+            return handler(payload)
+
+    def handle_health(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """服务存活检查"""
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.monotonic() - self._started_at, 1) if self._started_at else 0
+        }
+
+    def handle_status(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """RAG系统状态"""
+        return {
+            'system_status': self.coordinator.get_system_status(),
+            'progress': self.coordinator.get_processing_progress()
+        }
+
+    def handle_stats(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """请求耗时统计"""
+        return {'requests': self.request_stats.summary()}
+
+    def handle_search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """职位向量搜索"""
+        query = payload.get('query')
+        if not query:
+            raise ValueError("缺少 query 参数")
+
+        docs = self.coordinator.vector_manager.search_similar_jobs(
+            query, k=payload.get('k', 10), filters=payload.get('filters')
+        )
+        return {
+            'results': [{'content': doc.page_content, 'metadata': doc.metadata} for doc in docs]
+        }
+
+    def handle_match(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """简历职位匹配"""
+        from ..matcher.generic_resume_models import GenericResumeProfile
+
+        resume_data = payload.get('resume')
+        if not resume_data:
+            raise ValueError("缺少 resume 参数")
+
+        profile = GenericResumeProfile.from_dict(resume_data)
+        matcher = self._get_matcher(payload.get('matcher_config'))
+        result = asyncio.run(matcher.find_matching_jobs(
+            profile, filters=payload.get('filters') or {}, top_k=payload.get('top_k', 50)
+        ))
+        return result.to_dict()
+
+    def handle_import(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """从数据库导入职位到向量库（同一时间只允许一个导入任务）"""
+        if not self._import_lock.acquire(blocking=False):
+            raise ServiceConflictError("已有导入任务正在执行")
+
+        try:
+            return asyncio.run(self.coordinator.import_database_jobs(
+                batch_size=payload.get('batch_size', 50),
+                force_reprocess=payload.get('force_reprocess', False),
+                max_jobs=payload.get('max_jobs')
+            ))
+        finally:
+            self._import_lock.release()
+
+    def _make_handler(self):
+        """创建绑定到当前服务实例的HTTP请求处理类"""
+        service = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def _dispatch(self, method: str):
+                start_time = time.perf_counter()
+                path = self.path.split('?', 1)[0]
+                status = 200
+
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    payload = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                    body = service.handle(method, path, payload)
+                except ServiceRouteNotFoundError as e:
+                    status, body = 404, {'error': str(e)}
+                except ServiceConflictError as e:
+                    status, body = 409, {'error': str(e)}
+                except (ValueError, json.JSONDecodeError) as e:
+                    status, body = 400, {'error': str(e)}
+                except Exception as e:
+                    logger.exception(f"RAG服务请求处理失败: {method} {path}")
+                    status, body = 500, {'error': str(e)}
+
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                service.request_stats.record(path, elapsed_ms, status < 400)
+                body['elapsed_ms'] = round(elapsed_ms, 3)
+
+                data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('X-Response-Time-Ms', f'{elapsed_ms:.3f}')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} - {format % args}")
+
+        return _Handler
+
+
+class RAGServiceClient:
+    """RAG常驻服务客户端（rag_cli.py 和批处理脚本在服务运行时作为瘦客户端使用）"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 600):
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], timeout: float = 600) -> 'RAGServiceClient':
+        """根据配置创建客户端"""
+        host, port = get_service_address(config)
+        return cls(host, port, timeout)
+
+    def is_available(self, timeout: float = 0.5) -> bool:
+        """服务是否在运行"""
+        try:
+            return self._request('GET', '/health', timeout=timeout).get('status') == 'ok'
+        except RAGSystemError:
+            return False
+
+    def status(self) -> Dict[str, Any]:
+        return self._request('GET', '/status')
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request('GET', '/stats')
+
+    def search(self, query: str, k: int = 10, filters: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        return self._request('POST', '/search', {'query': query, 'k': k, 'filters': filters})['results']
+
+    def match(self, resume: Dict[str, Any], top_k: int = 50, filters: Optional[Dict] = None,
+              matcher_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload = {'resume': resume, 'top_k': top_k, 'filters': filters}
+        if matcher_config:
+            payload['matcher_config'] = matcher_config
+        return self._request('POST', '/match', payload)
+
+    def import_jobs(self, batch_size: int = 50, force_reprocess: bool = False,
+                    max_jobs: Optional[int] = None) -> Dict[str, Any]:
+        return self._request('POST', '/import', {
+            'batch_size': batch_size, 'force_reprocess': force_reprocess, 'max_jobs': max_jobs
+        })
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """发送请求并解析JSON响应，连接失败或服务端报错时抛出 RAGSystemError"""
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={'Content-Type': 'application/json; charset=utf-8'}
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', str(e))
+            except Exception:
+                message = str(e)
+            raise RAGSystemError(f"RAG服务请求失败 ({e.code}): {message}")
+        except (urllib.error.URLError, OSError) as e:
+            raise RAGSystemError(f"无法连接RAG服务 {self.base_url}: {e}")
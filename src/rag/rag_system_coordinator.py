@@ -15,9 +15,12 @@ from .database_job_reader import DatabaseJobReader
 from .optimized_job_processor import OptimizedJobProcessor
 from .vector_manager import ChromaDBManager
 from .document_creator import DocumentCreator
+from .job_features import extract_job_features
 from .performance_optimizer import create_performance_optimizer, performance_monitor
 from .error_handler import create_error_handler, with_error_handling
 from ..core.exceptions import RAGSystemError
+from ..database.match_outbox import MatchOutbox
+from ..database.job_features import JobFeatureStore
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +81,15 @@ class RAGSystemCoordinator:
             db_config = self.rag_config.get('database', {})
             db_path = db_config.get('path', './data/jobs.db')
             self.db_reader = DatabaseJobReader(db_path, db_config)
+            self.job_feature_store = JobFeatureStore(self.db_reader)
+            
+            # 增量匹配出队表：mark_job_as_processed 时由触发器写入职位ID
+            incremental_config = self.config.get('integration_system', {}).get('incremental_matching', {})
+            if incremental_config.get('enabled', False):
+                try:
+                    MatchOutbox(self.db_reader, incremental_config).ensure_tables()
+                except Exception as e:
+                    logger.warning(f"增量匹配出队表初始化失败，新职位需全量匹配: {e}")
             
             # 职位处理器
             llm_config = self.rag_config.get('llm', {})
@@ -329,8 +341,13 @@ class RAGSystemCoordinator:
                 job_url=job_data.get('url')
             )
             
+            # 提取匹配特征，写入每个文档的元数据
+            job_features = extract_job_features(job_id, job_structure, industry=job_data.get('industry'))
+            for doc in documents:
+                doc.metadata.update(job_features.to_metadata())
+            
             # 4. 向量化存储
-            doc_ids = await self.vector_manager.add_job_documents_async(documents, job_id)
+            doc_ids = await self.vector_manager.add_job_documents_async(documents, job_id, prune_stale=True)
             
             # 5. 计算语义评分（基于文档数量和内容质量）
             semantic_score = self._calculate_semantic_score(job_structure, documents)
@@ -362,6 +379,12 @@ class RAGSystemCoordinator:
                 structured_data=structured_data_json
             )
             
+            # 8. 保存匹配特征，供评分器按职位ID批量读取
+            try:
+                self.job_feature_store.save_many([job_features])
+            except Exception as e:
+                logger.warning(f"保存职位特征失败 {job_id}: {e}")
+            
             logger.debug(f"成功处理职位: {job_id} - {job_structure.job_title}")
             return True
             
@@ -5,13 +5,15 @@
 """
 
 from langchain.schema import Document
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Union
 import logging
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 from .vector_manager import ChromaDBManager
+from .lexical_index import reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +21,16 @@ logger = logging.getLogger(__name__)
 class SemanticSearchEngine:
     """语义搜索引擎"""
     
-    def __init__(self, vector_manager: ChromaDBManager, config: Dict = None):
+    def __init__(self, vector_manager: ChromaDBManager, config: Dict = None,
+                 lexical_searcher: Optional[Callable[[str, int], List[Tuple[str, float]]]] = None):
         """
         初始化语义搜索引擎
         
         Args:
             vector_manager: 向量存储管理器
             config: 配置字典
+            lexical_searcher: 词法检索函数 (query, limit) -> [(job_id, score)]，
+                如 DatabaseManager.search_jobs_fulltext；为空时混合搜索退化为分词重叠评分
         """
         self.vector_manager = vector_manager
         self.config = config or {}
@@ -35,6 +40,16 @@ class SemanticSearchEngine:
         self.score_threshold = self.config.get('score_threshold', 0.7)
         self.max_results = self.config.get('max_results', 50)
         
+        # 混合搜索配置
+        # fusion_method: rrf（倒数排名融合，默认）或 weighted（分数加权）
+        self.fusion_method = self.config.get('fusion_method', 'rrf')
+        self.rrf_k = self.config.get('rrf_k', 60)
+        self.hybrid_weights = self.config.get('hybrid_weights', {'vector': 0.7, 'lexical': 0.3})
+        self.lexical_searcher = lexical_searcher or self._create_default_lexical_searcher()
+        
+        # 多查询并发配置
+        self.max_parallel_queries = self.config.get('max_parallel_queries', 4)
+        
         # 搜索策略配置
         self.search_strategies = {
             'similarity': self._similarity_search,
@@ -67,13 +82,7 @@ class SemanticSearchEngine:
             strategy = 'similarity'
         
         try:
-            # 执行搜索
-            search_func = self.search_strategies[strategy]
-            results = search_func(query, k, filters, **kwargs)
-            
-            # 后处理结果
-            processed_results = self._post_process_results(results, query)
-            
+            processed_results = self._run_search(query, strategy, k, filters, **kwargs)
             logger.info(f"搜索完成，返回 {len(processed_results)} 个结果")
             return processed_results
             
@@ -81,6 +90,13 @@ class SemanticSearchEngine:
             logger.error(f"搜索失败: {e}")
             return []
     
+    def _run_search(self, query: str, strategy: str, k: int, filters: Dict = None,
+                    **kwargs) -> List[Dict[str, Any]]:
+        """执行搜索并后处理结果（出错时抛出异常）"""
+        search_func = self.search_strategies[strategy]
+        results = search_func(query, k, filters, **kwargs)
+        return self._post_process_results(results, query)
+    
     def _similarity_search(self, query: str, k: int, filters: Dict = None, 
                           **kwargs) -> List[Tuple[Document, float]]:
         """相似度搜索"""
@@ -89,6 +105,27 @@ class SemanticSearchEngine:
             query=query, k=k, filters=filters
         )
     
+    def _create_default_lexical_searcher(self) -> Optional[Callable[[str, int], List[Tuple[str, float]]]]:
+        """根据配置创建默认的全文检索函数（配置了 lexical_search.database_path 时启用）"""
+        lexical_config = self.config.get('lexical_search', {})
+        db_path = lexical_config.get('database_path')
+        if not db_path or not lexical_config.get('enabled', True):
+            return None
+        
+        from ..database.operations import DatabaseManager
+        return DatabaseManager(db_path).search_jobs_fulltext
+    
+    def _get_lexical_scores(self, query: str, limit: int) -> Optional[Dict[str, float]]:
+        """获取职位级词法相关性分数，未配置词法检索时返回None"""
+        if not self.lexical_searcher:
+            return None
+        
+        try:
+            return dict(self.lexical_searcher(query, limit))
+        except Exception as e:
+            logger.warning(f"词法检索失败，退化为分词重叠评分: {e}")
+            return None
+    
     def _hybrid_search(self, query: str, k: int, filters: Dict = None, 
                       **kwargs) -> List[Tuple[Document, float]]:
         """混合搜索：结合向量搜索和关键词匹配"""
@@ -98,17 +135,34 @@ class SemanticSearchEngine:
             query=query, k=k*2, filters=filters  # 获取更多结果用于重排序
         )
         
-        # 关键词匹配评分
+        return self._fuse_hybrid_results(query, vector_results, k, filters)
+    
+    def _fuse_hybrid_results(self, query: str, vector_results: List[Tuple[Document, float]], k: int,
+                             filters: Dict = None) -> List[Tuple[Document, float]]:
+        """将向量结果与词法信号融合（混合搜索的重排序部分）"""
+        
+        if self.fusion_method == 'rrf':
+            fused_results = self._rrf_fuse(query, vector_results, k, filters)
+            if fused_results is not None:
+                return fused_results
+        
+        # 词法信号：优先使用全文索引的BM25分数
+        lexical_scores = self._get_lexical_scores(query, k * 5)
         query_words = set(query.lower().split())
+        vector_weight = self.hybrid_weights.get('vector', 0.7)
+        lexical_weight = self.hybrid_weights.get('lexical', 0.3)
         
         enhanced_results = []
         for doc, vector_score in vector_results:
-            # 计算关键词匹配分数
-            content_words = set(doc.page_content.lower().split())
-            keyword_score = len(query_words.intersection(content_words)) / len(query_words)
+            if lexical_scores is not None:
+                keyword_score = lexical_scores.get(doc.metadata.get('job_id'), 0.0)
+            else:
+                # 计算关键词匹配分数
+                content_words = set(doc.page_content.lower().split())
+                keyword_score = len(query_words.intersection(content_words)) / len(query_words) if query_words else 0.0
             
             # 组合分数
-            combined_score = vector_score * 0.7 + keyword_score * 0.3
+            combined_score = vector_score * vector_weight + keyword_score * lexical_weight
             enhanced_results.append((doc, combined_score))
         
         # 按组合分数排序
@@ -116,6 +170,66 @@ class SemanticSearchEngine:
         
         return enhanced_results[:k]
     
+    def _rrf_fuse(self, query: str, vector_results: List[Tuple[Document, float]], k: int,
+                  filters: Dict = None) -> Optional[List[Tuple[Document, float]]]:
+        """
+        倒数排名融合向量结果与词法结果
+        
+        词法排名优先来自向量库的BM25文档索引（可召回仅词法命中的文档），
+        其次来自职位级全文检索（按职位排名映射到向量候选文档）。
+        返回的分数为归一化到 [0, 1] 的RRF分数；没有词法命中时返回None。
+        """
+        docs_by_key = {}
+        vector_ranking = []
+        for doc, _ in vector_results:
+            key = ChromaDBManager.get_document_key(doc)
+            if key not in docs_by_key:
+                docs_by_key[key] = doc
+                vector_ranking.append(key)
+        
+        lexical_ranking = None
+        if getattr(self.vector_manager, 'lexical_index', None) is not None:
+            lexical_hits = self.vector_manager.lexical_search(query, k * 2)
+            lexical_ranking = [doc_key for doc_key, _ in lexical_hits]
+            
+            # 补全仅词法命中的文档，并应用与向量搜索一致的元数据过滤
+            missing = [key for key in lexical_ranking if key not in docs_by_key]
+            for key, doc in self.vector_manager.get_documents_by_keys(missing).items():
+                if self._matches_filters(doc.metadata, filters):
+                    docs_by_key[key] = doc
+            lexical_ranking = [key for key in lexical_ranking if key in docs_by_key]
+        else:
+            lexical_scores = self._get_lexical_scores(query, k * 5)
+            if lexical_scores is not None:
+                job_rank = {job_id: rank for rank, job_id in
+                            enumerate(sorted(lexical_scores, key=lexical_scores.get, reverse=True))}
+                lexical_ranking = sorted(
+                    (key for key in vector_ranking if docs_by_key[key].metadata.get('job_id') in job_rank),
+                    key=lambda key: job_rank[docs_by_key[key].metadata.get('job_id')]
+                )
+        
+        if not lexical_ranking:
+            return None
+        
+        weights = [self.hybrid_weights.get('vector', 0.7), self.hybrid_weights.get('lexical', 0.3)]
+        fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking], k=self.rrf_k, weights=weights)
+        
+        # 归一化：两路排名均为第1时得分为1
+        max_score = sum(weights) / (self.rrf_k + 1)
+        return [(docs_by_key[key], score / max_score) for key, score in fused[:k]]
+    
+    @staticmethod
+    def _matches_filters(metadata: Dict, filters: Dict = None) -> bool:
+        """检查元数据是否满足简单的等值过滤条件（含运算符的条件不做补全）"""
+        if not filters:
+            return True
+        for key, expected in filters.items():
+            if isinstance(expected, dict) or key.startswith('$'):
+                return False
+            if metadata.get(key) != expected:
+                return False
+        return True
+    
     def _filtered_search(self, query: str, k: int, filters: Dict = None, 
                         **kwargs) -> List[Tuple[Document, float]]:
         """过滤搜索：基于元数据的精确过滤"""
@@ -141,16 +255,34 @@ class SemanticSearchEngine:
         """多查询搜索：生成多个相关查询并合并结果"""
         
         # 生成相关查询
-        related_queries = self._generate_related_queries(query)
+        queries = [query] + self._generate_related_queries(query)
         
-        all_results = {}  # doc_id -> (doc, max_score)
+        # 一次模型调用批量向量化所有查询，再并发检索
+        try:
+            embeddings = self.vector_manager.embed_queries(queries)
+        except Exception as e:
+            logger.warning(f"批量向量化查询失败，改为逐条检索: {e}")
+            embeddings = None
+        
+        if embeddings:
+            def search_one(embedding):
+                return self.vector_manager.similarity_search_by_vector_with_score(
+                    embedding=embedding, k=k, filters=filters
+                )
+            search_args = embeddings
+        else:
+            def search_one(q):
+                return self.vector_manager.similarity_search_with_score(
+                    query=q, k=k, filters=filters
+                )
+            search_args = queries
+        
+        workers = max(1, min(self.max_parallel_queries, len(search_args)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            result_lists = list(executor.map(search_one, search_args))
         
-        # 对每个查询执行搜索
-        for q in [query] + related_queries:
-            results = self.vector_manager.similarity_search_with_score(
-                query=q, k=k, filters=filters
-            )
-            
+        all_results = {}  # doc_id -> (doc, max_score)
+        for results in result_lists:
             for doc, score in results:
                 doc_id = doc.metadata.get('doc_id', id(doc))
                 if doc_id not in all_results or score > all_results[doc_id][1]:
@@ -161,6 +293,63 @@ class SemanticSearchEngine:
         
         return sorted_results[:k]
     
+    def search_batch(self, requests: List[Tuple[str, str, int]],
+                     filters: Dict = None,
+                     return_exceptions: bool = False) -> List[Union[List[Dict[str, Any]], Exception]]:
+        """
+        批量搜索：一次模型调用向量化全部查询，再在线程池中并发检索
+        
+        Args:
+            requests: (查询, 搜索策略, 返回数量) 列表；similarity/hybrid 策略复用批量向量，
+                其他策略按 search 逐条执行
+            filters: 过滤条件（所有查询共用）
+            return_exceptions: 为 True 时检索失败的查询在对应位置返回异常对象，
+                否则与 search 一样记录日志并返回空列表（与"没有命中"无法区分）
+            
+        Returns:
+            List: 每个查询的搜索结果（或异常），与 requests 顺序一致
+        """
+        if not requests:
+            return []
+        
+        try:
+            embeddings = self.vector_manager.embed_queries([query for query, _, _ in requests])
+        except Exception as e:
+            logger.warning(f"批量向量化查询失败，改为逐条检索: {e}")
+            embeddings = None
+        
+        def run_one(index):
+            query, strategy, k = requests[index]
+            if not embeddings or strategy not in ('similarity', 'hybrid'):
+                if strategy not in self.search_strategies:
+                    logger.warning(f"未知搜索策略: {strategy}，使用默认策略")
+                    strategy = 'similarity'
+                return self._run_search(query, strategy, k or self.default_k, filters)
+            
+            vector_k = k * 2 if strategy == 'hybrid' else k
+            results = self.vector_manager.similarity_search_by_vector_with_score(
+                embedding=embeddings[index], k=vector_k, filters=filters
+            )
+            if strategy == 'hybrid':
+                results = self._fuse_hybrid_results(query, results, k, filters)
+            return self._post_process_results(results, query)
+        
+        def search_one(index):
+            try:
+                return run_one(index)
+            except Exception as e:
+                logger.error(f"搜索失败: {e}")
+                return e if return_exceptions else []
+        
+        workers = max(1, min(self.max_parallel_queries, len(requests)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            result_lists = list(executor.map(search_one, range(len(requests))))
+        
+        failed = sum(1 for results in result_lists if isinstance(results, Exception))
+        total = sum(len(results) for results in result_lists if not isinstance(results, Exception))
+        logger.info(f"批量搜索完成，{len(requests)} 个查询共返回 {total} 个结果，失败 {failed} 个")
+        return result_lists
+    
     def _generate_related_queries(self, query: str) -> List[str]:
         """生成相关查询"""
         related_queries = []
@@ -0,0 +1,158 @@
+"""
+向量存储后端接口
+
+ChromaDBManager 内部通过 vectorstore._collection 使用集合级接口（add / upsert / get / query /
+delete / update / count），这里把这组接口抽象为 VectorBackend，便于替换底层存储：
+- ChromaBackend: ChromaDB 集合（默认，SQLite 持久化）
+- HnswBackend:   内存映射嵌入矩阵 + hnswlib 索引 + 列式元数据（见 hnsw_backend.py）
+
+返回值格式与 ChromaDB 一致（get 返回 {'ids', 'embeddings', 'documents', 'metadatas'}，
+query 返回按查询分组的二维列表），现有调用代码无需区分后端。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+# where 条件支持的比较运算符（与 ChromaDB 一致）
+_COMPARATORS = {
+    '$eq': lambda value, target: value == target,
+    '$ne': lambda value, target: value != target,
+    '$gt': lambda value, target: value is not None and value > target,
+    '$gte': lambda value, target: value is not None and value >= target,
+    '$lt': lambda value, target: value is not None and value < target,
+    '$lte': lambda value, target: value is not None and value <= target,
+    '$in': lambda value, target: value in target,
+    '$nin': lambda value, target: value not in target,
+}
+
+
+def match_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    判断元数据是否满足 ChromaDB 风格的 where 条件
+
+    支持 {'key': value}、{'key': {'$op': value}} 以及 $and / $or 组合；
+    顶层多个键按 $and 处理。
+    """
+    if not where:
+        return True
+    metadata = metadata or {}
+
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(match_where(metadata, item) for item in condition):
+                return False
+        elif key == '$or':
+            if not any(match_where(metadata, item) for item in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, target in condition.items():
+                comparator = _COMPARATORS.get(op)
+                if comparator is None:
+                    raise ValueError(f"不支持的过滤运算符: {op}")
+                if not comparator(value, target):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class VectorBackend(ABC):
+    """向量存储后端（ChromaDB 集合接口的子集）"""
+
+    name: str = ''
+
+    @property
+    @abstractmethod
+    def metadata(self) -> Dict[str, Any]:
+        """集合元数据（含 hnsw:space 距离空间）"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """有效向量数量"""
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+            documents: Optional[Sequence[str]] = None,
+            metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """添加向量"""
+
+    @abstractmethod
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               documents: Optional[Sequence[str]] = None,
+               metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """添加或覆盖向量"""
+
+    @abstractmethod
+    def get(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """按ID或过滤条件读取"""
+
+    @abstractmethod
+    def query(self, query_embeddings: Sequence[Sequence[float]], n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """最近邻检索"""
+
+    @abstractmethod
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        """按ID或过滤条件删除"""
+
+    @abstractmethod
+    def update(self, ids: Sequence[str], embeddings: Optional[Sequence[Sequence[float]]] = None,
+               documents: Optional[Sequence[str]] = None,
+               metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """更新已有向量的嵌入、文本或元数据"""
+
+    def persist(self) -> None:
+        """把内存中的状态写入磁盘（自动持久化的后端无需实现）"""
+
+    def close(self) -> None:
+        self.persist()
+
+
+class ChromaBackend(VectorBackend):
+    """ChromaDB 集合后端"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.name = collection.name
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.collection.metadata or {}
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self.collection.add(ids=list(ids), embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self.collection.upsert(ids=list(ids), embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> Dict[str, Any]:
+        kwargs = {'include': include if include is not None else ['documents', 'metadatas']}
+        if ids is not None:
+            kwargs['ids'] = list(ids)
+        for key, value in (('where', where), ('limit', limit), ('offset', offset)):
+            if value is not None:
+                kwargs[key] = value
+        return self.collection.get(**kwargs)
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None) -> Dict[str, Any]:
+        kwargs = {
+            'query_embeddings': query_embeddings,
+            'n_results': n_results,
+            'include': include if include is not None else ['documents', 'metadatas', 'distances']
+        }
+        if where:
+            kwargs['where'] = where
+        return self.collection.query(**kwargs)
+
+    def delete(self, ids=None, where=None) -> None:
+        self.collection.delete(ids=list(ids) if ids is not None else None, where=where)
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None) -> None:
+        self.collection.update(ids=list(ids), embeddings=embeddings, documents=documents, metadatas=metadatas)
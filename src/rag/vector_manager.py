@@ -3,31 +3,153 @@ ChromaDB向量存储管理器
 
 负责职位信息的向量化存储、检索和管理。
 支持时间感知的向量搜索，解决新数据被老数据掩盖的问题。
+底层存储默认为 ChromaDB，可通过 vector_db.backend 切换为进程内 HNSW 后端。
 """
 
-try:
-    from langchain_chroma import Chroma
-except ImportError:
-    from langchain.vectorstores import Chroma
-
-try:
-    from langchain_huggingface import HuggingFaceEmbeddings
-except ImportError:
-    from langchain.embeddings import HuggingFaceEmbeddings
-
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
 from langchain.schema import Document
-from typing import List, Dict, Optional, Any, Tuple
-from .llm_factory import create_llm
+from typing import List, Dict, Optional, Any, Tuple, Callable, Iterable
+from .lexical_index import BM25Index
+from .document_ids import assign_document_ids, compute_content_hash, find_duplicate_vectors
+from .vector_backends import VectorBackend
 import logging
 import os
 import json
+import time
+import uuid
+import threading
 import numpy as np
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# 尚未构建的延迟组件标记（None 本身是压缩检索器等组件的合法值）
+_NOT_LOADED = object()
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    延迟加载的嵌入模型
+    
+    ChromaDB 打开集合、统计、删除等操作都不需要嵌入模型，
+    因此模型推迟到第一次向量化时才加载。
+    """
+    
+    def __init__(self, factory: Callable[[], Embeddings]):
+        self._factory = factory
+        self._model: Optional[Embeddings] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_loaded(self) -> bool:
+        """模型是否已加载"""
+        return self._model is not None
+    
+    def load(self) -> Embeddings:
+        """加载并返回实际的嵌入模型（线程安全，只加载一次）"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start_time = time.perf_counter()
+                    self._model = self._factory()
+                    logger.info(f"嵌入模型加载完成，耗时 {time.perf_counter() - start_time:.2f} 秒")
+        return self._model
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.load().embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.load().embed_query(text)
+
+
+class BackendVectorStore(VectorStore):
+    """
+    基于 VectorBackend 的 LangChain 向量存储
+    
+    提供 ChromaDBManager 用到的 langchain Chroma 接口（add_documents / similarity_search* / as_retriever），
+    _collection 指向后端本身，集合级操作与 ChromaDB 共用同一套代码。
+    """
+    
+    def __init__(self, backend: VectorBackend, embedding_function: Embeddings):
+        self._collection = backend
+        self._embedding_function = embedding_function
+    
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+    
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[Dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        embeddings = self._embedding_function.embed_documents(texts)
+        self._collection.upsert(ids, embeddings, documents=texts, metadatas=metadatas or [{} for _ in texts])
+        return ids
+    
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> None:
+        self._collection.delete(ids=ids)
+    
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                               filter: Dict = None) -> List[Tuple[Document, float]]:
+        result = self._collection.query([embedding], n_results=k, where=filter,
+                                        include=['documents', 'metadatas', 'distances'])
+        return [
+            (Document(page_content=document or '', metadata=metadata or {}), distance)
+            for document, metadata, distance in zip(result['documents'][0], result['metadatas'][0],
+                                                    result['distances'][0])
+        ]
+    
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Dict = None,
+                                     **kwargs) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding_function.embed_query(query), k, filter)
+    
+    def similarity_search(self, query: str, k: int = 4, filter: Dict = None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+    
+    def similarity_search_by_vector_with_relevance_scores(self, embedding: List[float], k: int = 4,
+                                                          filter: Dict = None, **kwargs) -> List[Tuple[Document, float]]:
+        """与 langchain Chroma 的同名方法一致，返回原始距离（越小越相似）"""
+        return self.similarity_search_by_vector_with_score(embedding, k, filter)
+    
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        space = self._collection.metadata.get('hnsw:space', 'l2')
+        if space == 'cosine':
+            return self._cosine_relevance_score_fn
+        if space == 'ip':
+            return self._max_inner_product_relevance_score_fn
+        return self._euclidean_relevance_score_fn
+    
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[Dict]] = None,
+                   ids: Optional[List[str]] = None, path: Optional[str] = None,
+                   **kwargs) -> 'BackendVectorStore':
+        """
+        在 HNSW 后端上创建向量存储并写入文本
+        
+        Args:
+            texts: 文本列表
+            embedding: 嵌入模型
+            metadatas: 元数据列表
+            ids: 向量ID列表（默认随机生成）
+            path: HNSW 存储目录（必填）
+            **kwargs: HnswBackend 的其余参数（name / space / m / ef_construction 等）
+        """
+        if not path:
+            raise ValueError("BackendVectorStore.from_texts 需要 path 参数（HNSW 存储目录）")
+        from .hnsw_backend import HnswBackend
+        
+        store = cls(HnswBackend(path, **kwargs), embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+
+def create_worker_embeddings(vector_config: Dict) -> Embeddings:
+    """在嵌入工作进程中按向量库配置创建嵌入模型（顶层函数，供 spawn 启动的进程导入）"""
+    embeddings_config = dict(vector_config.get('embeddings', {}), pool={'enabled': False})
+    # 集合维度已由主进程校验，工作进程不再打开向量库
+    return ChromaDBManager(dict(vector_config, embeddings=embeddings_config))._init_embeddings(check_collection=False)
+
 
 class ChromaDBManager:
     """ChromaDB向量存储管理器"""
@@ -48,14 +170,22 @@ class ChromaDBManager:
         # 确保目录存在
         os.makedirs(self.persist_directory, exist_ok=True)
         
-        # 初始化嵌入模型
-        self.embeddings = self._init_embeddings()
-        
-        # 初始化ChromaDB
-        self.vectorstore = self._init_vectorstore()
+        # 嵌入模型在第一次向量化时加载；ChromaDB、压缩检索器和BM25索引在首次访问时构建
+        self.embeddings = LazyEmbeddings(self._init_embeddings)
+        pool_config = self.config.get('embeddings', {}).get('pool', {})
+        if pool_config.get('enabled', False):
+            self.embeddings = self._init_embedding_pool(pool_config)
+        self._vectorstore = _NOT_LOADED
+        self._compression_retriever = _NOT_LOADED
+        self._lexical_index = _NOT_LOADED
+        self._compact_index = _NOT_LOADED
+        self.compact_config = self.config.get('compact_index', {})
+        self._resume_collection = _NOT_LOADED
+        self.resume_index_config = self.config.get('resume_index', {})
+        self.resume_index_enabled = self.resume_index_config.get('enabled', False)
         
-        # 初始化压缩检索器
-        self.compression_retriever = self._init_compression_retriever()
+        if not self.config.get('embeddings', {}).get('lazy_load', True):
+            self.embeddings.load()
         
         # 时间感知配置
         self.time_config = self.config.get('time_aware_search', {})
@@ -69,34 +199,82 @@ class ChromaDBManager:
             logger.info(f"时间感知功能已启用: 新数据加分={self.fresh_data_boost}, "
                        f"新数据天数={self.fresh_data_days}, 时间衰减={self.time_decay_factor}")
     
-    def _init_embeddings(self) -> HuggingFaceEmbeddings:
+    @property
+    def vectorstore(self):
+        """ChromaDB向量存储（首次访问时打开）"""
+        if self._vectorstore is _NOT_LOADED:
+            self._vectorstore = self._init_vectorstore()
+        return self._vectorstore
+    
+    @vectorstore.setter
+    def vectorstore(self, value):
+        self._vectorstore = value
+    
+    @property
+    def compression_retriever(self):
+        """压缩检索器（首次访问时构建，未配置LLM时为None）"""
+        if self._compression_retriever is _NOT_LOADED:
+            self._compression_retriever = self._init_compression_retriever()
+        return self._compression_retriever
+    
+    @compression_retriever.setter
+    def compression_retriever(self, value):
+        self._compression_retriever = value
+    
+    @property
+    def lexical_index(self) -> Optional[BM25Index]:
+        """BM25词法索引（首次访问时加载，与向量库同步增量更新）"""
+        if self._lexical_index is _NOT_LOADED:
+            self._lexical_index = self._init_lexical_index()
+        return self._lexical_index
+    
+    @lexical_index.setter
+    def lexical_index(self, value: Optional[BM25Index]):
+        self._lexical_index = value
+    
+    @property
+    def compact_index(self):
+        """紧凑二级索引（启用且已构建时首次访问加载，否则为None）"""
+        if self._compact_index is _NOT_LOADED:
+            self._compact_index = self._init_compact_index()
+        return self._compact_index
+    
+    @compact_index.setter
+    def compact_index(self, value):
+        self._compact_index = value
+    
+    @property
+    def resume_collection(self) -> VectorBackend:
+        """简历分段向量集合（与职位集合分开存储，首次访问时打开）"""
+        if self._resume_collection is _NOT_LOADED:
+            self._resume_collection = self._init_resume_collection()
+        return self._resume_collection
+    
+    def _init_embeddings(self, check_collection: bool = True) -> Embeddings:
         """
         初始化嵌入模型 - 优化中文语义匹配
-        支持多种中文优化的向量模型和本地模型加载
+        支持多种中文优化的向量模型和本地模型加载，
+        embeddings.backend 为 onnx 时使用 ONNX Runtime（INT8量化）后端，
+        导出的来源模型与配置的模型不一致、或输出维度与已有集合不一致时回退PyTorch模型
+        
+        Args:
+            check_collection: 是否校验ONNX模型输出维度与已有集合一致
         """
         embeddings_config = self.config.get('embeddings', {})
+        model_name = self._resolve_model_name(embeddings_config)
         
-        # 检查是否使用本地模型路径
-        local_model_path = embeddings_config.get('local_model_path')
-        model_name = embeddings_config.get('model_name')
+        if embeddings_config.get('backend', 'pytorch') == 'onnx':
+            try:
+                from .onnx_embeddings import build_onnx_embeddings
+                expected_dim = self._stored_embedding_dim() if check_collection else None
+                return build_onnx_embeddings(embeddings_config, model_name=model_name, expected_dim=expected_dim)
+            except Exception as e:
+                logger.warning(f"ONNX嵌入后端不可用: {e}，回退到PyTorch模型")
         
-        if local_model_path:
-            # 使用本地模型路径
-            if os.path.exists(local_model_path):
-                model_name = local_model_path
-                logger.info(f"使用本地向量模型: {local_model_path}")
-            else:
-                logger.warning(f"本地模型路径不存在: {local_model_path}，回退到在线模型")
-                model_name = model_name or self._select_best_chinese_model(embeddings_config)
-        elif not model_name:
-            # 根据配置选择最佳中文模型
-            chinese_optimized = embeddings_config.get('chinese_optimized', True)
-            if chinese_optimized:
-                # 优先选择中文优化模型
-                model_name = self._select_best_chinese_model(embeddings_config)
-            else:
-                # 使用多语言模型
-                model_name = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings
+        except ImportError:
+            from langchain.embeddings import HuggingFaceEmbeddings
         
         logger.info(f"使用向量模型: {model_name}")
         
@@ -132,6 +310,60 @@ class ChromaDBManager:
                 encode_kwargs=encode_kwargs
             )
     
+    def _resolve_model_name(self, embeddings_config: Dict) -> str:
+        """确定配置的向量模型（本地模型路径 / model_name / 按性能级别选择）"""
+        # 检查是否使用本地模型路径
+        local_model_path = embeddings_config.get('local_model_path')
+        model_name = embeddings_config.get('model_name')
+        
+        if local_model_path:
+            # 使用本地模型路径
+            if os.path.exists(local_model_path):
+                model_name = local_model_path
+                logger.info(f"使用本地向量模型: {local_model_path}")
+            else:
+                logger.warning(f"本地模型路径不存在: {local_model_path}，回退到在线模型")
+                model_name = model_name or self._select_best_chinese_model(embeddings_config)
+        elif not model_name:
+            # 根据配置选择最佳中文模型
+            chinese_optimized = embeddings_config.get('chinese_optimized', True)
+            if chinese_optimized:
+                # 优先选择中文优化模型
+                model_name = self._select_best_chinese_model(embeddings_config)
+            else:
+                # 使用多语言模型
+                model_name = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+        
+        return model_name
+    
+    def _stored_embedding_dim(self) -> Optional[int]:
+        """已有职位集合的向量维度（集合为空或无法读取时返回None）"""
+        try:
+            result = self.vectorstore._collection.get(limit=1, include=['embeddings'])
+        except Exception as e:
+            logger.debug(f"读取集合向量维度失败: {e}")
+            return None
+        embeddings = result.get('embeddings')
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        return len(embeddings[0])
+    
+    def _init_embedding_pool(self, pool_config: Dict):
+        """构建多进程嵌入工作池（大批量嵌入分片到工作进程，小请求仍在本进程执行）"""
+        from .embedding_pool import EmbeddingWorkerPool, PooledEmbeddings
+        
+        pool = EmbeddingWorkerPool(
+            create_worker_embeddings,
+            factory_args=(self.config,),
+            workers=pool_config.get('workers', 0),
+            threads_per_worker=pool_config.get('threads_per_worker', 1),
+            pin_cores=pool_config.get('pin_cores', True),
+            chunk_size=pool_config.get('chunk_size', 64),
+            startup_timeout=pool_config.get('startup_timeout', 600)
+        )
+        logger.info(f"已启用嵌入工作池: {pool.workers} 个进程 × {pool.threads_per_worker} 线程")
+        return PooledEmbeddings(self.embeddings, pool, min_texts=pool_config.get('min_texts', 64))
+    
     def _select_best_chinese_model(self, embeddings_config: Dict) -> str:
         """选择最佳中文语义模型"""
         
@@ -182,17 +414,63 @@ class ChromaDBManager:
         
         return selected_model
     
-    def _init_vectorstore(self) -> Chroma:
-        """初始化ChromaDB向量存储"""
+    def _init_vectorstore(self):
+        """初始化向量存储（vector_db.backend: chroma / hnsw）"""
+        backend = self.config.get('backend', 'chroma')
+        if backend == 'hnsw':
+            from .hnsw_backend import HnswBackend
+            
+            hnsw_config = self.config.get('hnsw', {})
+            return BackendVectorStore(
+                HnswBackend(
+                    hnsw_config.get('path', os.path.join(self.persist_directory, 'hnsw', self.collection_name)),
+                    name=self.collection_name,
+                    space=hnsw_config.get('space', 'l2'),
+                    m=hnsw_config.get('m', 16),
+                    ef_construction=hnsw_config.get('ef_construction', 200),
+                    ef_search=hnsw_config.get('ef_search', 64),
+                    brute_force_threshold=hnsw_config.get('brute_force_threshold', 2000),
+                    snapshot_every=hnsw_config.get('snapshot_every', 5000),
+                    indexed_columns=hnsw_config.get('indexed_columns', ['job_id'])
+                ),
+                self.embeddings
+            )
+        if backend != 'chroma':
+            raise ValueError(f"不支持的向量后端: {backend}")
+        
+        try:
+            from langchain_chroma import Chroma
+        except ImportError:
+            from langchain.vectorstores import Chroma
+        
         return Chroma(
             persist_directory=self.persist_directory,
             embedding_function=self.embeddings,
             collection_name=self.collection_name
         )
     
-    def _init_compression_retriever(self) -> Optional[ContextualCompressionRetriever]:
+    def _init_resume_collection(self) -> VectorBackend:
+        """打开简历集合，后端与距离空间与职位集合一致，保证相似度可比"""
+        name = self.resume_index_config.get('collection_name', 'resume_profiles')
+        space = self._collection_space()
+        if isinstance(self.vectorstore, BackendVectorStore):
+            from .hnsw_backend import HnswBackend
+            
+            return HnswBackend(os.path.join(self.persist_directory, 'hnsw', name), name=name, space=space)
+        
+        from .vector_backends import ChromaBackend
+        
+        return ChromaBackend(
+            self.vectorstore._client.get_or_create_collection(name, metadata={'hnsw:space': space})
+        )
+    
+    def _init_compression_retriever(self):
         """初始化压缩检索器"""
         try:
+            from langchain.retrievers import ContextualCompressionRetriever
+            from langchain.retrievers.document_compressors import LLMChainExtractor
+            from .llm_factory import create_llm
+            
             # 初始化LLM压缩器
             llm_config = self.config.get('llm', {})
             
@@ -233,31 +511,106 @@ class ChromaDBManager:
             logger.warning(f"压缩检索器初始化失败: {e}，将使用基础检索器")
             return None
     
-    def add_job_documents(self, documents: List[Document], job_id: str = None) -> List[str]:
+    def _init_lexical_index(self) -> Optional[BM25Index]:
+        """初始化BM25词法索引"""
+        lexical_config = self.config.get('lexical_index', {})
+        if not lexical_config.get('enabled', True):
+            return None
+        
+        try:
+            persist_path = lexical_config.get(
+                'persist_path', os.path.join(self.persist_directory, 'bm25_index.jsonl')
+            )
+            index = BM25Index(
+                persist_path=persist_path,
+                tokenizer=lexical_config.get('tokenizer', 'auto'),
+                k1=lexical_config.get('k1', 1.5),
+                b=lexical_config.get('b', 0.75)
+            )
+            logger.info(f"BM25词法索引已加载: {index.get_stats()}")
+            return index
+        except Exception as e:
+            logger.warning(f"BM25词法索引初始化失败: {e}，混合检索将仅使用向量分数")
+            return None
+    
+    def _compact_index_dir(self) -> str:
+        return self.compact_config.get('path', os.path.join(self.persist_directory, 'compact_index'))
+    
+    def _init_compact_index(self):
+        """加载紧凑二级索引"""
+        if not self.compact_config.get('enabled', False):
+            return None
+        
+        try:
+            from .compact_index import CompactIndex
+            
+            index_dir = self._compact_index_dir()
+            if not CompactIndex.exists(index_dir):
+                logger.warning(f"紧凑索引未构建: {index_dir}，请运行 python rag_cli.py compact-index build")
+                return None
+            index = CompactIndex(index_dir).load()
+            logger.info(f"紧凑索引已加载: {index.rows} 行, {index.meta.get('dim')} 维 ({index.meta.get('dtype')})")
+            return index
+        except Exception as e:
+            logger.warning(f"紧凑索引加载失败: {e}，候选召回将使用全维度检索")
+            return None
+    
+    @staticmethod
+    def get_document_key(doc: Document) -> str:
+        """获取文档在向量库和词法索引中通用的标识"""
+        doc_key = doc.metadata.get('doc_id') or getattr(doc, 'id', None)
+        if doc_key:
+            return str(doc_key)
+        return f"{doc.metadata.get('job_id', 'unknown')}:{hash(doc.page_content)}"
+    
+    def add_job_documents(self, documents: List[Document], job_id: str = None,
+                          ids: List[str] = None, prune_stale: bool = False) -> List[str]:
         """
         添加职位文档到向量数据库
         
+        文档ID由 (job_id, 文档类型, 分块序号, 内容哈希) 确定性生成，写入按ID覆盖（upsert），
+        中断后重新导入不会产生重复向量，也不需要先删除旧文档。
+        
         Args:
             documents: 文档列表
             job_id: 职位ID
+            ids: 向量库ID列表（默认按文档内容生成确定性ID）
+            prune_stale: documents 为该职位的完整文档集时，删除该职位其余的旧版本向量
             
         Returns:
             List[str]: 文档ID列表
         """
         try:
-            # 为文档添加时间戳和job_id，并过滤复杂元数据
+            # 为文档添加时间戳、job_id和内容哈希，并过滤复杂元数据
             timestamp = datetime.now().isoformat()
             for doc in documents:
                 # 过滤复杂元数据（将列表转换为字符串）
                 filtered_metadata = self._filter_complex_metadata(doc.metadata)
                 filtered_metadata.update({
                     'created_at': timestamp,
+                    'updated_at': timestamp,
                     'job_id': job_id
                 })
+                if not filtered_metadata.get('content_hash'):
+                    filtered_metadata['content_hash'] = compute_content_hash(doc.page_content)
                 doc.metadata = filtered_metadata
             
-            # 批量添加文档
-            doc_ids = self.vectorstore.add_documents(documents)
+            if not ids:
+                ids = assign_document_ids(job_id, ((doc.page_content, doc.metadata) for doc in documents))
+            
+            # 批量写入文档（按ID upsert）
+            doc_ids = self.vectorstore.add_documents(documents, ids=list(ids))
+            
+            # 同步写入词法索引
+            doc_keys = [doc.metadata.get('doc_id') or chroma_id for doc, chroma_id in zip(documents, doc_ids)]
+            if self.lexical_index is not None:
+                self.lexical_index.add_documents(
+                    (doc_key, doc.page_content, job_id)
+                    for doc_key, doc in zip(doc_keys, documents)
+                )
+            
+            if prune_stale and job_id:
+                self._prune_stale_vectors(job_id, doc_ids, doc_keys)
             
             # 新版本的langchain-chroma不需要手动persist，自动持久化
             # self.vectorstore.persist()  # 已移除此方法
@@ -298,22 +651,47 @@ class ChromaDBManager:
         
         return filtered
     
-    async def add_job_documents_async(self, documents: List[Document], job_id: str = None) -> List[str]:
+    def _prune_stale_vectors(self, job_id: str, keep_ids: List[str], keep_keys: List[str]) -> int:
+        """删除职位下不在本次写入集合中的旧版本向量（只读取ID，不读取向量）"""
+        collection = self.vectorstore._collection
+        existing = collection.get(where={"job_id": job_id}, include=['metadatas'])
+        
+        keep_id_set = set(keep_ids)
+        keep_key_set = set(keep_keys)
+        stale_ids = []
+        stale_keys = []
+        for vector_id, metadata in zip(existing.get('ids') or [], existing.get('metadatas') or []):
+            if vector_id in keep_id_set:
+                continue
+            stale_ids.append(vector_id)
+            doc_key = (metadata or {}).get('doc_id') or vector_id
+            if doc_key not in keep_key_set:
+                stale_keys.append(doc_key)
+        
+        if stale_ids:
+            self.delete_documents_by_ids(stale_ids, stale_keys)
+            logger.info(f"职位 {job_id} 清理了 {len(stale_ids)} 个旧版本向量")
+        return len(stale_ids)
+    
+    async def add_job_documents_async(self, documents: List[Document], job_id: str = None,
+                                      **kwargs) -> List[str]:
         """
         异步添加职位文档到向量数据库
         
         Args:
             documents: 文档列表
             job_id: 职位ID
+            **kwargs: 透传给 add_job_documents（ids、prune_stale）
             
         Returns:
             List[str]: 文档ID列表
         """
         import asyncio
+        from functools import partial
         
         # 在线程池中执行同步操作
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.add_job_documents, documents, job_id)
+        return await loop.run_in_executor(None, partial(self.add_job_documents, documents, job_id, **kwargs))
     
     def search_similar_jobs(self, query: str, k: int = 5, filters: Dict = None) -> List[Document]:
         """
@@ -358,6 +736,12 @@ class ChromaDBManager:
             List[tuple]: (Document, score) 元组列表
         """
         try:
+            # 紧凑索引只保存向量，带过滤条件的查询仍走ChromaDB
+            if not filters and self.compact_index is not None:
+                results = self.compact_similarity_search_with_score(self.embeddings.embed_query(query), k)
+                if results is not None:
+                    return results
+            
             search_kwargs = {"k": k}
             if filters:
                 search_kwargs["filter"] = filters
@@ -369,6 +753,417 @@ class ChromaDBManager:
             logger.error(f"带分数搜索失败: {e}")
             return []
     
+    def load_resume_sections(self, resume_id: str,
+                             content_hash: str) -> Optional[Tuple[List[Document], List[List[float]]]]:
+        """
+        读取已缓存的简历分段向量
+        
+        Returns:
+            (分段文档, 分段向量)；未缓存或简历内容已变化时返回None
+        """
+        stored = self.resume_collection.get(
+            where={'resume_id': resume_id}, include=['embeddings', 'documents', 'metadatas']
+        )
+        metadatas = stored.get('metadatas') or []
+        if not metadatas or any((metadata or {}).get('content_hash') != content_hash for metadata in metadatas):
+            return None
+        
+        rows = sorted(zip(metadatas, stored['documents'], stored['embeddings']),
+                      key=lambda row: row[0].get('section_index', 0))
+        documents = [Document(page_content=document or '', metadata=dict(metadata)) for metadata, document, _ in rows]
+        embeddings = [[float(value) for value in embedding] for _, _, embedding in rows]
+        return documents, embeddings
+    
+    def store_resume_sections(self, resume_id: str, content_hash: str,
+                              documents: List[Document]) -> List[List[float]]:
+        """
+        向量化简历分段并写入简历集合（替换该简历的旧分段）
+        
+        Returns:
+            List[List[float]]: 分段向量（与 documents 顺序一致）
+        """
+        embeddings = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        metadatas = []
+        for index, doc in enumerate(documents):
+            metadata = self._filter_complex_metadata(doc.metadata)
+            metadata.update({'resume_id': resume_id, 'content_hash': content_hash, 'section_index': index})
+            doc.metadata = metadata
+            metadatas.append(metadata)
+        
+        collection = self.resume_collection
+        collection.delete(where={'resume_id': resume_id})
+        collection.add(
+            ids=[f"{resume_id}:section:{index}" for index in range(len(documents))],
+            embeddings=[list(map(float, embedding)) for embedding in embeddings],
+            documents=[doc.page_content for doc in documents],
+            metadatas=metadatas
+        )
+        logger.info(f"简历 {resume_id} 写入 {len(documents)} 个分段向量")
+        return embeddings
+    
+    def multi_vector_search(self, embeddings: List[List[float]], k: int = 20, filters: Dict = None,
+                            weights: Optional[List[float]] = None) -> List[Tuple[Document, float]]:
+        """
+        多向量检索：每个简历分段各检索一次（一次批量查询），职位文档取各分段中最高的加权相似度
+        
+        Args:
+            embeddings: 简历分段向量
+            k: 返回的职位文档数量
+            filters: 过滤条件
+            weights: 各分段权重（默认均为1）
+            
+        Returns:
+            List[Tuple[Document, float]]: (职位文档, 0-1 相似度) 列表，按相似度降序
+        """
+        if not embeddings:
+            return []
+        
+        from .compact_index import exact_distances
+        
+        query_embeddings = [list(map(float, embedding)) for embedding in embeddings]
+        query_kwargs = {
+            'query_embeddings': query_embeddings,
+            'n_results': k,
+            'include': ['documents', 'metadatas', 'embeddings']
+        }
+        if filters:
+            query_kwargs['where'] = filters
+        result = self.vectorstore._collection.query(**query_kwargs)
+        
+        # 集合距离只用于召回；分数按候选的完整向量计算余弦相似度，
+        # 不依赖向量是否归一化，也不依赖集合的距离空间（l2 距离在未归一化向量上无法换算为余弦）
+        best: Dict[str, Tuple[float, Optional[str], Optional[Dict]]] = {}
+        for section, ids in enumerate(result.get('ids') or []):
+            if not ids:
+                continue
+            weight = weights[section] if weights else 1.0
+            similarities = 1.0 - exact_distances(query_embeddings[section], result['embeddings'][section], 'cosine')
+            for vector_id, document, metadata, similarity in zip(
+                ids, result['documents'][section], result['metadatas'][section], similarities
+            ):
+                score = max(0.0, min(1.0, float(similarity))) * weight
+                if vector_id not in best or score > best[vector_id][0]:
+                    best[vector_id] = (score, document, metadata)
+        
+        ranked = sorted(best.values(), key=lambda item: item[0], reverse=True)[:k]
+        return [(Document(page_content=document or '', metadata=dict(metadata or {})), score)
+                for score, document, metadata in ranked]
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        批量向量化查询文本（一次模型调用）
+        
+        Args:
+            queries: 查询文本列表
+            
+        Returns:
+            List[List[float]]: 查询向量列表
+        """
+        if not queries:
+            return []
+        return self.embeddings.embed_documents(queries)
+    
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 5,
+                                               filters: Dict = None) -> List[tuple]:
+        """
+        使用预先计算的查询向量进行带分数搜索
+        
+        Args:
+            embedding: 查询向量
+            k: 返回结果数量
+            filters: 过滤条件
+            
+        Returns:
+            List[tuple]: (Document, score) 元组列表，score 为距离（越小越相似），与 similarity_search_with_score 一致
+        """
+        try:
+            search_kwargs = {"k": k}
+            if filters:
+                search_kwargs["filter"] = filters
+            
+            return self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                embedding, **search_kwargs
+            )
+            
+        except Exception as e:
+            logger.error(f"向量搜索失败: {e}")
+            return []
+    
+    def _collection_space(self) -> str:
+        """集合的距离空间（l2 / cosine / ip）"""
+        metadata = self.vectorstore._collection.metadata or {}
+        return metadata.get('hnsw:space', 'l2')
+    
+    def compact_similarity_search_with_score(self, embedding: List[float], k: int = 5) -> Optional[List[tuple]]:
+        """
+        紧凑索引检索（接口与 similarity_search_with_score 一致）
+        
+        Args:
+            embedding: 查询向量
+            k: 返回结果数量
+            
+        Returns:
+            Optional[List[tuple]]: (Document, score) 元组列表；索引不可用或已过期时返回None
+        """
+        results = self._compact_search(embedding, k)
+        if results is None:
+            return None
+        return [(doc, score) for _, doc, score in results]
+    
+    def _compact_search(self, embedding: List[float], k: int) -> Optional[List[tuple]]:
+        """
+        紧凑索引召回候选 + 全精度重打分
+        
+        在降维索引上取 k * oversample 个候选，再从ChromaDB读取候选的完整向量，
+        按集合的距离空间计算精确距离排序。分数语义与 similarity_search_with_score 一致（距离越小越相似）。
+        
+        Args:
+            embedding: 查询向量
+            k: 返回结果数量
+            
+        Returns:
+            Optional[List[tuple]]: (向量库ID, Document, score) 元组列表；索引不可用或已过期时返回None
+        """
+        from .compact_index import exact_distances
+        
+        index = self.compact_index
+        if index is None:
+            return None
+        
+        collection = self.vectorstore._collection
+        max_stale_ratio = self.compact_config.get('max_stale_ratio', 0.05)
+        if index.is_stale(collection.count(), max_stale_ratio):
+            logger.warning("紧凑索引与集合文档数相差过大，改用全维度检索，请重建紧凑索引")
+            return None
+        
+        candidate_ids = index.search(embedding, k * self.compact_config.get('oversample', 10))
+        if not candidate_ids:
+            return []
+        
+        # 已删除的候选在ChromaDB中读取不到，自然被过滤
+        batch = collection.get(ids=candidate_ids, include=['embeddings', 'documents', 'metadatas'])
+        if not batch['ids']:
+            return []
+        
+        distances = exact_distances(embedding, batch['embeddings'], self._collection_space())
+        order = np.argsort(distances)[:k]
+        return [
+            (batch['ids'][i], Document(page_content=batch['documents'][i], metadata=batch['metadatas'][i] or {}),
+             float(distances[i]))
+            for i in order
+        ]
+    
+    def build_compact_index(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        从ChromaDB中已计算的完整向量构建紧凑索引（不重新向量化）
+        
+        Args:
+            batch_size: 每批读取的向量数
+            
+        Returns:
+            Dict: 索引元信息
+        """
+        from .compact_index import CompactIndex
+        
+        collection = self.vectorstore._collection
+        total = collection.count()
+        
+        def batches():
+            for offset in range(0, total, batch_size):
+                batch = collection.get(include=['embeddings'], limit=batch_size, offset=offset)
+                if not batch['ids']:
+                    break
+                yield batch['ids'], batch['embeddings']
+        
+        index = CompactIndex.build(
+            self._compact_index_dir(),
+            batches,
+            total=total,
+            dim=self.compact_config.get('dim', 128),
+            method=self.compact_config.get('method', 'pca'),
+            dtype=self.compact_config.get('dtype', 'float16'),
+            fit_sample=self.compact_config.get('fit_sample', 50000),
+            space=self._collection_space()
+        )
+        self._compact_index = index
+        return index.meta
+    
+    def evaluate_compact_index(self, queries: List[str], k: int = 10, rounds: int = 3) -> Dict[str, Any]:
+        """
+        在留出查询集上评估紧凑索引的 recall@k 和查询延迟
+        
+        以ChromaDB全维度检索的前k个结果为基准，对比紧凑索引召回 + 全精度重打分的结果。
+        查询文本不参与PCA拟合（拟合只使用集合中的文档向量）。
+        
+        Args:
+            queries: 查询文本
+            k: 评估的结果数量
+            rounds: 计时轮数
+            
+        Returns:
+            Dict: recall@k 以及两种方式的平均/P95延迟（毫秒）
+        """
+        from .compact_index import recall_at_k
+        
+        if self.compact_index is None:
+            raise RuntimeError("紧凑索引未启用或未构建")
+        
+        collection = self.vectorstore._collection
+        embeddings = self.embed_queries(queries)
+        recalls = []
+        full_ms, compact_ms = [], []
+        for embedding in embeddings:
+            for _ in range(rounds):
+                start = time.perf_counter()
+                expected = collection.query(query_embeddings=[embedding], n_results=k, include=[])['ids'][0]
+                full_ms.append((time.perf_counter() - start) * 1000)
+                
+                start = time.perf_counter()
+                results = self._compact_search(embedding, k) or []
+                compact_ms.append((time.perf_counter() - start) * 1000)
+            recalls.append(recall_at_k(expected, [vector_id for vector_id, _, _ in results]))
+        
+        def summarize(samples: List[float]) -> Dict[str, float]:
+            ordered = sorted(samples)
+            return {
+                'avg_ms': round(sum(ordered) / len(ordered), 3),
+                'p95_ms': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3)
+            }
+        
+        return {
+            'queries': len(queries),
+            'k': k,
+            f'recall@{k}': round(sum(recalls) / len(recalls), 4) if recalls else 0.0,
+            'full': summarize(full_ms),
+            'compact': summarize(compact_ms),
+            'index': dict(self.compact_index.meta)
+        }
+    
+    def lexical_search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25词法检索
+        
+        Args:
+            query: 查询文本
+            k: 返回结果数量
+            
+        Returns:
+            List[Tuple[str, float]]: (文档标识, BM25分数) 列表；未启用词法索引时为空
+        """
+        if self.lexical_index is None:
+            return []
+        return self.lexical_index.search(query, k)
+    
+    def get_documents_by_keys(self, doc_keys: List[str]) -> Dict[str, Document]:
+        """
+        根据文档标识批量读取文档（用于补全仅词法命中的结果）
+        
+        Args:
+            doc_keys: 文档标识列表（元数据doc_id或向量库ID）
+            
+        Returns:
+            Dict[str, Document]: 文档标识 -> 文档
+        """
+        if not doc_keys:
+            return {}
+        
+        documents = {}
+        try:
+            collection = self.vectorstore._collection
+            
+            results = collection.get(
+                where={"doc_id": {"$in": list(doc_keys)}},
+                include=['documents', 'metadatas']
+            )
+            for content, metadata in zip(results.get('documents') or [], results.get('metadatas') or []):
+                documents[metadata.get('doc_id')] = Document(page_content=content, metadata=metadata)
+            
+            missing = [key for key in doc_keys if key not in documents]
+            if missing:
+                results = collection.get(ids=missing, include=['documents', 'metadatas'])
+                for doc_id, content, metadata in zip(results.get('ids') or [],
+                                                     results.get('documents') or [],
+                                                     results.get('metadatas') or []):
+                    documents[doc_id] = Document(page_content=content, metadata=metadata)
+            
+        except Exception as e:
+            logger.error(f"批量读取文档失败: {e}")
+        
+        return documents
+    
+    def rebuild_lexical_index(self, batch_size: int = 500) -> int:
+        """
+        从向量库全量重建BM25词法索引（用于已有集合首次启用或分词器变更）
+        
+        Args:
+            batch_size: 每批读取的文档数
+            
+        Returns:
+            int: 索引的文档数
+        """
+        if self.lexical_index is None:
+            logger.warning("词法索引未启用，跳过重建")
+            return 0
+        
+        collection = self.vectorstore._collection
+        total = collection.count()
+        self.lexical_index.clear()
+        
+        indexed = 0
+        for offset in range(0, total, batch_size):
+            results = collection.get(include=['documents', 'metadatas'], limit=batch_size, offset=offset)
+            self.lexical_index.add_documents(
+                ((metadata or {}).get('doc_id') or doc_id, content or '', (metadata or {}).get('job_id'))
+                for doc_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+            )
+            indexed += len(results['ids'])
+        
+        self.lexical_index.compact()
+        logger.info(f"BM25词法索引重建完成: {indexed} 个文档")
+        return indexed
+    
+    def audit_duplicate_vectors(self, batch_size: int = 500, fix: bool = False) -> Dict[str, Any]:
+        """
+        审计集合中的重复向量（确定性ID启用前重复导入遗留的数据）
+        
+        Args:
+            batch_size: 每批读取的文档数
+            fix: 是否删除多余的重复向量（每组保留一条）
+            
+        Returns:
+            Dict: 扫描数、旧式随机ID数、重复组、多余向量ID及删除数
+        """
+        collection = self.vectorstore._collection
+        total = collection.count()
+        # 没有 doc_id 元数据的文档在词法索引中以向量库ID为标识
+        keyed_by_vector_id = set()
+        
+        def iter_records():
+            for offset in range(0, total, batch_size):
+                results = collection.get(include=['documents', 'metadatas'], limit=batch_size, offset=offset)
+                for vector_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+                    if not (metadata or {}).get('doc_id'):
+                        keyed_by_vector_id.add(vector_id)
+                    yield vector_id, content, metadata
+        
+        report = find_duplicate_vectors(iter_records())
+        report['deleted'] = 0
+        
+        redundant_ids = report['redundant_ids']
+        if fix and redundant_ids:
+            # 共享 doc_id 的副本与保留的向量占用同一词法索引标识，只从向量库删除
+            for start in range(0, len(redundant_ids), batch_size):
+                batch = redundant_ids[start:start + batch_size]
+                lexical_keys = [vector_id for vector_id in batch if vector_id in keyed_by_vector_id]
+                if self.delete_documents_by_ids(batch, doc_keys=lexical_keys):
+                    report['deleted'] += len(batch)
+        
+        logger.info(
+            f"重复向量审计完成: 扫描 {report['scanned']} 个, 重复组 {len(report['duplicate_groups'])} 个, "
+            f"多余向量 {len(redundant_ids)} 个, 已删除 {report['deleted']} 个"
+        )
+        return report
+    
     def hybrid_search(self, query: str, filters: Dict = None, k: int = 20) -> List[Document]:
         """
         混合检索：向量检索 + 元数据过滤
@@ -435,6 +1230,9 @@ class ChromaDBManager:
             # 根据job_id过滤并删除
             collection.delete(where={"job_id": job_id})
             
+            if self.lexical_index is not None:
+                self.lexical_index.remove_job(job_id)
+            
             # 新版本自动持久化
             # self.vectorstore.persist()  # 已移除此方法
             
@@ -445,9 +1243,96 @@ class ChromaDBManager:
             logger.error(f"删除文档失败: {e}")
             return False
     
+    def delete_documents_by_ids(self, ids: List[str], doc_keys: List[str] = None) -> bool:
+        """
+        按向量库ID删除文档
+        
+        Args:
+            ids: 向量库ID列表
+            doc_keys: 对应的词法索引标识（默认与向量库ID相同）
+            
+        Returns:
+            bool: 删除是否成功
+        """
+        if not ids:
+            return True
+        
+        try:
+            self.vectorstore._collection.delete(ids=list(ids))
+            
+            if self.lexical_index is not None:
+                for doc_key in (ids if doc_keys is None else doc_keys):
+                    self.lexical_index.remove_document(doc_key)
+            
+            logger.info(f"成功删除 {len(ids)} 个文档")
+            return True
+            
+        except Exception as e:
+            logger.error(f"按ID删除文档失败: {e}")
+            return False
+    
+    def compact_collection(self, batch_size: int = 1000) -> int:
+        """
+        重建集合以压实HNSW索引
+        
+        ChromaDB 删除向量只在HNSW图中打删除标记，空间和图结构不会回收。
+        这里把现存向量（含已计算的嵌入，不重新向量化）分批复制到临时集合，
+        删除原集合后将临时集合改回原名。若上次压实在改名前中断，先恢复临时集合。
+        
+        Args:
+            batch_size: 每批复制的文档数
+            
+        Returns:
+            int: 复制的文档数
+        """
+        if isinstance(self.vectorstore, BackendVectorStore):
+            return self.vectorstore._collection.compact()
+        
+        client = self.vectorstore._client
+        temp_name = f"{self.collection_name}__compacting"
+        existing = {getattr(c, 'name', c) for c in client.list_collections()}
+        
+        if temp_name in existing:
+            if self.collection_name in existing:
+                client.delete_collection(temp_name)
+            else:
+                client.get_collection(temp_name).modify(name=self.collection_name)
+                self._vectorstore = _NOT_LOADED
+                logger.warning(f"已恢复上次中断压实的集合 {self.collection_name}")
+        
+        source = self.vectorstore._collection
+        target = client.create_collection(temp_name, metadata=source.metadata)
+        
+        total = source.count()
+        copied = 0
+        for offset in range(0, total, batch_size):
+            batch = source.get(include=['embeddings', 'documents', 'metadatas'],
+                               limit=batch_size, offset=offset)
+            if not batch['ids']:
+                break
+            target.add(
+                ids=batch['ids'],
+                embeddings=batch['embeddings'],
+                documents=batch['documents'],
+                metadatas=batch['metadatas']
+            )
+            copied += len(batch['ids'])
+        
+        if copied != total:
+            client.delete_collection(temp_name)
+            raise RuntimeError(f"压实复制不完整: {copied}/{total}")
+        
+        client.delete_collection(self.collection_name)
+        target.modify(name=self.collection_name)
+        
+        # 重新打开向量存储，使其指向压实后的集合
+        self._vectorstore = _NOT_LOADED
+        logger.info(f"集合 {self.collection_name} 压实完成: {copied} 个文档")
+        return copied
+    
     def update_document_metadata(self, doc_id: str, metadata: Dict) -> bool:
         """
-        更新文档元数据
+        更新文档元数据（同时刷新 updated_at，增量快照据此导出）
         
         Args:
             doc_id: 文档ID
@@ -462,7 +1347,7 @@ class ChromaDBManager:
             
             collection.update(
                 ids=[doc_id],
-                metadatas=[metadata]
+                metadatas=[dict(metadata, updated_at=datetime.now().isoformat())]
             )
             
             # 新版本自动持久化
@@ -475,10 +1360,45 @@ class ChromaDBManager:
             logger.error(f"更新文档元数据失败: {e}")
             return False
     
+    def export_snapshot(self, output_dir: str, since: Optional[str] = None, chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        导出向量快照（Parquet，分块读取，写入进行中也可安全执行）
+        
+        Args:
+            output_dir: 快照目录
+            since: 增量快照起始时间（ISO时间或上一个快照目录），None表示全量
+            chunk_size: 每块读取的向量数
+            
+        Returns:
+            Dict: 快照清单
+        """
+        from .vector_snapshot import export_snapshot
+        
+        return export_snapshot(self.vectorstore._collection, output_dir, since=since,
+                               chunk_size=chunk_size, collection_name=self.collection_name)
+    
+    def import_snapshot(self, snapshot_dirs: List[str], batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        导入向量快照（直接写入已计算的嵌入，不重新向量化），同时重建词法索引
+        
+        Args:
+            snapshot_dirs: 快照目录（全量快照在前，增量快照按时间先后排列）
+            batch_size: 每批写入的向量数
+            
+        Returns:
+            Dict: 导入统计
+        """
+        from .vector_snapshot import import_snapshot
+        
+        return import_snapshot(self.vectorstore._collection, snapshot_dirs, batch_size=batch_size,
+                               lexical_index=self.lexical_index)
+    
     def backup_collection(self, backup_path: str) -> bool:
         """
         备份集合数据
         
+        优先导出全量向量快照；未安装pyarrow时回退为复制持久化目录。
+        
         Args:
             backup_path: 备份路径
             
@@ -486,22 +1406,30 @@ class ChromaDBManager:
             bool: 备份是否成功
         """
         try:
-            import shutil
-            
             # 创建备份目录
             os.makedirs(backup_path, exist_ok=True)
             
-            # 复制数据库文件
-            shutil.copytree(
-                self.persist_directory, 
-                os.path.join(backup_path, 'chroma_db'),
-                dirs_exist_ok=True
-            )
+            try:
+                manifest = self.export_snapshot(os.path.join(backup_path, 'snapshot'))
+                backup_format = 'snapshot'
+            except ImportError:
+                import shutil
+                
+                logger.warning("未安装pyarrow，改为复制持久化目录备份")
+                shutil.copytree(
+                    self.persist_directory, 
+                    os.path.join(backup_path, 'chroma_db'),
+                    dirs_exist_ok=True
+                )
+                manifest = None
+                backup_format = 'directory'
             
             # 保存配置信息
             config_backup = {
                 'collection_name': self.collection_name,
                 'backup_time': datetime.now().isoformat(),
+                'format': backup_format,
+                'snapshot': manifest,
                 'stats': self.get_collection_stats()
             }
             
@@ -551,12 +1479,7 @@ class ChromaDBManager:
             logger.debug(f"基础搜索返回 {len(base_results)} 个结果，开始时间感知重排序")
             
             # 2. 应用时间感知重排序
-            if strategy == 'fresh_first':
-                reranked_results = self._fresh_first_rerank(base_results)
-            elif strategy == 'balanced':
-                reranked_results = self._balanced_time_rerank(base_results)
-            else:  # hybrid
-                reranked_results = self._hybrid_time_rerank(base_results)
+            reranked_results = self.rerank_by_time(base_results, strategy)
             
             # 3. 返回前k个结果
             final_results = reranked_results[:k]
@@ -572,6 +1495,15 @@ class ChromaDBManager:
             # 降级到基础搜索
             return self.similarity_search_with_score(query=query, k=k, filters=filters)
     
+    def rerank_by_time(self, results: List[Tuple[Document, float]],
+                       strategy: str = 'hybrid') -> List[Tuple[Document, float]]:
+        """按时间感知策略重排序检索结果（'hybrid', 'fresh_first', 'balanced'）"""
+        if strategy == 'fresh_first':
+            return self._fresh_first_rerank(results)
+        if strategy == 'balanced':
+            return self._balanced_time_rerank(results)
+        return self._hybrid_time_rerank(results)
+    
     def _hybrid_time_rerank(self, results: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
         """混合时间重排序：平衡相似度和时间新旧"""
         reranked = []
@@ -780,11 +1712,20 @@ class ChromaDBManager:
             # 新版本自动持久化，无需手动调用persist
             # self.vectorstore.persist()  # 已移除此方法
             
+            # 进程内后端需要保存索引和元数据快照
+            if isinstance(self._vectorstore, BackendVectorStore):
+                self._vectorstore._collection.close()
+            if self._resume_collection is not _NOT_LOADED:
+                self._resume_collection.close()
+                self._resume_collection = _NOT_LOADED
+            
             # 清理向量存储引用，帮助释放文件句柄
-            if hasattr(self, 'vectorstore'):
-                self.vectorstore = None
-            if hasattr(self, 'compression_retriever'):
-                self.compression_retriever = None
+            self.vectorstore = None
+            self.compression_retriever = None
+            
+            # 停止嵌入工作进程
+            if hasattr(self.embeddings, 'shutdown'):
+                self.embeddings.shutdown()
                 
             logger.info("ChromaDB连接已关闭")
         except Exception as e:
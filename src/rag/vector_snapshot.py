@@ -0,0 +1,265 @@
+"""
+向量快照导出/导入
+
+backup_collection 原先直接复制整个持久化目录：速度慢、无法增量，并且写入进行中复制可能得到
+不一致的 SQLite 文件。这里改为通过集合接口分块读取，把 ID、嵌入（float32 定长列表）、文本和
+元数据流式写入 Parquet 文件（每块一个 row group）：
+- 全量快照:   导出全部向量
+- 增量快照:   只导出元数据 updated_at（每次写入时更新，缺失时取 created_at）不早于 since 的向量，
+              并附带当时全部有效ID，恢复时据此删除基准快照之后被删除的向量
+- 导入:       直接写入已计算的嵌入（不重新向量化）；目标集合为空时走 add 批量加载，
+              同时重建BM25词法索引
+
+快照目录结构:
+    manifest.json        快照信息（模式、since、快照时间、维度、距离空间、行数）
+    vectors.parquet      id / job_id / created_at / embedding / document / metadata(JSON)
+    live_ids.parquet     增量快照时的全部有效ID
+
+pyarrow 仅在导出/导入时导入。
+"""
+
+import json
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+VECTORS_FILE = 'vectors.parquet'
+LIVE_IDS_FILE = 'live_ids.parquet'
+SNAPSHOT_FORMAT = 'vector-snapshot'
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """解析ISO时间（去掉时区，与 created_at 的本地时间比较）"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _modified_time(metadata: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    """向量最后一次写入的时间（旧数据没有 updated_at 时取 created_at）"""
+    metadata = metadata or {}
+    return _parse_time(metadata.get('updated_at') or metadata.get('created_at'))
+
+
+def resolve_since(since: Optional[str]) -> Optional[str]:
+    """since 可以是ISO时间，也可以是已有快照目录（取该快照的快照时间）"""
+    if not since:
+        return None
+    manifest_path = Path(since) / MANIFEST_FILE
+    if manifest_path.exists():
+        return read_manifest(since)['snapshot_time']
+    if _parse_time(since) is None:
+        raise ValueError(f"无效的 since 参数（需为ISO时间或快照目录）: {since}")
+    return since
+
+
+def read_manifest(snapshot_dir: str) -> Dict[str, Any]:
+    with open(Path(snapshot_dir) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"不是向量快照目录: {snapshot_dir}")
+    return manifest
+
+
+def _schema(pa, dim: int):
+    return pa.schema([
+        ('id', pa.string()),
+        ('job_id', pa.string()),
+        ('created_at', pa.string()),
+        ('embedding', pa.list_(pa.float32(), dim)),
+        ('document', pa.string()),
+        ('metadata', pa.string()),
+    ])
+
+
+def export_snapshot(collection, output_dir: str, since: Optional[str] = None, chunk_size: int = 1000,
+                    collection_name: str = '') -> Dict[str, Any]:
+    """
+    分块导出集合快照
+
+    Args:
+        collection: 向量集合（ChromaDB 集合或 VectorBackend）
+        output_dir: 快照目录
+        since: 增量快照的起始时间（ISO时间或上一个快照目录），None表示全量
+        chunk_size: 每块读取/写入的向量数
+        collection_name: 集合名称（写入清单）
+
+    Returns:
+        Dict: 快照清单
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    since = resolve_since(since)
+    since_time = _parse_time(since)
+    # 快照时间取导出开始时刻：导出期间写入的向量由下一次增量快照覆盖
+    snapshot_time = datetime.now().isoformat()
+    started = time.perf_counter()
+
+    target = Path(output_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    count_before = collection.count()
+
+    writer = None
+    dim = None
+    rows = 0
+    scanned = 0
+    live_ids: List[str] = []
+    try:
+        for offset in range(0, count_before, chunk_size):
+            batch = collection.get(include=['embeddings', 'documents', 'metadatas'], limit=chunk_size, offset=offset)
+            if not len(batch['ids']):
+                break
+            scanned += len(batch['ids'])
+            live_ids.extend(batch['ids'])
+
+            selected = [
+                i for i, metadata in enumerate(batch['metadatas'])
+                if since_time is None or (_modified_time(metadata) or since_time) >= since_time
+            ]
+            if not selected:
+                continue
+
+            embeddings = np.asarray([batch['embeddings'][i] for i in selected], dtype=np.float32)
+            if dim is None:
+                dim = int(embeddings.shape[1])
+                writer = pq.ParquetWriter(str(target / VECTORS_FILE), _schema(pa, dim), compression='zstd')
+            metadatas = [batch['metadatas'][i] or {} for i in selected]
+            table = pa.Table.from_arrays([
+                pa.array([batch['ids'][i] for i in selected], pa.string()),
+                pa.array([metadata.get('job_id') for metadata in metadatas], pa.string()),
+                pa.array([metadata.get('created_at') for metadata in metadatas], pa.string()),
+                pa.FixedSizeListArray.from_arrays(pa.array(embeddings.reshape(-1), pa.float32()), dim),
+                pa.array([batch['documents'][i] for i in selected], pa.string()),
+                pa.array([json.dumps(metadata, ensure_ascii=False) for metadata in metadatas], pa.string()),
+            ], schema=_schema(pa, dim))
+            writer.write_table(table)
+            rows += len(selected)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if since_time is not None:
+        pq.write_table(pa.table({'id': pa.array(live_ids, pa.string())}), str(target / LIVE_IDS_FILE),
+                       compression='zstd')
+
+    count_after = collection.count()
+    if count_after != count_before:
+        logger.warning(f"导出期间集合发生写入（{count_before} -> {count_after}），"
+                       f"变更将由下一次增量快照覆盖")
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'version': 1,
+        'collection': collection_name,
+        'mode': 'incremental' if since_time is not None else 'full',
+        'since': since,
+        'snapshot_time': snapshot_time,
+        'space': (collection.metadata or {}).get('hnsw:space', 'l2'),
+        'dim': dim,
+        'rows': rows,
+        'scanned': scanned,
+        'count_before': count_before,
+        'count_after': count_after,
+        'export_seconds': round(time.perf_counter() - started, 3)
+    }
+    with open(target / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"向量快照导出完成: {rows} 个向量 ({manifest['mode']}) -> {target}")
+    return manifest
+
+
+def import_snapshot(collection, snapshot_dirs: Union[str, Sequence[str]], batch_size: int = 1000,
+                    lexical_index=None) -> Dict[str, Any]:
+    """
+    按顺序导入快照（一个全量快照 + 若干增量快照）
+
+    Args:
+        collection: 目标集合（ChromaDB 集合或 VectorBackend）
+        snapshot_dirs: 快照目录（列表按时间先后排列）
+        batch_size: 每批写入的向量数
+        lexical_index: 需要同步重建的BM25词法索引（可选）
+
+    Returns:
+        Dict: 导入统计（写入数、删除数、耗时）
+    """
+    import numpy as np
+    import pyarrow.parquet as pq
+
+    if isinstance(snapshot_dirs, str):
+        snapshot_dirs = [snapshot_dirs]
+
+    started = time.perf_counter()
+    stats = {'snapshots': len(snapshot_dirs), 'written': 0, 'deleted': 0, 'bulk_load': False}
+    target_space = (collection.metadata or {}).get('hnsw:space', 'l2')
+
+    for snapshot_dir in snapshot_dirs:
+        manifest = read_manifest(snapshot_dir)
+        if manifest['space'] != target_space:
+            logger.warning(f"快照距离空间 {manifest['space']} 与目标集合 {target_space} 不一致")
+
+        # 目标集合为空时直接 add，省去按ID查重
+        bulk_load = collection.count() == 0
+        stats['bulk_load'] = stats['bulk_load'] or bulk_load
+        write = collection.add if bulk_load else collection.upsert
+
+        vectors_path = Path(snapshot_dir) / VECTORS_FILE
+        if vectors_path.exists():
+            parquet = pq.ParquetFile(str(vectors_path))
+            for record_batch in parquet.iter_batches(batch_size=batch_size,
+                                                     columns=['id', 'embedding', 'document', 'metadata']):
+                ids = record_batch.column(0).to_pylist()
+                embedding_column = record_batch.column(1)
+                embeddings = np.asarray(embedding_column.values.to_numpy(zero_copy_only=False), dtype=np.float32)
+                embeddings = embeddings.reshape(len(ids), embedding_column.type.list_size)
+                documents = record_batch.column(2).to_pylist()
+                metadatas = [json.loads(value) for value in record_batch.column(3).to_pylist()]
+
+                write(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
+                if lexical_index is not None:
+                    lexical_index.add_documents(
+                        (metadata.get('doc_id') or vector_id, document or '', metadata.get('job_id'))
+                        for vector_id, document, metadata in zip(ids, documents, metadatas)
+                    )
+                stats['written'] += len(ids)
+
+        live_ids_path = Path(snapshot_dir) / LIVE_IDS_FILE
+        if manifest['mode'] == 'incremental' and live_ids_path.exists():
+            stats['deleted'] += _delete_missing(collection, set(pq.read_table(str(live_ids_path)).column('id').to_pylist()),
+                                                batch_size, lexical_index)
+
+    stats['import_seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"向量快照导入完成: 写入 {stats['written']} 个, 删除 {stats['deleted']} 个, "
+                f"耗时 {stats['import_seconds']} 秒")
+    return stats
+
+
+def _delete_missing(collection, live_ids: set, batch_size: int, lexical_index=None) -> int:
+    """删除不在快照有效ID集合中的向量（基准快照之后被删除的向量）"""
+    stale, stale_keys = [], []
+    total = collection.count()
+    for offset in range(0, total, batch_size):
+        batch = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+        if not len(batch['ids']):
+            break
+        for vector_id, metadata in zip(batch['ids'], batch['metadatas']):
+            if vector_id not in live_ids:
+                stale.append(vector_id)
+                stale_keys.append((metadata or {}).get('doc_id') or vector_id)
+
+    for start in range(0, len(stale), batch_size):
+        collection.delete(ids=stale[start:start + batch_size])
+    if lexical_index is not None:
+        for doc_key in stale_keys:
+            lexical_index.remove_document(doc_key)
+    return len(stale)
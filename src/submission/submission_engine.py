@@ -20,6 +20,12 @@ from .anti_crawler import AntiCrawlerSystem
 from .job_status_detector import JobStatusDetector
 from ..auth.browser_manager import BrowserManager
 from ..auth.login_manager import LoginManager
+from ..utils.metrics import default_registry
+
+# 投递指标（写入全局指标注册表，由 /metrics 端点导出）
+SUBMISSION_QUEUE_DEPTH = default_registry.gauge('submission_queue_depth', '本轮批量投递中剩余待投递的职位数')
+SUBMISSION_RESULTS = default_registry.counter('submission_results_total', '投递结果数', ['status'])
+SUBMISSION_DURATION = default_registry.histogram('submission_duration_seconds', '单个职位投递耗时（秒）')
 
 
 class ResumeSubmissionEngine:
@@ -294,6 +300,7 @@ class ResumeSubmissionEngine:
                 return self.current_report
             
             self.logger.info(f"获取到 {len(all_pending_jobs)} 个待投递职位，将分 {(len(all_pending_jobs) + batch_size - 1) // batch_size} 批处理")
+            SUBMISSION_QUEUE_DEPTH.set(len(all_pending_jobs))
             
             # 2. 按batch_size分批处理
             for batch_num in range(0, len(all_pending_jobs), batch_size):
@@ -312,6 +319,7 @@ class ResumeSubmissionEngine:
                         # 投递单个职位（同步版本）
                         result = self.submit_single_job_sync(job_record)
                         self.current_report.add_result(result)
+                        self._record_submission_metrics(result, len(all_pending_jobs) - batch_num - i - 1)
                         
                         # 更新数据库
                         self.data_manager.update_submission_result(result)
@@ -345,6 +353,7 @@ class ResumeSubmissionEngine:
                         )
                         
                         self.current_report.add_result(error_result)
+                        self._record_submission_metrics(error_result, len(all_pending_jobs) - batch_num - i - 1)
                         self.data_manager.update_submission_result(error_result)
                         continue
                 
@@ -401,6 +410,7 @@ class ResumeSubmissionEngine:
                 return self.current_report
             
             self.logger.info(f"获取到 {len(all_pending_jobs)} 个待投递职位，将分 {(len(all_pending_jobs) + batch_size - 1) // batch_size} 批处理")
+            SUBMISSION_QUEUE_DEPTH.set(len(all_pending_jobs))
             
             # 2. 按batch_size分批处理
             for batch_num in range(0, len(all_pending_jobs), batch_size):
@@ -419,6 +429,7 @@ class ResumeSubmissionEngine:
                         # 投递单个职位
                         result = await self.submit_single_job(job_record)
                         self.current_report.add_result(result)
+                        self._record_submission_metrics(result, len(all_pending_jobs) - batch_num - i - 1)
                         
                         # 更新数据库
                         self.data_manager.update_submission_result(result)
@@ -452,6 +463,7 @@ class ResumeSubmissionEngine:
                         )
                         
                         self.current_report.add_result(error_result)
+                        self._record_submission_metrics(error_result, len(all_pending_jobs) - batch_num - i - 1)
                         self.data_manager.update_submission_result(error_result)
                         continue
                 
@@ -475,6 +487,12 @@ class ResumeSubmissionEngine:
                 self.current_report.finalize()
             return self.current_report or SubmissionReport()
     
+    def _record_submission_metrics(self, result: SubmissionResult, remaining: int):
+        """记录单个职位的投递指标"""
+        SUBMISSION_RESULTS.inc(labels={'status': result.status.value})
+        SUBMISSION_DURATION.observe(result.execution_time)
+        SUBMISSION_QUEUE_DEPTH.set(remaining)
+    
     async def submit_single_job(self, job_record: JobMatchRecord) -> SubmissionResult:
         """
         投递单个职位
@@ -0,0 +1,315 @@
+"""
+指标注册表模块
+
+提供 Prometheus / OpenMetrics 风格的指标类型：
+- Counter:   单调递增计数器（吞吐量、成功/失败次数）
+- Gauge:     可增可减的瞬时值（队列深度、运行中任务数、内存使用率）
+- Histogram: 固定分桶直方图（阶段耗时），内存占用只与分桶数和标签组合数有关
+
+指标注册到 MetricsRegistry，可渲染为 OpenMetrics 文本，并通过 MetricsHTTPServer 在本机 /metrics 暴露供抓取。
+
+用法:
+    from src.utils.metrics import default_registry
+
+    stage_latency = default_registry.histogram(
+        'pipeline_stage_duration_seconds', '流水线阶段耗时', ['stage']
+    )
+    stage_latency.observe(1.25, {'stage': 'matching'})
+"""
+
+import math
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Optional, Sequence, Iterable
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# 默认耗时分桶（秒），覆盖从毫秒级向量检索到分钟级的抓取/投递阶段
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs)
+    return f'{{{rendered}}}' if rendered else ''
+
+
+class _MetricFamily:
+    """指标族基类：同名指标按标签值组合分别存储"""
+
+    metric_type = 'unknown'
+
+    def __init__(self, name: str, description: str = '', labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Optional[Dict[str, str]]) -> Tuple[str, ...]:
+        labels = labels or {}
+        if len(labels) != len(self.labelnames) or any(name not in labels for name in self.labelnames):
+            raise ValueError(f"指标 {self.name} 的标签应为 {list(self.labelnames)}，实际为 {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_pairs(self, key: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        return list(zip(self.labelnames, key))
+
+    def samples(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """返回 (样本名, 标签对, 值) 列表"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_MetricFamily):
+    """单调递增计数器"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, description: str = '', labelnames: Sequence[str] = ()):
+        # OpenMetrics 中计数器族名不含 _total 后缀，样本名带 _total
+        super().__init__(name[:-6] if name.endswith('_total') else name, description, labelnames)
+
+    def inc(self, amount: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        if amount < 0:
+            raise ValueError(f"计数器 {self.name} 只能递增")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(f'{self.name}_total', self._label_pairs(key), value) for key, value in self._values.items()]
+
+
+class Gauge(_MetricFamily):
+    """瞬时值"""
+
+    metric_type = 'gauge'
+
+    def set(self, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        self.inc(-amount, labels)
+
+    def get(self, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._label_pairs(key), value) for key, value in self._values.items()]
+
+
+class _HistogramState:
+    __slots__ = ('bucket_counts', 'count', 'sum')
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_MetricFamily):
+    """固定分桶直方图（每个标签组合只保存各桶计数、总数和总和）"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, description: str = '', labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        if not self.buckets:
+            raise ValueError(f"直方图 {name} 至少需要一个有限分桶")
+
+    def observe(self, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = _HistogramState(len(self.buckets) + 1)
+            state.bucket_counts[index] += 1
+            state.count += 1
+            state.sum += value
+
+    def get(self, labels: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """获取某个标签组合的 count / sum"""
+        state = self._values.get(self._key(labels))
+        return {'count': state.count, 'sum': state.sum} if state else {'count': 0, 'sum': 0.0}
+
+    def quantile(self, q: float, labels: Optional[Dict[str, str]] = None) -> float:
+        """按分桶线性插值估算分位数（与 PromQL histogram_quantile 一致）"""
+        state = self._values.get(self._key(labels))
+        if not state or not state.count:
+            return 0.0
+
+        target = q * state.count
+        cumulative = 0
+        lower = 0.0
+        for index, bound in enumerate(self.buckets):
+            bucket_count = state.bucket_counts[index]
+            if cumulative + bucket_count >= target and bucket_count:
+                return lower + (bound - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound
+        return self.buckets[-1]
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, state in self._values.items():
+                pairs = self._label_pairs(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), state.bucket_counts):
+                    cumulative += bucket_count
+                    result.append((f'{self.name}_bucket', pairs + [('le', _format_value(bound))], cumulative))
+                result.append((f'{self.name}_count', pairs, state.count))
+                result.append((f'{self.name}_sum', pairs, state.sum))
+        return result
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._families: Dict[str, _MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, labelnames: Sequence[str], **kwargs):
+        family_name = name[:-6] if cls is Counter and name.endswith('_total') else name
+        with self._lock:
+            family = self._families.get(family_name)
+            if family is None:
+                family = self._families[family_name] = cls(name, description, labelnames, **kwargs)
+            elif not isinstance(family, cls) or family.labelnames != tuple(labelnames):
+                raise ValueError(
+                    f"指标 {family_name} 已注册为 {family.metric_type}{list(family.labelnames)}，"
+                    f"不能再注册为 {cls.metric_type}{list(labelnames)}"
+                )
+            return family
+
+    def counter(self, name: str, description: str = '', labelnames: Sequence[str] = ()) -> Counter:
+        """获取或注册计数器"""
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def gauge(self, name: str, description: str = '', labelnames: Sequence[str] = ()) -> Gauge:
+        """获取或注册仪表盘"""
+        return self._get_or_create(Gauge, name, description, labelnames)
+
+    def histogram(self, name: str, description: str = '', labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        """获取或注册直方图"""
+        return self._get_or_create(Histogram, name, description, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_MetricFamily]:
+        return self._families.get(name)
+
+    def families(self) -> List[_MetricFamily]:
+        with self._lock:
+            return list(self._families.values())
+
+    def clear(self) -> None:
+        """清空所有指标值（保留注册信息）"""
+        for family in self.families():
+            family.clear()
+
+    def render(self) -> str:
+        """渲染为 OpenMetrics 文本格式"""
+        lines = []
+        for family in sorted(self.families(), key=lambda f: f.name):
+            lines.append(f'# TYPE {family.name} {family.metric_type}')
+            if family.description:
+                lines.append(f'# HELP {family.name} {family.description}')
+            for sample_name, pairs, value in family.samples():
+                lines.append(f'{sample_name}{_format_labels(pairs)} {_format_value(value)}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsHTTPServer:
+    """在本机暴露 /metrics 抓取端点"""
+
+    def __init__(self, registry: 'MetricsRegistry', host: str = '127.0.0.1', port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}/metrics'
+
+    def start(self) -> None:
+        """在后台线程中启动HTTP服务（port=0 时自动分配端口）"""
+        if self._server:
+            return
+
+        registry = self.registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} - {format % args}")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"指标端点已启动: {self.url}")
+
+    def stop(self) -> None:
+        """停止HTTP服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# 全局指标注册表
+default_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """获取全局指标注册表"""
+    return default_registry
@@ -0,0 +1,436 @@
+"""
+轻量级链路追踪模块
+
+为各模块提供统一、近乎零开销的操作耗时追踪：
+- Span 使用 time.perf_counter_ns 计时，通过 contextvars 维护父子嵌套关系（同步代码和 asyncio 任务通用）
+- 进程 RSS 内存和 CPU 使用率由后台线程定期采样，Span 只读取最近一次采样值，不在调用路径上阻塞
+- 每个操作名维护一个 HDR 风格的对数分桶直方图，内存占用固定，可计算 p50/p90/p99 等分位数
+
+用法:
+    from src.utils.tracing import tracer
+
+    with tracer.span('vector_search', k=10):
+        ...
+
+    @tracer.trace('batch_import')
+    async def import_jobs(...):
+        ...
+"""
+
+import os
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, List, Any, Optional, Callable
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+class HdrHistogram:
+    """
+    HDR 风格的对数-线性分桶直方图
+
+    小于 2 * 2^significant_bits 的值逐一计数，更大的值按 2 的幂分段，每段再线性细分为
+    2^significant_bits 个子桶，相对误差不超过 1 / 2^significant_bits（默认 7 位，约 0.8%）。
+    桶以稀疏字典存储，桶数量上限由值域的位数决定，与记录次数无关。
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self.sub_bucket_count = 1 << significant_bits
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value: Optional[int] = None
+        self.max_value: Optional[int] = None
+
+    def _bucket_index(self, value: int) -> int:
+        if value < (self.sub_bucket_count << 1):
+            return value
+        shift = value.bit_length() - self.significant_bits - 1
+        return shift * self.sub_bucket_count + (value >> shift)
+
+    def _bucket_upper_bound(self, index: int) -> int:
+        if index < (self.sub_bucket_count << 1):
+            return index
+        shift = index // self.sub_bucket_count - 1
+        mantissa = index - shift * self.sub_bucket_count
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """记录一个非负整数值"""
+        value = max(int(value), 0)
+        index = self._bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total_count += 1
+        self.total_sum += value
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: 'HdrHistogram') -> None:
+        """合并另一个直方图（分桶精度需相同）"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+            self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+
+    def percentile(self, percent: float) -> int:
+        """获取分位数（返回所在桶的上界，不超过最大值）"""
+        if not self.total_count:
+            return 0
+
+        target = max(1, int(round(self.total_count * percent / 100.0)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._bucket_upper_bound(index), self.max_value)
+        return self.max_value
+
+    @property
+    def mean(self) -> float:
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+
+@dataclass
+class ResourceSample:
+    """进程资源采样"""
+    timestamp: float
+    rss_mb: float
+    cpu_percent: float
+
+
+class ResourceSampler:
+    """
+    进程资源后台采样器
+
+    后台线程每隔 interval 秒采样一次当前进程的 RSS 和 CPU 使用率（两次采样间的平均值），
+    调用方通过 latest 读取最近一次结果，不产生任何系统调用。
+    未安装 psutil 时 CPU 使用率由 time.process_time 估算，RSS 在 Linux 下读取 /proc/self/statm。
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.latest = ResourceSample(time.time(), 0.0, 0.0)
+        self.peak_rss_mb = 0.0
+        self._process = psutil.Process() if psutil else None
+        self._last_cpu_time = time.process_time()
+        self._last_wall_time = time.perf_counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动后台采样线程（已启动时忽略）"""
+        with self._lock:
+            if self.running:
+                return
+            self._stop_event.clear()
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台采样线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"资源采样失败: {e}")
+
+    def sample(self) -> ResourceSample:
+        """立即采样一次并更新 latest"""
+        if self._process:
+            rss_mb = self._process.memory_info().rss / 1024 / 1024
+            cpu_percent = self._process.cpu_percent(interval=None)
+        else:
+            rss_mb = self._read_statm_rss_mb()
+            cpu_time = time.process_time()
+            wall_time = time.perf_counter()
+            elapsed = wall_time - self._last_wall_time
+            cpu_percent = (cpu_time - self._last_cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+            self._last_cpu_time, self._last_wall_time = cpu_time, wall_time
+
+        self.latest = ResourceSample(time.time(), rss_mb, cpu_percent)
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        return self.latest
+
+    @staticmethod
+    def _read_statm_rss_mb() -> float:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+        except (OSError, ValueError, AttributeError, IndexError):
+            return 0.0
+
+
+@dataclass
+class Span:
+    """一次操作的追踪记录"""
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    trace_id: int
+    start_ns: int
+    start_time: float = 0.0
+    end_ns: int = 0
+    start_rss_mb: float = 0.0
+    end_rss_mb: float = 0.0
+    cpu_percent: float = 0.0
+    success: bool = True
+    error_message: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1_000_000
+
+    @property
+    def memory_delta_mb(self) -> float:
+        return self.end_rss_mb - self.start_rss_mb
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'trace_id': self.trace_id,
+            'duration_ms': round(self.duration_ms, 3),
+            'memory_delta_mb': round(self.memory_delta_mb, 2),
+            'cpu_percent': round(self.cpu_percent, 1),
+            'success': self.success,
+            'error_message': self.error_message,
+            'attributes': self.attributes
+        }
+
+
+class _OperationStats:
+    """单个操作名的聚合统计（耗时以微秒记录）"""
+
+    __slots__ = ('count', 'errors', 'histogram', 'memory_delta_mb')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.histogram = HdrHistogram()
+        self.memory_delta_mb = 0.0
+
+
+class _SpanScope:
+    """Span 上下文管理器，同时支持 with 和 async with"""
+
+    __slots__ = ('_tracer', '_name', '_attributes', '_span', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._span, self._token = self._tracer._start_span(self._name, self._attributes)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._tracer._end_span(self._span, self._token, exc)
+        return False
+
+    async def __aenter__(self) -> Span:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+
+class Tracer:
+    """链路追踪器"""
+
+    def __init__(self, sample_interval: float = 1.0, max_recent_spans: int = 1000, enabled: bool = True):
+        self.enabled = enabled
+        self.sampler = ResourceSampler(sample_interval)
+        self.recent_spans: deque = deque(maxlen=max_recent_spans)
+        self._current_span: ContextVar[Optional[Span]] = ContextVar(f'current_span_{id(self)}', default=None)
+        self._ids = itertools.count(1)
+        self._stats: Dict[str, _OperationStats] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Span], None]] = []
+
+    def span(self, name: str, **attributes) -> _SpanScope:
+        """创建一个 Span 上下文，嵌套调用时自动关联父 Span"""
+        return _SpanScope(self, name, attributes)
+
+    def trace(self, name: Optional[str] = None) -> Callable:
+        """函数追踪装饰器（支持同步和异步函数），name 默认为函数限定名"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return sync_wrapper
+        return decorator
+
+    def current_span(self) -> Optional[Span]:
+        """获取当前上下文中正在执行的 Span"""
+        return self._current_span.get()
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        """注册 Span 结束回调（在结束 Span 的线程中同步调用，应保持轻量）"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _start_span(self, name: str, attributes: Dict[str, Any]):
+        if not self.sampler.running:
+            self.sampler.start()
+
+        parent = self._current_span.get()
+        span_id = next(self._ids)
+        span = Span(
+            name=name,
+            span_id=span_id,
+            parent_id=parent.span_id if parent else None,
+            trace_id=parent.trace_id if parent else span_id,
+            start_ns=time.perf_counter_ns(),
+            start_time=time.time(),
+            start_rss_mb=self.sampler.latest.rss_mb,
+            attributes=attributes
+        )
+        return span, self._current_span.set(span)
+
+    def _end_span(self, span: Span, token, exc: Optional[BaseException]) -> None:
+        span.end_ns = time.perf_counter_ns()
+        self._current_span.reset(token)
+
+        latest = self.sampler.latest
+        span.end_rss_mb = latest.rss_mb
+        span.cpu_percent = latest.cpu_percent
+        if exc is not None:
+            span.success = False
+            span.error_message = str(exc)
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            stats = self._stats.get(span.name)
+            if stats is None:
+                stats = self._stats[span.name] = _OperationStats()
+            stats.count += 1
+            stats.histogram.record(span.duration_ns // 1000)
+            stats.memory_delta_mb += span.memory_delta_mb
+            if not span.success:
+                stats.errors += 1
+            self.recent_spans.append(span)
+
+        for listener in self._listeners:
+            try:
+                listener(span)
+            except Exception as e:
+                logger.debug(f"Span回调执行失败: {e}")
+
+    def get_summary(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取按操作名聚合的耗时统计
+
+        Args:
+            name: 操作名称，None 表示所有操作
+
+        Returns:
+            Dict: {操作名: {count, errors, success_rate, avg_ms, p50_ms, p90_ms, p99_ms, max_ms, ...}}
+        """
+        with self._lock:
+            items = [(name, self._stats[name])] if name in self._stats else (
+                [] if name else list(self._stats.items())
+            )
+            summary = {}
+            for op_name, stats in items:
+                histogram = stats.histogram
+                summary[op_name] = {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'success_rate': (stats.count - stats.errors) / stats.count if stats.count else 0,
+                    'avg_ms': round(histogram.mean / 1000, 3),
+                    'min_ms': round((histogram.min_value or 0) / 1000, 3),
+                    'p50_ms': round(histogram.percentile(50) / 1000, 3),
+                    'p90_ms': round(histogram.percentile(90) / 1000, 3),
+                    'p99_ms': round(histogram.percentile(99) / 1000, 3),
+                    'max_ms': round((histogram.max_value or 0) / 1000, 3),
+                    'total_memory_delta_mb': round(stats.memory_delta_mb, 2)
+                }
+            return summary
+
+    def get_resource_usage(self) -> Dict[str, float]:
+        """获取最近一次进程资源采样"""
+        latest = self.sampler.latest
+        return {
+            'rss_mb': round(latest.rss_mb, 2),
+            'peak_rss_mb': round(self.sampler.peak_rss_mb, 2),
+            'cpu_percent': round(latest.cpu_percent, 1),
+            'sampled_at': latest.timestamp
+        }
+
+    def get_recent_spans(self, limit: int = 100, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取最近结束的 Span"""
+        with self._lock:
+            spans = [span for span in self.recent_spans if name is None or span.name == name]
+        return [span.to_dict() for span in spans[-limit:]]
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """重置聚合统计"""
+        with self._lock:
+            if name is None:
+                self._stats.clear()
+                self.recent_spans.clear()
+            else:
+                self._stats.pop(name, None)
+
+
+# 全局追踪器
+tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """获取全局追踪器"""
+    return tracer
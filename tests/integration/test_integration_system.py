@@ -480,6 +480,29 @@ class TestPipelineMonitor:
         assert monitor.pipeline_stats['total_pipelines_executed'] == 2
         assert monitor.pipeline_stats['successful_pipelines'] == 1
         assert monitor.pipeline_stats['failed_pipelines'] == 1
+    
+    def test_metrics_endpoint_scrape(self, test_config):
+        """测试通过本机 /metrics 抓取流水线指标"""
+        import urllib.request
+        from src.utils.metrics import MetricsRegistry
+        from src.integration.monitoring import MetricsCollector
+        
+        collector = MetricsCollector(test_config, registry=MetricsRegistry())
+        collector.increment_counter('pipeline_success')
+        collector.set_gauge('job_queue_depth', 3, {'priority': 'HIGH'})
+        collector.record_timer('pipeline_execution_time', 1.5)
+        
+        server = collector.start_http_server(port=0)
+        try:
+            with urllib.request.urlopen(server.url, timeout=5) as response:
+                body = response.read().decode('utf-8')
+        finally:
+            collector.stop_http_server()
+        
+        assert 'pipeline_success_total 1.0' in body
+        assert 'job_queue_depth{priority="HIGH"} 3.0' in body
+        assert 'pipeline_execution_time_count 1.0' in body
+        assert body.endswith('# EOF\n')
 
 
 class TestEndToEndIntegration:
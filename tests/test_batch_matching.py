@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+批量简历匹配测试脚本
+验证全部简历一次批量检索、共享候选池中每个职位只提取一次信息、并发打分且结果按输入顺序返回，
+以及检索失败只影响对应简历的结果
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('langchain')
+
+from src.matcher.smart_matching import SmartMatchingEngine
+
+
+JOBS = {
+    'job_1': ('Python 后端开发', ['python', 'django'], '3年'),
+    'job_2': ('Java 开发', ['java', 'spring'], '5年'),
+    'job_3': ('数据工程师', ['python', 'spark', 'sql'], '2年'),
+    'job_4': ('前端开发', ['react', 'typescript'], '不限'),
+}
+
+
+def _search(query, k):
+    """按查询中的技能词返回职位文档，相似度按命中技能数递增"""
+    results = []
+    for job_id, (title, skills, experience) in JOBS.items():
+        hits = sum(1 for skill in skills if skill in query.lower())
+        if not hits:
+            continue
+        for doc_type in ('overview', 'skills'):
+            results.append({
+                'content': f"{title} {' '.join(skills)}",
+                'metadata': {'doc_id': f'{job_id}_{doc_type}', 'job_id': job_id, 'job_title': title,
+                             'company': f'{job_id}公司', 'type': doc_type, 'skills': skills,
+                             'experience': experience},
+                'similarity_score': min(0.5 + 0.15 * hits, 0.95)
+            })
+    return results[:k]
+
+
+def _engine():
+    engine = SmartMatchingEngine(object(), {'batch_concurrency': 2})
+    engine.batch_calls = []
+
+    def search_batch(requests, filters=None, return_exceptions=False):
+        engine.batch_calls.append([query for query, _, _ in requests])
+        return [_search(query, k) for query, _, k in requests]
+
+    engine.search_engine.search_batch = search_batch
+    engine.search_engine.search = lambda query, strategy, k, filters=None: _search(query, k)
+    return engine
+
+
+RESUMES = [
+    {'resume_id': 'a', 'skills': ['Python', 'Django'], 'experience_years': 4},
+    {'resume_id': 'b', 'skills': ['Java', 'Spring'], 'experience_years': 6},
+    {'resume_id': 'c', 'skills': ['Python', 'Spark', 'SQL'], 'experience_years': 1},
+]
+
+
+def test_batch_match_shares_candidate_pool():
+    engine = _engine()
+    extracted = []
+    extract_job_info = engine._extract_job_info
+
+    def counting_extract(job_docs):
+        extracted.append(job_docs[0]['metadata']['job_id'])
+        return extract_job_info(job_docs)
+
+    engine._extract_job_info = counting_extract
+    results = asyncio.run(engine.batch_match_resumes(RESUMES, k=3))
+
+    # 一次批量检索，每个职位只提取一次信息
+    assert len(engine.batch_calls) == 1 and len(engine.batch_calls[0]) == 3
+    assert sorted(extracted) == ['job_1', 'job_2', 'job_3']
+
+    assert [result['resume_id'] for result in results] == ['a', 'b', 'c']
+    assert all(result['success'] and result['processing_time'] >= 0 for result in results)
+    assert results[1]['matches'][0]['job_id'] == 'job_2'
+
+
+def test_batch_match_equals_single_resume_matching():
+    engine = _engine()
+    results = asyncio.run(engine.batch_match_resumes(RESUMES, k=3, max_concurrency=3))
+
+    for resume_data, result in zip(RESUMES, results):
+        expected = asyncio.run(engine.match_resume_to_jobs(resume_data, k=3))
+        assert [(match['job_id'], match['overall_score']) for match in result['matches']] == \
+            [(match['job_id'], match['overall_score']) for match in expected]
+        assert result['match_count'] == len(expected)
+
+
+def test_batch_search_failure_reported_per_resume():
+    engine = _engine()
+
+    def failing_batch(requests, filters=None, return_exceptions=False):
+        raise RuntimeError("向量库不可用")
+
+    def search(query, strategy, k, filters=None):
+        if 'java' in query.lower():
+            raise RuntimeError("检索超时")
+        return _search(query, k)
+
+    engine.search_engine.search_batch = failing_batch
+    engine.search_engine.search = search
+    results = asyncio.run(engine.batch_match_resumes(RESUMES, k=3))
+
+    # 批量检索失败后逐份检索，只有检索出错的简历标记为失败
+    assert [result['success'] for result in results] == [True, False, True]
+    assert results[1]['error'] == '检索超时' and results[1]['matches'] == []
+    assert results[0]['matches'][0]['job_id'] == 'job_1'
+
+
+def test_batch_query_failure_reported_per_resume():
+    from src.rag.semantic_search import SemanticSearchEngine
+
+    class _VectorManager:
+        def embed_queries(self, queries):
+            return [[float(i)] for i in range(len(queries))]
+
+        def similarity_search_by_vector_with_score(self, embedding, k=5, filters=None):
+            if int(embedding[0]) == 1:
+                raise RuntimeError("检索超时")
+            return []
+
+    search_engine = SemanticSearchEngine(_VectorManager(), {'max_parallel_queries': 2})
+    requests = [('python', 'similarity', 3), ('java', 'similarity', 3)]
+    assert search_engine.search_batch(requests) == [[], []]
+    results = search_engine.search_batch(requests, return_exceptions=True)
+    assert results[0] == [] and isinstance(results[1], RuntimeError)
+
+    engine = _engine()
+
+    def batch_with_failure(requests, filters=None, return_exceptions=False):
+        assert return_exceptions
+        return [RuntimeError("检索超时") if 'java' in query.lower() else _search(query, k)
+                for query, _, k in requests]
+
+    engine.search_engine.search_batch = batch_with_failure
+    results = asyncio.run(engine.batch_match_resumes(RESUMES, k=3))
+
+    # 单个查询失败不再表现为"没有命中"，只有该简历标记为失败
+    assert [result['success'] for result in results] == [True, False, True]
+    assert results[1]['error'] == '检索超时' and results[1]['matches'] == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
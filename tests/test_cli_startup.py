@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+CLI冷启动测试脚本
+验证 rag_cli.py --help 不加载重量级依赖且导入耗时在预算内
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.benchmark_cli_startup import measure_command, parse_importtime
+
+
+def test_parse_importtime():
+    """测试 -X importtime 输出解析"""
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       300 |        420 | json\n"
+    )
+    records = parse_importtime(stderr)
+    assert [record['module'] for record in records] == ['json.decoder', 'json']
+    assert records[1]['depth'] == 0 and records[0]['depth'] == 1
+
+
+def test_help_startup_within_budget():
+    """测试 --help 冷启动"""
+    result = measure_command('help')
+    assert result['returncode'] == 0
+    assert result['forbidden_imported'] == []
+    # 预算放宽3倍，避免CI机器负载波动造成误报
+    assert result['import_ms'] < result['budget_ms'] * 3
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+紧凑二级索引测试脚本
+验证PCA/截断降维、float16/int8存储的候选召回，以及全精度重打分后的 recall@k
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip('numpy')
+
+from src.rag.compact_index import CompactIndex, exact_distances, recall_at_k
+
+
+def _clustered_vectors(rows=600, dim=64, clusters=12, seed=7):
+    """生成带簇结构、能量集中在前几维的归一化向量（模拟 Matryoshka 嵌入的低秩结构）"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, rows)] + 0.3 * rng.normal(size=(rows, dim))
+    vectors *= 1.0 / (1.0 + np.arange(dim) / 2.0)
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _batches(vectors, batch_size=128):
+    ids = [f'doc_{i}' for i in range(len(vectors))]
+
+    def generate():
+        for start in range(0, len(vectors), batch_size):
+            yield ids[start:start + batch_size], vectors[start:start + batch_size].tolist()
+    return generate
+
+
+@pytest.mark.parametrize('method,dtype', [('pca', 'float16'), ('pca', 'int8'), ('truncate', 'float16')])
+def test_compact_candidates_recall_after_rescoring(tmp_path, method, dtype):
+    vectors = _clustered_vectors()
+    index = CompactIndex.build(str(tmp_path / method / dtype), _batches(vectors), total=len(vectors),
+                               dim=16, method=method, dtype=dtype)
+
+    assert index.rows == len(vectors)
+    assert index.meta['dim'] == 16 and index.meta['full_dim'] == 64
+    assert index._vectors.dtype == np.dtype(dtype)
+
+    # 重新加载后以内存映射方式读取
+    reloaded = CompactIndex(str(tmp_path / method / dtype)).load()
+    assert isinstance(reloaded._vectors, np.memmap)
+
+    queries = _clustered_vectors(rows=20, seed=99)
+    k = 10
+    recalls = []
+    for query in queries:
+        expected = [f'doc_{i}' for i in np.argsort(exact_distances(query, vectors))[:k]]
+        candidates = reloaded.search(query, k * 10)
+        rows = [int(doc_id.split('_')[1]) for doc_id in candidates]
+        rescored = [candidates[i] for i in np.argsort(exact_distances(query, vectors[rows]))[:k]]
+        recalls.append(recall_at_k(expected, rescored))
+
+    assert sum(recalls) / len(recalls) >= 0.9
+
+
+def test_stale_detection_and_recall_helper(tmp_path):
+    vectors = _clustered_vectors(rows=100)
+    index = CompactIndex.build(str(tmp_path), _batches(vectors), total=len(vectors), dim=8)
+
+    assert not index.is_stale(103, 0.05)
+    assert index.is_stale(110, 0.05)
+    assert CompactIndex.exists(str(tmp_path))
+    assert recall_at_k(['a', 'b'], ['b', 'c']) == 0.5
+    assert recall_at_k([], ['a']) == 1.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
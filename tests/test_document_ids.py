@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+向量文档ID测试脚本
+验证确定性ID生成、重复导入幂等性和重复向量审计
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.document_ids import (
+    assign_document_ids, compute_content_hash, find_duplicate_vectors, is_deterministic_id
+)
+
+
+def _job_documents():
+    return [
+        ('Python后端开发工程师', {'type': 'overview'}),
+        ('负责后端服务开发', {'type': 'responsibility', 'index': 0}),
+        ('负责代码评审', {'type': 'responsibility', 'index': 1}),
+        ('熟悉Python', {'type': 'requirement', 'index': 0}),
+    ]
+
+
+def test_ids_are_stable_and_unique():
+    """测试同一内容重复生成的ID一致且互不冲突"""
+    first = assign_document_ids('job_001', _job_documents())
+    second = assign_document_ids('job_001', _job_documents())
+
+    assert first == second
+    assert len(set(first)) == len(first)
+    assert first[0].startswith('job_001:overview:0:')
+    assert all(is_deterministic_id(doc_id, 'job_001') for doc_id in first)
+    assert not is_deterministic_id('3f2a6c1e-8b1d-4c0e-9a57-1f0d6f3b2c11')
+
+
+def test_content_change_changes_only_that_id():
+    """测试内容变化只影响对应文档的ID"""
+    documents = _job_documents()
+    before = assign_document_ids('job_001', documents)
+
+    documents[2] = ('负责代码评审和技术分享', {'type': 'responsibility', 'index': 1})
+    after = assign_document_ids('job_001', documents)
+
+    assert [b == a for b, a in zip(before, after)] == [True, True, False, True]
+    assert after[2].split(':')[:3] == ['job_001', 'responsibility', '1']
+
+
+def test_audit_finds_duplicates_from_repeated_imports():
+    """测试审计重复导入遗留的随机ID副本"""
+    content = 'Python后端开发工程师'
+    metadata = {'job_id': 'job_001', 'type': 'overview', 'doc_id': 'job_001_overview'}
+    stable_id = assign_document_ids('job_001', [(content, metadata)])[0]
+
+    records = [
+        ('legacy-uuid-1', content, dict(metadata)),
+        (stable_id, content, dict(metadata, content_hash=compute_content_hash(content))),
+        ('legacy-uuid-2', content, dict(metadata)),
+        ('legacy-uuid-3', '机器学习工程师', {'job_id': 'job_002', 'type': 'overview'}),
+    ]
+    report = find_duplicate_vectors(records)
+
+    assert report['scanned'] == 4
+    assert report['legacy_ids'] == 3
+    assert len(report['duplicate_groups']) == 1
+    assert report['duplicate_groups'][0]['keep'] == stable_id
+    assert sorted(report['redundant_ids']) == ['legacy-uuid-1', 'legacy-uuid-2']
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
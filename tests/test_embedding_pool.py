@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+多进程嵌入工作池测试脚本
+验证分片嵌入、共享内存回传、顺序保持和失败回退
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.embedding_pool import EmbeddingWorkerPool, PooledEmbeddings
+
+
+class _LengthEmbeddings:
+    """按文本长度和首字符生成确定性向量的假模型"""
+
+    is_loaded = True
+
+    def load(self):
+        return self
+
+    def embed_documents(self, texts):
+        return [[float(len(text)), float(ord(text[0]) if text else 0), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def create_length_embeddings():
+    """工作进程中的模型工厂（顶层函数，可被 spawn 进程导入）"""
+    return _LengthEmbeddings()
+
+
+def create_broken_embeddings():
+    raise RuntimeError('模型文件缺失')
+
+
+def test_pool_shards_and_preserves_order():
+    """测试分片并行嵌入后结果与单进程一致且顺序不变"""
+    texts = [f'职位描述{i}' * (i % 7 + 1) for i in range(50)]
+    pool = EmbeddingWorkerPool(create_length_embeddings, workers=2, chunk_size=8, pin_cores=False,
+                               startup_timeout=60, task_timeout=60)
+    try:
+        result = pool.embed_documents(texts)
+        assert pool.dim == 3
+        assert len(pool.worker_info) == 2
+        assert result == _LengthEmbeddings().embed_documents(texts)
+
+        # 第二个请求复用已启动的工作进程
+        assert pool.embed_documents(texts[:5]) == _LengthEmbeddings().embed_documents(texts[:5])
+    finally:
+        pool.shutdown()
+    assert not pool.is_running
+
+
+def test_pooled_embeddings_falls_back_to_local():
+    """测试工作池启动失败时回退到本进程模型，且不再重复启动"""
+    pool = EmbeddingWorkerPool(create_broken_embeddings, workers=1, pin_cores=False, startup_timeout=60)
+    embeddings = PooledEmbeddings(_LengthEmbeddings(), pool, min_texts=2)
+
+    texts = ['Python', 'Java', 'Go']
+    assert embeddings.embed_documents(texts) == _LengthEmbeddings().embed_documents(texts)
+    assert embeddings._pool_failed
+    assert embeddings.embed_query('Go') == [2.0, 71.0, 1.0]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
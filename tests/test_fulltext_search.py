@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+职位全文索引（FTS5）测试脚本
+验证触发器同步、MATCH检索和BM25词法信号
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.operations import DatabaseManager
+
+
+def _create_manager(tmp_path) -> DatabaseManager:
+    """创建带测试数据的数据库管理器"""
+    db_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    db_manager.init_database()
+
+    jobs = [
+        ('job_001', 'Python开发工程师', '负责后端服务开发', '熟悉Python和Django框架', 'python'),
+        ('job_002', '机器学习算法工程师', '负责推荐系统建模', '精通机器学习和深度学习', 'AI'),
+        ('job_003', 'Java开发工程师', '负责交易系统开发', '熟悉Spring Boot', 'java'),
+    ]
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        for job_id, title, description, requirements, keyword in jobs:
+            cursor.execute(
+                "INSERT INTO jobs (job_id, title, company, url, website) VALUES (?, ?, ?, ?, ?)",
+                (job_id, title, '测试公司', f'https://example.com/{job_id}', 'test')
+            )
+            cursor.execute(
+                "INSERT INTO job_details (job_id, description, requirements, keyword) VALUES (?, ?, ?, ?)",
+                (job_id, description, requirements, keyword)
+            )
+        conn.commit()
+
+    return db_manager
+
+
+def test_build_fulltext_query():
+    """测试MATCH表达式构建"""
+    assert DatabaseManager.build_fulltext_query("Python 机器学习") == '"python" OR "机器学习"'
+    assert DatabaseManager.build_fulltext_query("go") is None
+    assert DatabaseManager.build_fulltext_query("") is None
+
+    column_query = DatabaseManager.build_fulltext_query("python", columns=['keyword', 'description'])
+    assert column_query == '{keyword description} : ("python")'
+
+
+def test_phrase_query_keeps_substring_semantics(tmp_path):
+    """测试过滤用的短语表达式与 LIKE 子串匹配一致，过短的词回退到 LIKE"""
+    assert DatabaseManager.build_fulltext_query("Spring  Boot", phrase=True) == '"spring boot"'
+    assert DatabaseManager.build_fulltext_query(
+        "spring boot", columns=['keyword', 'requirements'], phrase=True
+    ) == '{keyword requirements} : ("spring boot")'
+    # 含少于3个字符的词时不丢弃该词，而是交由调用方回退到 LIKE
+    assert DatabaseManager.build_fulltext_query("Go 后端开发", phrase=True) is None
+    assert DatabaseManager.build_fulltext_query("go", phrase=True) is None
+
+    db_manager = _create_manager(tmp_path)
+    with db_manager.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, title, company, url, website) VALUES ('job_004', '后端工程师', '测试公司', 'https://example.com/job_004', 'test')"
+        )
+        conn.execute(
+            "INSERT INTO job_details (job_id, description, requirements, keyword) "
+            "VALUES ('job_004', '负责 Spring Cloud 微服务', '熟悉 Boot 启动流程', 'java')"
+        )
+        conn.commit()
+        db_manager.ensure_fulltext_index()
+        match_query = DatabaseManager.build_fulltext_query("spring boot", phrase=True)
+        job_ids = {row['job_id'] for row in conn.execute(
+            "SELECT job_id FROM job_search_fts WHERE job_search_fts MATCH ?", (match_query,)
+        )}
+        like_ids = {row['job_id'] for row in conn.execute(
+            "SELECT job_id FROM job_details WHERE LOWER(requirements) LIKE '%spring boot%' "
+            "OR LOWER(description) LIKE '%spring boot%'"
+        )}
+    # 只包含 spring 或 boot 其中一个词的职位不再命中
+    assert job_ids == like_ids == {'job_003'}
+
+
+def test_fulltext_search_with_triggers(tmp_path):
+    """测试触发器同步后的全文检索"""
+    db_manager = _create_manager(tmp_path)
+
+    results = db_manager.search_jobs_fulltext("机器学习")
+    assert [job_id for job_id, _ in results] == ['job_002']
+    assert results[0][1] == 1.0
+
+    # 更新职位详情后索引应同步
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE job_details SET requirements = '熟悉Python与机器学习' WHERE job_id = 'job_001'")
+        conn.commit()
+
+    job_ids = {job_id for job_id, _ in db_manager.search_jobs_fulltext("机器学习")}
+    assert job_ids == {'job_001', 'job_002'}
+
+    # 删除职位详情后索引应同步
+    with db_manager.get_connection() as conn:
+        conn.execute("DELETE FROM job_details WHERE job_id = 'job_002'")
+        conn.commit()
+
+    job_ids = {job_id for job_id, _ in db_manager.search_jobs_fulltext("机器学习")}
+    assert job_ids == {'job_001'}
+
+
+def test_fulltext_title_sync_and_backfill(tmp_path):
+    """测试标题同步和已有数据回填"""
+    db_manager = _create_manager(tmp_path)
+
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE jobs SET title = 'Golang开发工程师' WHERE job_id = 'job_003'")
+        conn.commit()
+
+    assert [job_id for job_id, _ in db_manager.search_jobs_fulltext("golang")] == ['job_003']
+
+    # 模拟旧数据库：删除索引后重新建立，应从job_details回填
+    with db_manager.get_connection() as conn:
+        conn.execute("DROP TABLE job_search_fts")
+        conn.commit()
+
+    rebuilt_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    assert rebuilt_manager.ensure_fulltext_index()
+    assert [job_id for job_id, _ in rebuilt_manager.search_jobs_fulltext("django")] == ['job_001']
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
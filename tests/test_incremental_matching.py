@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+增量匹配测试脚本
+验证标记职位已处理时写入出队表、按水位线只对新职位打分、多份简历档案、新简历首次全量匹配不吞掉
+其他档案待处理的事件以及并发提交保护
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.operations import DatabaseManager
+from src.database.match_outbox import MatchOutbox
+from src.matcher.generic_resume_models import GenericResumeProfile, JobMatchResult
+from src.matcher.incremental_matching import IncrementalMatchingWorker
+
+
+class _FakeMatcher:
+    """按职位ID给出固定分数，并记录每次打分的职位"""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = []
+
+    async def score_jobs(self, resume_profile, job_ids, docs_per_job=10):
+        self.calls.append((resume_profile.name, list(job_ids)))
+        return [
+            JobMatchResult(job_id=job_id, job_title=f'职位{job_id}', company='测试公司',
+                           overall_score=self.scores[job_id],
+                           dimension_scores={'semantic_similarity': self.scores[job_id]})
+            for job_id in job_ids if self.scores.get(job_id, 0) >= 0.5
+        ]
+
+
+def _create_manager(tmp_path) -> DatabaseManager:
+    db_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    db_manager.init_database()
+    with db_manager.get_connection() as conn:
+        for i in range(1, 6):
+            conn.execute(
+                "INSERT INTO jobs (job_id, title, company, url, website) VALUES (?, ?, ?, ?, ?)",
+                (f'job_{i}', f'职位{i}', '测试公司', f'https://example.com/{i}', 'test')
+            )
+        conn.commit()
+    return db_manager
+
+
+def _match_rows(db_manager):
+    with db_manager.get_connection() as conn:
+        rows = conn.execute(
+            "SELECT job_id, resume_profile_id FROM resume_matches ORDER BY resume_profile_id, job_id"
+        ).fetchall()
+    return [(row['job_id'], row['resume_profile_id']) for row in rows]
+
+
+def test_outbox_events_and_incremental_scoring(tmp_path):
+    db_manager = _create_manager(tmp_path)
+    matcher = _FakeMatcher({'job_1': 0.9, 'job_2': 0.3, 'job_3': 0.7, 'job_4': 0.8, 'job_5': 0.6})
+    worker = IncrementalMatchingWorker(matcher, db_manager, {'batch_size': 2})
+    worker.register_profile(GenericResumeProfile(name='张三'), profile_id='resume_a')
+
+    # 生成了向量文档的职位才会进入出队表
+    db_manager.mark_job_as_processed('job_1', doc_count=3)
+    db_manager.mark_job_as_processed('job_2', doc_count=3)
+    db_manager.mark_job_as_processed('job_3', doc_count=0)
+    db_manager.mark_job_as_processed('job_1', doc_count=4)
+    assert worker.outbox.pending_count() == 3
+
+    totals = asyncio.run(worker.run_pending())
+    # job_1 重新处理后再次打分，旧的未投递匹配记录被替换
+    assert totals['batches'] == 2 and totals['saved'] == 2
+    assert matcher.calls == [('张三', ['job_1', 'job_2']), ('张三', ['job_1'])]
+    assert _match_rows(db_manager) == [('job_1', 'resume_a')]
+    assert worker.outbox.pending_count() == 0
+
+    # 没有新事件时不再打分
+    matcher.calls.clear()
+    assert asyncio.run(worker.run_pending())['batches'] == 0
+    assert matcher.calls == []
+
+    # 新职位与全部启用的简历档案匹配；已删除的职位只推进水位线
+    worker.register_profile(GenericResumeProfile(name='李四'), profile_id='resume_b')
+    db_manager.mark_job_as_processed('job_4', doc_count=2)
+    db_manager.mark_job_as_processed('job_5', doc_count=2)
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE jobs SET is_deleted = 1 WHERE job_id = 'job_5'")
+        conn.commit()
+
+    totals = asyncio.run(worker.run_pending())
+    assert totals['jobs'] == 1 and totals['saved'] == 2
+    assert sorted(matcher.calls) == [('张三', ['job_4']), ('李四', ['job_4'])]
+    assert _match_rows(db_manager) == [('job_1', 'resume_a'), ('job_4', 'resume_a'), ('job_4', 'resume_b')]
+
+
+def test_onboarding_profile_keeps_pending_events_for_other_profiles(tmp_path):
+    db_manager = _create_manager(tmp_path)
+    matcher = _FakeMatcher({'job_1': 0.9, 'job_2': 0.6, 'job_3': 0.7, 'job_4': 0.8})
+    worker = IncrementalMatchingWorker(matcher, db_manager)
+    worker.register_profile(GenericResumeProfile(name='张三'), profile_id='resume_a')
+
+    # resume_a 尚未消费的事件
+    db_manager.mark_job_as_processed('job_1', doc_count=2)
+    db_manager.mark_job_as_processed('job_2', doc_count=2)
+
+    async def full_match():
+        # 全量匹配期间又有职位完成处理
+        db_manager.mark_job_as_processed('job_3', doc_count=2)
+        matches = await matcher.score_jobs(GenericResumeProfile(name='李四'), ['job_1', 'job_2'])
+        return len(matches)
+
+    result, drained = asyncio.run(worker.onboard_profile(GenericResumeProfile(name='李四'), full_match,
+                                                         profile_id='resume_b'))
+    assert result == 2 and drained['jobs'] == 2
+    assert matcher.calls[0] == ('张三', ['job_1', 'job_2'])
+    assert worker.is_registered('resume_b')
+
+    # 全量匹配期间到达的事件由两份简历各自打分
+    matcher.calls.clear()
+    totals = asyncio.run(worker.run_pending())
+    assert totals['jobs'] == 1
+    assert sorted(matcher.calls) == [('张三', ['job_3']), ('李四', ['job_3'])]
+    assert _match_rows(db_manager) == [('job_1', 'resume_a'), ('job_2', 'resume_a'), ('job_3', 'resume_a'),
+                                       ('job_3', 'resume_b')]
+
+
+def test_commit_rejects_stale_watermark(tmp_path):
+    db_manager = _create_manager(tmp_path)
+    outbox = MatchOutbox(db_manager)
+    outbox.ensure_tables()
+    db_manager.mark_job_as_processed('job_1', doc_count=1)
+    db_manager.mark_job_as_processed('job_2', doc_count=1)
+
+    watermark, last_event_id, job_ids = outbox.fetch_pending()
+    assert job_ids == ['job_1', 'job_2']
+
+    # 另一个工作进程（或全量匹配）已经覆盖了这些事件
+    outbox.advance_watermark(last_event_id)
+    record = {'job_id': 'job_1', 'resume_profile_id': 'default', 'match_score': 0.9, 'priority_level': 'high'}
+    assert outbox.commit([record], watermark, last_event_id) is None
+    assert _match_rows(db_manager) == []
+    assert outbox.get_watermark() == last_event_id
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
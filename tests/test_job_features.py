@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+职位特征测试脚本
+验证导入时的特征提取、元数据往返、特征表批量读写与补齐，以及评分器直接使用导入时特征
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.operations import DatabaseManager
+from src.database.job_features import JobFeatureStore
+from src.rag.job_features import (
+    FEATURE_VERSION, JobFeatures, collect_job_features, extract_education_level,
+    extract_job_features, extract_required_years, parse_skill_list
+)
+
+
+STRUCTURED = {
+    'job_title': 'Python 数据工程师',
+    'responsibilities': ['负责基于 Spark 和 Airflow 的数据管道开发'],
+    'requirements': ['熟悉 Docker 部署', '有大数据平台经验优先'],
+    'skills': 'Python, SQL、Python',
+    'education': '本科及以上，硕士优先',
+    'experience': '3-5年',
+    'salary_min': 20000,
+    'salary_max': 35000
+}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('3-5年', 3), ('5年以上', 5), ('3+ years', 3), ('经验不限', 0), ('应届毕业生', 0), ('', None), ('若干', None)
+])
+def test_extract_required_years(text, expected):
+    assert extract_required_years(text) == expected
+
+
+def test_extract_education_level_and_skill_list():
+    assert extract_education_level('本科及以上，硕士优先') == 3
+    assert extract_education_level('博士') == 5
+    assert extract_education_level('学历不限') == 0
+    assert extract_education_level('') is None
+    # 逗号拼接的字符串按技能拆分，而不是逐字符展开
+    assert parse_skill_list('Python, SQL、Spark') == ['Python', 'SQL', 'Spark']
+    assert parse_skill_list(['Go', ' ']) == ['Go']
+
+
+def test_extract_job_features_and_metadata_round_trip():
+    features = extract_job_features('job_1', STRUCTURED, industry='互联网')
+
+    assert features.skills[:2] == ['python', 'sql']
+    assert {'spark', 'airflow', 'docker', '大数据'} <= set(features.skills)
+    assert len(features.skills) == len(set(features.skills))
+    assert features.required_years == 3
+    assert features.education_level == 3
+    assert features.salary_range == {'min': 20000, 'max': 35000}
+    assert features.industry == '互联网'
+
+    metadata = {'job_id': 'job_1', 'salary_min': 20000, 'salary_max': 35000, **features.to_metadata()}
+    assert all(value is None or isinstance(value, (str, int, float, bool)) for value in metadata.values())
+    assert JobFeatures.from_metadata(metadata) == features
+
+    # 旧版本特征视为缺失
+    assert JobFeatures.from_metadata(dict(metadata, feature_version=FEATURE_VERSION - 1)) is None
+
+
+def _create_manager(tmp_path) -> DatabaseManager:
+    db_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    db_manager.init_database()
+    with db_manager.get_connection() as conn:
+        for i in range(1, 4):
+            conn.execute(
+                "INSERT INTO jobs (job_id, title, company, url, website) VALUES (?, ?, ?, ?, ?)",
+                (f'job_{i}', f'职位{i}', '测试公司', f'https://example.com/{i}', 'test')
+            )
+        conn.execute("INSERT INTO job_details (job_id, industry) VALUES ('job_1', '互联网')")
+        conn.commit()
+    return db_manager
+
+
+def test_store_bulk_load_and_cache(tmp_path):
+    db_manager = _create_manager(tmp_path)
+    store = JobFeatureStore(db_manager, {'query_chunk_size': 2})
+    store.save_many([extract_job_features(f'job_{i}', dict(STRUCTURED, experience=f'{i}年')) for i in range(1, 4)])
+
+    loaded = store.load_many(['job_1', 'job_2', 'job_3', 'job_x'])
+    assert sorted(loaded) == ['job_1', 'job_2', 'job_3']
+    assert [loaded[f'job_{i}'].required_years for i in range(1, 4)] == [1, 2, 3]
+
+    # 再次读取命中进程内缓存，不再查表
+    with db_manager.get_connection() as conn:
+        conn.execute("DELETE FROM job_features")
+        conn.commit()
+    assert sorted(store.load_many(['job_1', 'job_3'])) == ['job_1', 'job_3']
+
+    # 元数据中已有特征的职位不查表
+    metadatas = {'job_1': [{'job_id': 'job_1'}], 'job_2': [extract_job_features('job_2', STRUCTURED).to_metadata()]}
+    features = collect_job_features(metadatas, store=store)
+    assert features['job_2'].job_id == 'job_2' and features['job_1'].required_years == 1
+
+
+def test_backfill_from_structured_data(tmp_path):
+    db_manager = _create_manager(tmp_path)
+    db_manager.mark_job_as_processed('job_1', doc_count=3, structured_data=json.dumps(STRUCTURED, ensure_ascii=False))
+    db_manager.mark_job_as_processed('job_2', doc_count=3, structured_data='not json')
+    store = JobFeatureStore(db_manager)
+
+    assert store.backfill() == 1
+    assert store.backfill() == 0
+    assert store.backfill(force=True) == 1
+
+    features = store.load_many(['job_1'])['job_1']
+    assert features.industry == '互联网' and features.required_years == 3 and 'python' in features.skills
+
+
+def test_smart_matching_uses_import_time_features():
+    pytest.importorskip('langchain')
+    from src.matcher.smart_matching import SmartMatchingEngine
+
+    engine = SmartMatchingEngine(object(), {})
+    feature_metadata = extract_job_features('job_1', STRUCTURED).to_metadata()
+    job_docs = [
+        # 向量库中的技能元数据是逗号拼接的字符串
+        {'content': '技能要求', 'metadata': {'job_id': 'job_1', 'type': 'skills', 'skills': 'Python, SQL',
+                                         'experience': '3-5年', **feature_metadata}},
+        {'content': '概览', 'metadata': {'job_id': 'job_1', 'type': 'overview', 'experience': '3-5年',
+                                       **feature_metadata}}
+    ]
+
+    job_info = engine._extract_job_info(job_docs)
+    assert job_info['skills'] == extract_job_features('job_1', STRUCTURED).skills
+    assert job_info['required_years'] == 3
+    assert engine._calculate_experience_match({'experience_years': 3}, job_info) == 1.0
+
+    legacy_info = engine._extract_job_info([{'content': '', 'metadata': {'job_id': 'job_2', 'skills': 'Python, SQL'}}])
+    assert sorted(legacy_info['skills']) == ['Python', 'SQL']
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
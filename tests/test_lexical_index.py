@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+BM25词法索引测试脚本
+验证中文分词、增量更新、日志持久化和倒数排名融合
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.lexical_index import BM25Index, tokenize, reciprocal_rank_fusion
+
+
+def test_bigram_tokenize_chinese():
+    """测试中文二元组分词"""
+    tokens = tokenize("熟悉Python和机器学习", tokenizer='bigram')
+    assert 'python' in tokens
+    assert '机器' in tokens and '学习' in tokens
+    assert tokenize("Node.js C++", tokenizer='bigram') == ['node.js', 'c++']
+
+
+def test_bm25_incremental_update():
+    """测试增量添加、替换和删除"""
+    index = BM25Index(tokenizer='bigram')
+    index.add_documents([
+        ('job_001_overview', 'Python后端开发工程师', 'job_001'),
+        ('job_002_overview', '机器学习算法工程师', 'job_002'),
+    ])
+
+    assert index.search_jobs('机器学习', k=1)[0][0] == 'job_002'
+
+    # 相同doc_id重新添加时替换旧内容
+    index.add_document('job_002_overview', 'Java开发工程师', 'job_002')
+    assert index.search('机器学习') == []
+
+    assert index.remove_job('job_001') == 1
+    assert len(index) == 1
+    assert index.search('python') == []
+
+
+def test_bm25_journal_persistence(tmp_path):
+    """测试日志持久化和压缩"""
+    persist_path = str(tmp_path / "bm25_index.jsonl")
+
+    index = BM25Index(persist_path=persist_path, tokenizer='bigram')
+    index.add_document('doc_a', '数据平台架构师', 'job_a')
+    index.add_document('doc_b', '前端开发工程师', 'job_b')
+    index.remove_job('job_b')
+
+    reloaded = BM25Index(persist_path=persist_path, tokenizer='bigram')
+    assert len(reloaded) == 1
+    assert reloaded.search_jobs('架构')[0][0] == 'job_a'
+
+    reloaded.compact()
+    with open(persist_path, 'r', encoding='utf-8') as f:
+        assert len(f.readlines()) == 2  # header + 1个文档
+
+
+def test_reciprocal_rank_fusion():
+    """测试倒数排名融合"""
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'a']], k=60)
+    assert [key for key, _ in fused] == ['a', 'c', 'b']
+
+    weighted = reciprocal_rank_fusion([['a'], ['b']], k=60, weights=[1.0, 2.0])
+    assert weighted[0][0] == 'b'
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
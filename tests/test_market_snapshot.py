@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+市场统计快照测试脚本
+验证增量刷新、汇总维度和查询接口
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.operations import DatabaseManager
+from src.database.market_snapshots import (
+    MarketSnapshotManager, detect_skills, resolve_experience_bucket, parse_salary_range
+)
+
+
+def _insert_jobs(db_manager, jobs):
+    """写入测试职位"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        for job_id, title, salary, location, experience, requirements, created_at in jobs:
+            cursor.execute(
+                "INSERT INTO jobs (job_id, title, company, url, website, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, title, '测试公司', f'https://example.com/{job_id}', 'test', created_at)
+            )
+            cursor.execute(
+                "INSERT INTO job_details (job_id, salary, location, experience, requirements) VALUES (?, ?, ?, ?, ?)",
+                (job_id, salary, location, experience, requirements)
+            )
+        conn.commit()
+
+
+def _create_manager(tmp_path) -> DatabaseManager:
+    """创建带测试数据的数据库管理器"""
+    db_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    db_manager.init_database()
+    _insert_jobs(db_manager, [
+        ('job_001', 'Python开发工程师', '20-30k', '北京·海淀', '3-5年', '熟悉Python和Django', '2025-01-01 10:00:00'),
+        ('job_002', 'Golang后端工程师', '30-40k', '上海', '5-10年', '熟悉Go和Kubernetes', '2025-01-01 12:00:00'),
+        ('job_003', '数据分析师', '面议', '长沙', '经验不限', '熟悉Python和SQL', '2025-01-02 09:00:00'),
+    ])
+    return db_manager
+
+
+def test_helpers():
+    """测试技能识别、经验区间和薪资解析"""
+    assert detect_skills('熟悉Go和Kubernetes，了解Google搜索') == ['kubernetes', 'go']
+    assert 'java' not in detect_skills('JavaScript前端开发')
+    assert detect_skills('C++/C#开发') == ['c++', 'c#']
+
+    assert resolve_experience_bucket('3-5年') == '3-5年'
+    assert resolve_experience_bucket('1年以下') == '1年以下'
+    assert resolve_experience_bucket('经验不限') == '不限'
+    assert resolve_experience_bucket('经验丰富') is None
+
+    assert parse_salary_range('20-30k') == {'min': 20000, 'max': 30000, 'avg': 25000}
+    assert parse_salary_range('面议')['avg'] == 0
+
+
+def test_snapshot_refresh_and_queries(tmp_path):
+    """测试快照汇总和查询"""
+    snapshots = MarketSnapshotManager(_create_manager(tmp_path))
+
+    stats = snapshots.refresh()
+    assert stats['processed_jobs'] == 3
+
+    daily = snapshots.get_daily_counts('2025-01-01', '2025-01-31')
+    assert [(row['date'], row['job_count']) for row in daily] == [('2025-01-01', 2), ('2025-01-02', 1)]
+
+    top_skills = {row['skill']: row['job_count'] for row in snapshots.get_top_skills()}
+    assert top_skills['python'] == 2
+    assert top_skills['go'] == 1
+
+    cities = {row['city']: row for row in snapshots.get_city_summary()}
+    assert set(cities) == {'北京', '上海'}
+    assert cities['上海']['average_salary'] == 35000
+
+    summary = snapshots.get_salary_summary(skill='python')
+    assert summary['job_count'] == 2
+    assert summary['salary_count'] == 1
+    assert summary['medium'] == 1
+
+    assert snapshots.get_salary_summary(experience_bucket='3-5年')['job_count'] == 1
+
+
+def test_snapshot_incremental_refresh(tmp_path):
+    """测试增量刷新只处理新增职位"""
+    db_manager = _create_manager(tmp_path)
+    snapshots = MarketSnapshotManager(db_manager)
+    snapshots.refresh()
+
+    assert snapshots.refresh()['processed_jobs'] == 0
+
+    _insert_jobs(db_manager, [
+        ('job_004', 'Python算法工程师', '40-60k', '北京', '5-10年', '熟悉Python和PyTorch', '2025-01-01 18:00:00'),
+    ])
+    assert snapshots.refresh()['processed_jobs'] == 1
+
+    beijing = snapshots.get_city_summary(skill='python')[0]
+    assert beijing['city'] == '北京'
+    assert beijing['job_count'] == 2
+    assert (beijing['min_salary'], beijing['max_salary']) == (25000, 50000)
+
+    # 重建后结果与增量刷新一致
+    expected = snapshots.get_daily_counts()
+    snapshots.rebuild()
+    assert snapshots.get_daily_counts() == expected
+
+
+def test_snapshot_rebuilds_after_updates_deletes_and_late_jobs(tmp_path):
+    """测试职位详情修改/删除、职位软删除以及职位行晚于详情写入时快照自动重建"""
+    db_manager = _create_manager(tmp_path)
+    snapshots = MarketSnapshotManager(db_manager)
+    snapshots.refresh()
+    assert snapshots.get_total_jobs() == 3
+
+    def rebuilt_total():
+        stats = snapshots.refresh()
+        assert stats['rebuilt']
+        return snapshots.get_total_jobs()
+
+    # 软删除的职位不计入
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE jobs SET is_deleted = 1 WHERE job_id = 'job_002'")
+        conn.commit()
+    assert rebuilt_total() == 2
+    assert 'go' not in {row['skill'] for row in snapshots.get_top_skills()}
+    assert not snapshots.refresh()['rebuilt']
+
+    # 修改已汇总的职位详情
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE job_details SET salary = '40-60k' WHERE job_id = 'job_001'")
+        conn.commit()
+    assert rebuilt_total() == 2
+    assert snapshots.get_salary_summary(skill='python')['very_high'] == 1
+
+    # 删除职位详情
+    with db_manager.get_connection() as conn:
+        conn.execute("DELETE FROM job_details WHERE job_id = 'job_003'")
+        conn.commit()
+    assert rebuilt_total() == 1
+
+    # 职位行晚于详情写入：先推进水位线但不计入，职位写入后重建时补上
+    with db_manager.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO job_details (job_id, salary, location, experience, requirements) "
+            "VALUES ('job_005', '20-30k', '杭州', '1-3年', '熟悉Java')"
+        )
+        conn.commit()
+    stats = snapshots.refresh()
+    assert stats['processed_jobs'] == 0 and not stats['rebuilt']
+    with db_manager.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, title, company, url, website, created_at) "
+            "VALUES ('job_005', 'Java开发工程师', '测试公司', 'https://example.com/job_005', 'test', '2025-01-03 09:00:00')"
+        )
+        conn.commit()
+    assert rebuilt_total() == 2
+    assert {row['city'] for row in snapshots.get_city_summary()} == {'北京', '杭州'}
+
+    # 与快照无关的列更新不会触发重建
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE jobs SET application_status = 'submitted'")
+        conn.commit()
+    assert not snapshots.refresh()['rebuilt']
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
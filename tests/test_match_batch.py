@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+匹配结果批次测试脚本
+验证 MatchBatch 列存储的过滤、排序与逐个对象一致，完整结果按需生成，以及增量打分只为达到阈值的职位生成匹配分析
+"""
+
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('numpy')
+
+from src.matcher.generic_resume_models import ResumeMatchingResult, MatchingSummary, CareerInsights
+from src.matcher.match_batch import DIMENSIONS, MatchBatch
+
+
+def _fill(batch, count, seed=3):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        # 分数取一位小数，制造大量同分
+        dimension_scores = {name: round(rng.random(), 1) for name in DIMENSIONS}
+        score = round(rng.random(), 1)
+        salary_range = None if i % 3 == 0 else {'min': 10000 + i, 'max': None if i % 3 == 1 else 20000.5}
+        batch.append(f'job_{i}', f'职位{i}', f'公司{i}', score, dimension_scores,
+                     location='北京', salary_range=salary_range, confidence_level=0.5)
+        rows.append((f'job_{i}', score, dimension_scores, salary_range))
+    return rows
+
+
+def test_filter_and_rank_match_stable_sort():
+    batch = MatchBatch(capacity=4)
+    rows = _fill(batch, 300)
+    assert len(batch) == 300
+
+    top = batch.filter(0.5).ranked(20)
+    expected = sorted([row for row in rows if row[1] >= 0.5], key=lambda row: row[1], reverse=True)[:20]
+    assert top.job_ids == [row[0] for row in expected]
+    assert list(top.scores) == [row[1] for row in expected]
+
+    for index, (_, score, dimension_scores, salary_range) in enumerate(expected):
+        match = top[index]
+        assert match.overall_score == score
+        assert match.dimension_scores == dimension_scores
+        assert match.salary_range == salary_range
+        assert match.confidence_level == 0.5
+
+
+def test_materialize_lazily_and_row_dict_format():
+    calls = []
+
+    def materializer(batch, index):
+        calls.append(batch.job_ids[index])
+        return batch.build_result(index)
+
+    batch = MatchBatch(materializer=materializer)
+    _fill(batch, 50)
+    top = batch.ranked(3)
+    assert calls == []
+
+    matches = top.to_list()
+    assert calls == top.job_ids
+
+    # 轻量字典与 ResumeMatchingResult.to_dict() 中的评分字段一致
+    result = ResumeMatchingResult(MatchingSummary(), matches, CareerInsights(), None).to_dict()
+    for index, match_dict in enumerate(result['matches']):
+        row = top.row_dict(index)
+        assert {key: match_dict[key] for key in row} == row
+    assert top.nbytes == 3 * (1 + len(DIMENSIONS) + 1 + 3) * 8
+
+    with pytest.raises(IndexError):
+        top.materialize(3)
+
+
+def _job_docs(rng, job_index):
+    from langchain.schema import Document
+
+    skills = rng.sample(['python', 'java', 'go', 'react', 'docker', 'spark', 'sql'], 3)
+    return [
+        Document(
+            page_content=f"职位{job_index} {' '.join(skills)}",
+            metadata={'job_id': f'job_{job_index}', 'job_title': f'职位{job_index}', 'company': f'公司{job_index % 4}',
+                      'type': doc_type, 'skills': skills, 'search_score': round(rng.uniform(0.05, 0.95), 2),
+                      'salary_min': 15000, 'salary_max': 30000, 'experience_required': f'{rng.randint(1, 8)}年'}
+        )
+        for doc_type in ('overview', 'skills')
+    ]
+
+
+def test_score_jobs_matches_per_job_scoring_and_defers_analysis():
+    pytest.importorskip('langchain')
+    from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+    from src.matcher.generic_resume_models import GenericResumeProfile
+
+    rng = random.Random(5)
+    jobs = {f'job_{i}': _job_docs(rng, i) for i in range(40)}
+    matcher = GenericResumeJobMatcher(object(), {'min_score_threshold': 0.5})
+    profile = GenericResumeProfile(name='张三', total_experience_years=5)
+    profile.add_skill_category('编程语言', ['Python', 'Go', 'SQL'])
+
+    async def fake_search(query, filters, k, resume_profile=None):
+        return []
+
+    matcher._execute_semantic_search = fake_search
+    matcher._group_results_by_job = lambda results: jobs
+
+    async def per_job():
+        results = [await matcher._calculate_match_score(profile, docs, job_id) for job_id, docs in jobs.items()]
+        results = [result for result in results if result and result.overall_score >= matcher.min_score_threshold]
+        results.sort(key=lambda result: result.overall_score, reverse=True)
+        return results
+
+    expected = asyncio.run(per_job())
+
+    analysis_calls = []
+    generate_match_analysis = matcher._generate_match_analysis
+
+    def counting_analysis(*args):
+        analysis_calls.append(args[2].get('job_id'))
+        return generate_match_analysis(*args)
+
+    matcher._generate_match_analysis = counting_analysis
+    batch = asyncio.run(matcher.score_jobs_batch(profile, list(jobs)))
+    assert 0 < len(batch) < len(jobs)
+    assert analysis_calls == []
+
+    matches = asyncio.run(matcher.score_jobs(profile, list(jobs)))
+    assert [(match.job_id, match.overall_score, match.dimension_scores, match.salary_range) for match in matches] == \
+        [(match.job_id, match.overall_score, match.dimension_scores, match.salary_range) for match in expected]
+    assert analysis_calls == [match.job_id for match in expected]
+    assert [match.match_analysis for match in matches] == [match.match_analysis for match in expected]
+
+
+def test_score_jobs_batch_searches_jobs_crowded_out_of_shared_budget():
+    pytest.importorskip('langchain')
+    from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+    from src.matcher.generic_resume_models import GenericResumeProfile
+
+    rng = random.Random(7)
+    # job_0 的文档数远超 docs_per_job，整批检索的预算全被它占满
+    crowded = [doc for _ in range(10) for doc in _job_docs(rng, 0)]
+    quiet = _job_docs(rng, 1)
+    matcher = GenericResumeJobMatcher(object(), {'min_score_threshold': 0.0})
+    matcher._is_job_available = lambda job_id: True
+    profile = GenericResumeProfile(name='张三', total_experience_years=5)
+    profile.add_skill_category('编程语言', ['Python', 'Go', 'SQL'])
+    searches = []
+
+    async def fake_search(query, filters, k, resume_profile=None):
+        searches.append((filters, k))
+        if filters == {'job_id': 'job_1'}:
+            return [(doc, 0.2) for doc in quiet][:k]
+        if filters == {'job_id': 'job_2'}:
+            return []
+        return [(doc, 0.1) for doc in crowded][:k]
+
+    matcher._execute_semantic_search = fake_search
+    batch = asyncio.run(matcher.score_jobs_batch(profile, ['job_0', 'job_1', 'job_2'], docs_per_job=4))
+
+    assert sorted(batch.job_ids) == ['job_0', 'job_1']
+    assert batch.unscored_job_ids == ['job_2']
+    assert [filters for filters, _ in searches[1:]] == [{'job_id': 'job_1'}, {'job_id': 'job_2'}]
+    job_docs, _ = batch.payloads[batch.job_ids.index('job_0')]
+    assert len(job_docs) == 4
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
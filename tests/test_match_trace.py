@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+匹配评分追踪测试脚本
+验证追踪缓冲区的按列记录与 JSON/Parquet 导出，以及 find_matching_jobs 在 explain 模式下
+逐个记录候选职位去向和各阶段耗时、结果与未追踪时一致
+"""
+
+import sys
+import json
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('numpy')
+
+from src.matcher.match_batch import DIMENSIONS
+from src.matcher.match_trace import MatchTrace, active_trace
+
+
+def _filled_trace():
+    trace = MatchTrace(resume_name='张三', query='python 后端')
+    trace.record('job_1', 'matched', 0.9, 0.8, {name: 0.8 for name in DIMENSIONS}, score_ns=1_500_000)
+    trace.record('job_2', 'pruned', 0.5, dimension_scores={'semantic_similarity': 0.4}, score_ns=200_000)
+    trace.record('job_3', 'failed')
+    trace.mark_selected(['job_1', 'job_x'])
+    with trace.phase('search'):
+        pass
+    trace.add_phase_ns('analysis', 2_000_000)
+    trace.count('candidate_jobs', 3)
+    return trace
+
+
+def test_columns_rows_and_summary():
+    trace = _filled_trace()
+    assert len(trace) == 3
+
+    columns = trace.to_columns()
+    assert list(columns) == ['job_id', 'outcome', 'upper_bound', 'overall_score', *DIMENSIONS, 'score_ms']
+    assert columns['outcome'] == ['selected', 'pruned', 'failed']
+    assert columns['overall_score'] == [0.8, None, None]
+    assert columns['skills_match'] == [0.8, None, None]
+    assert columns['semantic_similarity'] == [0.8, 0.4, None]
+    assert columns['score_ms'] == [1.5, 0.2, 0.0]
+    assert trace.rows()[1]['upper_bound'] == 0.5
+
+    summary = trace.summary()
+    assert summary['outcomes'] == {'selected': 1, 'pruned': 1, 'failed': 1}
+    assert list(summary['phases_ms']) == ['search', 'analysis'] and summary['phases_ms']['analysis'] == 2.0
+    assert summary['counters'] == {'candidate_jobs': 3}
+
+
+def test_dump_json_and_parquet(tmp_path):
+    trace = _filled_trace()
+
+    with open(trace.dump(str(tmp_path / 'trace.json')), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['query'] == 'python 后端' and data['jobs'] == trace.to_columns()
+
+    pq = pytest.importorskip('pyarrow.parquet')
+    table = pq.read_table(trace.dump(str(tmp_path / 'nested' / 'trace.parquet')))
+    assert table.num_rows == 3 and table.column('job_id').to_pylist() == ['job_1', 'job_2', 'job_3']
+    assert json.loads(table.schema.metadata[b'match_trace'])['outcomes']['selected'] == 1
+
+
+def _search_results(rng, count):
+    from langchain.schema import Document
+
+    results = []
+    for job_index in range(count):
+        skills = rng.sample(['python', 'java', 'go', 'react', 'docker', 'spark', 'sql'], 3)
+        for doc_type in ('overview', 'skills'):
+            doc = Document(
+                page_content=f"职位{job_index} {' '.join(skills)}",
+                metadata={'job_id': f'job_{job_index}', 'job_title': f'职位{job_index}', 'type': doc_type,
+                          'skills': skills, 'experience_required': f'{rng.randint(1, 8)}年'}
+            )
+            results.append((doc, round(rng.uniform(0.05, 0.95), 2)))
+    return results
+
+
+def test_find_matching_jobs_explain_mode():
+    pytest.importorskip('langchain')
+    from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+    from src.matcher.generic_resume_models import GenericResumeProfile
+
+    search_results = _search_results(random.Random(7), 60)
+    matcher = GenericResumeJobMatcher(object(), {'min_score_threshold': 0.3})
+    profile = GenericResumeProfile(name='张三', total_experience_years=5)
+    profile.add_skill_category('编程语言', ['Python', 'Go', 'SQL'])
+
+    async def fake_search(query, filters, k, resume_profile=None):
+        return search_results
+
+    matcher._execute_semantic_search = fake_search
+    matcher._is_job_available = lambda job_id: job_id != 'job_3'
+
+    plain = asyncio.run(matcher.find_matching_jobs(profile, top_k=5))
+    assert 'trace' not in plain.query_metadata and matcher.last_trace is None
+
+    trace = MatchTrace()
+    result = asyncio.run(matcher.find_matching_jobs(profile, top_k=5, trace=trace))
+    assert active_trace() is None and matcher.last_trace is trace
+    assert [(match.job_id, match.overall_score) for match in result.matches] == \
+        [(match.job_id, match.overall_score) for match in plain.matches]
+
+    # 每个候选职位恰好记录一行，已删除职位不参与评分
+    rows = {row['job_id']: row for row in trace.rows()}
+    assert len(trace) == len(rows) == result.query_metadata['candidate_jobs_count'] == 59
+    assert 'job_3' not in rows
+
+    summary = result.query_metadata['trace']
+    assert summary['outcomes'].get('selected') == len(result.matches)
+    assert summary['outcomes'].get('pruned', 0) == result.query_metadata['pruned_candidates'] > 0
+    # successful_matches 只统计完成评分且达到阈值的职位，不含提前跳过的候选
+    assert result.query_metadata['successful_matches'] == \
+        summary['outcomes'].get('selected', 0) + summary['outcomes'].get('matched', 0)
+    for match in result.matches:
+        assert rows[match.job_id]['outcome'] == 'selected'
+        assert rows[match.job_id]['overall_score'] == match.overall_score
+        assert {name: rows[match.job_id][name] for name in DIMENSIONS} == match.dimension_scores
+    for row in rows.values():
+        if row['outcome'] == 'pruned':
+            # 跳过技能匹配的候选只有廉价维度分数和分数上界
+            assert row['skills_match'] is None and row['overall_score'] is None
+            assert row['upper_bound'] is not None and row['semantic_similarity'] is not None
+
+    assert {'search', 'grouping', 'availability', 'features', 'partial_scoring',
+            'skills_scoring', 'analysis'} <= set(summary['phases_ms'])
+    assert summary['counters'] == {'search_results': 120, 'candidate_jobs': 59}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
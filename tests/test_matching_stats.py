@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+匹配监控聚合计数测试脚本
+验证触发器维护的计数在插入、改分、删除以及重复保存同一职位/匹配后与全表统计一致，已有数据库首次建表时的初始统计，
+未匹配职位的反连接查询，以及 MatchingMonitor 直接读取聚合计数
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.operations import DatabaseManager
+from src.database.matching_stats import MatchingStatsStore
+
+
+def _create_db(tmp_path, jobs=6):
+    db_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    db_manager.init_database()
+    with db_manager.get_connection() as conn:
+        for index in range(jobs):
+            conn.execute(
+                "INSERT INTO jobs (job_id, title, company, url, website, rag_processed) VALUES (?, ?, ?, ?, ?, ?)",
+                (f"job_{index}", f"职位{index}", "公司", f"https://example.com/{index}", "51job", index % 3 != 2)
+            )
+        conn.commit()
+    return db_manager
+
+
+def _add_matches(db_manager, matches):
+    with db_manager.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO resume_matches (job_id, resume_profile_id, match_score, priority_level) VALUES (?, 'default', ?, 'medium')",
+            matches
+        )
+        conn.commit()
+
+
+def _full_scan(db_manager):
+    with db_manager.get_connection() as conn:
+        return {
+            'total_jobs': conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0],
+            'total_matches': conn.execute("SELECT COUNT(*) FROM resume_matches").fetchone()[0],
+            'avg_score': conn.execute("SELECT AVG(match_score) FROM resume_matches WHERE match_score > 0").fetchone()[0] or 0.0,
+            'high_quality_matches': conn.execute("SELECT COUNT(*) FROM resume_matches WHERE match_score >= 0.7").fetchone()[0]
+        }
+
+
+def _assert_consistent(store, db_manager):
+    counters = store.read()
+    expected = _full_scan(db_manager)
+    assert {name: counters[name] for name in ('total_jobs', 'total_matches', 'high_quality_matches')} == \
+        {name: expected[name] for name in ('total_jobs', 'total_matches', 'high_quality_matches')}
+    assert counters['avg_score'] == pytest.approx(expected['avg_score'])
+    return counters
+
+
+def test_counters_follow_inserts_updates_and_deletes(tmp_path):
+    db_manager = _create_db(tmp_path)
+    # 建表前已有的数据在首次建表时统计
+    _add_matches(db_manager, [('job_0', 0.9), ('job_1', 0.4), ('job_1', 0.0)])
+    store = MatchingStatsStore(db_manager)
+    counters = _assert_consistent(store, db_manager)
+    assert counters['total_jobs'] == 6 and counters['total_matches'] == 3
+    assert counters['scored_matches'] == 2 and counters['avg_score'] == pytest.approx(0.65)
+
+    _add_matches(db_manager, [('job_3', 0.75), ('job_4', 0.7), ('job_4', 0.2)])
+    assert _assert_consistent(store, db_manager)['high_quality_matches'] == 3
+
+    with db_manager.get_connection() as conn:
+        conn.execute("UPDATE resume_matches SET match_score = 0.95 WHERE job_id = 'job_1' AND match_score = 0")
+        conn.execute("UPDATE resume_matches SET match_score = 0.1 WHERE job_id = 'job_0'")
+        conn.execute("UPDATE resume_matches SET processed = 1")
+        conn.execute("DELETE FROM resume_matches WHERE job_id = 'job_4'")
+        conn.execute("DELETE FROM jobs WHERE job_id = 'job_5'")
+        conn.execute(
+            "INSERT INTO jobs (job_id, title, company, url, website) VALUES ('job_9', '职位9', '公司', 'https://example.com/9', 'zhaopin')"
+        )
+        conn.commit()
+    counters = _assert_consistent(store, db_manager)
+    assert counters['total_jobs'] == 6 and counters['total_matches'] == 4 and counters['high_quality_matches'] == 2
+
+    # 对账后计数不变，新的管理器实例不会重复统计
+    assert store.rebuild() == pytest.approx(counters)
+    assert MatchingStatsStore(db_manager).read() == pytest.approx(counters)
+
+
+def test_resaving_job_and_match_does_not_double_count(tmp_path):
+    db_manager = _create_db(tmp_path, jobs=0)
+    store = MatchingStatsStore(db_manager)
+    job = {'job_id': 'job_x', 'title': '后端开发', 'company': '公司', 'url': 'https://example.com/x',
+           'website': '51job', 'job_fingerprint': 'fp_x'}
+
+    # 重复抓取同一职位
+    for _ in range(3):
+        assert db_manager.save_job(job)
+    assert _assert_consistent(store, db_manager)['total_jobs'] == 1
+    assert db_manager.get_job('job_x').title == '后端开发'
+
+    # 指纹相同的新职位ID替换旧职位
+    assert db_manager.save_job(dict(job, job_id='job_y'))
+    assert _assert_consistent(store, db_manager)['total_jobs'] == 1
+    assert db_manager.get_job('job_x') is None
+
+    # 重复保存同一职位的匹配结果只更新分数
+    for score in (0.5, 0.8):
+        assert db_manager.save_resume_match({'job_id': 'job_y', 'match_score': score, 'priority_level': 'high'})
+    counters = _assert_consistent(store, db_manager)
+    assert counters['total_matches'] == 1 and counters['high_quality_matches'] == 1
+
+
+def test_missing_tables_and_unmatched_jobs(tmp_path):
+    assert MatchingStatsStore(DatabaseManager(str(tmp_path / "empty.db"))).read()['total_jobs'] == 0
+
+    db_manager = _create_db(tmp_path)
+    _add_matches(db_manager, [('job_0', 0.8), ('job_0', 0.6), ('job_3', 0.5)])
+    store = MatchingStatsStore(db_manager, {'unmatched_limit': 10})
+
+    # job_2 / job_5 尚未完成RAG处理
+    assert sorted(store.unmatched_job_ids()) == ['job_1', 'job_4']
+    assert len(store.unmatched_job_ids(limit=1)) == 1
+
+    with db_manager.get_connection() as conn:
+        plan = ' '.join(row['detail'] for row in conn.execute("""
+        EXPLAIN QUERY PLAN SELECT j.job_id FROM jobs j
+        WHERE j.rag_processed = 1 AND NOT EXISTS (SELECT 1 FROM resume_matches m WHERE m.job_id = j.job_id)
+        """).fetchall())
+    assert 'idx_resume_matches_job_id' in plan
+
+
+def test_monitor_reads_aggregate_counters(tmp_path):
+    pytest.importorskip('langchain')
+    from src.matcher.matching_monitor import MatchingMonitor
+
+    db_manager = _create_db(tmp_path, jobs=20)
+    _add_matches(db_manager, [('job_0', 0.9), ('job_1', 0.5)])
+    monitor = MatchingMonitor(db_manager, object(), {})
+
+    stats = asyncio.run(monitor._collect_database_stats())
+    assert (stats.total_jobs, stats.total_matches, stats.high_quality_matches) == (20, 2, 1)
+    assert stats.match_rate == pytest.approx(0.1) and stats.avg_score == pytest.approx(0.7)
+
+    issues = asyncio.run(monitor._check_matching_quality(stats))
+    assert {'low_match_rate'} == {issue['type'] for issue in issues}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+指标注册表测试脚本
+验证计数器、仪表盘、直方图、OpenMetrics 文本输出和本机 /metrics 抓取
+"""
+
+import sys
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.metrics import MetricsRegistry, MetricsHTTPServer, OPENMETRICS_CONTENT_TYPE
+
+
+def test_metric_types():
+    """测试计数器、仪表盘和直方图"""
+    registry = MetricsRegistry()
+
+    runs = registry.counter('pipeline_stage_runs_total', '阶段执行次数', ['stage', 'status'])
+    runs.inc(labels={'stage': 'matching', 'status': 'success'})
+    runs.inc(2, labels={'stage': 'matching', 'status': 'success'})
+    assert runs.get({'stage': 'matching', 'status': 'success'}) == 3
+    assert registry.counter('pipeline_stage_runs', '', ['stage', 'status']) is runs
+
+    with pytest.raises(ValueError):
+        runs.inc(-1, labels={'stage': 'matching', 'status': 'success'})
+    with pytest.raises(ValueError):
+        runs.inc(labels={'stage': 'matching'})
+    with pytest.raises(ValueError):
+        registry.gauge('pipeline_stage_runs')
+
+    depth = registry.gauge('queue_depth', '队列深度')
+    depth.set(5)
+    depth.dec(2)
+    assert depth.get() == 3
+
+    latency = registry.histogram('stage_seconds', '阶段耗时', buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value)
+    assert latency.get() == {'count': 4, 'sum': 6.05}
+    assert 0.1 < latency.quantile(0.5) <= 1.0
+    # 分桶固定，记录次数不影响内存
+    assert len(latency._values[()].bucket_counts) == 4
+
+
+def test_openmetrics_render():
+    """测试 OpenMetrics 文本格式"""
+    registry = MetricsRegistry()
+    registry.counter('submission_results_total', '投递结果数', ['status']).inc(labels={'status': 'success'})
+    registry.gauge('queue_depth').set(2)
+    registry.histogram('task_seconds', buckets=(1.0,)).observe(0.5)
+
+    text = registry.render()
+    lines = text.splitlines()
+    assert '# TYPE submission_results counter' in lines
+    assert 'submission_results_total{status="success"} 1.0' in lines
+    assert 'queue_depth 2.0' in lines
+    assert 'task_seconds_bucket{le="1.0"} 1.0' in lines
+    assert 'task_seconds_bucket{le="+Inf"} 1.0' in lines
+    assert 'task_seconds_count 1.0' in lines
+    assert text.endswith('# EOF\n')
+
+
+def test_metrics_endpoint_scrape():
+    """测试本机 /metrics 抓取"""
+    registry = MetricsRegistry()
+    registry.gauge('job_scheduler_queue_depth', '队列深度', ['priority']).set(7, {'priority': 'HIGH'})
+
+    server = MetricsHTTPServer(registry, port=0)
+    server.start()
+    try:
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            assert response.headers['Content-Type'] == OPENMETRICS_CONTENT_TYPE
+            body = response.read().decode('utf-8')
+    finally:
+        server.stop()
+
+    assert 'job_scheduler_queue_depth{priority="HIGH"} 7.0' in body
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
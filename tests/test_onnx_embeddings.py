@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+ONNX嵌入后端测试脚本
+验证精度一致性检查、吞吐量测量工具，以及导出目录与配置模型/集合维度的校验（不需要onnxruntime）
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.onnx_embeddings import (
+    EXPORT_INFO_FILE, benchmark_throughput, build_onnx_embeddings, cosine_drift, default_model_dir,
+    is_exported, validate_export
+)
+
+
+def test_cosine_drift():
+    """测试余弦漂移计算"""
+    reference = [[1.0, 0.0], [0.0, 2.0], [3.0, 4.0]]
+    assert cosine_drift(reference, reference)['max_drift'] == pytest.approx(0.0)
+
+    drift = cosine_drift(reference, [[1.0, 0.0], [0.0, 2.0], [4.0, 3.0]])
+    assert drift['min_cosine'] == pytest.approx(0.96)
+    assert drift['max_drift'] == pytest.approx(0.04)
+    assert drift['samples'] == 3
+
+    with pytest.raises(ValueError):
+        cosine_drift(reference, reference[:2])
+
+
+def test_benchmark_throughput():
+    """测试吞吐量测量（含预热轮）"""
+    calls = []
+
+    def embed(texts):
+        calls.append(len(texts))
+        return [[0.0] for _ in texts]
+
+    result = benchmark_throughput(embed, ['文本'] * 10, rounds=2, warmup=1)
+    assert calls == [10, 10, 10]
+    assert result['rounds'] == 2
+    assert result['texts_per_second'] > 0
+
+
+def test_missing_export_is_reported(tmp_path):
+    """测试未导出ONNX模型时给出明确错误（ChromaDBManager据此回退PyTorch）"""
+    assert not is_exported(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        build_onnx_embeddings({'onnx': {'model_dir': str(tmp_path)}})
+
+
+
+def test_export_must_match_configured_model(tmp_path):
+    """测试导出目录按配置的模型确定，来源模型或维度不一致时报错"""
+    assert default_model_dir('GanymedeNil/text2vec-large-chinese').endswith('text2vec-large-chinese')
+    assert default_model_dir('models\\embeddings\\m3e-base').endswith('m3e-base')
+
+    with pytest.raises(FileNotFoundError, match='text2vec-large-chinese'):
+        build_onnx_embeddings({}, model_name='GanymedeNil/text2vec-large-chinese')
+
+    export_info = {'source_model': 'models/embeddings/text2vec-base-chinese', 'embedding_dim': 768}
+    with open(tmp_path / EXPORT_INFO_FILE, 'w', encoding='utf-8') as f:
+        json.dump(export_info, f)
+    with pytest.raises(ValueError, match='text2vec-large-chinese'):
+        build_onnx_embeddings({'onnx': {'model_dir': str(tmp_path)}}, model_name='GanymedeNil/text2vec-large-chinese')
+
+    validate_export(export_info, 'shibing624/text2vec-base-chinese', expected_dim=768)
+    with pytest.raises(ValueError, match='1024'):
+        validate_export(export_info, 'shibing624/text2vec-base-chinese', expected_dim=1024)
+    with pytest.raises(ValueError):
+        validate_export({'source_model': 'text2vec-base-chinese'}, expected_dim=1024, embedding_dim=768)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
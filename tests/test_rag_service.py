@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+RAG常驻服务测试脚本
+使用桩组件验证HTTP接口、客户端和请求耗时统计
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.exceptions import RAGSystemError
+from src.rag.rag_service import RAGService, RAGServiceClient
+
+
+class _StubVectorManager:
+    def search_similar_jobs(self, query, k=5, filters=None):
+        if query == 'missing':
+            raise KeyError('job_id')
+        return [SimpleNamespace(page_content=f"{query} 职位{i}", metadata={'job_id': f'job_{i}'}) for i in range(k)]
+
+
+class _StubCoordinator:
+    vector_manager = _StubVectorManager()
+
+    def get_system_status(self):
+        return {'components': {'vector_manager': True}}
+
+    def get_processing_progress(self):
+        return {'database_stats': {'total': 3}}
+
+
+class _StubMatcher:
+    def __init__(self, config=None):
+        self.config = config
+
+    async def find_matching_jobs(self, resume_profile, filters=None, top_k=20):
+        metadata = {'resume_name': resume_profile.name, 'filters': filters, 'top_k': top_k}
+        if self.config is not None:
+            metadata['config'] = self.config
+        return SimpleNamespace(to_dict=lambda: {
+            'matching_summary': {'total_matches': 0},
+            'matches': [],
+            'query_metadata': metadata
+        })
+
+
+@pytest.fixture
+def client():
+    service = RAGService({}, port=0, coordinator=_StubCoordinator(), matcher=_StubMatcher())
+    service.start(block=False)
+    yield RAGServiceClient(service.host, service.port, timeout=5)
+    service.shutdown()
+
+
+def test_service_endpoints(client):
+    """测试状态、搜索和匹配接口"""
+    assert client.is_available()
+    assert client.status()['progress']['database_stats']['total'] == 3
+
+    results = client.search('Python', k=2)
+    assert [result['metadata']['job_id'] for result in results] == ['job_0', 'job_1']
+
+    matched = client.match({'name': '测试'}, top_k=5, filters={'job_id': 'job_1'})
+    assert matched['query_metadata'] == {'resume_name': '测试', 'filters': {'job_id': 'job_1'}, 'top_k': 5}
+    assert matched['elapsed_ms'] >= 0
+
+
+def test_service_errors_and_stats(client):
+    """测试错误响应和请求耗时统计"""
+    with pytest.raises(RAGSystemError, match='400'):
+        client.search('')
+
+    with pytest.raises(RAGSystemError, match='404'):
+        client._request('GET', '/unknown')
+
+    stats = client.stats()['requests']
+    assert stats['/search']['count'] == 1
+    assert stats['/search']['errors'] == 1
+    assert stats['/search']['max_ms'] >= stats['/search']['p50_ms']
+
+
+def test_handler_errors_map_to_status_codes():
+    """测试处理函数内部的 KeyError 返回500，导入任务冲突返回409"""
+    service = RAGService({}, port=0, coordinator=_StubCoordinator(), matcher=_StubMatcher())
+    service.start(block=False)
+    client = RAGServiceClient(service.host, service.port, timeout=5)
+    try:
+        with pytest.raises(RAGSystemError, match='500'):
+            client.search('missing')
+
+        service._import_lock.acquire()
+        try:
+            with pytest.raises(RAGSystemError, match='409'):
+                client.import_jobs()
+        finally:
+            service._import_lock.release()
+    finally:
+        service.shutdown()
+
+
+def test_match_uses_requested_matcher_config():
+    """测试请求带匹配器配置时按配置创建（并缓存）匹配器，不带时使用常驻匹配器"""
+    service = RAGService({}, port=0, coordinator=_StubCoordinator(), matcher=_StubMatcher())
+    created = []
+
+    def create_matcher(config):
+        created.append(config)
+        return _StubMatcher(config)
+
+    service._create_matcher = create_matcher
+    service.start(block=False)
+    client = RAGServiceClient(service.host, service.port, timeout=5)
+    config = {'min_score_threshold': 0.25, 'weights': {'skills_match': 0.35}}
+    try:
+        for _ in range(2):
+            matched = client.match({'name': '测试'}, top_k=1, matcher_config=config)
+            assert matched['query_metadata']['config'] == config
+        assert created == [config]
+
+        assert 'config' not in client.match({'name': '测试'})['query_metadata']
+        with pytest.raises(RAGSystemError, match='400'):
+            client._request('POST', '/match', {'resume': {'name': '测试'}, 'matcher_config': [1]})
+    finally:
+        service.shutdown()
+
+
+def test_client_unavailable():
+    """测试服务未运行时客户端返回不可用"""
+    assert not RAGServiceClient('127.0.0.1', 1, timeout=0.2).is_available()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
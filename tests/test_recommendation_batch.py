@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+职位推荐批量检索测试脚本
+验证各推荐策略的查询一次向量化、并发检索、合并后一次分组评分，且结果与逐条串行搜索一致
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('langchain')
+
+from langchain.schema import Document
+
+from src.matcher.recommendation import JobRecommendationEngine
+
+
+class _FakeVectorManager:
+    """按查询词返回包含该词的职位文档，并记录向量化和检索调用"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.embed_calls = []
+        self.text_searches = 0
+        self._lock = threading.Lock()
+
+    def embed_queries(self, queries):
+        self.embed_calls.append(list(queries))
+        return [[float(i)] for i in range(len(queries))]
+
+    def _search(self, query, k):
+        words = query.lower().split()
+        hits = [doc for doc in self.documents if any(word in doc.page_content.lower() for word in words)]
+        return [(doc, 0.9 - rank * 0.01) for rank, doc in enumerate(hits[:k])]
+
+    def similarity_search_with_score(self, query, k=5, filters=None):
+        with self._lock:
+            self.text_searches += 1
+        return self._search(query, k)
+
+    def similarity_search_by_vector_with_score(self, embedding, k=5, filters=None):
+        query = self.current_queries[int(embedding[0])]
+        return self._search(query, k)
+
+
+def _documents():
+    jobs = [
+        ('job_1', 'Python 后端开发', ['python', 'django']),
+        ('job_2', 'React 前端开发', ['react', 'typescript']),
+        ('job_3', 'Python 数据工程师', ['python', 'spark']),
+        ('job_4', 'Go 后端开发', ['go', 'docker']),
+    ]
+    documents = []
+    for job_id, title, skills in jobs:
+        for index, doc_type in enumerate(['overview', 'skills']):
+            documents.append(Document(
+                page_content=f"{title} {' '.join(skills)}",
+                metadata={'doc_id': f'{job_id}_{index}', 'job_id': job_id, 'job_title': title,
+                          'company': f'{job_id}公司', 'type': doc_type, 'skills': skills}
+            ))
+    return documents
+
+
+def _engine(vector_manager, batched):
+    engine = JobRecommendationEngine(vector_manager, {'batched_retrieval': batched,
+                                                      'search': {'max_parallel_queries': 4}})
+
+    # 记录本次批量向量化的查询，供假向量库按向量下标还原查询词
+    search_batch = engine.search_engine.search_batch
+
+    def tracking_search_batch(requests, filters=None):
+        vector_manager.current_queries = [query for query, _, _ in requests]
+        return search_batch(requests, filters)
+
+    engine.search_engine.search_batch = tracking_search_batch
+    return engine
+
+
+USER_PROFILE = {'skills': ['Python', 'Django', 'Spark'], 'desired_position': '后端开发', 'experience_years': 3}
+
+
+def test_hybrid_recommendation_embeds_all_queries_once():
+    vector_manager = _FakeVectorManager(_documents())
+    engine = _engine(vector_manager, batched=True)
+
+    recommendations = engine.recommend_jobs(USER_PROFILE, strategy='hybrid', k=5)
+
+    # 内容查询 + 3个技能查询，一次模型调用
+    assert len(vector_manager.embed_calls) == 1
+    assert len(vector_manager.embed_calls[0]) == 4
+    assert vector_manager.text_searches == 0
+
+    job_ids = [rec['job_id'] for rec in recommendations]
+    assert len(job_ids) == len(set(job_ids))
+    assert {'job_1', 'job_3'} <= set(job_ids)
+
+
+@pytest.mark.parametrize('strategy', ['content_based', 'collaborative', 'hybrid', 'trending'])
+def test_batched_results_match_sequential(strategy):
+    documents = _documents()
+    batched = _engine(_FakeVectorManager(documents), batched=True).recommend_jobs(
+        USER_PROFILE, strategy=strategy, k=5)
+    sequential_manager = _FakeVectorManager(documents)
+    sequential = _engine(sequential_manager, batched=False).recommend_jobs(
+        USER_PROFILE, strategy=strategy, k=5)
+
+    assert sequential_manager.embed_calls == []
+    assert [(rec['job_id'], rec['recommendation_score']) for rec in batched] == \
+        [(rec['job_id'], rec['recommendation_score']) for rec in sequential]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+简历分段向量测试脚本
+验证简历分段向量按内容哈希缓存（未变化时不重新向量化）、多向量检索按加权最高分为职位文档打分
+（未归一化向量 + l2 空间下分数仍为余弦相似度）并应用过滤条件，以及简历写入时清理职位集合中的旧简历向量
+"""
+
+import sys
+import zlib
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('langchain')
+pytest.importorskip('hnswlib')
+
+from src.rag.vector_manager import ChromaDBManager
+from src.matcher.generic_resume_models import GenericResumeProfile
+from src.matcher.generic_resume_vectorizer import GenericResumeVectorizer, get_resume_id
+
+
+class FakeEmbeddings:
+    """按字符哈希生成的未归一化向量，记录每次向量化的文本数"""
+
+    def __init__(self, dim=32):
+        self.dim = dim
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for char in text:
+                vector[zlib.crc32(char.encode('utf-8')) % self.dim] += 1.0
+            vectors.append(vector)
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def _manager(tmp_path, space='l2'):
+    manager = ChromaDBManager({
+        'persist_directory': str(tmp_path),
+        'backend': 'hnsw',
+        'hnsw': {'space': space},
+        'resume_index': {'enabled': True},
+        'lexical_index': {'enabled': False}
+    })
+    manager.embeddings = FakeEmbeddings()
+    return manager
+
+
+def _profile(skills):
+    profile = GenericResumeProfile(name='Zhang San', total_experience_years=5, current_position='后端工程师')
+    profile.add_skill_category('编程语言', skills)
+    return profile
+
+
+def test_section_embeddings_cached_by_content_hash(tmp_path):
+    manager = _manager(tmp_path)
+    vectorizer = GenericResumeVectorizer(manager, {})
+    profile = _profile(['Python', 'Go'])
+
+    documents, embeddings = vectorizer.get_section_embeddings(profile)
+    assert manager.embeddings.calls == [len(documents)]
+    assert vectorizer.get_section_embeddings(profile)[1] == embeddings
+    assert len(manager.embeddings.calls) == 1
+
+    # 新进程（无进程内缓存）从简历集合读取，不重新向量化
+    reloaded_documents, reloaded = GenericResumeVectorizer(manager, {}).get_section_embeddings(_profile(['Python', 'Go']))
+    assert len(manager.embeddings.calls) == 1
+    assert reloaded == embeddings
+    assert [doc.page_content for doc in reloaded_documents] == [doc.page_content for doc in documents]
+
+    # 简历内容变化后重新向量化，并替换简历集合中的旧分段
+    changed_documents, _ = GenericResumeVectorizer(manager, {}).get_section_embeddings(_profile(['Python', 'Rust']))
+    assert manager.embeddings.calls == [len(documents), len(changed_documents)]
+    stored = manager.resume_collection.get(where={'resume_id': get_resume_id(profile)}, include=['metadatas'])
+    assert len(stored['ids']) == len(changed_documents)
+    assert len({metadata['content_hash'] for metadata in stored['metadatas']}) == 1
+
+
+def _add_job_vectors(manager):
+    rows = [
+        ('job_a:overview', [5.0, 0.0, 0.0, 0.0], 'job_a'),
+        ('job_a:skills', [0.0, 1.0, 0.0, 0.0], 'job_a'),
+        ('job_b:overview', [1.0, 1.0, 0.0, 0.0], 'job_b'),
+        ('job_c:overview', [0.0, 0.0, 4.0, 0.0], 'job_c'),
+    ]
+    manager.vectorstore._collection.add(
+        [vector_id for vector_id, _, _ in rows],
+        [vector for _, vector, _ in rows],
+        documents=[vector_id for vector_id, _, _ in rows],
+        metadatas=[{'job_id': job_id} for _, _, job_id in rows]
+    )
+
+
+@pytest.mark.parametrize('space', ['l2', 'cosine'])
+def test_multi_vector_search_takes_best_weighted_section(tmp_path, space):
+    manager = _manager(tmp_path, space)
+    _add_job_vectors(manager)
+
+    # 两个未归一化的简历分段，第二个权重0.5
+    sections = [[2.0, 0.0, 0.0, 0.0], [0.0, 3.0, 0.0, 0.0]]
+    results = manager.multi_vector_search(sections, k=10, weights=[1.0, 0.5])
+    scores = {doc.page_content: score for doc, score in results}
+
+    assert [doc.page_content for doc, _ in results][:3] == ['job_a:overview', 'job_b:overview', 'job_a:skills']
+    assert scores['job_a:overview'] == pytest.approx(1.0)
+    # job_a:skills 与第一个分段正交，取第二个分段的加权分数
+    assert scores['job_a:skills'] == pytest.approx(0.5)
+    # job_b:overview 两个分段的余弦都是 0.707，取加权后较高的一个
+    assert scores['job_b:overview'] == pytest.approx(2 ** -0.5, abs=1e-5)
+    assert scores['job_c:overview'] == pytest.approx(0.0)
+
+    filtered = manager.multi_vector_search(sections, k=10, filters={'job_id': {'$in': ['job_b', 'job_c']}},
+                                           weights=[1.0, 0.5])
+    assert {doc.metadata['job_id'] for doc, _ in filtered} == {'job_b', 'job_c'}
+    assert manager.multi_vector_search([], k=10) == []
+
+
+def test_vectorize_and_store_removes_legacy_resume_vectors(tmp_path):
+    manager = _manager(tmp_path)
+    _add_job_vectors(manager)
+    profile = _profile(['Python'])
+    resume_id = get_resume_id(profile)
+
+    # 旧版本把简历向量写进了职位集合
+    manager.vectorstore._collection.add(
+        [f'{resume_id}:legacy:0', f'{resume_id}:legacy:1'],
+        [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]],
+        documents=['旧简历概览', '旧简历技能'],
+        metadatas=[{'job_id': resume_id}, {'job_id': resume_id}]
+    )
+
+    doc_ids = asyncio.run(GenericResumeVectorizer(manager, {}).vectorize_and_store(profile))
+
+    job_collection = manager.vectorstore._collection
+    assert job_collection.get(where={'job_id': resume_id})['ids'] == []
+    assert job_collection.count() == 4
+    assert sorted(manager.resume_collection.get(where={'resume_id': resume_id})['ids']) == sorted(doc_ids)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+技能嵌入表测试脚本
+验证技能表的构建与内存映射加载、向量化的技能匹配（含表外技能按需向量化），
+以及匹配器用技能表识别映射规则之外的同义技能
+"""
+
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip('numpy')
+
+from src.matcher.skill_embeddings import SkillEmbeddingTable, collect_canonical_skills, embedding_model_id
+
+# 同一组内的技能互为同义词，方向相同；不同组正交
+SYNONYM_GROUPS = [
+    ['kubernetes', 'k8s', '容器编排'],
+    ['python', 'python3'],
+    ['数据湖', 'data lake', 'lakehouse'],
+    ['rust'],
+    ['spark', 'pyspark'],
+]
+
+
+class FakeEmbeddings:
+    """按同义词组返回确定向量的嵌入模型，记录每次向量化的文本"""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for index, group in enumerate(SYNONYM_GROUPS):
+                if text.lower() in group:
+                    # 同组向量带一点扰动，余弦相似度仍高于阈值
+                    vector[index] = 2.0
+                    vector[-1] = 0.1 * group.index(text.lower())
+                    break
+            else:
+                vector[len(SYNONYM_GROUPS) + zlib.crc32(text.encode('utf-8')) % (self.dim - len(SYNONYM_GROUPS) - 1)] = 1.0
+            vectors.append(vector)
+        return vectors
+
+
+def test_build_and_load_memory_mapped_table(tmp_path):
+    embeddings = FakeEmbeddings()
+    skills = collect_canonical_skills(['Kubernetes', ' python '], ['k8s', 'python', ''], ['数据湖'])
+    assert skills == ['kubernetes', 'python', 'k8s', '数据湖']
+
+    SkillEmbeddingTable.build(str(tmp_path), skills, embeddings.embed_documents, model='m3e-base', batch_size=3)
+    assert [len(batch) for batch in embeddings.calls] == [3, 1]
+    assert SkillEmbeddingTable.exists(str(tmp_path))
+
+    loaded = SkillEmbeddingTable(str(tmp_path)).load()
+    assert loaded.rows == 4 and loaded.dim == 64 and loaded.model == 'm3e-base'
+    assert isinstance(loaded._vectors, np.memmap)
+    assert np.allclose(np.linalg.norm(np.asarray(loaded._vectors), axis=1), 1.0)
+    assert 'K8S' in loaded and 'rust' not in loaded
+
+    assert embedding_model_id({'model_name': 'm3e-base'}) == 'm3e-base'
+    assert embedding_model_id({'model_name': 'm3e-base', 'local_model_path': './models/m3e'}) == './models/m3e'
+
+
+def test_match_uses_cosine_threshold_and_embeds_unknown_skills_once(tmp_path):
+    embeddings = FakeEmbeddings()
+    SkillEmbeddingTable.build(str(tmp_path), ['kubernetes', 'python', 'data lake', 'rust'], embeddings.embed_documents)
+    table = SkillEmbeddingTable(str(tmp_path), embeddings.embed_documents).load()
+    embeddings.calls.clear()
+
+    job_skills = ['Kubernetes', 'python', 'rust', 'spark']
+    resume_skills = ['容器编排', 'python3', 'lakehouse']
+    similarity = table.similarity(job_skills, resume_skills)
+    assert similarity.shape == (4, 3)
+    assert table.match(job_skills, resume_skills, 0.82) == [True, True, False, False]
+    # 表外技能批量向量化一次，之后命中缓存
+    assert embeddings.calls == [['spark', '容器编排', 'python3', 'lakehouse']]
+    table.match(['spark'], ['pyspark'], 0.82)
+    assert embeddings.calls[1:] == [['pyspark']]
+    assert table.match(['spark'], ['pyspark'], 0.82) == [True]
+    assert len(embeddings.calls) == 2
+
+    # 没有向量化函数时表外技能不参与向量匹配
+    offline = SkillEmbeddingTable(str(tmp_path)).load()
+    assert offline.match(['kubernetes', 'rust'], ['容器编排', 'rust'], 0.82) == [False, True]
+    assert offline.match([], ['rust'], 0.82) == [] and offline.match(['rust'], [], 0.82) == [False]
+
+
+class FakeVectorManager:
+    def __init__(self, persist_directory, model_name='m3e-base'):
+        self.persist_directory = persist_directory
+        self.config = {'embeddings': {'model_name': model_name}}
+        self.embeddings = FakeEmbeddings()
+
+
+def test_matcher_catches_synonyms_missing_from_rule_maps(tmp_path):
+    pytest.importorskip('langchain')
+    from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+
+    vector_manager = FakeVectorManager(str(tmp_path))
+    config = {'resume_matching_advanced': {'skill_embeddings': {'enabled': True}}}
+    matcher = GenericResumeJobMatcher(vector_manager, config)
+    assert matcher.skill_embedding_table is None
+
+    meta = matcher.build_skill_embedding_table()
+    assert meta['path'] == str(tmp_path / 'skill_embeddings') and meta['model'] == 'm3e-base'
+    assert {'python', 'kubernetes', 'k8s', '数据工程师', 'data engineer'} <= set(matcher.canonical_skills())
+
+    job_skills = ['kubernetes', 'rust', 'machine learning']
+    resume_skills = ['容器编排', 'ml']
+    # 映射规则：ml 是 machine learning 的变体，容器编排不在任何映射中
+    rule_matched = [matcher._is_skill_matched(skill, resume_skills) for skill in job_skills]
+    assert rule_matched == [False, False, True]
+
+    fresh = GenericResumeJobMatcher(vector_manager, config)
+    assert fresh.skill_embedding_table.rows == meta['rows']
+    assert fresh._match_job_skills(job_skills, resume_skills) == [True, False, True]
+    fresh.skill_rule_fallback = False
+    assert fresh._match_job_skills(job_skills, resume_skills) == [True, False, False]
+    # 表外技能无法向量化时只剩精确匹配，两侧都要规范化（调用方只把简历技能转成小写，未去空白）
+    fresh.skill_embedding_table.embed_fn = None
+    assert fresh._match_job_skills(['Foolang ', 'barscript'], [' foolang', 'BARSCRIPT ']) == [True, True]
+
+    # 嵌入模型变更后技能表失效，退回映射规则
+    stale = GenericResumeJobMatcher(FakeVectorManager(str(tmp_path), model_name='bge-large-zh'), config)
+    assert stale.skill_embedding_table is None
+    assert stale._match_job_skills(job_skills, resume_skills) == rule_matched
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+流式 top-k 测试脚本
+验证有界堆选择与稳定排序取前k一致，以及匹配器按分数上界跳过候选、只为前k生成匹配分析后结果不变
+"""
+
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.matcher.topk import BoundedTopK
+
+
+@pytest.mark.parametrize('k', [0, 1, 5, 50])
+def test_bounded_topk_matches_stable_sort(k):
+    rng = random.Random(k)
+    # 分数取一位小数，制造大量同分
+    scores = [round(rng.random(), 1) for _ in range(200)]
+
+    top_heap = BoundedTopK(k)
+    for order, score in enumerate(scores):
+        top_heap.push(score, order, f'item_{order}')
+
+    expected = sorted(enumerate(scores), key=lambda item: item[1], reverse=True)[:k]
+    assert top_heap.items() == [(score, f'item_{order}') for order, score in expected]
+
+
+def test_can_enter_respects_ties():
+    top_heap = BoundedTopK(2)
+    top_heap.push(0.5, 3, 'a')
+    top_heap.push(0.9, 4, 'b')
+    assert top_heap.threshold == 0.5
+
+    # 同分时顺序号更小的候选在稳定排序中靠前，可以进入
+    assert top_heap.can_enter(0.5, 2)
+    assert not top_heap.can_enter(0.5, 5)
+    assert not top_heap.can_enter(0.4, 0)
+
+
+def _job_docs(rng, job_index):
+    from langchain.schema import Document
+
+    skills = rng.sample(['python', 'java', 'go', 'react', 'docker', 'spark', 'sql'], 3)
+    return [
+        Document(
+            page_content=f"职位{job_index} {' '.join(skills)}",
+            metadata={'job_id': f'job_{job_index}', 'job_title': f'职位{job_index}', 'company': f'公司{job_index % 4}',
+                      'type': doc_type, 'skills': skills, 'search_score': round(rng.uniform(0.05, 0.95), 2),
+                      'experience_required': f'{rng.randint(1, 8)}年'}
+        )
+        for doc_type in ('overview', 'skills')
+    ]
+
+
+def test_generic_matcher_top_k_unchanged_and_analysis_deferred():
+    pytest.importorskip('langchain')
+    from src.matcher.generic_resume_matcher import GenericResumeJobMatcher
+    from src.matcher.generic_resume_models import GenericResumeProfile
+
+    rng = random.Random(7)
+    jobs = {f'job_{i}': _job_docs(rng, i) for i in range(60)}
+    matcher = GenericResumeJobMatcher(object(), {'min_score_threshold': 0.3})
+    profile = GenericResumeProfile(name='张三', total_experience_years=5)
+    profile.add_skill_category('编程语言', ['Python', 'Go', 'SQL'])
+
+    async def fake_search(query, filters, k, resume_profile=None):
+        return []
+
+    matcher._execute_semantic_search = fake_search
+    matcher._group_results_by_job = lambda results: jobs
+
+    # 全量打分后稳定排序取前k
+    async def brute_force(top_k):
+        results = [await matcher._calculate_match_score(profile, docs, job_id) for job_id, docs in jobs.items()]
+        results = [result for result in results if result and result.overall_score >= matcher.min_score_threshold]
+        results.sort(key=lambda result: result.overall_score, reverse=True)
+        return [(result.job_id, result.overall_score) for result in results[:top_k]]
+
+    expected = asyncio.run(brute_force(5))
+
+    analysis_calls = []
+    generate_match_analysis = matcher._generate_match_analysis
+
+    def counting_analysis(*args):
+        analysis_calls.append(args[2].get('job_id'))
+        return generate_match_analysis(*args)
+
+    matcher._generate_match_analysis = counting_analysis
+    result = asyncio.run(matcher.find_matching_jobs(profile, top_k=5))
+
+    assert [(match.job_id, match.overall_score) for match in result.matches] == expected
+    assert len(analysis_calls) == len(expected)
+    assert result.query_metadata['pruned_candidates'] > 0
+
+
+def test_smart_matching_top_k_unchanged_and_analysis_deferred():
+    pytest.importorskip('langchain')
+    from src.matcher.smart_matching import SmartMatchingEngine
+
+    rng = random.Random(11)
+    search_results = []
+    for i in range(30):
+        for doc in _job_docs(rng, i):
+            search_results.append({'content': doc.page_content, 'metadata': doc.metadata,
+                                   'similarity_score': doc.metadata['search_score']})
+
+    engine = SmartMatchingEngine(object(), {})
+    engine.search_engine.search = lambda **kwargs: search_results
+    resume_data = {'skills': ['python', 'go', 'sql'], 'experience_years': 4}
+
+    jobs_by_id = engine._group_results_by_job(search_results)
+    brute_force = [asyncio.run(engine._calculate_job_match(resume_data, docs)) for docs in jobs_by_id.values()]
+    brute_force.sort(key=lambda match: match['overall_score'], reverse=True)
+
+    analysis_calls = []
+    generate_match_analysis = engine._generate_match_analysis
+
+    def counting_analysis(*args):
+        analysis_calls.append(args[1]['job_id'])
+        return generate_match_analysis(*args)
+
+    engine._generate_match_analysis = counting_analysis
+    matches = asyncio.run(engine.match_resume_to_jobs(resume_data, k=5))
+
+    assert [(match['job_id'], match['overall_score']) for match in matches] == \
+        [(match['job_id'], match['overall_score']) for match in brute_force[:5]]
+    assert len(analysis_calls) == 5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
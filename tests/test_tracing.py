@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+链路追踪测试脚本
+验证Span嵌套、直方图分位数、后台资源采样和性能监控器的开销
+"""
+
+import sys
+import time
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.tracing import Tracer, HdrHistogram
+from src.rag.performance_monitor import PerformanceMonitor
+
+
+def test_histogram_percentiles():
+    """测试直方图分位数的相对误差"""
+    histogram = HdrHistogram()
+    values = [random.randint(1, 5_000_000) for _ in range(20000)]
+    for value in values:
+        histogram.record(value)
+
+    values.sort()
+    for percent in (50, 90, 99):
+        exact = values[int(len(values) * percent / 100) - 1]
+        assert abs(histogram.percentile(percent) - exact) / exact < 0.02
+
+    assert histogram.percentile(100) == values[-1]
+    assert histogram.min_value == values[0]
+    # 桶数量与记录次数无关
+    assert len(histogram.counts) < 3000
+
+
+def test_nested_spans_sync_and_async():
+    """测试同步和异步代码中的父子Span"""
+    tracer = Tracer()
+
+    with tracer.span('outer') as outer:
+        with tracer.span('inner') as inner:
+            pass
+    assert inner.parent_id == outer.span_id
+    assert inner.trace_id == outer.trace_id
+    assert tracer.current_span() is None
+
+    async def child(name):
+        async with tracer.span(name) as span:
+            await asyncio.sleep(0.01)
+            return span
+
+    async def parent():
+        async with tracer.span('request') as root:
+            spans = await asyncio.gather(child('a'), child('b'))
+        return root, spans
+
+    root, spans = asyncio.run(parent())
+    assert all(span.parent_id == root.span_id for span in spans)
+    assert tracer.get_summary('a')['a']['p50_ms'] >= 10
+
+
+def test_trace_decorator_records_errors():
+    """测试装饰器记录失败操作"""
+    tracer = Tracer()
+
+    @tracer.trace('flaky')
+    def flaky(fail):
+        if fail:
+            raise ValueError('失败')
+        return 1
+
+    flaky(False)
+    with pytest.raises(ValueError):
+        flaky(True)
+
+    summary = tracer.get_summary()['flaky']
+    assert summary['count'] == 2
+    assert summary['errors'] == 1
+    assert tracer.get_recent_spans(name='flaky')[-1]['error_message'] == '失败'
+    assert tracer.get_resource_usage()['sampled_at'] > 0
+
+
+def test_span_overhead():
+    """测试Span开销（每个Span应远小于1毫秒）"""
+    tracer = Tracer()
+    iterations = 10000
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with tracer.span('noop'):
+            pass
+    per_span_us = (time.perf_counter() - start) / iterations * 1e6
+
+    assert per_span_us < 200
+    assert tracer.get_summary('noop')['noop']['count'] == iterations
+
+
+def test_monitor_operation_does_not_block():
+    """测试性能监控器不再在操作前后阻塞采样CPU"""
+    monitor = PerformanceMonitor({'max_history_size': 5})
+
+    async def run():
+        for _ in range(10):
+            async with monitor.monitor_operation('quick_op', {'batch': 1}):
+                pass
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - start < 0.5
+
+    summary = monitor.get_performance_summary('quick_op')
+    assert summary['total_operations'] == 5
+    assert summary['latency_percentiles']['quick_op']['count'] >= 10
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+向量后端测试脚本
+验证 ChromaDB 风格的 where 过滤，HNSW 后端的增删改查、过滤检索、持久化恢复和压实，
+通过 BackendVectorStore.from_texts 直接创建 HNSW 向量存储，以及文本/向量检索在各后端返回同向的距离分数
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.vector_backends import match_where
+
+
+def test_match_where_operators():
+    metadata = {'job_id': 'job_1', 'type': 'skills', 'salary': 20000}
+
+    assert match_where(metadata, None)
+    assert match_where(metadata, {'job_id': 'job_1'})
+    assert not match_where(metadata, {'job_id': 'job_2'})
+    assert match_where(metadata, {'job_id': {'$in': ['job_1', 'job_3']}})
+    assert match_where(metadata, {'salary': {'$gte': 15000, '$lt': 30000}})
+    assert not match_where(metadata, {'salary': {'$gt': 20000}})
+    assert match_where(metadata, {'$and': [{'job_id': 'job_1'}, {'type': {'$ne': 'overview'}}]})
+    assert match_where(metadata, {'$or': [{'job_id': 'job_9'}, {'type': 'skills'}]})
+    assert not match_where({}, {'salary': {'$gt': 0}})
+
+    with pytest.raises(ValueError):
+        match_where(metadata, {'salary': {'$regex': '.*'}})
+
+
+def _vectors(rows, dim=16, seed=3):
+    np = pytest.importorskip('numpy')
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_hnsw_backend_crud_filter_and_reload(tmp_path):
+    pytest.importorskip('hnswlib')
+    from src.rag.hnsw_backend import HnswBackend
+
+    vectors = _vectors(60)
+    ids = [f'job_{i // 3}:chunk:{i % 3}' for i in range(60)]
+    metadatas = [{'job_id': f'job_{i // 3}', 'index': i % 3} for i in range(60)]
+    backend = HnswBackend(str(tmp_path / 'hnsw'), brute_force_threshold=5)
+    backend.add(ids, vectors, documents=[f'文档{i}' for i in range(60)], metadatas=metadatas)
+    assert backend.count() == 60
+
+    # 自身向量是最近邻
+    result = backend.query([vectors[7]], n_results=3)
+    assert result['ids'][0][0] == ids[7]
+    assert result['distances'][0][0] == pytest.approx(0.0, abs=1e-5)
+
+    # 倒排列过滤（精确计算路径）与非倒排列过滤（HNSW过滤路径）
+    filtered = backend.query([vectors[0]], n_results=10, where={'job_id': {'$in': ['job_4', 'job_5']}})
+    assert sorted(filtered['ids'][0]) == sorted(ids[12:18])
+    by_index = backend.query([vectors[0]], n_results=50, where={'index': 2})
+    assert len(by_index['ids'][0]) == 20
+    assert all(metadata['index'] == 2 for metadata in by_index['metadatas'][0])
+
+    job_docs = backend.get(where={'job_id': 'job_2'}, include=['embeddings', 'metadatas'])
+    assert job_docs['ids'] == ids[6:9]
+    assert job_docs['embeddings'][0] == pytest.approx(vectors[6].tolist(), abs=1e-6)
+
+    # 删除、更新元数据、覆盖写入
+    backend.delete(where={'job_id': 'job_0'})
+    backend.update([ids[3]], metadatas=[{'status': 'closed'}])
+    backend.upsert([ids[4]], [vectors[40]], documents=['新文档'], metadatas=[{'job_id': 'job_1', 'index': 1}])
+    backend.add([ids[5]], [vectors[41]], documents=['不会覆盖'], metadatas=[{'job_id': 'job_1'}])
+    assert backend.count() == 57
+    assert backend.query([vectors[0]], n_results=1)['ids'][0] != [ids[0]]
+
+    # 未调用 persist 时从日志和嵌入矩阵恢复
+    reloaded = HnswBackend(str(tmp_path / 'hnsw'))
+    assert reloaded.count() == 57
+    record = reloaded.get(ids=[ids[3], ids[4], ids[5]])
+    assert record['metadatas'][0]['status'] == 'closed'
+    assert record['documents'][1:] == ['新文档', '文档5']
+    assert reloaded.query([vectors[40]], n_results=2)['ids'][0][0] in (ids[4], ids[40])
+
+    # 压实后只保留有效行
+    assert reloaded.compact() == 57
+    assert reloaded.store.rows == 57
+    reloaded.close()
+    assert HnswBackend(str(tmp_path / 'hnsw')).count() == 57
+
+
+def test_backend_vector_store_from_texts(tmp_path):
+    pytest.importorskip('hnswlib')
+    pytest.importorskip('langchain')
+    from src.rag.vector_manager import BackendVectorStore
+
+    class _Embeddings:
+        def embed_documents(self, texts):
+            return [[float('Python' in text), float('Java' in text), 1.0] for text in texts]
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    with pytest.raises(ValueError, match='path'):
+        BackendVectorStore.from_texts(['Python开发'], _Embeddings())
+
+    store = BackendVectorStore.from_texts(
+        ['Python开发', 'Java开发'], _Embeddings(), metadatas=[{'job_id': 'job_1'}, {'job_id': 'job_2'}],
+        ids=['job_1:0', 'job_2:0'], path=str(tmp_path / 'hnsw'), space='cosine'
+    )
+    assert store._collection.count() == 2
+    assert store._collection.metadata['hnsw:space'] == 'cosine'
+    assert store.similarity_search('Python', k=1)[0].metadata['job_id'] == 'job_1'
+
+
+
+@pytest.mark.parametrize('backend', ['hnsw', 'chroma'])
+def test_text_and_vector_search_return_same_distances(tmp_path, backend):
+    pytest.importorskip('langchain')
+    if backend == 'hnsw':
+        pytest.importorskip('hnswlib')
+    else:
+        pytest.importorskip('langchain_chroma')
+    from langchain.schema import Document
+    from src.rag.vector_manager import ChromaDBManager
+
+    class _Embeddings:
+        def embed_documents(self, texts):
+            return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    manager = ChromaDBManager({'persist_directory': str(tmp_path), 'backend': backend,
+                               'lexical_index': {'enabled': False}})
+    manager.embeddings = _Embeddings()
+    manager.vectorstore.add_documents([Document(page_content='abc', metadata={'job_id': 'job_1'}),
+                                       Document(page_content='abcdefgh', metadata={'job_id': 'job_2'})],
+                                      ids=['job_1:0', 'job_2:0'])
+
+    by_text = [(doc.page_content, score) for doc, score in manager.similarity_search_with_score('abc', k=2)]
+    by_vector = [(doc.page_content, score) for doc, score in
+                 manager.similarity_search_by_vector_with_score(manager.embeddings.embed_query('abc'), k=2)]
+
+    # 两种检索都返回距离：越小越相似
+    assert [content for content, _ in by_text] == [content for content, _ in by_vector] == ['abc', 'abcdefgh']
+    assert [score for _, score in by_vector] == pytest.approx([score for _, score in by_text])
+    assert by_vector[0][1] < by_vector[1][1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+向量垃圾回收测试脚本
+验证孤儿向量识别（软删除、已清理职位）、批量删除、压实和延迟报告
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.operations import DatabaseManager
+from src.database.vector_gc import VectorGarbageCollector
+
+
+class _FakeCollection:
+    """按插入顺序分页的内存集合"""
+
+    def __init__(self, records):
+        self.records = dict(records)
+
+    def count(self):
+        return len(self.records)
+
+    def get(self, include=None, limit=None, offset=0):
+        items = list(self.records.items())[offset:offset + limit]
+        return {'ids': [vid for vid, _ in items], 'metadatas': [meta for _, meta in items]}
+
+
+class _FakeVectorStore:
+    def __init__(self, collection):
+        self._collection = collection
+
+
+class _FakeVectorManager:
+    def __init__(self, records, persist_directory):
+        self.vectorstore = _FakeVectorStore(_FakeCollection(records))
+        self.persist_directory = persist_directory
+        self.deleted_batches = []
+        self.compacted = 0
+        self.searches = 0
+
+    def delete_documents_by_ids(self, ids, doc_keys=None):
+        self.deleted_batches.append((list(ids), list(doc_keys)))
+        for vector_id in ids:
+            self.vectorstore._collection.records.pop(vector_id)
+        return True
+
+    def compact_collection(self, batch_size=1000):
+        self.compacted += 1
+        return self.vectorstore._collection.count()
+
+    def embed_queries(self, queries):
+        return [[0.0] for _ in queries]
+
+    def similarity_search_by_vector_with_score(self, embedding, k=5, filters=None):
+        self.searches += 1
+        return []
+
+
+def _setup(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    db_manager.init_database()
+    with db_manager.get_connection() as conn:
+        for job_id, is_deleted in [('job_live', 0), ('job_soft_deleted', 1)]:
+            conn.execute(
+                "INSERT INTO jobs (job_id, title, company, url, website, is_deleted) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, '开发工程师', '测试公司', f'https://example.com/{job_id}', 'test', is_deleted)
+            )
+        conn.commit()
+
+    records = []
+    for job_id in ('job_live', 'job_soft_deleted', 'job_purged', 'resume_zhang_san'):
+        for i in range(3):
+            records.append((f'{job_id}:overview:{i}', {'job_id': job_id, 'doc_id': f'{job_id}_{i}'}))
+    records.append(('no-job-metadata', {}))
+
+    persist_directory = tmp_path / "chroma"
+    persist_directory.mkdir()
+    (persist_directory / "data.bin").write_bytes(b'0' * 128)
+    return db_manager, _FakeVectorManager(records, str(persist_directory))
+
+
+def test_dry_run_reports_orphans_without_deleting(tmp_path):
+    """测试干运行只统计孤儿向量"""
+    db_manager, vector_manager = _setup(tmp_path)
+    collector = VectorGarbageCollector(db_manager, vector_manager, {'batch_size': 4, 'latency_rounds': 0})
+
+    report = collector.run(dry_run=True)
+
+    assert report['scanned'] == 13
+    assert report['orphan_jobs'] == 2
+    assert report['orphan_vectors'] == 6
+    assert report['deleted_vectors'] == 0
+    assert vector_manager.deleted_batches == []
+
+
+def test_gc_deletes_orphans_in_batches_and_compacts(tmp_path):
+    """测试分批删除孤儿向量、压实并报告延迟"""
+    db_manager, vector_manager = _setup(tmp_path)
+    collector = VectorGarbageCollector(db_manager, vector_manager, {
+        'batch_size': 4, 'latency_rounds': 2, 'latency_queries': ['Python']
+    })
+
+    report = collector.run()
+
+    assert report['deleted_vectors'] == 6
+    assert [len(ids) for ids, _ in vector_manager.deleted_batches] == [4, 2]
+    assert vector_manager.deleted_batches[0][1][0] == 'job_soft_deleted_0'
+    assert vector_manager.compacted == 1
+    assert report['compacted_documents'] == 7
+
+    remaining = {meta.get('job_id') for meta in vector_manager.vectorstore._collection.records.values()}
+    assert remaining == {'job_live', 'resume_zhang_san', None}
+
+    assert report['latency_before']['samples'] == 2
+    assert report['latency_after']['samples'] == 2
+    assert report['size_before_bytes'] == 128
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+向量快照测试脚本
+验证全量/增量快照导出（按 updated_at 包含仅元数据更新的向量）、空集合批量加载、增量删除同步以及词法索引重建
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('numpy')
+pytest.importorskip('pyarrow')
+
+from src.rag.lexical_index import BM25Index
+from src.rag.vector_snapshot import export_snapshot, import_snapshot, read_manifest
+
+
+class _FakeCollection:
+    """按插入顺序分页的内存集合"""
+
+    def __init__(self, records=None):
+        self.records = dict(records or {})
+        self.metadata = {'hnsw:space': 'cosine'}
+        self.calls = []
+
+    def count(self):
+        return len(self.records)
+
+    def get(self, include=None, limit=None, offset=0):
+        items = list(self.records.items())[offset:offset + limit]
+        return {
+            'ids': [vector_id for vector_id, _ in items],
+            'embeddings': [record['embedding'] for _, record in items],
+            'documents': [record['document'] for _, record in items],
+            'metadatas': [record['metadata'] for _, record in items],
+        }
+
+    def _write(self, ids, embeddings, documents, metadatas):
+        for vector_id, embedding, document, metadata in zip(ids, embeddings, documents, metadatas):
+            self.records[vector_id] = {'embedding': embedding, 'document': document, 'metadata': metadata}
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.calls.append('add')
+        self._write(ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.calls.append('upsert')
+        self._write(ids, embeddings, documents, metadatas)
+
+    def delete(self, ids):
+        for vector_id in ids:
+            self.records.pop(vector_id, None)
+
+
+def _record(job, index, created_at):
+    return f'{job}:chunk:{index}', {
+        'embedding': [float(index), 0.5, -1.0],
+        'document': f'{job} Python 开发 {index}',
+        'metadata': {'job_id': job, 'doc_id': f'{job}_{index}', 'created_at': created_at},
+    }
+
+
+def test_full_and_incremental_snapshot_round_trip(tmp_path):
+    source = _FakeCollection(dict(
+        [_record('job_1', i, '2026-01-01T10:00:00') for i in range(5)] +
+        [_record('job_2', i, '2026-01-02T10:00:00') for i in range(3)]
+    ))
+
+    full = export_snapshot(source, str(tmp_path / 'full'), chunk_size=3, collection_name='job_positions')
+    assert full['mode'] == 'full' and full['rows'] == 8 and full['dim'] == 3
+    assert read_manifest(str(tmp_path / 'full'))['space'] == 'cosine'
+
+    # 基准快照之后：新增 job_3、删除 job_1 的一个分块、job_2 的一个分块仅更新元数据（created_at 不变）
+    source.records.update(dict(_record('job_3', i, '2026-02-01T09:00:00') for i in range(2)))
+    source.records.pop('job_1:chunk:4')
+    source.records['job_2:chunk:1']['metadata'] = dict(
+        source.records['job_2:chunk:1']['metadata'], salary='30k', updated_at='2026-02-02T09:00:00'
+    )
+    incremental = export_snapshot(source, str(tmp_path / 'inc'), since='2026-01-15T00:00:00', chunk_size=3)
+    assert incremental['mode'] == 'incremental'
+    assert incremental['rows'] == 3 and incremental['scanned'] == 9
+
+    # since 也可以直接指定上一个快照目录
+    assert export_snapshot(source, str(tmp_path / 'inc2'), since=str(tmp_path / 'inc'))['since'] == \
+        incremental['snapshot_time']
+
+    target = _FakeCollection()
+    lexical = BM25Index()
+    stats = import_snapshot(target, [str(tmp_path / 'full'), str(tmp_path / 'inc')], batch_size=4,
+                            lexical_index=lexical)
+
+    assert stats['written'] == 11 and stats['deleted'] == 1 and stats['bulk_load']
+    assert target.calls[0] == 'add' and target.calls[-1] == 'upsert'
+    assert sorted(target.records) == sorted(source.records)
+    assert target.records['job_3:chunk:1']['embedding'] == pytest.approx([1.0, 0.5, -1.0])
+    assert target.records['job_2:chunk:0']['metadata']['doc_id'] == 'job_2_0'
+    assert target.records['job_2:chunk:1']['metadata']['salary'] == '30k'
+    assert len(lexical) == 9
+    assert lexical.get_job_id('job_3_0') == 'job_3'
+    assert lexical.get_job_id('job_1_4') is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
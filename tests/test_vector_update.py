@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+职位文档增量更新测试脚本
+验证按内容哈希把新文档分为新增、删除、内容变化和仅元数据变化四类，只对内容变化和新增的文档重新嵌入，
+仅元数据变化的文档保留原 created_at 并刷新 updated_at，以及元数据库中没有记录的职位退回整体重建
+"""
+
+import sys
+import zlib
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('langchain')
+pytest.importorskip('hnswlib')
+
+from langchain.schema import Document
+from src.rag.vector_manager import ChromaDBManager
+from src.database.vector_ops import VectorDatabaseOperations
+
+
+class FakeEmbeddings:
+    """按字符哈希生成向量，记录每次向量化的文本"""
+
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for char in text:
+                vector[zlib.crc32(char.encode('utf-8')) % self.dim] += 1.0
+            vectors.append(vector)
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def _operations(tmp_path):
+    manager = ChromaDBManager({
+        'persist_directory': str(tmp_path / 'vectors'),
+        'backend': 'hnsw',
+        'lexical_index': {'enabled': False}
+    })
+    manager.embeddings = FakeEmbeddings()
+    return VectorDatabaseOperations(manager, {'metadata_db_path': str(tmp_path / 'meta' / 'vector_metadata.db')})
+
+
+def _documents(overview='Python后端开发工程师', responsibility='负责后端服务开发',
+               requirement='熟悉Python', salary='20k-30k', extra=None):
+    documents = [
+        Document(page_content=overview, metadata={'type': 'overview', 'salary': salary}),
+        Document(page_content=responsibility, metadata={'type': 'responsibility', 'index': 0}),
+        Document(page_content=requirement, metadata={'type': 'requirement', 'index': 0}),
+    ]
+    if extra:
+        documents.append(Document(page_content=extra, metadata={'type': 'requirement', 'index': 1}))
+    return documents
+
+
+def _stored(operations, job_id):
+    collection = operations.vector_manager.vectorstore._collection
+    result = collection.get(where={'job_id': job_id}, include=['documents', 'metadatas'])
+    return {document: (vector_id, metadata)
+            for vector_id, document, metadata in zip(result['ids'], result['documents'], result['metadatas'])}
+
+
+def test_update_splits_added_removed_changed_and_metadata_only(tmp_path):
+    operations = _operations(tmp_path)
+    embeddings = operations.vector_manager.embeddings
+
+    # 元数据库中没有记录：整体重建
+    first = operations.update_job_documents('job_1', _documents())
+    assert first['success'] and first['mode'] == 'full' and first['updated_documents'] == 3
+    original = _stored(operations, 'job_1')
+    embeddings.calls.clear()
+
+    # 概览仅元数据变化、职责内容变化、新增一条要求、其余不变
+    second = operations.update_job_documents(
+        'job_1', _documents(responsibility='负责分布式后端服务开发', salary='25k-35k', extra='熟悉Docker')
+    )
+    assert second['mode'] == 'incremental'
+    assert (second['updated_documents'], second['metadata_updated_documents'],
+            second['removed_documents'], second['unchanged_documents']) == (2, 1, 0, 1)
+    assert embeddings.calls == [['负责分布式后端服务开发', '熟悉Docker']]
+
+    current = _stored(operations, 'job_1')
+    assert set(current) == {'Python后端开发工程师', '负责分布式后端服务开发', '熟悉Python', '熟悉Docker'}
+    # 仅元数据变化的文档不重新嵌入：向量ID不变，元数据更新，created_at 保持原值，updated_at 刷新
+    overview_id, overview_metadata = current['Python后端开发工程师']
+    assert overview_id == original['Python后端开发工程师'][0]
+    assert overview_metadata['salary'] == '25k-35k'
+    assert overview_metadata['created_at'] == original['Python后端开发工程师'][1]['created_at']
+    assert overview_metadata['updated_at'] > original['Python后端开发工程师'][1]['updated_at']
+    # 未变化的文档原样保留
+    assert current['熟悉Python'] == original['熟悉Python']
+
+    # 删除最后一条要求，其余不变：不重新嵌入
+    embeddings.calls.clear()
+    third = operations.update_job_documents(
+        'job_1', _documents(responsibility='负责分布式后端服务开发', salary='25k-35k')
+    )
+    assert (third['updated_documents'], third['metadata_updated_documents'],
+            third['removed_documents'], third['unchanged_documents']) == (0, 0, 1, 3)
+    assert embeddings.calls == []
+    assert set(_stored(operations, 'job_1')) == {'Python后端开发工程师', '负责分布式后端服务开发', '熟悉Python'}
+
+    with sqlite3.connect(operations.metadata_db_path) as conn:
+        active = conn.execute(
+            "SELECT COUNT(*) FROM vector_documents WHERE job_id = 'job_1' AND is_active = TRUE"
+        ).fetchone()[0]
+    assert active == 3
+
+
+def test_update_without_stored_metadata_falls_back_to_full_rebuild(tmp_path):
+    operations = _operations(tmp_path)
+    # 旧版本直接写入向量库的职位没有元数据记录
+    operations.vector_manager.add_job_documents(_documents(requirement='熟悉Java'), 'job_2')
+    assert set(_stored(operations, 'job_2')) == {'Python后端开发工程师', '负责后端服务开发', '熟悉Java'}
+
+    result = operations.update_job_documents('job_2', _documents())
+    assert result['success'] and result['mode'] == 'full'
+    assert set(_stored(operations, 'job_2')) == {'Python后端开发工程师', '负责后端服务开发', '熟悉Python'}
+    assert len(operations._load_stored_documents('job_2')) == 3
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))